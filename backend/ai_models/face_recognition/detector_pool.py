@@ -0,0 +1,115 @@
+"""
+Face detector pool
+MediaPipe graphs must not run process() concurrently, so camera threads
+check a detector out of this pool instead of sharing one. Detectors are
+created on demand up to the pool size, so the number of graphs follows the
+number of threads that actually detect at the same time.
+"""
+
+import os
+import time
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+
+class DetectorPool:
+    """
+    Checkout/return pool of detector instances
+    """
+
+    def __init__(self, factory: Callable[[], Any], size: Optional[int] = None,
+                 wait_observer: Optional[Callable[[float], None]] = None):
+        """
+        Args:
+            factory: Creates one detector
+            size: Maximum detectors (default: FACE_DETECTOR_POOL_SIZE, or the CPU count)
+            wait_observer: Called with the seconds each checkout waited (e.g. a metrics histogram)
+        """
+        self.factory = factory
+        self.size = size or int(os.getenv('FACE_DETECTOR_POOL_SIZE', '0')) or (os.cpu_count() or 1)
+        self.wait_observer = wait_observer
+        self._free: List[Any] = []
+        self._created = 0
+        self._in_use = 0
+        self._cond = threading.Condition()
+        self.stats = {
+            'checkouts': 0,
+            'waits': 0,              # checkouts that found every detector busy
+            'wait_seconds_total': 0.0,
+            'max_wait_seconds': 0.0
+        }
+
+    def _acquire(self, timeout: Optional[float]):
+        start = time.perf_counter()
+        deadline = None if timeout is None else start + timeout
+        waited = False
+        create = False
+        with self._cond:
+            while not self._free:
+                if self._created < self.size:
+                    self._created += 1  # reserve; build outside the lock
+                    create = True
+                    break
+                waited = True
+                remaining = None if deadline is None else deadline - time.perf_counter()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError(f"No face detector free after {timeout:.1f}s ({self.size} in use)")
+                self._cond.wait(remaining)
+            detector = None if create else self._free.pop()
+            self._in_use += 1
+
+        if create:
+            try:
+                detector = self.factory()
+            except Exception:
+                with self._cond:
+                    self._created -= 1
+                    self._in_use -= 1
+                    self._cond.notify()
+                raise
+
+        wait = time.perf_counter() - start if waited else 0.0
+        with self._cond:
+            self.stats['checkouts'] += 1
+            if waited:
+                self.stats['waits'] += 1
+                self.stats['wait_seconds_total'] += wait
+                self.stats['max_wait_seconds'] = max(self.stats['max_wait_seconds'], wait)
+        if self.wait_observer is not None:
+            self.wait_observer(wait)
+        return detector
+
+    def _release(self, detector):
+        with self._cond:
+            self._free.append(detector)
+            self._in_use -= 1
+            self._cond.notify()
+
+    @contextmanager
+    def checkout(self, timeout: Optional[float] = None):
+        """
+        Borrow a detector for the duration of the with block
+
+        Raises:
+            TimeoutError: No detector became free within timeout seconds
+        """
+        detector = self._acquire(timeout)
+        try:
+            yield detector
+        finally:
+            self._release(detector)
+
+    def get_stats(self) -> Dict:
+        with self._cond:
+            return {**self.stats, 'size': self.size, 'created': self._created, 'in_use': self._in_use}
+
+    def close(self):
+        """Close idle detectors (MediaPipe graphs hold native resources)"""
+        with self._cond:
+            idle, self._free = self._free, []
+            self._created -= len(idle)
+        for detector in idle:
+            close = getattr(detector, 'close', None)
+            if close is not None:
+                close()
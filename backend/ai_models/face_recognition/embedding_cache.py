@@ -0,0 +1,108 @@
+"""
+Persistent face embedding cache for training
+Stores backbone feature vectors in SQLite keyed by
+(image content hash, augmentation, backbone version), so retraining only
+embeds new or changed images and a changed backbone never reuses stale vectors.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+# Marker stored for images where no usable face was found
+NO_FACE = 'no_face'
+
+
+def image_hash(data: bytes) -> str:
+    """Content hash of the encoded image file"""
+    return hashlib.sha256(data).hexdigest()
+
+
+class EmbeddingCache:
+    """SQLite-backed store of float32 embeddings"""
+
+    def __init__(self, path: str, backbone_version: str):
+        """
+        Args:
+            path: SQLite database file (created if missing)
+            backbone_version: Identifies backbone weights + preprocessing; entries
+                for other versions are ignored
+        """
+        self.path = str(path)
+        self.backbone_version = backbone_version
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS embeddings ('
+                ' image_hash TEXT NOT NULL,'
+                ' augmentation TEXT NOT NULL,'
+                ' backbone TEXT NOT NULL,'
+                ' dim INTEGER,'
+                ' vector BLOB,'
+                ' created REAL NOT NULL,'
+                ' PRIMARY KEY (image_hash, augmentation, backbone))'
+            )
+            self._conn.commit()
+        self.stats = {'hits': 0, 'misses': 0, 'writes': 0}
+
+    def get(self, digest: str) -> Dict[str, Optional[np.ndarray]]:
+        """
+        All cached augmentations of an image
+
+        Returns:
+            augmentation -> vector (None when that augmentation produced no embedding)
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT augmentation, vector FROM embeddings WHERE image_hash = ? AND backbone = ?',
+                (digest, self.backbone_version)
+            ).fetchall()
+        result = {
+            augmentation: np.frombuffer(blob, dtype=np.float32) if blob is not None else None
+            for augmentation, blob in rows
+        }
+        self.stats['hits' if result else 'misses'] += 1
+        return result
+
+    def put_many(self, digest: str, vectors: Dict[str, Optional[np.ndarray]]):
+        """Store embeddings for an image in one transaction"""
+        now = time.time()
+        rows = []
+        for augmentation, vector in vectors.items():
+            if vector is None:
+                rows.append((digest, augmentation, self.backbone_version, None, None, now))
+            else:
+                vector = np.ascontiguousarray(vector, dtype=np.float32).ravel()
+                rows.append((digest, augmentation, self.backbone_version, vector.size, vector.tobytes(), now))
+        with self._lock:
+            self._conn.executemany('INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?, ?, ?)', rows)
+            self._conn.commit()
+        self.stats['writes'] += len(rows)
+
+    def prune(self, keep_hashes: Iterable[str]) -> int:
+        """Delete entries for images that are gone and for other backbone versions"""
+        keep = set(keep_hashes)
+        with self._lock:
+            existing = self._conn.execute('SELECT DISTINCT image_hash, backbone FROM embeddings').fetchall()
+            stale = [(h, b) for h, b in existing if h not in keep or b != self.backbone_version]
+            self._conn.executemany('DELETE FROM embeddings WHERE image_hash = ? AND backbone = ?', stale)
+            self._conn.commit()
+        return len(stale)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                'SELECT COUNT(*) FROM embeddings WHERE backbone = ?', (self.backbone_version,)
+            ).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,232 @@
+"""
+Nearest-neighbour face gallery
+Per-person prototype embeddings in one contiguous, L2-normalised float32
+matrix. All faces of a frame are matched with a single matrix product.
+
+Enrolling a new person appends rows into spare capacity and publishes a new
+snapshot; re-enrolling or removing a person publishes a compacted copy. Readers always
+work on a complete snapshot, so running cameras pick up changes on their
+next frame without locks or a classifier retrain.
+"""
+
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class GallerySnapshot:
+    """Immutable view of the gallery used for matching"""
+
+    __slots__ = ('matrix', 'labels', 'names', 'version')
+
+    def __init__(self, matrix: np.ndarray, labels: np.ndarray, names: Tuple[str, ...], version: int):
+        self.matrix = matrix    # (N, D) normalised prototypes
+        self.labels = labels    # (N,) index into names
+        self.names = names
+        self.version = version
+
+    def __len__(self) -> int:
+        return self.matrix.shape[0]
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[None, :]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+class EmbeddingGallery:
+    """
+    Enrolled identities for cosine-similarity matching
+    """
+
+    def __init__(self, dim: Optional[int] = None, max_prototypes: int = 16, initial_capacity: int = 256,
+                 backbone_version: Optional[str] = None):
+        """
+        Args:
+            dim: Embedding size (taken from the first enrollment if None)
+            max_prototypes: Rows kept per person
+            initial_capacity: Rows preallocated before the first growth
+            backbone_version: Backbone weights + preprocessing the embeddings came from
+                (saved with the gallery; embeddings from another backbone do not compare)
+        """
+        self.dim = dim
+        self.backbone_version = backbone_version
+        self.max_prototypes = max_prototypes
+        self._capacity = initial_capacity
+        self._matrix: Optional[np.ndarray] = None
+        self._labels: Optional[np.ndarray] = None
+        self._names: List[str] = []
+        self._count = 0
+        self._write_lock = threading.Lock()
+        self._snapshot = GallerySnapshot(np.zeros((0, dim or 0), np.float32), np.zeros(0, np.int32), (), 0)
+
+    @property
+    def snapshot(self) -> GallerySnapshot:
+        return self._snapshot
+
+    def get_persons(self) -> List[str]:
+        snapshot = self._snapshot
+        present = set(snapshot.labels.tolist())
+        return [name for i, name in enumerate(snapshot.names) if i in present]
+
+    def _select_prototypes(self, vectors: np.ndarray) -> np.ndarray:
+        """Keep the centroid plus the samples farthest from it (covers pose/lighting spread)"""
+        if len(vectors) <= self.max_prototypes:
+            return vectors
+        centroid = _normalize(vectors.mean(axis=0))
+        order = np.argsort(vectors @ centroid[0])  # least similar first
+        return np.vstack([centroid, vectors[order[:self.max_prototypes - 1]]])
+
+    def add_person(self, name: str, embeddings: np.ndarray) -> int:
+        """
+        Enroll (or extend) a person
+
+        Prototypes are re-selected over the person's existing rows and the new
+        samples, so repeated enrollment keeps at most max_prototypes rows.
+
+        Returns:
+            Number of prototype rows now held for the person
+        """
+        vectors = _normalize(embeddings)
+        with self._write_lock:
+            self._check_dim(vectors)
+            if name in self._names and self._matrix is not None:
+                existing = self._labels[:self._count] == self._names.index(name)
+                if existing.any():
+                    vectors = np.vstack([self._matrix[:self._count][existing], vectors])
+                    self._compact(~existing)
+            return self._append_rows(name, self._select_prototypes(vectors))
+
+    def _append(self, name: str, vectors: np.ndarray) -> int:
+        with self._write_lock:
+            return self._append_rows(name, vectors)
+
+    def _check_dim(self, vectors: np.ndarray):
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+        if vectors.shape[1] != self.dim:
+            raise ValueError(f"Embedding size {vectors.shape[1]} does not match gallery ({self.dim})")
+
+    def _append_rows(self, name: str, vectors: np.ndarray) -> int:
+        """Append rows for a person and publish (caller holds the write lock)"""
+        self._check_dim(vectors)
+
+        if self._matrix is None:
+            self._matrix = np.empty((self._capacity, self.dim), dtype=np.float32)
+            self._labels = np.empty(self._capacity, dtype=np.int32)
+
+        needed = self._count + len(vectors)
+        if needed > self._matrix.shape[0]:
+            # Grow into new buffers - published snapshots keep the old ones
+            capacity = max(needed, self._matrix.shape[0] * 2)
+            matrix = np.empty((capacity, self.dim), dtype=np.float32)
+            labels = np.empty(capacity, dtype=np.int32)
+            matrix[:self._count] = self._matrix[:self._count]
+            labels[:self._count] = self._labels[:self._count]
+            self._matrix, self._labels = matrix, labels
+
+        if name in self._names:
+            label = self._names.index(name)
+        else:
+            label = len(self._names)
+            self._names.append(name)
+
+        # Rows past _count are invisible to existing snapshots, so this is safe while matching
+        self._matrix[self._count:needed] = vectors
+        self._labels[self._count:needed] = label
+        self._count = needed
+        self._publish()
+        return len(vectors)
+
+    def remove_person(self, name: str) -> bool:
+        """Remove a person (publishes a compacted copy)"""
+        with self._write_lock:
+            if name not in self._names or self._matrix is None:
+                return False
+            keep = self._labels[:self._count] != self._names.index(name)
+            if keep.all():
+                return False
+            self._compact(keep)
+            self._publish()
+        return True
+
+    def _compact(self, keep: np.ndarray):
+        """Copy the kept rows into new buffers - published snapshots keep the old ones (caller holds the write lock)"""
+        kept = int(keep.sum())
+        matrix = np.empty_like(self._matrix)
+        labels = np.empty_like(self._labels)
+        matrix[:kept] = self._matrix[:self._count][keep]
+        labels[:kept] = self._labels[:self._count][keep]
+        self._matrix, self._labels, self._count = matrix, labels, kept
+
+    def _publish(self):
+        self._snapshot = GallerySnapshot(
+            self._matrix[:self._count], self._labels[:self._count],
+            tuple(self._names), self._snapshot.version + 1
+        )
+
+    def match(self, embeddings: np.ndarray, threshold: float = 0.75,
+              margin: float = 0.0) -> List[Dict]:
+        """
+        Match a batch of face embeddings
+
+        Args:
+            embeddings: (M, D) features, one row per face
+            threshold: Minimum cosine similarity for a match
+            margin: Required gap to the best other person
+
+        Returns:
+            One dict per face: name ('Unknown' if no match), similarity, margin, matched
+        """
+        snapshot = self._snapshot
+        if len(embeddings) == 0:
+            return []
+        if len(snapshot) == 0:
+            return [{'name': 'Unknown', 'similarity': 0.0, 'margin': 0.0, 'matched': False}
+                    for _ in range(len(embeddings))]
+
+        queries = _normalize(embeddings)
+        similarities = queries @ snapshot.matrix.T  # (M, N)
+        best_rows = similarities.argmax(axis=1)
+        rows = np.arange(len(queries))
+        best = similarities[rows, best_rows]
+        best_labels = snapshot.labels[best_rows]
+        same_person = snapshot.labels[None, :] == best_labels[:, None]
+        runner_up = np.where(same_person, -np.inf, similarities).max(axis=1)
+        gaps = np.where(np.isfinite(runner_up), best - runner_up, best)
+
+        results = []
+        for i in range(len(queries)):
+            matched = bool(best[i] >= threshold and gaps[i] >= margin)
+            results.append({
+                'name': snapshot.names[best_labels[i]] if matched else 'Unknown',
+                'similarity': float(best[i]),
+                'margin': float(gaps[i]),
+                'matched': matched
+            })
+        return results
+
+    def save(self, path: str):
+        snapshot = self._snapshot
+        np.savez(path, matrix=snapshot.matrix, labels=snapshot.labels,
+                 names=np.array(snapshot.names, dtype=str),
+                 backbone_version=np.array(self.backbone_version or ''))
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> 'EmbeddingGallery':
+        # The enrollment API rewrites this file, so never unpickle it (names are a unicode array)
+        data = np.load(path, allow_pickle=False)
+        gallery = cls(dim=data['matrix'].shape[1], **kwargs)
+        # Galleries saved before versioning have no backbone_version
+        if 'backbone_version' in data.files:
+            gallery.backbone_version = str(data['backbone_version']) or None
+        names = [str(name) for name in data['names']]
+        for label, name in enumerate(names):
+            rows = data['matrix'][data['labels'] == label]
+            if len(rows):
+                gallery._append(name, rows)  # already normalised prototypes
+        return gallery
@@ -0,0 +1,129 @@
+"""
+Face quality gate
+Cheap checks run on every detected face before it reaches the recognition
+backbone: sharpness (variance of the Laplacian), size (inter-ocular distance
+from the detector's eye keypoints), exposure, and a frontal-pose proxy (nose
+offset from the eye midpoint). Motion-blurred, tiny, badly lit or profile
+faces are skipped instead of becoming "Unknown" results that raise intruder
+alerts; the next frame of the same person gets another chance.
+"""
+
+import os
+import threading
+from typing import Dict, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+# MediaPipe face detection keypoint order
+RIGHT_EYE, LEFT_EYE, NOSE_TIP = 0, 1, 2
+
+# Crops are scored at a fixed size so sharpness does not depend on face size
+SCORE_SIZE = (96, 96)
+
+
+class FaceQualityGate:
+    """
+    Scores face crops and decides which ones are worth embedding
+    """
+
+    def __init__(self, min_sharpness: Optional[float] = None, min_eye_distance: Optional[float] = None,
+                 min_brightness: Optional[float] = None, max_brightness: Optional[float] = None,
+                 min_contrast: Optional[float] = None, max_yaw: Optional[float] = None,
+                 enabled: Optional[bool] = None):
+        """
+        Args:
+            min_sharpness: Minimum Laplacian variance of the 96x96 grey crop
+            min_eye_distance: Minimum distance between the eyes in pixels
+            min_brightness / max_brightness: Allowed mean grey level
+            min_contrast: Minimum grey level standard deviation
+            max_yaw: Maximum nose offset from the eye midpoint, in eye distances
+                (0 = frontal, ~0.5 and above = turning towards profile)
+            enabled: False lets every face through (scores are still computed)
+        """
+        def setting(value, name, default):
+            return value if value is not None else float(os.getenv(name, default))
+
+        self.min_sharpness = setting(min_sharpness, 'FACE_MIN_SHARPNESS', '40')
+        self.min_eye_distance = setting(min_eye_distance, 'FACE_MIN_EYE_DISTANCE', '18')
+        self.min_brightness = setting(min_brightness, 'FACE_MIN_BRIGHTNESS', '40')
+        self.max_brightness = setting(max_brightness, 'FACE_MAX_BRIGHTNESS', '220')
+        self.min_contrast = setting(min_contrast, 'FACE_MIN_CONTRAST', '15')
+        self.max_yaw = setting(max_yaw, 'FACE_MAX_YAW', '0.5')
+        self.enabled = enabled if enabled is not None else os.getenv('FACE_QUALITY_GATE', 'true').lower() == 'true'
+
+        self._lock = threading.Lock()
+        self.stats = {'scored': 0, 'passed': 0, 'rejected': {}}
+
+    def score(self, face_image: np.ndarray,
+              keypoints: Optional[Sequence[Tuple[float, float]]] = None) -> Dict:
+        """
+        Score one face crop
+
+        Args:
+            face_image: BGR crop
+            keypoints: Detector keypoints in frame pixels (eyes and nose are used when present)
+
+        Returns:
+            Dict with sharpness, eye_distance, brightness, contrast, yaw (None if unknown),
+            passed, and the reasons it failed
+        """
+        reasons = []
+        if face_image is None or face_image.size == 0:
+            result = {'sharpness': 0.0, 'eye_distance': None, 'brightness': 0.0, 'contrast': 0.0,
+                      'yaw': None, 'passed': False, 'reasons': ['empty']}
+            self._count(result)
+            return result
+
+        gray = cv2.cvtColor(face_image, cv2.COLOR_BGR2GRAY) if face_image.ndim == 3 else face_image
+        gray = cv2.resize(gray, SCORE_SIZE, interpolation=cv2.INTER_AREA)
+        sharpness = float(cv2.Laplacian(gray, cv2.CV_64F).var())
+        brightness = float(gray.mean())
+        contrast = float(gray.std())
+
+        eye_distance = yaw = None
+        if keypoints is not None and len(keypoints) > NOSE_TIP:
+            right_eye = np.asarray(keypoints[RIGHT_EYE], dtype=np.float64)
+            left_eye = np.asarray(keypoints[LEFT_EYE], dtype=np.float64)
+            nose = np.asarray(keypoints[NOSE_TIP], dtype=np.float64)
+            eye_distance = float(np.linalg.norm(left_eye - right_eye))
+            if eye_distance > 0:
+                yaw = float(abs(nose[0] - (left_eye[0] + right_eye[0]) / 2) / eye_distance)
+
+        if sharpness < self.min_sharpness:
+            reasons.append('blur')
+        if eye_distance is not None and eye_distance < self.min_eye_distance:
+            reasons.append('small')
+        if brightness < self.min_brightness:
+            reasons.append('dark')
+        elif brightness > self.max_brightness:
+            reasons.append('bright')
+        if contrast < self.min_contrast:
+            reasons.append('low_contrast')
+        if yaw is not None and yaw > self.max_yaw:
+            reasons.append('pose')
+
+        result = {
+            'sharpness': round(sharpness, 1),
+            'eye_distance': round(eye_distance, 1) if eye_distance is not None else None,
+            'brightness': round(brightness, 1),
+            'contrast': round(contrast, 1),
+            'yaw': round(yaw, 3) if yaw is not None else None,
+            'passed': not reasons or not self.enabled,
+            'reasons': reasons
+        }
+        self._count(result)
+        return result
+
+    def _count(self, result: Dict):
+        with self._lock:
+            self.stats['scored'] += 1
+            if result['passed']:
+                self.stats['passed'] += 1
+            for reason in result['reasons']:
+                self.stats['rejected'][reason] = self.stats['rejected'].get(reason, 0) + 1
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {'scored': self.stats['scored'], 'passed': self.stats['passed'],
+                    'rejected': dict(self.stats['rejected']), 'enabled': self.enabled}
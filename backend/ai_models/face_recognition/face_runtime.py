@@ -0,0 +1,295 @@
+"""
+Face Recognition Runtime Base
+Detection, the quality gate, the enrollment gallery and the recognition decision
+rules shared by the Keras (MobileNetFaceRecognitionSystem) and TFLite
+(TFLiteFaceRecognitionSystem) runtimes. A runtime only provides inference:
+embed_faces(), classify_faces(), _class_label() and backbone_version.
+"""
+
+import os
+import logging
+from abc import ABC, abstractmethod
+
+import cv2
+import numpy as np
+import mediapipe as mp
+
+from embedding_cache import NO_FACE
+from detector_pool import DetectorPool
+from embedding_gallery import EmbeddingGallery
+from face_quality import FaceQualityGate
+from training_pipeline import AUGMENTATIONS
+
+logger = logging.getLogger(__name__)
+
+
+class FaceRecognitionRuntime(ABC):
+    def __init__(self):
+        # MediaPipe graphs are not thread-safe, so camera threads check one out of a pool
+        self.mp_face_detection = mp.solutions.face_detection
+        self.detector_pool = DetectorPool(self._create_face_detection)
+
+        # Blurred, tiny, badly lit or profile faces are skipped before the backbone
+        self.quality_gate = FaceQualityGate()
+
+        self.authorized_persons = []
+
+        # Enrollment mode: nearest-neighbour gallery instead of the softmax head
+        # ('classifier' keeps the trained classifier)
+        self.recognition_mode = os.getenv('FACE_RECOGNITION_MODE', 'classifier')
+        self.gallery_threshold = float(os.getenv('FACE_GALLERY_THRESHOLD', '0.75'))
+        self.gallery_margin = float(os.getenv('FACE_GALLERY_MARGIN', '0.05'))
+        self.gallery = EmbeddingGallery()
+        self.gallery_path = None
+
+        # Training feature extraction (see training_pipeline)
+        self.training_batch_size = int(os.getenv('FACE_TRAINING_BATCH_SIZE', '32'))
+        self.training_workers = int(os.getenv('FACE_TRAINING_WORKERS', '0')) or None
+
+    @abstractmethod
+    def embed_faces(self, face_images):
+        """Backbone features for face crops (None for crops under 50 px or None crops)"""
+
+    @abstractmethod
+    def classify_faces(self, face_images):
+        """(features, probabilities) for face crops, None for crops under 50 px or None crops"""
+
+    @abstractmethod
+    def _class_label(self, index: int) -> str:
+        """Person name for a classifier output index"""
+
+    def extract_face_features(self, face_image):
+        """Extract features from a face image"""
+        try:
+            return self.embed_faces([face_image])[0]
+        except Exception as e:
+            print(f"Error extracting features: {e}")
+            return None
+
+    def detect_faces(self, image, face_detection=None, with_keypoints=False):
+        """
+        Detect faces using MediaPipe (face_detection: detector to use instead of a pooled one)
+
+        Returns:
+            face_locations, or (face_locations, keypoints) with with_keypoints - keypoints
+            per face as (x, y) pixels: right eye, left eye, nose tip, mouth, ear tragions
+        """
+        rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        if face_detection is not None:
+            results = face_detection.process(rgb_image)
+        else:
+            with self.detector_pool.checkout() as pooled_detection:
+                results = pooled_detection.process(rgb_image)
+
+        face_locations = []
+        face_keypoints = []
+        if results.detections:
+            h, w, _ = image.shape
+            for detection in results.detections:
+                bbox = detection.location_data.relative_bounding_box
+                x = int(bbox.xmin * w)
+                y = int(bbox.ymin * h)
+                width = int(bbox.width * w)
+                height = int(bbox.height * h)
+
+                top = max(0, y)
+                right = min(w, x + width)
+                bottom = min(h, y + height)
+                left = max(0, x)
+
+                face_locations.append((top, right, bottom, left))
+                face_keypoints.append([(kp.x * w, kp.y * h) for kp in detection.location_data.relative_keypoints])
+
+        if with_keypoints:
+            return face_locations, face_keypoints
+        return face_locations
+
+    def _create_face_detection(self):
+        return self.mp_face_detection.FaceDetection(model_selection=1, min_detection_confidence=0.7)
+
+    def _new_face_detector(self):
+        """Detector for one training worker (MediaPipe graphs are not thread-safe)"""
+        face_detection = self._create_face_detection()
+        return lambda image: self.detect_faces(image, face_detection)
+
+    def embed_face_image(self, img):
+        """
+        Detect the first face in a decoded BGR image and embed each augmentation
+
+        Returns:
+            (vectors, cacheable): vectors maps augmentation -> features (None if
+            unusable), or is {NO_FACE: None} if no usable face was found
+        """
+        face_locations = self.detect_faces(img)
+        if len(face_locations) == 0:
+            return {NO_FACE: None}, True
+
+        top, right, bottom, left = face_locations[0]
+        face_image = img[top:bottom, left:right]
+        if face_image.shape[0] < 50 or face_image.shape[1] < 50:
+            return {NO_FACE: None}, True
+
+        vectors = {name: self.extract_face_features(augment(face_image)) for name, augment in AUGMENTATIONS.items()}
+        return vectors, all(features is not None for features in vectors.values())
+
+    def enroll_person(self, person_name: str, images) -> int:
+        """
+        Add a person to the gallery without retraining (live cameras see it on their next frame)
+
+        Returns:
+            Number of face samples enrolled
+        """
+        features = []
+        for img in images:
+            vectors, _ = self.embed_face_image(img)
+            features.extend(v for name, v in vectors.items() if name != NO_FACE and v is not None)
+        if not features:
+            return 0
+
+        self.gallery.add_person(person_name, np.array(features))
+        if person_name not in self.authorized_persons:
+            self.authorized_persons = self.authorized_persons + [person_name]
+        if self.gallery_path:
+            self.save_gallery()
+        return len(features)
+
+    def remove_person(self, person_name: str) -> bool:
+        """Remove a person from the gallery"""
+        if not self.gallery.remove_person(person_name):
+            return False
+        self.authorized_persons = [p for p in self.authorized_persons if p != person_name]
+        if self.gallery_path:
+            self.save_gallery()
+        return True
+
+    def load_gallery(self, gallery_path: str) -> bool:
+        """
+        Load a saved gallery (enrollments are written back to the same file)
+
+        Returns:
+            False if there is no gallery, or it was built with another backbone
+            or in the old pickled format and has to be rebuilt
+        """
+        self.gallery_path = gallery_path
+        if not os.path.exists(gallery_path):
+            return False
+        try:
+            gallery = EmbeddingGallery.load(gallery_path)
+        except ValueError:
+            # Galleries from before unicode names stored them pickled, which load() refuses
+            print(f"Gallery {gallery_path} uses the old pickled format - it needs to be rebuilt")
+            return False
+        if gallery.backbone_version != self.backbone_version:
+            print(f"Gallery {gallery_path} was built with backbone {gallery.backbone_version or 'unknown'}, "
+                  f"not {self.backbone_version} - it needs to be rebuilt")
+            return False
+        self.gallery = gallery
+        self.authorized_persons = self.gallery.get_persons()
+        print(f"Gallery loaded: {', '.join(self.authorized_persons)}")
+        return True
+
+    def save_gallery(self, gallery_path: str = None):
+        """Save the gallery stamped with this runtime's backbone_version (default: where it was loaded from)"""
+        self.gallery.backbone_version = self.backbone_version
+        self.gallery.save(gallery_path or self.gallery_path)
+
+    def quality_crops(self, frame):
+        """
+        Detect faces and score them with the quality gate
+
+        Returns:
+            (face_locations, crops, qualities): crops is None for faces that failed the gate
+        """
+        face_locations, face_keypoints = self.detect_faces(frame, with_keypoints=True)
+        crops, qualities = [], []
+        for (top, right, bottom, left), keypoints in zip(face_locations, face_keypoints):
+            crop = frame[top:bottom, left:right]
+            quality = self.quality_gate.score(crop, keypoints)
+            crops.append(crop if quality['passed'] else None)
+            qualities.append(quality)
+        return face_locations, crops, qualities
+
+    def recognize_faces_in_frame(self, frame):
+        """Recognize faces in a frame"""
+        face_names, face_locations, verification_results, _ = self.recognize_faces_with_quality(frame)
+        return face_names, face_locations, verification_results
+
+    def recognize_faces_with_quality(self, frame):
+        """
+        Recognize faces in a frame, skipping those that fail the quality gate
+
+        Returns:
+            (face_names, face_locations, verification_results, qualities): skipped faces
+            are "Unknown", unverified and have qualities[i]['passed'] == False
+        """
+        face_locations, crops, qualities = self.quality_crops(frame)
+        face_names, verification_results = self.recognize_face_crops(crops)
+        return face_names, face_locations, verification_results, qualities
+
+    def recognize_face_crops(self, crops):
+        """
+        Recognize face crops in one batched call (e.g. a track's best shots)
+
+        Returns:
+            (face_names, verification_results): aligned with crops; None crops are "Unknown"
+        """
+        if self.recognition_mode == 'gallery':
+            return self._recognize_with_gallery(crops)
+
+        face_names = []
+        verification_results = []
+
+        # All crops that passed the gate go through backbone + classifier together
+        _, probabilities = self.classify_faces(crops)
+
+        for predictions in probabilities:
+            if predictions is None:
+                face_names.append("Unknown")
+                verification_results.append(False)
+                continue
+
+            max_prob_index = int(np.argmax(predictions))
+            max_probability = predictions[max_prob_index]
+
+            # Get second highest probability to check confidence gap
+            sorted_probs = np.sort(predictions)[::-1]
+            second_prob = sorted_probs[1] if len(sorted_probs) > 1 else 0
+            confidence_gap = max_probability - second_prob
+
+            logger.debug("max confidence %.3f, 2nd: %.3f, gap: %.3f", max_probability, second_prob, confidence_gap)
+
+            # Stricter criteria for recognition:
+            # 1. Confidence must be >= 70% (increased from 50%)
+            # 2. Confidence gap between 1st and 2nd must be >= 20% (avoid ambiguous cases)
+            if max_probability >= 0.70 and confidence_gap >= 0.20:
+                predicted_label = self._class_label(max_prob_index)
+                face_names.append(predicted_label)
+                verification_results.append(True)
+                logger.debug("Recognized %s", predicted_label)
+            else:
+                logger.debug("Rejected: confidence %.3f or gap %.3f too low", max_probability, confidence_gap)
+                face_names.append("Unknown")
+                verification_results.append(False)
+
+        return face_names, verification_results
+
+    def _recognize_with_gallery(self, crops):
+        """Match every gated face crop against the gallery in one vectorized call"""
+        face_names = ["Unknown"] * len(crops)
+        verification_results = [False] * len(crops)
+
+        features, indices = [], []
+        for i, vector in enumerate(self.embed_faces(crops)):
+            if vector is not None:
+                features.append(vector)
+                indices.append(i)
+
+        if features:
+            matches = self.gallery.match(np.array(features), self.gallery_threshold, self.gallery_margin)
+            for i, match in zip(indices, matches):
+                face_names[i] = match['name']
+                verification_results[i] = match['matched']
+                logger.debug("Gallery match %s: similarity %.3f, margin %.3f",
+                             match['name'], match['similarity'], match['margin'])
+
+        return face_names, verification_results
@@ -17,8 +17,11 @@ import pickle
 from datetime import datetime
 from typing import List, Tuple
 import warnings
+import logging
 warnings.filterwarnings('ignore')
 
+logger = logging.getLogger(__name__)
+
 class ImprovedEfficientNetFaceRecognitionSystem:
     def __init__(self):
         """Initialize the Improved EfficientNet B7 Face Recognition System."""
@@ -390,9 +393,9 @@ class ImprovedEfficientNetFaceRecognitionSystem:
                     predicted_label = self.label_encoder.inverse_transform([max_prob_index])[0]
                     name = predicted_label
                     verification_result = 1
-                    print(f"Debug: Recognized {name} with confidence {max_probability:.3f}")
+                    logger.debug("Recognized %s with confidence %.3f", name, max_probability)
                 else:
-                    print(f"Debug: Rejected - max confidence {max_probability:.3f} < threshold {confidence_threshold}")
+                    logger.debug("Rejected - max confidence %.3f < threshold %s", max_probability, confidence_threshold)
                 
             except Exception as e:
                 print(f"Recognition error: {e}")
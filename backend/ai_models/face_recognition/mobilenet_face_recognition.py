@@ -7,7 +7,10 @@ import cv2
 import numpy as np
 import pickle
 import os
+import logging
+import time
 from pathlib import Path
+import tensorflow as tf
 from sklearn.preprocessing import LabelEncoder
 from sklearn.model_selection import train_test_split
 from tensorflow.keras.applications import MobileNetV2
@@ -15,83 +18,231 @@ from tensorflow.keras.applications.mobilenet_v2 import preprocess_input
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import Dense, Dropout, GlobalAveragePooling2D
 from tensorflow.keras.callbacks import EarlyStopping, ReduceLROnPlateau
-import mediapipe as mp
 
-class MobileNetFaceRecognitionSystem:
+from app.utils.model_artifacts import MODEL_LOADING, ArtifactError, enforce_offline, model_artifacts
+from embedding_cache import EmbeddingCache, NO_FACE, image_hash
+from embedding_gallery import EmbeddingGallery
+from face_runtime import FaceRecognitionRuntime
+from training_pipeline import AUGMENTATIONS, TrainingPipeline
+
+logger = logging.getLogger(__name__)
+
+# One traced graph serves every batch size
+INPUT_SIGNATURE = [tf.TensorSpec(shape=(None, 224, 224, 3), dtype=tf.float32)]
+
+BACKBONE_WEIGHTS = 'mobilenet_v2_imagenet_notop'
+BACKBONE_KEY = 'mobilenet_v2_backbone'
+
+
+def _load_backbone():
+    """MobileNetV2 feature extractor with ImageNet weights from the local artifact cache"""
+    enforce_offline()
+    model = MobileNetV2(
+        weights=model_artifacts.path(BACKBONE_WEIGHTS),  # verified local file, never downloaded
+        include_top=False,
+        input_shape=(224, 224, 3),
+        pooling='avg'
+    )
+    model.trainable = False
+    return model
+
+
+model_artifacts.register(BACKBONE_KEY, _load_backbone)
+
+
+def prepare_backbone_input(face_image):
+    """Face crop (BGR) -> preprocessed 224x224 RGB MobileNetV2 input"""
+    face_resized = cv2.resize(face_image, (224, 224), interpolation=cv2.INTER_LANCZOS4)
+    face_rgb = cv2.cvtColor(face_resized, cv2.COLOR_BGR2RGB)
+    return preprocess_input(face_rgb.astype(np.float32))
+
+class MobileNetFaceRecognitionSystem(FaceRecognitionRuntime):
     def __init__(self):
         print("Loading MobileNetV2 model...")
+        super().__init__()
         
-        # Load MobileNetV2 (much smaller than EfficientNetB7)
-        self.base_model = MobileNetV2(
-            weights='imagenet',  # This WORKS (no TensorFlow bug)
-            include_top=False,
-            input_shape=(224, 224, 3),
-            pooling='avg'
-        )
-        self.base_model.trainable = False
+        # The MobileNetV2 backbone (much smaller than EfficientNetB7) is shared by all
+        # instances and loaded on first use, unless MODEL_LOADING=eager
+        self._backbone_version = None
         
-        # Initialize MediaPipe Face Detection
-        self.mp_face_detection = mp.solutions.face_detection
-        self.face_detection = self.mp_face_detection.FaceDetection(
-            model_selection=1, min_detection_confidence=0.7
-        )
+        # Compiled inference: Keras predict() builds a data adapter and callbacks on
+        # every call, which dominates the cost of a single face
+        self.compiled_inference = os.getenv('FACE_COMPILED_INFERENCE', 'true').lower() == 'true'
+        self._embed_fn = None
+        self._fused_fn = None
         
         self.classifier_model = None
         self.label_encoder = None
-        self.authorized_persons = []
+        if MODEL_LOADING == 'eager':
+            try:
+                self._build_inference_functions()
+            except ArtifactError as e:
+                # Cached by model_artifacts; raised again (and reported) on first inference
+                logger.error("MobileNetV2 backbone unavailable: %s", e)
         
-        print("✅ MobileNetV2 model loaded successfully!")
+        print("✅ MobileNetV2 model loaded successfully!" if model_artifacts.is_loaded(BACKBONE_KEY)
+              else "✅ MobileNetV2 ready (backbone loads on first use)")
     
-    def extract_face_features(self, face_image):
-        """Extract features from a face image"""
-        try:
-            if face_image.shape[0] < 50 or face_image.shape[1] < 50:
-                return None
-            
-            # Resize
-            face_resized = cv2.resize(face_image, (224, 224), interpolation=cv2.INTER_LANCZOS4)
-            
-            # Convert BGR to RGB
-            face_rgb = cv2.cvtColor(face_resized, cv2.COLOR_BGR2RGB)
-            
-            # Preprocess for MobileNetV2
-            face_array = np.expand_dims(face_rgb, axis=0)
-            face_preprocessed = preprocess_input(face_array)
+    @property
+    def base_model(self):
+        return model_artifacts.get(BACKBONE_KEY)
+    
+    @property
+    def backbone_version(self):
+        """Cached embeddings are only reused for the same weights and preprocessing"""
+        if self._backbone_version is None:
+            weights_digest = model_artifacts.checksum(BACKBONE_WEIGHTS)[:12]
+            self._backbone_version = f"mobilenet_v2-224-avg-lanczos-{weights_digest}"
+        return self._backbone_version
+    
+    def _build_inference_functions(self):
+        """Trace the backbone (and backbone + classifier when trained) and warm them up"""
+        if not self.compiled_inference:
+            return
+        start = time.perf_counter()
+        base_model = self.base_model
+        warmup = tf.zeros((1, 224, 224, 3), tf.float32)
+        
+        if self._embed_fn is None:
+            self._embed_fn = tf.function(lambda images: base_model(images, training=False),
+                                         input_signature=INPUT_SIGNATURE)
+            self._embed_fn(warmup)
+        
+        self._fused_fn = None
+        if self.classifier_model is not None:
+            classifier = self.classifier_model
             
-            # Extract features
-            features = self.base_model.predict(face_preprocessed, verbose=0)
-            return features.flatten()
+            @tf.function(input_signature=INPUT_SIGNATURE)
+            def fused(images):
+                features = base_model(images, training=False)
+                return features, classifier(features, training=False)
             
-        except Exception as e:
-            print(f"Error extracting features: {e}")
-            return None
+            self._fused_fn = fused
+            self._fused_fn(warmup)
+        
+        logger.info("Compiled face inference ready (%.0f ms trace + warm-up)", (time.perf_counter() - start) * 1000)
+    
+    def _ensure_inference_functions(self, classify: bool = False):
+        """Trace on first inference (and after the classifier changes), not when a model is loaded"""
+        if not self.compiled_inference:
+            return
+        if self._embed_fn is None or (classify and self.classifier_model is not None and self._fused_fn is None):
+            self._build_inference_functions()
+    
+    def _backbone(self, batch):
+        """Backbone features for a preprocessed (N, 224, 224, 3) batch"""
+        self._ensure_inference_functions()
+        if self._embed_fn is not None:
+            return self._embed_fn(batch).numpy()
+        return self.base_model.predict(batch, verbose=0)
+    
+    def _infer_faces(self, face_images, classify: bool):
+        valid = [i for i, face in enumerate(face_images)
+                 if face is not None and face.shape[0] >= 50 and face.shape[1] >= 50]
+        features = [None] * len(face_images)
+        probabilities = [None] * len(face_images)
+        if not valid:
+            return features, probabilities
+        
+        batch = np.stack([prepare_backbone_input(face_images[i]) for i in valid]).astype(np.float32)
+        self._ensure_inference_functions(classify)
+        if not classify or self.classifier_model is None:
+            # No classifier head (gallery mode, or no trained model): probabilities stay None
+            batch_features, batch_probabilities = self._backbone(batch), None
+        elif self._fused_fn is not None:
+            batch_features, batch_probabilities = (t.numpy() for t in self._fused_fn(batch))
+        else:
+            batch_features = self.base_model.predict(batch, verbose=0)
+            batch_probabilities = self.classifier_model.predict(batch_features, verbose=0)
+        
+        for row, i in enumerate(valid):
+            features[i] = batch_features[row].flatten()
+            if batch_probabilities is not None:
+                probabilities[i] = batch_probabilities[row]
+        return features, probabilities
+    
+    def embed_faces(self, face_images):
+        """Backbone features for face crops in one call (None for crops under 50 px or None crops)"""
+        return self._infer_faces(face_images, classify=False)[0]
+    
+    def classify_faces(self, face_images):
+        """
+        Features and classifier probabilities for face crops in one fused call
+        
+        Returns:
+            (features, probabilities): lists aligned with face_images, None for crops under 50 px
+        """
+        return self._infer_faces(face_images, classify=True)
+    
+    def _class_label(self, index: int) -> str:
+        return self.label_encoder.inverse_transform([index])[0]
     
-    def detect_faces(self, image):
-        """Detect faces using MediaPipe"""
-        rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        results = self.face_detection.process(rgb_image)
-        
-        face_locations = []
-        if results.detections:
-            h, w, _ = image.shape
-            for detection in results.detections:
-                bbox = detection.location_data.relative_bounding_box
-                x = int(bbox.xmin * w)
-                y = int(bbox.ymin * h)
-                width = int(bbox.width * w)
-                height = int(bbox.height * h)
-                
-                top = max(0, y)
-                right = min(w, x + width)
-                bottom = min(h, y + height)
-                left = max(0, x)
-                
-                face_locations.append((top, right, bottom, left))
-        
-        return face_locations
+    def embed_training_image(self, data: bytes):
+        """
+        Detect the face in an encoded image and embed each augmentation
+        
+        Returns:
+            (vectors, cacheable): vectors maps augmentation -> features (None if
+            unusable), or is {NO_FACE: None} if no face was found. Failures that
+            may be transient are not cacheable. vectors is None for unreadable files.
+        """
+        img = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if img is None:
+            return None, False
+        return self.embed_face_image(img)
     
-    def train_with_authorized_faces(self, authorized_faces_path: str):
-        """Train the classifier"""
+    def training_pipeline(self) -> TrainingPipeline:
+        return TrainingPipeline(
+            detector_factory=self._new_face_detector,
+            embed_batch=self._backbone,
+            prepare_input=prepare_backbone_input,
+            augmentations=AUGMENTATIONS,
+            batch_size=self.training_batch_size,
+            workers=self.training_workers
+        )
+    
+    def _embed_directory(self, person_dirs, cache):
+        """
+        Embeddings for every image in person_dirs, from the cache where possible and
+        through the batched training pipeline otherwise
+        
+        Returns:
+            (persons, hashes, embedded): persons maps name -> one augmentation -> features
+            dict per image; hashes lists every image digest seen; embedded counts cache misses
+        """
+        persons = {}
+        hashes = []
+        misses = []
+        for person_dir in person_dirs:
+            images = persons.setdefault(person_dir.name, [])
+            for image_file in person_dir.glob("*.jpg"):
+                data = image_file.read_bytes()
+                digest = image_hash(data)
+                hashes.append(digest)
+                vectors = cache.get(digest) if cache else {}
+                if NO_FACE not in vectors and not all(name in vectors for name in AUGMENTATIONS):
+                    misses.append((images, len(images), digest, data))
+                images.append(vectors)
+        
+        if misses:
+            pipeline = self.training_pipeline()
+            print(f"Embedding {len(misses)} images ({pipeline.workers} workers, batches of {pipeline.batch_size})...")
+            results = pipeline.run([data for _, _, _, data in misses])
+            for (images, slot, digest, _), (vectors, cacheable) in zip(misses, results):
+                images[slot] = vectors or {}
+                if cache and cacheable:
+                    cache.put_many(digest, vectors)
+            pipeline.print_report()
+        
+        return persons, hashes, len(misses)
+    
+    def train_with_authorized_faces(self, authorized_faces_path: str, cache_path: str = None):
+        """
+        Train the classifier
+        
+        Embeddings are cached on disk by image content, so only new or changed
+        images go through MediaPipe and MobileNetV2. Pass cache_path='' to disable.
+        """
         print("\n=== Training Mode ===")
         print("Loading and processing authorized faces with MobileNetV2...")
         
@@ -99,44 +250,18 @@ class MobileNetFaceRecognitionSystem:
         all_labels = []
         
         path = Path(authorized_faces_path)
+        if cache_path is None:
+            cache_path = os.getenv('FACE_EMBEDDING_CACHE', str(path / '.embeddings.sqlite3'))
+        cache = EmbeddingCache(cache_path, self.backbone_version) if cache_path else None
+        persons, seen_hashes, embedded = self._embed_directory(
+            [person_dir for person_dir in path.iterdir() if person_dir.is_dir()], cache
+        )
         
-        for person_dir in path.iterdir():
-            if not person_dir.is_dir():
-                continue
-            
-            person_name = person_dir.name
-            print(f"Processing faces for: {person_name}")
+        for person_name, images in persons.items():
             features_for_person = []
-            
-            for image_file in person_dir.glob("*.jpg"):
-                img = cv2.imread(str(image_file))
-                if img is None:
-                    continue
-                
-                face_locations = self.detect_faces(img)
-                
-                if len(face_locations) > 0:
-                    top, right, bottom, left = face_locations[0]
-                    face_image = img[top:bottom, left:right]
-                    
-                    # Original
-                    features = self.extract_face_features(face_image)
-                    if features is not None:
-                        all_features.append(features)
-                        all_labels.append(person_name)
-                        features_for_person.append(features)
-                    
-                    # Augmentation: horizontal flip
-                    face_flipped = cv2.flip(face_image, 1)
-                    features = self.extract_face_features(face_flipped)
-                    if features is not None:
-                        all_features.append(features)
-                        all_labels.append(person_name)
-                        features_for_person.append(features)
-                    
-                    # Augmentation: slight brightness change
-                    face_bright = cv2.convertScaleAbs(face_image, alpha=1.2, beta=10)
-                    features = self.extract_face_features(face_bright)
+            for vectors in images:
+                for name in AUGMENTATIONS:
+                    features = vectors.get(name)
                     if features is not None:
                         all_features.append(features)
                         all_labels.append(person_name)
@@ -144,6 +269,11 @@ class MobileNetFaceRecognitionSystem:
             
             print(f"  - Total features for {person_name}: {len(features_for_person)}")
         
+        if cache:
+            pruned = cache.prune(seen_hashes)
+            print(f"Embedding cache: {len(seen_hashes) - embedded} images reused, {embedded} embedded, {pruned} stale removed")
+            cache.close()
+        
         if len(all_features) < 10:
             print("❌ Not enough training data!")
             return False
@@ -209,6 +339,7 @@ class MobileNetFaceRecognitionSystem:
         print(f"Validation accuracy: {val_acc:.4f}")
         print(f"Authorized persons: {', '.join(self.authorized_persons)}")
         
+        self._fused_fn = None  # retraced for the new classifier on first inference
         return True
     
     def save_model(self, model_path: str):
@@ -240,51 +371,37 @@ class MobileNetFaceRecognitionSystem:
             
             print("Model data loaded successfully!")
             print(f"Authorized persons: {', '.join(self.authorized_persons)}")
+            # The backbone stays lazy: tracing and warm-up happen on the first inference
+            self._fused_fn = None
             return True
             
+        except ArtifactError:
+            raise
         except Exception as e:
             print(f"Error loading model: {e}")
             return False
     
-    def recognize_faces_in_frame(self, frame):
-        """Recognize faces in a frame"""
-        face_locations = self.detect_faces(frame)
-        face_names = []
-        verification_results = []
-        
-        for (top, right, bottom, left) in face_locations:
-            face_image = frame[top:bottom, left:right]
-            features = self.extract_face_features(face_image)
-            
-            if features is None:
-                face_names.append("Unknown")
-                verification_results.append(False)
-                continue
-            
-            features_reshaped = features.reshape(1, -1)
-            predictions = self.classifier_model.predict(features_reshaped, verbose=0)
-            
-            max_prob_index = np.argmax(predictions[0])
-            max_probability = predictions[0][max_prob_index]
-            
-            # Get second highest probability to check confidence gap
-            sorted_probs = np.sort(predictions[0])[::-1]
-            second_prob = sorted_probs[1] if len(sorted_probs) > 1 else 0
-            confidence_gap = max_probability - second_prob
-            
-            print(f"Debug: max confidence {max_probability:.3f}, 2nd: {second_prob:.3f}, gap: {confidence_gap:.3f}")
-            
-            # Stricter criteria for recognition:
-            # 1. Confidence must be >= 70% (increased from 50%)
-            # 2. Confidence gap between 1st and 2nd must be >= 20% (avoid ambiguous cases)
-            if max_probability >= 0.70 and confidence_gap >= 0.20:
-                predicted_label = self.label_encoder.inverse_transform([max_prob_index])[0]
-                face_names.append(predicted_label)
-                verification_results.append(True)
-                print(f"✅ AUTHORIZED: {predicted_label}")
-            else:
-                print(f"🚨 REJECTED: confidence {max_probability:.3f} or gap {confidence_gap:.3f} too low")
-                face_names.append("Unknown")
-                verification_results.append(False)
-        
-        return face_names, face_locations, verification_results
+    def build_gallery(self, authorized_faces_path: str, cache_path: str = None):
+        """Enroll everyone in the known faces directory (embeddings come from the cache when possible)"""
+        path = Path(authorized_faces_path)
+        if cache_path is None:
+            cache_path = os.getenv('FACE_EMBEDDING_CACHE', str(path / '.embeddings.sqlite3'))
+        cache = EmbeddingCache(cache_path, self.backbone_version) if cache_path else None
+        
+        persons, _, _ = self._embed_directory(
+            [d for d in sorted(path.iterdir()) if d.is_dir() and d.name.lower() != 'unknown'], cache
+        )
+        
+        gallery = EmbeddingGallery()
+        for person_name, images in persons.items():
+            features = [v for vectors in images for name, v in vectors.items() if name != NO_FACE and v is not None]
+            if features:
+                gallery.add_person(person_name, np.array(features))
+                print(f"  - Enrolled {person_name}: {len(features)} samples")
+        
+        if cache:
+            cache.close()
+        self.gallery = gallery
+        self.authorized_persons = gallery.get_persons()
+        return len(self.authorized_persons) > 0
+    
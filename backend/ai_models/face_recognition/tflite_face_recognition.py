@@ -0,0 +1,154 @@
+"""
+Face Recognition runtime using an exported TFLite model
+Runs the fused MobileNetV2 backbone + classifier written by
+scripts/export_face_tflite.py through the TFLite interpreter (XNNPACK on CPU),
+so recognition does not import TensorFlow/Keras or rebuild MobileNetV2 at startup.
+
+Detection, the gallery and the decision rules come from face_runtime, shared with
+MobileNetFaceRecognitionSystem.
+"""
+
+import os
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from embedding_gallery import EmbeddingGallery
+from face_runtime import FaceRecognitionRuntime
+from training_pipeline import AUGMENTATIONS, TrainingPipeline
+
+logger = logging.getLogger(__name__)
+
+
+def load_interpreter_module():
+    """tflite_runtime when installed (small), otherwise the interpreter bundled with TensorFlow"""
+    try:
+        from tflite_runtime import interpreter as tflite
+    except ImportError:
+        from tensorflow.lite.python import interpreter as tflite
+    return tflite
+
+
+def prepare_tflite_input(face_image):
+    """Face crop (BGR) -> 224x224 RGB float input (normalisation is part of the exported model)"""
+    face_resized = cv2.resize(face_image, (224, 224), interpolation=cv2.INTER_LANCZOS4)
+    return cv2.cvtColor(face_resized, cv2.COLOR_BGR2RGB).astype(np.float32)
+
+
+class TFLiteFaceRecognitionSystem(FaceRecognitionRuntime):
+    def __init__(self):
+        super().__init__()
+
+        # XNNPACK is the interpreter's default CPU delegate; FACE_TFLITE_XNNPACK=false is for comparison
+        self.num_threads = int(os.getenv('FACE_TFLITE_THREADS', str(min(4, os.cpu_count() or 1))))
+        self.use_xnnpack = os.getenv('FACE_TFLITE_XNNPACK', 'true').lower() == 'true'
+
+        self.interpreter = None
+        self.backbone_version = None
+        self._interpreter_lock = threading.Lock()
+        self._input_index = None
+        self._features_index = None
+        self._probabilities_index = None
+
+    def load_model(self, model_path: str) -> bool:
+        """Load {model_path}.tflite and its {model_path}_tflite.json metadata"""
+        try:
+            start = time.perf_counter()
+            with open(f"{model_path}_tflite.json") as f:
+                metadata = json.load(f)
+
+            tflite = load_interpreter_module()
+            options = {'model_path': f"{model_path}.tflite", 'num_threads': self.num_threads}
+            if not self.use_xnnpack:
+                options['experimental_op_resolver_type'] = tflite.OpResolverType.BUILTIN_WITHOUT_DEFAULT_DELEGATES
+            interpreter = tflite.Interpreter(**options)
+            interpreter.allocate_tensors()
+
+            self._input_index = interpreter.get_input_details()[0]['index']
+            self._features_index = self._probabilities_index = None
+            for output in interpreter.get_output_details():
+                if output['shape'][-1] == metadata['feature_dim']:
+                    self._features_index = output['index']
+                else:
+                    self._probabilities_index = output['index']
+
+            self.interpreter = interpreter
+            self.authorized_persons = list(metadata.get('labels', []))
+            self.backbone_version = metadata.get('backbone_version')
+
+            # Warm up (first invoke sets up XNNPACK)
+            self._invoke(np.zeros((224, 224, 3), np.float32))
+            print(f"TFLite face model loaded from {model_path}.tflite "
+                  f"({metadata.get('quantization', 'none')}, {self.num_threads} threads, "
+                  f"{(time.perf_counter() - start) * 1000:.0f} ms)")
+            if self.authorized_persons:
+                print(f"Authorized persons: {', '.join(self.authorized_persons)}")
+            return True
+
+        except Exception as e:
+            print(f"Error loading TFLite model: {e}")
+            return False
+
+    def _invoke(self, face_input):
+        """Run one face (the interpreter is shared by camera threads)"""
+        with self._interpreter_lock:
+            self.interpreter.set_tensor(self._input_index, face_input[None, ...])
+            self.interpreter.invoke()
+            features = self.interpreter.get_tensor(self._features_index)[0].copy()
+            probabilities = (self.interpreter.get_tensor(self._probabilities_index)[0].copy()
+                             if self._probabilities_index is not None else None)
+        return features, probabilities
+
+    def _infer_faces(self, face_images):
+        features = [None] * len(face_images)
+        probabilities = [None] * len(face_images)
+        for i, face in enumerate(face_images):
+            if face is not None and face.shape[0] >= 50 and face.shape[1] >= 50:
+                features[i], probabilities[i] = self._invoke(prepare_tflite_input(face))
+        return features, probabilities
+
+    def embed_faces(self, face_images):
+        """Backbone features for face crops (None for crops under 50 px)"""
+        return self._infer_faces(face_images)[0]
+
+    def classify_faces(self, face_images):
+        """
+        Features and classifier probabilities for face crops
+
+        Returns:
+            (features, probabilities): lists aligned with face_images, None for crops under 50 px
+        """
+        return self._infer_faces(face_images)
+
+    def _class_label(self, index: int) -> str:
+        return self.authorized_persons[index]
+
+    def build_gallery(self, authorized_faces_path: str) -> bool:
+        """Enroll everyone in the known faces directory"""
+        pipeline = TrainingPipeline(
+            detector_factory=self._new_face_detector,
+            embed_batch=lambda batch: np.stack([self._invoke(face)[0] for face in batch]),
+            prepare_input=prepare_tflite_input,
+            augmentations=AUGMENTATIONS,
+            batch_size=self.training_batch_size,
+            workers=self.training_workers
+        )
+
+        gallery = EmbeddingGallery()
+        for person_dir in sorted(Path(authorized_faces_path).iterdir()):
+            if not person_dir.is_dir() or person_dir.name.lower() == 'unknown':
+                continue
+            results = pipeline.run([image_file.read_bytes() for image_file in person_dir.glob("*.jpg")])
+            features = [v for vectors, _ in results if vectors for v in vectors.values() if v is not None]
+            if features:
+                gallery.add_person(person_dir.name, np.array(features))
+                print(f"  - Enrolled {person_dir.name}: {len(features)} samples")
+
+        self.gallery = gallery
+        self.authorized_persons = gallery.get_persons()
+        return len(self.authorized_persons) > 0
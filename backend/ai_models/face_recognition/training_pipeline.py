@@ -0,0 +1,186 @@
+"""
+Batched feature extraction for face training
+Decoding, face detection and augmentation run in a thread pool (each worker
+has its own detector), and the prepared crops are streamed into fixed-size
+backbone batches. Workers keep preparing the next batches while the backbone
+runs, so one predict call covers batch_size crops instead of one.
+"""
+
+import os
+import time
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from embedding_cache import NO_FACE
+
+PHASES = ('decode', 'detect', 'augment', 'embed')
+
+# Training augmentations, in the order their features are appended
+AUGMENTATIONS = {
+    'original': lambda face: face,
+    'flip': lambda face: cv2.flip(face, 1),
+    'bright_1.2_10': lambda face: cv2.convertScaleAbs(face, alpha=1.2, beta=10),
+}
+
+
+class TrainingPipeline:
+    """
+    Embeds encoded training images with the same results as embedding them one by one
+    """
+
+    def __init__(self, detector_factory: Callable[[], Callable[[np.ndarray], List[Tuple[int, int, int, int]]]],
+                 embed_batch: Callable[[np.ndarray], np.ndarray],
+                 prepare_input: Callable[[np.ndarray], np.ndarray],
+                 augmentations: Dict[str, Callable[[np.ndarray], np.ndarray]],
+                 batch_size: int = 32, workers: Optional[int] = None, prefetch_batches: int = 2,
+                 min_face_size: int = 50, progress_interval: float = 5.0):
+        """
+        Args:
+            detector_factory: Creates a face detector (called once per worker thread);
+                the detector maps a BGR image to (top, right, bottom, left) boxes
+            embed_batch: Backbone call, (B, H, W, 3) inputs -> (B, D) features
+            prepare_input: Face crop -> backbone input (resize + colour + normalisation)
+            augmentations: name -> augmentation applied to the face crop
+            batch_size: Crops per backbone call (the last batch is padded to this size
+                so the backbone always sees one input shape)
+            workers: Preparation threads (default: CPU count, at most 8)
+            prefetch_batches: Batches' worth of images prepared ahead of the backbone
+            min_face_size: Smaller faces count as no face
+            progress_interval: Seconds between progress lines (0 disables them)
+        """
+        self.detector_factory = detector_factory
+        self.embed_batch = embed_batch
+        self.prepare_input = prepare_input
+        self.augmentations = augmentations
+        self.batch_size = batch_size
+        self.workers = workers or min(8, os.cpu_count() or 1)
+        self.prefetch_batches = prefetch_batches
+        self.min_face_size = min_face_size
+        self.progress_interval = progress_interval
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.stats = {phase: {'items': 0, 'seconds': 0.0} for phase in PHASES}
+        self.stats['batches'] = 0
+        self.stats['wall_seconds'] = 0.0
+
+    def _timed(self, phase: str, start: float, items: int = 1) -> float:
+        now = time.perf_counter()
+        with self._lock:
+            self.stats[phase]['items'] += items
+            self.stats[phase]['seconds'] += now - start
+        return now
+
+    def _prepare(self, index: int, data: bytes):
+        """Worker: decode, detect and augment one image"""
+        detect = getattr(self._local, 'detect', None)
+        if detect is None:
+            detect = self._local.detect = self.detector_factory()
+
+        start = time.perf_counter()
+        img = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+        start = self._timed('decode', start)
+        if img is None:
+            return index, None, []
+
+        face_locations = detect(img)
+        start = self._timed('detect', start)
+        if len(face_locations) == 0:
+            return index, {NO_FACE: None}, []
+
+        top, right, bottom, left = face_locations[0]
+        face_image = img[top:bottom, left:right]
+        if face_image.shape[0] < self.min_face_size or face_image.shape[1] < self.min_face_size:
+            return index, {NO_FACE: None}, []
+
+        crops = [(name, self.prepare_input(augment(face_image))) for name, augment in self.augmentations.items()]
+        self._timed('augment', start)
+        return index, {name: None for name in self.augmentations}, crops
+
+    def _embed(self, crops: List[Tuple[int, str, np.ndarray]], results: List):
+        start = time.perf_counter()
+        batch = np.stack([crop for _, _, crop in crops])
+        if len(batch) < self.batch_size:
+            padding = np.zeros((self.batch_size - len(batch),) + batch.shape[1:], dtype=batch.dtype)
+            batch = np.concatenate([batch, padding])
+        features = np.asarray(self.embed_batch(batch))
+        for (index, name, _), vector in zip(crops, features):
+            results[index][0][name] = vector.flatten()
+        self._timed('embed', start, len(crops))
+        with self._lock:
+            self.stats['batches'] += 1
+
+    def run(self, images: Sequence[bytes]) -> List[Tuple[Optional[Dict[str, Optional[np.ndarray]]], bool]]:
+        """
+        Embed encoded images
+
+        Returns:
+            One (vectors, cacheable) per image, as MobileNetFaceRecognitionSystem.embed_training_image
+        """
+        started = time.perf_counter()
+        results: List = [(None, False)] * len(images)
+        pending: List[Tuple[int, str, np.ndarray]] = []
+        window = max(self.workers, self.prefetch_batches * self.batch_size // max(1, len(self.augmentations)))
+        queued = iter(enumerate(images))
+        done_count = 0
+        last_report = started
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='face-train') as pool:
+            in_flight = set()
+
+            def fill():
+                for index, data in queued:
+                    in_flight.add(pool.submit(self._prepare, index, data))
+                    if len(in_flight) >= window:
+                        return
+
+            fill()
+            while in_flight:
+                finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    index, vectors, crops = future.result()
+                    results[index] = (vectors, False)
+                    pending.extend((index, name, crop) for name, crop in crops)
+                    done_count += 1
+                fill()  # keep workers busy while the backbone runs
+
+                while len(pending) >= self.batch_size:
+                    self._embed(pending[:self.batch_size], results)
+                    del pending[:self.batch_size]
+
+                if self.progress_interval and time.perf_counter() - last_report >= self.progress_interval:
+                    last_report = time.perf_counter()
+                    rate = done_count / (last_report - started)
+                    print(f"  ⏳ {done_count}/{len(images)} images prepared ({rate:.1f} images/sec)")
+
+            if pending:
+                self._embed(pending, results)
+
+        self.stats['wall_seconds'] += time.perf_counter() - started
+        return [(vectors, vectors is not None and (NO_FACE in vectors or all(v is not None for v in vectors.values())))
+                for vectors, _ in results]
+
+    def report(self) -> Dict[str, float]:
+        """Throughput per phase (per busy second) and end to end (per wall-clock second)"""
+        summary = {}
+        for phase in PHASES:
+            stats = self.stats[phase]
+            summary[f"{phase}_per_sec"] = stats['items'] / stats['seconds'] if stats['seconds'] else 0.0
+        decoded = self.stats['decode']['items']
+        wall = self.stats['wall_seconds']
+        summary['images_per_sec'] = decoded / wall if wall else 0.0
+        summary['batches'] = self.stats['batches']
+        return summary
+
+    def print_report(self):
+        report = self.report()
+        print(f"  📊 {self.stats['decode']['items']} images in {self.stats['wall_seconds']:.1f}s "
+              f"({report['images_per_sec']:.1f} images/sec, {self.workers} workers, "
+              f"{report['batches']} batches of {self.batch_size})")
+        for phase in PHASES:
+            unit = 'crops' if phase == 'embed' else 'images'
+            print(f"     {phase:<8} {report[f'{phase}_per_sec']:8.1f} {unit} per busy second")
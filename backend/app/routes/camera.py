@@ -17,6 +17,8 @@ except ImportError:
     print("Warning: CameraDiscovery not available")
     camera_discovery = None
 
+from app.services.camera_prober import camera_prober
+
 camera_bp = Blueprint('camera', __name__)
 
 @camera_bp.route('/list', methods=['GET'])
@@ -101,6 +103,19 @@ def toggle_recording(camera_id):
     else:
         return jsonify({'error': 'Failed to toggle recording'}), 500
 
+@camera_bp.route('/<int:camera_id>/recordings', methods=['GET'])
+def get_recordings(camera_id):
+    """List recorded segments, optionally limited to a time range (?start=&end= epoch seconds)"""
+    start = request.args.get('start', type=float)
+    end = request.args.get('end', type=float)
+    segments = camera_service.get_recordings(camera_id, start, end)
+    
+    return jsonify({
+        'camera_id': camera_id,
+        'recording': camera_service.recording_engine.is_recording(camera_id),
+        'segments': segments
+    })
+
 @camera_bp.route('/add', methods=['POST'])
 def add_camera():
     """Manually add a camera to the system"""
@@ -152,17 +167,39 @@ def scan_network():
 
 @camera_bp.route('/status', methods=['GET'])
 def get_camera_status():
-    """Get camera discovery service status"""
+    """Get camera discovery service status (?probe=true re-checks cameras in parallel)"""
     if camera_discovery:
         cameras = camera_discovery.get_cameras()
-        online_count = len([c for c in cameras if c['status'] == 'online'])
-        offline_count = len([c for c in cameras if c['status'] == 'offline'])
+        
+        # Recent results come from the prober cache, so repeated calls stay cheap
+        if request.args.get('probe', 'false').lower() == 'true':
+            results = camera_prober.probe_many(c['url'] for c in cameras)
+        else:
+            results = {c['url']: camera_prober.get_last_result(c['url']) for c in cameras}
+        
+        camera_status = []
+        for cam in cameras:
+            result = results.get(cam['url'])
+            status = cam['status']
+            if result is not None:
+                status = 'online' if result['online'] else 'offline'
+            camera_status.append({
+                'id': cam['id'],
+                'status': status,
+                'latency_ms': result['latency_ms'] if result else None,
+                'checked_at': result['checked_at'] if result else None,
+                'error': result['error'] if result else None
+            })
+        
+        online_count = len([c for c in camera_status if c['status'] == 'online'])
+        offline_count = len([c for c in camera_status if c['status'] == 'offline'])
         
         return jsonify({
             'total_cameras': len(cameras),
             'online': online_count,
             'offline': offline_count,
-            'scanning': camera_discovery.scanning
+            'scanning': camera_discovery.scanning,
+            'cameras': camera_status
         })
     
     return jsonify({
@@ -139,7 +139,8 @@ def start_surveillance(camera_id: str):
         manager = SurveillanceManager(
             camera_url=camera['url'],
             output_dir=f"surveillance_output/{camera_id}",
-            known_faces_dir="data/known_faces"
+            known_faces_dir="data/known_faces",
+            camera_name=camera_id
         )
         
         # Set up activity callback
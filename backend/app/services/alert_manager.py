@@ -15,14 +15,20 @@ except ImportError:
     print("⚠️ MongoDB models not available, using in-memory storage only")
 
 class AlertManager:
-    def __init__(self, socketio):
+    def __init__(self, socketio, evidence_recorder=None, dry_run=False):
         self.socketio = socketio
         self.email_service = EmailAlertService()
         self.active_alerts = {}
         self.alert_history = []
         
+        # Dry run (benchmarks/replays): alerts are kept in memory only
+        self.dry_run = dry_run
+        
+        # Optional EvidenceRecorder - writes pre/post-event clips for alerts
+        self.evidence_recorder = None if dry_run else evidence_recorder
+        
         # Initialize MongoDB alert model
-        if MONGODB_AVAILABLE:
+        if MONGODB_AVAILABLE and not dry_run:
             try:
                 self.alert_model = AlertModel()
                 print("✅ MongoDB AlertModel initialized")
@@ -71,6 +77,13 @@ class AlertManager:
             except Exception as e:
                 print(f"⚠️ Failed to save alert to database: {e}")
         
+        # Request evidence clip (linked to the DB alert once written)
+        if self.evidence_recorder and alert_data.get('camera_id'):
+            alert_data['clip_pending'] = self.evidence_recorder.request_clip(
+                alert_data['camera_id'],
+                alert_id=alert_data.get('db_id') or None
+            )
+        
         # Store alert in memory
         self.active_alerts[alert_data['id']] = alert_data
         self.alert_history.append(alert_data)
@@ -84,7 +97,7 @@ class AlertManager:
             self.socketio.emit('new_alert', alert_data)
         
         # Determine if email should be sent
-        should_send_email = self._should_send_email(alert_data)
+        should_send_email = not self.dry_run and self._should_send_email(alert_data)
         
         if should_send_email:
             # Send email notification in background
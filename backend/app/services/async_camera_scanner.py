@@ -0,0 +1,249 @@
+"""
+Async Camera Scanner
+asyncio-based network scanner for IP cameras.
+
+All hosts are probed concurrently under one global concurrency limit.
+For each host every probe (IP Webcam, RTSP, HTTP) runs at the same time.
+Probes are ranked by their order in the probe list: a hit is accepted as
+soon as every higher-ranked probe has failed, and the remaining probes are
+cancelled. Cameras are streamed to the caller as soon as they are found.
+"""
+
+import asyncio
+import ipaddress
+from datetime import datetime
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from database.config import discovered_camera_id
+
+# (camera type, port, path) - path None means a plain TCP connect (RTSP).
+# Highest priority first: an IP Webcam host also answers the generic HTTP probe on :8080
+DEFAULT_PROBES: List[Tuple[str, int, Optional[str]]] = [
+    ('ip_webcam', 8080, '/video'),
+    ('ip_webcam', 8081, '/video'),
+    ('ip_webcam', 4747, '/video'),
+    ('rtsp', 554, None),
+    ('rtsp', 8554, None),
+    ('http', 80, '/video'),
+    ('http', 80, '/mjpeg'),
+    ('http', 8080, '/'),
+]
+
+CAMERA_NAMES = {
+    'ip_webcam': 'IP Webcam',
+    'rtsp': 'RTSP Camera',
+    'http': 'HTTP Camera',
+}
+
+
+def build_camera_record(ip: str, port: int, camera_type: str, path: Optional[str]) -> Dict:
+    """Build a discovered camera document (same shape as CameraDiscovery)"""
+    if camera_type == 'rtsp':
+        url = f'rtsp://{ip}:{port}/stream'
+    else:
+        url = f'http://{ip}:{port}{path}'
+
+    now = datetime.now().isoformat()
+    return {
+        'id': discovered_camera_id(ip, port),
+        'name': f'{CAMERA_NAMES.get(camera_type, "Camera")} {ip}',
+        'ip': ip,
+        'port': port,
+        'url': url,
+        'type': camera_type,
+        'status': 'online',
+        'last_seen': now,
+        'discovered_at': now
+    }
+
+
+class _ConnectionPool:
+    """Keep-alive HTTP connections shared by the probes of a host"""
+
+    def __init__(self):
+        self._idle: Dict[Tuple[str, int], List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]]] = {}
+
+    def acquire(self, host: str, port: int):
+        idle = self._idle.get((host, port))
+        while idle:
+            reader, writer = idle.pop()
+            if not writer.is_closing():
+                return reader, writer
+        return None
+
+    def release(self, host: str, port: int, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._idle.setdefault((host, port), []).append((reader, writer))
+
+    def close_host(self, host: str):
+        """Close all idle connections to a host"""
+        for key in [k for k in self._idle if k[0] == host]:
+            for _, writer in self._idle.pop(key):
+                writer.close()
+
+    def close_all(self):
+        for key in list(self._idle):
+            for _, writer in self._idle.pop(key):
+                writer.close()
+
+
+class AsyncCameraScanner:
+    """Concurrent camera scanner with a global connection limit"""
+
+    def __init__(self,
+                 max_concurrency: int = 256,
+                 timeout: float = 0.5,
+                 probes: Optional[List[Tuple[str, int, Optional[str]]]] = None,
+                 exclude: Optional[Set[str]] = None):
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.probes = probes or DEFAULT_PROBES
+        self.exclude = exclude or set()
+        self.hosts_scanned = 0
+
+    async def _http_head(self, pool: _ConnectionPool, semaphore: asyncio.Semaphore,
+                         host: str, port: int, path: str) -> Optional[int]:
+        """Send a HEAD request, reusing a pooled connection when possible"""
+        async with semaphore:
+            for attempt in range(2):
+                conn = pool.acquire(host, port)
+                reused = conn is not None
+                if conn is None:
+                    conn = await asyncio.wait_for(asyncio.open_connection(host, port), self.timeout)
+                reader, writer = conn
+
+                try:
+                    request = (f"HEAD {path} HTTP/1.1\r\nHost: {host}:{port}\r\n"
+                               f"User-Agent: AI-Eyes-Scanner\r\nConnection: keep-alive\r\n\r\n")
+                    writer.write(request.encode('ascii'))
+                    await writer.drain()
+
+                    status_line = await asyncio.wait_for(reader.readline(), self.timeout)
+                    if not status_line:
+                        # Pooled connection was closed by the server - retry on a fresh one
+                        writer.close()
+                        if reused and attempt == 0:
+                            continue
+                        return None
+
+                    keep_alive = status_line.startswith(b'HTTP/1.1')
+                    while True:
+                        line = await asyncio.wait_for(reader.readline(), self.timeout)
+                        if line in (b'\r\n', b'\n', b''):
+                            break
+                        if line.lower().startswith(b'connection:') and b'close' in line.lower():
+                            keep_alive = False
+
+                    parts = status_line.split()
+                    status = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else None
+
+                    if keep_alive:
+                        pool.release(host, port, reader, writer)
+                    else:
+                        writer.close()
+                    return status
+
+                except BaseException:
+                    writer.close()
+                    raise
+        return None
+
+    async def _tcp_connect(self, semaphore: asyncio.Semaphore, host: str, port: int) -> bool:
+        """Check that a TCP port accepts connections"""
+        async with semaphore:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), self.timeout)
+            writer.close()
+            return True
+
+    async def _run_probe(self, pool: _ConnectionPool, semaphore: asyncio.Semaphore,
+                         ip: str, probe: Tuple[str, int, Optional[str]]) -> Optional[Dict]:
+        """Run one probe; return a camera record on success"""
+        camera_type, port, path = probe
+        try:
+            if path is None:
+                found = await self._tcp_connect(semaphore, ip, port)
+            else:
+                status = await self._http_head(pool, semaphore, ip, port, path)
+                found = status in (200, 302)
+        except (OSError, asyncio.TimeoutError, ValueError):
+            return None
+
+        return build_camera_record(ip, port, camera_type, path) if found else None
+
+    async def probe_host(self, ip: str, semaphore: asyncio.Semaphore,
+                         pool: Optional[_ConnectionPool] = None) -> Optional[Dict]:
+        """Probe one host with all probes at once; the best-ranked success wins"""
+        if ip in self.exclude:
+            return None
+
+        own_pool = pool is None
+        pool = pool or _ConnectionPool()
+        tasks = [asyncio.ensure_future(self._run_probe(pool, semaphore, ip, probe)) for probe in self.probes]
+
+        rank = {task: i for i, task in enumerate(tasks)}
+        results: List[Optional[Dict]] = [None] * len(tasks)
+        finished = [False] * len(tasks)
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    results[rank[task]] = task.result()
+                    finished[rank[task]] = True
+                # Accept the best hit once nothing ranked above it is still running
+                for i in range(len(tasks)):
+                    if not finished[i]:
+                        break
+                    if results[i]:
+                        return results[i]
+            return None
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if own_pool:
+                pool.close_all()
+            else:
+                pool.close_host(ip)
+            self.hosts_scanned += 1
+
+    @staticmethod
+    def _hosts(target: Union[str, Iterable[str]]) -> List[str]:
+        """Expand a network range (e.g. 192.168.1.0/24) or pass through an IP list"""
+        if isinstance(target, str):
+            network = ipaddress.IPv4Network(target, strict=False)
+            hosts = [str(ip) for ip in network.hosts()]
+            return hosts or [str(network.network_address)]
+        return list(target)
+
+    async def scan(self, target: Union[str, Iterable[str]]) -> AsyncIterator[Dict]:
+        """Scan a network range or IP list, yielding cameras as they are found"""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        pool = _ConnectionPool()
+        self.hosts_scanned = 0
+
+        tasks = [asyncio.ensure_future(self.probe_host(ip, semaphore, pool)) for ip in self._hosts(target)]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                camera = await finished
+                if camera:
+                    yield camera
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            pool.close_all()
+
+    def scan_sync(self, target: Union[str, Iterable[str]],
+                  on_camera: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+        """Run a scan from synchronous code, calling on_camera for each camera found"""
+        async def run():
+            cameras = []
+            async for camera in self.scan(target):
+                cameras.append(camera)
+                if on_camera:
+                    on_camera(camera)
+            return cameras
+
+        return asyncio.run(run())
@@ -4,14 +4,18 @@ Auto-discovers IP cameras on the network using multiple protocols
 MongoDB storage only (no JSON fallback)
 """
 
+import os
 import socket
 import requests
 import threading
 import time
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
 from datetime import datetime
 import ipaddress
-from database.config import get_database
+from pymongo import UpdateOne
+from database.config import get_database, discovered_camera_id, DISCOVERED_CAMERAS_COLLECTION
+from app.services.async_camera_scanner import AsyncCameraScanner
+from app.services.camera_prober import camera_prober
 
 class CameraDiscovery:
     """Auto-discover IP cameras on the network"""
@@ -19,6 +23,18 @@ class CameraDiscovery:
     def __init__(self):
         self.discovered_cameras = []
         self.scanning = False
+        
+        # Results found during a scan - written in one bulk upsert when it ends
+        self._scan_results: Dict[str, Dict] = {}
+        self._results_lock = threading.Lock()
+        
+        # Local IP, resolved once per scan instead of once per probed host
+        self._local_ip: Optional[str] = None
+        
+        # Async scanner settings
+        self.scan_concurrency = int(os.getenv('CAMERA_SCAN_CONCURRENCY', '256'))
+        self.scan_timeout = float(os.getenv('CAMERA_SCAN_TIMEOUT', '0.5'))
+        
         self.load_discovered_cameras()
         
     @property
@@ -26,20 +42,26 @@ class CameraDiscovery:
         """Get MongoDB cameras collection"""
         db = get_database()
         if db is not None:
-            return db['discovered_cameras']
+            return db[DISCOVERED_CAMERAS_COLLECTION]
         return None
         
     def load_discovered_cameras(self):
         """Load previously discovered cameras from MongoDB"""
         try:
             if self.cameras_collection is not None:
-                cameras = list(self.cameras_collection.find())
-                # Convert ObjectId to string
-                for camera in cameras:
-                    if '_id' in camera:
-                        camera['id'] = str(camera['_id'])
-                        del camera['_id']
-                self.discovered_cameras = cameras
+                cameras = {}
+                for camera in self.cameras_collection.find():
+                    object_id = camera.pop('_id', None)
+                    # Legacy documents may carry their ObjectId as id (or none) - key them by ip:port
+                    # like new scans, so saving them back updates the same camera
+                    if camera.get('ip') and camera.get('port'):
+                        camera['id'] = discovered_camera_id(camera['ip'], camera['port'])
+                    elif not camera.get('id'):
+                        camera['id'] = str(object_id)
+                    previous = cameras.get(camera['id'])
+                    if previous is None or (camera.get('last_seen') or '') > (previous.get('last_seen') or ''):
+                        cameras[camera['id']] = camera
+                self.discovered_cameras = list(cameras.values())
                 print(f"📂 Loaded {len(self.discovered_cameras)} previously discovered cameras from MongoDB")
             else:
                 print("⚠️ MongoDB not connected - cannot load cameras")
@@ -48,29 +70,54 @@ class CameraDiscovery:
             print(f"❌ Could not load discovered cameras: {e}")
             self.discovered_cameras = []
     
-    def save_discovered_cameras(self):
-        """Save discovered cameras to MongoDB"""
+    def save_discovered_cameras(self, cameras: Optional[List[Dict]] = None):
+        """Upsert cameras into MongoDB in a single bulk write, keyed by camera id"""
         try:
             if self.cameras_collection is None:
                 print("⚠️ MongoDB not connected - cannot save cameras")
                 return
-                
-            # Clear existing and insert all
-            self.cameras_collection.delete_many({})
-            if self.discovered_cameras:
-                # Remove any _id fields before inserting
-                cameras_to_insert = []
-                for camera in self.discovered_cameras:
-                    cam_copy = camera.copy()
-                    if '_id' in cam_copy:
-                        del cam_copy['_id']
-                    cameras_to_insert.append(cam_copy)
-                
-                self.cameras_collection.insert_many(cameras_to_insert)
-                print(f"💾 Saved {len(self.discovered_cameras)} discovered cameras to MongoDB")
+            
+            if cameras is None:
+                cameras = self.discovered_cameras
+            if not cameras:
+                return
+            
+            operations = []
+            for camera in cameras:
+                cam_copy = {k: v for k, v in camera.items() if k != '_id'}
+                operations.append(UpdateOne({'id': cam_copy['id']}, {'$set': cam_copy}, upsert=True))
+            
+            result = self.cameras_collection.bulk_write(operations, ordered=False)
+            print(f"💾 Saved {len(operations)} discovered cameras to MongoDB ({result.upserted_count} new)")
         except Exception as e:
             print(f"❌ Could not save discovered cameras: {e}")
     
+    def _merge_camera(self, camera: Dict) -> Dict:
+        """Add or update a camera in the in-memory list"""
+        existing = next((c for c in self.discovered_cameras if c['id'] == camera['id']), None)
+        
+        if existing:
+            # Keep the original discovery time
+            camera = {**camera, 'discovered_at': existing.get('discovered_at', camera.get('discovered_at'))}
+            existing.update(camera)
+            return existing
+        
+        self.discovered_cameras.append(camera)
+        return camera
+    
+    def _flush_scan_results(self) -> int:
+        """Merge buffered scan results and persist them in one round trip"""
+        with self._results_lock:
+            results = list(self._scan_results.values())
+            self._scan_results = {}
+        
+        if not results:
+            return 0
+        
+        merged = [self._merge_camera(camera) for camera in results]
+        self.save_discovered_cameras(merged)
+        return len(merged)
+    
     def get_local_ip(self) -> str:
         """Get local IP address of this machine"""
         try:
@@ -104,7 +151,7 @@ class CameraDiscovery:
                 if response.status_code in [200, 302]:
                     print(f"📱 Found IP Webcam at {ip}:{port}")
                     return {
-                        'id': f'camera_{ip.replace(".", "_")}_{port}',
+                        'id': discovered_camera_id(ip, port),
                         'name': f'IP Webcam {ip}',
                         'ip': ip,
                         'port': port,
@@ -135,7 +182,7 @@ class CameraDiscovery:
                 if result == 0:
                     print(f"📹 Found RTSP camera at {ip}:{port}")
                     return {
-                        'id': f'camera_{ip.replace(".", "_")}_{port}',
+                        'id': discovered_camera_id(ip, port),
                         'name': f'RTSP Camera {ip}',
                         'ip': ip,
                         'port': port,
@@ -167,7 +214,7 @@ class CameraDiscovery:
                 if response.status_code in [200, 302]:
                     print(f"🎥 Found HTTP camera at {url}")
                     return {
-                        'id': f'camera_{ip.replace(".", "_")}_{port}',
+                        'id': discovered_camera_id(ip, port),
                         'name': f'HTTP Camera {ip}',
                         'ip': ip,
                         'port': port,
@@ -182,10 +229,10 @@ class CameraDiscovery:
         
         return None
     
-    def scan_ip(self, ip: str):
+    def scan_ip(self, ip: str) -> Optional[Dict]:
         """Scan a single IP for cameras"""
         # Skip local machine
-        local_ip = self.get_local_ip()
+        local_ip = self._local_ip or self.get_local_ip()
         if ip == local_ip:
             return
         
@@ -203,22 +250,23 @@ class CameraDiscovery:
         if not camera:
             camera = self.check_http_camera(ip, timeout=0.3)
         
-        # Add to discovered cameras if found
         if camera:
-            # Check if camera already exists
-            existing = next((c for c in self.discovered_cameras if c['id'] == camera['id']), None)
-            
-            if existing:
-                # Update existing camera
-                existing.update(camera)
-            else:
-                # Add new camera
-                self.discovered_cameras.append(camera)
-            
-            self.save_discovered_cameras()
+            self._buffer_result(camera)
+        
+        return camera
+    
+    def _buffer_result(self, camera: Dict):
+        """Buffer a scan result - persisted once at the end of the scan"""
+        with self._results_lock:
+            self._scan_results[camera['id']] = camera
+        
+        # Single-IP scan outside a network scan: persist right away
+        if not self.scanning:
+            self._flush_scan_results()
     
-    def scan_network(self, network_range: Optional[str] = None):
-        """Scan entire network for cameras"""
+    def scan_network(self, network_range: Optional[str] = None,
+                     on_camera: Optional[Callable[[Dict], None]] = None):
+        """Scan entire network for cameras (on_camera is called as each camera is found)"""
         if self.scanning:
             print("⚠️ Scan already in progress")
             return
@@ -226,39 +274,36 @@ class CameraDiscovery:
         self.scanning = True
         
         try:
+            self._local_ip = self.get_local_ip()
             if not network_range:
-                network_range = self.get_network_range()
+                network_range = str(ipaddress.IPv4Network(f"{self._local_ip}/24", strict=False))
             
             print(f"🔍 Scanning network {network_range} for cameras...")
-            print(f"📍 Local IP: {self.get_local_ip()}")
+            print(f"📍 Local IP: {self._local_ip}")
             
-            network = ipaddress.IPv4Network(network_range)
-            threads = []
+            def handle_camera(camera: Dict):
+                print(f"📷 Found {camera['type']} camera at {camera['url']}")
+                self._buffer_result(camera)
+                if on_camera:
+                    on_camera(camera)
             
-            # Scan all IPs in network
-            for ip in network.hosts():
-                ip_str = str(ip)
-                thread = threading.Thread(target=self.scan_ip, args=(ip_str,))
-                thread.daemon = True
-                thread.start()
-                threads.append(thread)
-                
-                # Limit concurrent threads
-                if len(threads) >= 50:
-                    for t in threads:
-                        t.join()
-                    threads = []
-            
-            # Wait for remaining threads
-            for t in threads:
-                t.join()
+            scanner = AsyncCameraScanner(
+                max_concurrency=self.scan_concurrency,
+                timeout=self.scan_timeout,
+                exclude={self._local_ip}
+            )
+            started = time.time()
+            scanner.scan_sync(network_range, on_camera=handle_camera)
             
-            print(f"✅ Scan complete. Found {len(self.discovered_cameras)} cameras")
+            found = self._flush_scan_results()
+            print(f"✅ Scan complete in {time.time() - started:.1f}s. "
+                  f"Found {found} cameras ({len(self.discovered_cameras)} known)")
             
         except Exception as e:
             print(f"❌ Error scanning network: {e}")
         
         finally:
+            self._local_ip = None
             self.scanning = False
     
     def start_background_scan(self, interval: int = 300):
@@ -288,7 +333,7 @@ class CameraDiscovery:
             port = parsed.port or 8080
             
             camera = {
-                'id': f'camera_{ip.replace(".", "_")}_{port}',
+                'id': discovered_camera_id(ip, port),
                 'name': name,
                 'ip': ip,
                 'port': port,
@@ -300,15 +345,8 @@ class CameraDiscovery:
                 'manual': True
             }
             
-            # Check if camera already exists
-            existing = next((c for c in self.discovered_cameras if c['id'] == camera['id']), None)
-            
-            if existing:
-                existing.update(camera)
-            else:
-                self.discovered_cameras.append(camera)
-            
-            self.save_discovered_cameras()
+            camera = self._merge_camera(camera)
+            self.save_discovered_cameras([camera])
             print(f"✅ Manually added camera: {name} ({url})")
             return camera
             
@@ -319,33 +357,39 @@ class CameraDiscovery:
     def remove_camera(self, camera_id: str):
         """Remove a camera"""
         self.discovered_cameras = [c for c in self.discovered_cameras if c['id'] != camera_id]
-        self.save_discovered_cameras()
+        try:
+            if self.cameras_collection is not None:
+                self.cameras_collection.delete_one({'id': camera_id})
+        except Exception as e:
+            print(f"❌ Could not remove camera from MongoDB: {e}")
         print(f"🗑️ Removed camera: {camera_id}")
     
     def check_camera_connectivity(self, camera: Dict) -> bool:
         """Check if a camera is reachable"""
-        try:
-            url = camera['url']
-            response = requests.head(url, timeout=2)
-            return response.status_code in [200, 302]
-        except:
-            return False
+        return camera_prober.probe(camera['url'])['online']
     
     def update_camera_status(self):
-        """Update status of all cameras (online/offline)"""
+        """Update status of all cameras (online/offline), probing them in parallel"""
         print("🔄 Updating camera connectivity status...")
         
-        for camera in self.discovered_cameras:
-            is_online = self.check_camera_connectivity(camera)
+        cameras = list(self.discovered_cameras)
+        results = camera_prober.probe_many(c['url'] for c in cameras)
+        
+        for camera in cameras:
+            result = results.get(camera['url'])
+            if result is None:
+                continue
             
-            if is_online:
+            camera['probe_latency_ms'] = result['latency_ms']
+            if result['online']:
                 camera['status'] = 'online'
                 camera['last_seen'] = datetime.now().isoformat()
             else:
                 camera['status'] = 'offline'
         
         self.save_discovered_cameras()
-        print("✅ Camera status updated")
+        online = len([c for c in cameras if c['status'] == 'online'])
+        print(f"✅ Camera status updated ({online}/{len(cameras)} online)")
     
     def start_status_monitor(self, interval: int = 30):
         """Start periodic status monitoring (every 30 seconds by default)"""
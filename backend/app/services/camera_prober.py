@@ -0,0 +1,157 @@
+"""
+Camera Prober Service
+Concurrent camera liveness checks shared by startup, the status monitor
+and the status API. Uses pooled HTTP sessions, a per-probe deadline and a
+short-lived result cache so repeated checks don't hit the cameras again.
+"""
+
+import math
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class CameraProber:
+    """Probe camera URLs in parallel and cache the results"""
+
+    def __init__(self,
+                 max_workers: Optional[int] = None,
+                 timeout: Optional[float] = None,
+                 cache_ttl: Optional[float] = None):
+        self.max_workers = max_workers or int(os.getenv('CAMERA_PROBE_WORKERS', '16'))
+        self.timeout = timeout if timeout is not None else float(os.getenv('CAMERA_PROBE_TIMEOUT', '2'))
+        self.cache_ttl = cache_ttl if cache_ttl is not None else float(os.getenv('CAMERA_PROBE_CACHE_SECONDS', '10'))
+
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='camera-probe')
+        self._local = threading.local()
+        self._cache: Dict[str, Dict] = {}
+        self._cache_lock = threading.Lock()
+
+    def _session(self) -> requests.Session:
+        """One pooled session per worker thread (connections are kept alive)"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=4, max_retries=0)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            self._local.session = session
+        return session
+
+    def _result(self, url: str, online: bool, started: float,
+                status_code: Optional[int] = None, error: Optional[str] = None) -> Dict:
+        return {
+            'url': url,
+            'online': online,
+            'status_code': status_code,
+            'latency_ms': round((time.perf_counter() - started) * 1000, 1),
+            'error': error,
+            'checked_at': datetime.now().isoformat()
+        }
+
+    def _probe_uncached(self, url: str) -> Dict:
+        """Probe a single URL (HEAD for HTTP, TCP connect for RTSP)"""
+        started = time.perf_counter()
+        parsed = urlparse(url)
+
+        try:
+            if parsed.scheme in ('rtsp', 'rtsps'):
+                port = parsed.port or 554
+                with socket.create_connection((parsed.hostname, port), timeout=self.timeout):
+                    pass
+                return self._result(url, True, started)
+
+            response = self._session().head(url, timeout=(self.timeout, self.timeout), allow_redirects=False)
+            response.close()
+            online = response.status_code in [200, 302]
+            return self._result(url, online, started, status_code=response.status_code)
+
+        except Exception as e:
+            return self._result(url, False, started, error=type(e).__name__)
+
+    def _store(self, result: Dict) -> Dict:
+        with self._cache_lock:
+            self._cache[result['url']] = {**result, '_cached_at': time.time()}
+        return result
+
+    def get_cached(self, url: str) -> Optional[Dict]:
+        """Get a cached result if it is still fresh"""
+        with self._cache_lock:
+            cached = self._cache.get(url)
+        if cached is None or time.time() - cached['_cached_at'] > self.cache_ttl:
+            return None
+        return {k: v for k, v in cached.items() if k != '_cached_at'}
+
+    def get_last_result(self, url: str) -> Optional[Dict]:
+        """Get the most recent result regardless of age"""
+        with self._cache_lock:
+            cached = self._cache.get(url)
+        if cached is None:
+            return None
+        return {k: v for k, v in cached.items() if k != '_cached_at'}
+
+    def probe(self, url: str, use_cache: bool = True) -> Dict:
+        """Probe one camera URL"""
+        if use_cache:
+            cached = self.get_cached(url)
+            if cached:
+                return cached
+        return self._store(self._probe_uncached(url))
+
+    def probe_many(self, urls: Iterable[str], use_cache: bool = True,
+                   deadline: Optional[float] = None) -> Dict[str, Dict]:
+        """
+        Probe many camera URLs concurrently
+
+        Args:
+            urls: Camera URLs to check
+            use_cache: Reuse results younger than cache_ttl
+            deadline: Overall time budget in seconds (default: one probe timeout per
+                round of max_workers probes, plus 1s)
+
+        Returns:
+            Dict of url -> probe result. Probes still running at the deadline
+            are reported offline with error 'deadline'.
+        """
+        results: Dict[str, Dict] = {}
+        pending = {}
+
+        for url in dict.fromkeys(urls):
+            cached = self.get_cached(url) if use_cache else None
+            if cached:
+                results[url] = cached
+            else:
+                pending[self._executor.submit(self._probe_uncached, url)] = url
+
+        if pending:
+            started = time.perf_counter()
+            if deadline is None:
+                # Probes beyond max_workers queue behind the running ones
+                deadline = math.ceil(len(pending) / self.max_workers) * self.timeout + 1.0
+            done, not_done = wait(pending, timeout=deadline)
+
+            for future in done:
+                results[pending[future]] = self._store(future.result())
+            for future in not_done:
+                url = pending[future]
+                # Leave the probe running; its result lands in the cache when it finishes
+                future.add_done_callback(lambda f: self._store(f.result()))
+                results[url] = self._result(url, False, started, error='deadline')
+
+        return results
+
+    def shutdown(self):
+        """Stop the worker pool"""
+        self._executor.shutdown(wait=False)
+
+
+# Singleton instance
+camera_prober = CameraProber()
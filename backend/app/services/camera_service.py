@@ -4,6 +4,15 @@ import time
 from datetime import datetime
 import numpy as np
 from config.settings import *
+from app.services.evidence_recorder import EvidenceRecorder
+from app.services.recording_engine import RecordingEngine
+
+# Import database models
+try:
+    from database.models import AlertModel
+    MONGODB_AVAILABLE = True
+except ImportError:
+    MONGODB_AVAILABLE = False
 
 class CameraService:
     def __init__(self):
@@ -11,6 +20,20 @@ class CameraService:
         self.recording_status = {}
         self.detection_active = {}
         
+        # Alerts are stored in MongoDB so evidence clips can be linked to them
+        self.alert_model = None
+        if MONGODB_AVAILABLE:
+            try:
+                self.alert_model = AlertModel()
+            except Exception as e:
+                print(f"⚠️ MongoDB AlertModel initialization failed: {e}")
+        
+        # Pre-event buffers so alerts get an evidence clip, not just a still
+        self.evidence_recorder = EvidenceRecorder(alert_model=self.alert_model)
+        
+        # Segmented continuous recording (dedicated writer thread per camera)
+        self.recording_engine = RecordingEngine()
+        
     def get_frame(self, camera_id):
         """Get frame from specific camera"""
         if camera_id not in self.cameras:
@@ -20,6 +43,8 @@ class CameraService:
         if camera_id in self.cameras:
             ret, frame = self.cameras[camera_id].read()
             if ret:
+                self.evidence_recorder.add_frame(str(camera_id), frame)
+                self.recording_engine.submit_frame(camera_id, frame)
                 return frame
         return None
     
@@ -59,34 +84,37 @@ class CameraService:
     def toggle_recording(self, camera_id, start_recording):
         """Start or stop recording"""
         if start_recording:
+            already_recording = self.recording_status.get(camera_id, False)
             self.recording_status[camera_id] = True
-            # Start recording thread
-            thread = threading.Thread(target=self._record_video, args=(camera_id,))
-            thread.daemon = True
-            thread.start()
+            self.recording_engine.start_recording(camera_id)
+            
+            # Frames reach the recorder through get_frame(); this loop keeps
+            # them flowing whenever the AI loop is not already capturing
+            if not already_recording:
+                thread = threading.Thread(target=self._record_video, args=(camera_id,))
+                thread.daemon = True
+                thread.start()
         else:
             self.recording_status[camera_id] = False
+            self.recording_engine.stop_recording(camera_id)
         
         return True
     
     def _record_video(self, camera_id):
-        """Record video from camera"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{ALERTS_PATH}/recording_{camera_id}_{timestamp}.mp4"
-        
-        # Video writer setup
-        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-        out = cv2.VideoWriter(filename, fourcc, FPS, CAMERA_RESOLUTION)
-        
+        """Capture loop feeding the segment recorder"""
         while self.recording_status.get(camera_id, False):
+            if self.detection_active.get(camera_id, False):
+                # AI loop is capturing now - it feeds the recorder
+                time.sleep(0.5)
+                continue
+            
             frame = self.get_frame(camera_id)
-            if frame is not None:
-                # Resize frame to standard resolution
-                frame_resized = cv2.resize(frame, CAMERA_RESOLUTION)
-                out.write(frame_resized)
-            time.sleep(1/FPS)
-        
-        out.release()
+            if frame is None:
+                time.sleep(0.5)
+    
+    def get_recordings(self, camera_id, start=None, end=None):
+        """Get recorded segments overlapping a time range"""
+        return self.recording_engine.find_segments(camera_id, start, end)
     
     def start_ai_detection(self, camera_id, mode='farm'):
         """Start AI detection for camera"""
@@ -134,6 +162,22 @@ class CameraService:
             'description': detection_result['description']
         }
         
+        # Store the alert so the clip is attached to it once written
+        if self.alert_model:
+            try:
+                alert_data['db_id'] = self.alert_model.create_alert(
+                    camera_id=str(camera_id),
+                    alert_type=alert_data['type'],
+                    message=alert_data['description'],
+                    image_path=alert_image
+                )
+            except Exception as e:
+                print(f"⚠️ Failed to save alert to database: {e}")
+        
+        # Dump pre-event + post-event frames into a clip in the background
+        alert_data['clip_pending'] = self.evidence_recorder.request_clip(
+            str(camera_id), alert_id=alert_data.get('db_id') or None)
+        
         # Send alert (this would trigger email and WebSocket notification)
         self._send_alert(alert_data)
     
@@ -148,5 +192,6 @@ class CameraService:
     
     def cleanup(self):
         """Cleanup all camera connections"""
+        self.recording_engine.stop_all()
         for camera_id in list(self.cameras.keys()):
             self.disconnect_camera(camera_id)
\ No newline at end of file
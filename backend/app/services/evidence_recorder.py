@@ -0,0 +1,302 @@
+"""
+Evidence Recorder Service
+Keeps a short pre-event buffer of JPEG frames per camera in memory and
+writes pre-event + post-event video clips when an alert fires
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+# Default recordings directory (backend/storage/recordings, same as StorageManager)
+DEFAULT_RECORDINGS_DIR = Path(__file__).resolve().parent.parent.parent / "storage" / "recordings"
+
+
+class FrameRingBuffer:
+    """In-memory ring buffer of JPEG-compressed frames for one camera"""
+
+    def __init__(self, max_seconds: float = 10.0, max_bytes: int = 16 * 1024 * 1024,
+                 jpeg_quality: int = 70):
+        self.max_seconds = max_seconds
+        self.max_bytes = max_bytes
+        self.jpeg_quality = jpeg_quality
+        self._frames: Deque[Tuple[float, bytes]] = deque()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def memory_bytes(self) -> int:
+        """Bytes currently held by the buffer"""
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def push(self, frame: np.ndarray, timestamp: Optional[float] = None) -> bool:
+        """Compress a BGR frame to JPEG and append it"""
+        ok, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        if not ok:
+            return False
+        self.push_jpeg(buffer.tobytes(), timestamp)
+        return True
+
+    def push_jpeg(self, jpeg_bytes: bytes, timestamp: Optional[float] = None):
+        """Append an already-encoded JPEG frame"""
+        if timestamp is None:
+            timestamp = time.time()
+
+        with self._lock:
+            self._frames.append((timestamp, jpeg_bytes))
+            self._bytes += len(jpeg_bytes)
+            self._evict(timestamp)
+
+    def _evict(self, now: float):
+        """Drop frames older than max_seconds or beyond the memory cap"""
+        while self._frames and (
+            now - self._frames[0][0] > self.max_seconds or self._bytes > self.max_bytes
+        ):
+            _, old = self._frames.popleft()
+            self._bytes -= len(old)
+
+    def frames_between(self, start: float, end: float) -> List[Tuple[float, bytes]]:
+        """Get frames with start < timestamp <= end (oldest first)"""
+        with self._lock:
+            return [(ts, data) for ts, data in self._frames if start < ts <= end]
+
+    def clear(self):
+        """Drop all buffered frames"""
+        with self._lock:
+            self._frames.clear()
+            self._bytes = 0
+
+
+class _ClipJob:
+    """A clip being collected for one camera"""
+
+    def __init__(self, camera_id: str, event_time: float, pre_seconds: float, post_seconds: float):
+        self.camera_id = camera_id
+        self.event_time = event_time
+        self.start_time = event_time - pre_seconds
+        self.end_time = event_time + post_seconds
+        self.alert_ids: List[str] = []
+        self.callbacks: List[Callable[[Optional[str], List[str]], None]] = []
+        self.frames: List[Tuple[float, bytes]] = []
+
+
+class EvidenceRecorder:
+    """Per-camera pre-event buffers plus a background clip writer"""
+
+    def __init__(self,
+                 pre_event_seconds: Optional[float] = None,
+                 post_event_seconds: Optional[float] = None,
+                 max_buffer_mb: Optional[float] = None,
+                 buffer_fps: Optional[float] = None,
+                 jpeg_quality: int = 70,
+                 output_dir: Optional[str] = None,
+                 alert_model=None):
+        self.pre_event_seconds = pre_event_seconds if pre_event_seconds is not None else \
+            float(os.getenv('EVIDENCE_PRE_EVENT_SECONDS', '10'))
+        self.post_event_seconds = post_event_seconds if post_event_seconds is not None else \
+            float(os.getenv('EVIDENCE_POST_EVENT_SECONDS', '5'))
+        max_buffer_mb = max_buffer_mb if max_buffer_mb is not None else \
+            float(os.getenv('EVIDENCE_BUFFER_MAX_MB', '16'))
+        self.max_buffer_bytes = int(max_buffer_mb * 1024 * 1024)
+        self.buffer_fps = buffer_fps if buffer_fps is not None else \
+            float(os.getenv('EVIDENCE_BUFFER_FPS', '5'))
+        self.jpeg_quality = jpeg_quality
+        self.output_dir = Path(output_dir) if output_dir else DEFAULT_RECORDINGS_DIR
+        self.alert_model = alert_model
+
+        self.buffers: Dict[str, FrameRingBuffer] = {}
+        self._last_push: Dict[str, float] = {}
+        self._active_jobs: Dict[str, _ClipJob] = {}
+        self._lock = threading.Lock()
+
+        print(f"🎞️ Evidence recorder: {self.pre_event_seconds:.0f}s pre / {self.post_event_seconds:.0f}s post, "
+              f"{max_buffer_mb:.0f} MB per camera")
+
+    def get_buffer(self, camera_id: str) -> FrameRingBuffer:
+        """Get (or create) the ring buffer for a camera"""
+        buffer = self.buffers.get(camera_id)
+        if buffer is None:
+            with self._lock:
+                buffer = self.buffers.get(camera_id)
+                if buffer is None:
+                    # Keep enough history for the pre-event window plus the post-event wait
+                    buffer = FrameRingBuffer(
+                        max_seconds=self.pre_event_seconds + self.post_event_seconds,
+                        max_bytes=self.max_buffer_bytes,
+                        jpeg_quality=self.jpeg_quality
+                    )
+                    self.buffers[camera_id] = buffer
+        return buffer
+
+    def _due(self, camera_id: str, timestamp: float) -> bool:
+        """Throttle buffering to buffer_fps so JPEG encoding stays cheap"""
+        if self.buffer_fps <= 0:
+            return True
+        last = self._last_push.get(camera_id, 0.0)
+        if timestamp - last < 1.0 / self.buffer_fps:
+            return False
+        self._last_push[camera_id] = timestamp
+        return True
+
+    def add_frame(self, camera_id: str, frame: np.ndarray, timestamp: Optional[float] = None) -> bool:
+        """Add a raw BGR frame to the camera's pre-event buffer"""
+        if frame is None:
+            return False
+        timestamp = timestamp or time.time()
+        if not self._due(camera_id, timestamp):
+            return False
+        return self.get_buffer(camera_id).push(frame, timestamp)
+
+    def add_jpeg(self, camera_id: str, jpeg_bytes: bytes, timestamp: Optional[float] = None) -> bool:
+        """Add an already-encoded JPEG frame to the camera's pre-event buffer"""
+        timestamp = timestamp or time.time()
+        if not self._due(camera_id, timestamp):
+            return False
+        self.get_buffer(camera_id).push_jpeg(jpeg_bytes, timestamp)
+        return True
+
+    def request_clip(self, camera_id: str, alert_id: Optional[str] = None,
+                     event_time: Optional[float] = None,
+                     callback: Optional[Callable[[Optional[str], List[str]], None]] = None) -> bool:
+        """
+        Request an evidence clip around an alert
+
+        Alerts that arrive while a clip for the same camera is still being
+        collected are linked to that clip instead of starting a new one.
+        """
+        if camera_id not in self.buffers:
+            return False
+
+        event_time = event_time or time.time()
+
+        with self._lock:
+            job = self._active_jobs.get(camera_id)
+            if job is not None and event_time <= job.end_time:
+                if alert_id:
+                    job.alert_ids.append(alert_id)
+                if callback:
+                    job.callbacks.append(callback)
+                return True
+
+            job = _ClipJob(camera_id, event_time, self.pre_event_seconds, self.post_event_seconds)
+            if alert_id:
+                job.alert_ids.append(alert_id)
+            if callback:
+                job.callbacks.append(callback)
+            # Grab the pre-event frames now, before they age out of the buffer
+            job.frames = self.buffers[camera_id].frames_between(job.start_time, event_time)
+            self._active_jobs[camera_id] = job
+
+        thread = threading.Thread(target=self._run_job, args=(job,), daemon=True)
+        thread.start()
+        return True
+
+    def _run_job(self, job: _ClipJob):
+        """Collect post-event frames, then write and link the clip"""
+        buffer = self.buffers[job.camera_id]
+        last_ts = job.frames[-1][0] if job.frames else job.event_time
+
+        # Poll the buffer until the post-event window has passed
+        while True:
+            now = time.time()
+            new_frames = buffer.frames_between(last_ts, job.end_time)
+            if new_frames:
+                job.frames.extend(new_frames)
+                last_ts = new_frames[-1][0]
+            if now >= job.end_time:
+                break
+            time.sleep(min(1.0, job.end_time - now))
+
+        with self._lock:
+            if self._active_jobs.get(job.camera_id) is job:
+                del self._active_jobs[job.camera_id]
+
+        clip_path = None
+        try:
+            clip_path = self.write_clip(job.camera_id, job.frames, job.event_time)
+        except Exception as e:
+            print(f"❌ Evidence clip failed for {job.camera_id}: {e}")
+
+        if clip_path:
+            self._link_clip(clip_path, job)
+
+        for callback in job.callbacks:
+            try:
+                callback(clip_path, job.alert_ids)
+            except Exception as e:
+                print(f"⚠️ Evidence clip callback error: {e}")
+
+    def write_clip(self, camera_id: str, frames: List[Tuple[float, bytes]],
+                   event_time: float) -> Optional[str]:
+        """Decode buffered JPEG frames and write them to an MP4 clip"""
+        if not frames:
+            print(f"⚠️ No buffered frames for {camera_id}, evidence clip skipped")
+            return None
+
+        first = cv2.imdecode(np.frombuffer(frames[0][1], dtype=np.uint8), cv2.IMREAD_COLOR)
+        if first is None:
+            return None
+        height, width = first.shape[:2]
+
+        # Play back at the rate the frames were actually buffered
+        span = frames[-1][0] - frames[0][0]
+        fps = (len(frames) - 1) / span if span > 0 else max(self.buffer_fps, 1.0)
+        fps = max(1.0, min(fps, 30.0))
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.fromtimestamp(event_time).strftime("%Y%m%d_%H%M%S")
+        clip_path = self.output_dir / f"evidence_{camera_id}_{timestamp}.mp4"
+
+        writer = cv2.VideoWriter(str(clip_path), cv2.VideoWriter_fourcc(*'mp4v'), fps, (width, height))
+        try:
+            for _, data in frames:
+                frame = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+                if frame is None:
+                    continue
+                if frame.shape[:2] != (height, width):
+                    frame = cv2.resize(frame, (width, height))
+                writer.write(frame)
+        finally:
+            writer.release()
+
+        print(f"🎞️ Evidence clip saved: {clip_path} ({len(frames)} frames)")
+        return str(clip_path)
+
+    def _link_clip(self, clip_path: str, job: _ClipJob):
+        """Attach the clip to its alert documents"""
+        if self.alert_model is None:
+            return
+        for alert_id in job.alert_ids:
+            try:
+                self.alert_model.attach_clip(alert_id, clip_path, job.start_time, job.end_time)
+            except Exception as e:
+                print(f"⚠️ Could not link evidence clip to alert {alert_id}: {e}")
+
+    def remove_camera(self, camera_id: str):
+        """Drop a camera's buffer"""
+        with self._lock:
+            buffer = self.buffers.pop(camera_id, None)
+            self._last_push.pop(camera_id, None)
+        if buffer:
+            buffer.clear()
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """Get buffer memory usage per camera"""
+        return {
+            camera_id: {
+                'frames': len(buffer),
+                'memory_bytes': buffer.memory_bytes,
+                'max_bytes': buffer.max_bytes
+            }
+            for camera_id, buffer in self.buffers.items()
+        }
@@ -0,0 +1,321 @@
+"""
+Recording Engine Service
+Continuous per-camera recording into fixed-length video segments.
+Each camera gets a dedicated writer thread fed through a bounded queue,
+so recording never blocks capture or AI inference.
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import cv2
+import numpy as np
+
+# Default recordings directory (backend/storage/recordings, same as StorageManager)
+DEFAULT_RECORDINGS_DIR = Path(__file__).resolve().parent.parent.parent / "storage" / "recordings"
+
+INDEX_FILENAME = "index.json"
+
+# Slack when pacing frames to the recording FPS (timestamp rounding, clock jitter)
+FRAME_INTERVAL_SLACK = 1e-3
+
+
+class SegmentRecorder:
+    """Writes fixed-length segments for one camera on its own thread"""
+
+    def __init__(self,
+                 camera_id: str,
+                 output_dir: Path,
+                 segment_seconds: float = 60.0,
+                 fps: float = 10.0,
+                 queue_size: int = 30,
+                 retention_hours: float = 24.0,
+                 max_bytes: int = 0):
+        self.camera_id = camera_id
+        self.output_dir = Path(output_dir) / str(camera_id)
+        self.segment_seconds = segment_seconds
+        self.fps = fps
+        self.retention_hours = retention_hours
+        self.max_bytes = max_bytes  # 0 = no size limit
+
+        # Frames are queued by reference (no copy) - the capture stage must not
+        # write into a frame after handing it over. cv2.VideoCapture.read()
+        # returns a fresh array per call, so this holds for the capture loops.
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._last_accept = 0.0
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+        self._index_lock = threading.Lock()
+
+        # Current segment state (writer thread only)
+        self._writer = None
+        self._segment: Optional[Dict] = None
+        self._frame_size = None
+
+        self.stats = {
+            'frames_written': 0,
+            'frames_dropped': 0,
+            'frames_skipped': 0,
+            'segments_written': 0
+        }
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.output_dir / INDEX_FILENAME
+        self.segments: List[Dict] = self._load_index()
+
+    @property
+    def is_running(self) -> bool:
+        return self._running
+
+    def start(self):
+        """Start the writer thread"""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._writer_loop, daemon=True,
+                                        name=f"recorder-{self.camera_id}")
+        self._thread.start()
+        print(f"⏺️ Recording started for {self.camera_id} ({self.segment_seconds:.0f}s segments @ {self.fps:.0f} FPS)")
+
+    def stop(self, timeout: float = 5.0):
+        """Stop recording and close the current segment"""
+        if not self._running:
+            return
+        self._running = False
+        if self._thread:
+            self._thread.join(timeout=timeout)
+        print(f"⏹️ Recording stopped for {self.camera_id}")
+
+    def wants_frame(self, timestamp: Optional[float] = None) -> bool:
+        """Whether submit() would accept a frame now (lets capture skip decoding)"""
+        timestamp = timestamp or time.time()
+        return self._running and timestamp - self._last_accept >= 1.0 / self.fps - FRAME_INTERVAL_SLACK
+
+    def submit(self, frame: np.ndarray, timestamp: Optional[float] = None) -> bool:
+        """
+        Hand a frame to the writer without blocking
+
+        Frames arriving faster than the recording FPS are skipped, and frames
+        are dropped when the writer falls behind (queue full).
+        """
+        if not self._running or frame is None:
+            return False
+
+        timestamp = timestamp or time.time()
+        if timestamp - self._last_accept < 1.0 / self.fps - FRAME_INTERVAL_SLACK:
+            self.stats['frames_skipped'] += 1
+            return False
+
+        try:
+            self._queue.put_nowait((frame, timestamp))
+            self._last_accept = timestamp
+            return True
+        except queue.Full:
+            self.stats['frames_dropped'] += 1
+            return False
+
+    def _writer_loop(self):
+        """Drain the queue into segment files"""
+        while self._running or not self._queue.empty():
+            try:
+                frame, timestamp = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+            try:
+                if self._segment is None or timestamp - self._segment['start'] >= self.segment_seconds:
+                    self._rotate(timestamp, frame)
+                self._write(frame, timestamp)
+            except Exception as e:
+                print(f"❌ Recording error for {self.camera_id}: {e}")
+                self._close_segment()
+
+        self._close_segment()
+
+    def _rotate(self, timestamp: float, frame: np.ndarray):
+        """Close the current segment and open a new one"""
+        self._close_segment()
+
+        height, width = frame.shape[:2]
+        self._frame_size = (width, height)
+        stamp = datetime.fromtimestamp(timestamp).strftime('%Y%m%d_%H%M%S_%f')[:-3]
+        filename = f"{self.camera_id}_{stamp}.mp4"
+        path = self.output_dir / filename
+
+        self._writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*'mp4v'), self.fps, self._frame_size)
+        self._segment = {
+            'file': filename,
+            'start': timestamp,
+            'end': timestamp,
+            'frames': 0
+        }
+
+    def _write(self, frame: np.ndarray, timestamp: float):
+        """Write one frame to the open segment"""
+        if frame.shape[1] != self._frame_size[0] or frame.shape[0] != self._frame_size[1]:
+            frame = cv2.resize(frame, self._frame_size)
+        self._writer.write(frame)
+        self._segment['end'] = timestamp
+        self._segment['frames'] += 1
+        self.stats['frames_written'] += 1
+
+    def _close_segment(self):
+        """Finalize the open segment and record it in the index"""
+        if self._writer is not None:
+            self._writer.release()
+            self._writer = None
+
+        if self._segment is not None:
+            segment = self._segment
+            self._segment = None
+            if segment['frames'] > 0:
+                path = self.output_dir / segment['file']
+                segment['size_bytes'] = path.stat().st_size if path.exists() else 0
+                with self._index_lock:
+                    self.segments.append(segment)
+                    self._apply_retention()
+                    self._save_index()
+                self.stats['segments_written'] += 1
+
+    def _apply_retention(self):
+        """Delete segments beyond the age / size limits (oldest first)"""
+        cutoff = time.time() - self.retention_hours * 3600 if self.retention_hours > 0 else None
+
+        def over_limit():
+            if not self.segments:
+                return False
+            if cutoff is not None and self.segments[0]['end'] < cutoff:
+                return True
+            if self.max_bytes > 0:
+                return sum(s.get('size_bytes', 0) for s in self.segments) > self.max_bytes
+            return False
+
+        while len(self.segments) > 1 and over_limit():
+            old = self.segments.pop(0)
+            try:
+                (self.output_dir / old['file']).unlink()
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                print(f"⚠️ Could not delete old segment {old['file']}: {e}")
+
+    def _load_index(self) -> List[Dict]:
+        """Load the segment index from disk"""
+        try:
+            if self.index_path.exists():
+                with open(self.index_path, 'r') as f:
+                    return json.load(f).get('segments', [])
+        except Exception as e:
+            print(f"⚠️ Could not load recording index for {self.camera_id}: {e}")
+        return []
+
+    def _save_index(self):
+        """Atomically rewrite the segment index"""
+        tmp_path = self.index_path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump({'camera_id': self.camera_id, 'segments': self.segments}, f, indent=2)
+        os.replace(tmp_path, self.index_path)
+
+    def find_segments(self, start: Optional[float] = None, end: Optional[float] = None) -> List[Dict]:
+        """Get segments overlapping [start, end] (segments are in time order)"""
+        with self._index_lock:
+            segments = list(self.segments)
+        return [
+            s for s in segments
+            if (start is None or s['end'] >= start) and (end is None or s['start'] <= end)
+        ]
+
+    def get_status(self) -> Dict:
+        """Get recorder status"""
+        return {
+            'recording': self._running,
+            'segment_seconds': self.segment_seconds,
+            'fps': self.fps,
+            'queue_depth': self._queue.qsize(),
+            'segments': len(self.segments),
+            **self.stats
+        }
+
+
+class RecordingEngine:
+    """Manages a SegmentRecorder per camera"""
+
+    def __init__(self, output_dir: Optional[str] = None):
+        self.output_dir = Path(output_dir) if output_dir else DEFAULT_RECORDINGS_DIR
+        self.segment_seconds = float(os.getenv('RECORDING_SEGMENT_SECONDS', '60'))
+        self.fps = float(os.getenv('RECORDING_FPS', '10'))
+        self.retention_hours = float(os.getenv('RECORDING_RETENTION_HOURS', '24'))
+        self.max_bytes_per_camera = int(float(os.getenv('RECORDING_MAX_MB_PER_CAMERA', '0')) * 1024 * 1024)
+        self.recorders: Dict[str, SegmentRecorder] = {}
+        self._lock = threading.Lock()
+
+    def start_recording(self, camera_id, **overrides) -> SegmentRecorder:
+        """Start (or resume) recording for a camera"""
+        camera_id = str(camera_id)
+        with self._lock:
+            recorder = self.recorders.get(camera_id)
+            if recorder is None or overrides:
+                if recorder is not None:
+                    recorder.stop()
+                recorder = SegmentRecorder(
+                    camera_id,
+                    self.output_dir,
+                    segment_seconds=overrides.get('segment_seconds', self.segment_seconds),
+                    fps=overrides.get('fps', self.fps),
+                    retention_hours=overrides.get('retention_hours', self.retention_hours),
+                    max_bytes=overrides.get('max_bytes', self.max_bytes_per_camera)
+                )
+                self.recorders[camera_id] = recorder
+        recorder.start()
+        return recorder
+
+    def stop_recording(self, camera_id):
+        """Stop recording for a camera"""
+        recorder = self.recorders.get(str(camera_id))
+        if recorder:
+            recorder.stop()
+
+    def is_recording(self, camera_id) -> bool:
+        recorder = self.recorders.get(str(camera_id))
+        return recorder is not None and recorder.is_running
+
+    def wants_frame(self, camera_id, timestamp: Optional[float] = None) -> bool:
+        """Whether the camera's recorder would accept a frame now"""
+        recorder = self.recorders.get(str(camera_id))
+        return recorder is not None and recorder.wants_frame(timestamp)
+
+    def submit_frame(self, camera_id, frame: np.ndarray, timestamp: Optional[float] = None) -> bool:
+        """Pass a captured frame to the camera's recorder (no-op when not recording)"""
+        recorder = self.recorders.get(str(camera_id))
+        if recorder is None or not recorder.is_running:
+            return False
+        return recorder.submit(frame, timestamp)
+
+    def find_segments(self, camera_id, start: Optional[float] = None, end: Optional[float] = None) -> List[Dict]:
+        """Find recorded segments for a time range"""
+        camera_id = str(camera_id)
+        recorder = self.recorders.get(camera_id)
+        if recorder is None:
+            # Index is on disk even if the camera is not recording right now
+            index_path = self.output_dir / camera_id / INDEX_FILENAME
+            if not index_path.exists():
+                return []
+            recorder = SegmentRecorder(camera_id, self.output_dir)
+            with self._lock:
+                self.recorders.setdefault(camera_id, recorder)
+        return recorder.find_segments(start, end)
+
+    def get_status(self) -> Dict[str, Dict]:
+        """Get status of all recorders"""
+        return {camera_id: recorder.get_status() for camera_id, recorder in self.recorders.items()}
+
+    def stop_all(self):
+        """Stop all recorders"""
+        for recorder in list(self.recorders.values()):
+            recorder.stop()
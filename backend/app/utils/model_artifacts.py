@@ -0,0 +1,252 @@
+"""
+Model artifact manager for AI Eyes Security System
+Resolves model weights from a local cache directory, verified against the
+SHA-256 checksums in its manifest.json, and never downloads anything at
+runtime. Populate the cache on a connected machine with
+scripts/fetch_model_artifacts.py and copy the directory to the site.
+
+Models are registered with a loader and built on first use (lazy), or all
+at once in parallel with preload() (eager). Load times are recorded per model.
+"""
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+MODEL_CACHE_DIR = os.getenv('MODEL_CACHE_DIR', str(Path(__file__).parent.parent.parent / 'storage' / 'models'))
+MODEL_LOADING = os.getenv('MODEL_LOADING', 'lazy').lower()  # lazy or eager
+
+# Where weights were dropped before the cache existed (backend/app/models)
+LEGACY_MODEL_DIRS = [Path(__file__).parent.parent / 'models']
+
+# Known artifacts: cache file name and where fetch_model_artifacts.py gets it
+KNOWN_ARTIFACTS = {
+    'mobilenet_v2_imagenet_notop': {
+        'file': 'mobilenet_v2_weights_tf_dim_ordering_tf_kernels_1.0_224_no_top.h5',
+        'source': 'keras',
+        'url': 'https://storage.googleapis.com/tensorflow/keras-applications/mobilenet_v2/'
+               'mobilenet_v2_weights_tf_dim_ordering_tf_kernels_1.0_224_no_top.h5'
+    },
+    'yolov9c': {'file': 'yolov9c.pt', 'source': 'ultralytics'},
+    'yolov8n': {'file': 'yolov8n.pt', 'source': 'ultralytics'},
+}
+
+
+class ArtifactError(RuntimeError):
+    """Weights are missing from the cache or fail verification"""
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def enforce_offline():
+    """Stop libraries from reaching the network on their own (update checks, asset downloads)"""
+    os.environ.setdefault('YOLO_OFFLINE', '1')
+    os.environ.setdefault('HF_HUB_OFFLINE', '1')
+
+
+class ModelArtifacts:
+    """Checksum-verified local weights plus lazily loaded models"""
+
+    def __init__(self, cache_dir=MODEL_CACHE_DIR, legacy_dirs=LEGACY_MODEL_DIRS):
+        self.cache_dir = Path(cache_dir)
+        self.legacy_dirs = [Path(d) for d in legacy_dirs]
+        self._lock = threading.Lock()
+        self._verified = {}  # name -> (size, mtime_ns) of the verified file
+        self._loaders = {}
+        self._models = {}
+        self._model_locks = {}
+        self._errors = {}
+        self._load_times = {}
+
+    @property
+    def manifest_path(self):
+        return self.cache_dir / 'manifest.json'
+
+    def read_manifest(self):
+        if not self.manifest_path.exists():
+            return {'artifacts': {}}
+        with open(self.manifest_path) as f:
+            return json.load(f)
+
+    def write_manifest(self, manifest):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.manifest_path.with_suffix('.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.manifest_path)
+
+    def add(self, name, file_path):
+        """Record a file that is already in the cache directory (computes its checksum)"""
+        file_path = Path(file_path)
+        manifest = self.read_manifest()
+        manifest['artifacts'][name] = {
+            'file': file_path.name,
+            'sha256': file_sha256(file_path),
+            'bytes': file_path.stat().st_size
+        }
+        self.write_manifest(manifest)
+        with self._lock:
+            self._verified.pop(name, None)
+        return manifest['artifacts'][name]
+
+    def path(self, name):
+        """
+        Local path of a verified artifact
+
+        Raises:
+            ArtifactError: Not in the manifest, file missing, or checksum mismatch
+        """
+        entry = self.read_manifest()['artifacts'].get(name)
+        if entry is None:
+            raise ArtifactError(f"Model artifact '{name}' is not in {self.manifest_path} "
+                                f"(run scripts/fetch_model_artifacts.py on a connected machine)")
+        file_path = self.cache_dir / entry['file']
+        if not file_path.exists():
+            raise ArtifactError(f"Model artifact '{name}' missing: {file_path}")
+        if not entry.get('sha256'):
+            raise ArtifactError(f"Model artifact '{name}' has no checksum in {self.manifest_path}")
+
+        stat = file_path.stat()
+        signature = (stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            if self._verified.get(name) == signature:
+                return str(file_path)
+        if file_sha256(file_path) != entry['sha256']:
+            raise ArtifactError(f"Model artifact '{name}' failed checksum verification: {file_path}")
+        with self._lock:
+            self._verified[name] = signature
+        return str(file_path)
+
+    def checksum(self, name):
+        """SHA-256 of a verified artifact (identifies the weights without loading them)"""
+        self.path(name)
+        return self.read_manifest()['artifacts'][name]['sha256']
+
+    def legacy_path(self, name):
+        """Weights for a known artifact left in a legacy model directory, or None"""
+        known = KNOWN_ARTIFACTS.get(name)
+        if known is None:
+            return None
+        for directory in self.legacy_dirs:
+            candidate = directory / known['file']
+            if candidate.exists():
+                return str(candidate)
+        return None
+
+    def find(self, *names):
+        """
+        First of names available (e.g. a preferred model and its fallback)
+
+        Each name is looked up in the cache, then in the legacy model
+        directories. Legacy files have no recorded checksum, so they are used
+        with a warning until they are added to the cache.
+        """
+        errors = []
+        for name in names:
+            try:
+                return name, self.path(name)
+            except ArtifactError as e:
+                legacy = self.legacy_path(name)
+                if legacy is not None:
+                    logger.warning("Using unverified legacy weights %s for '%s' - add them to the cache with "
+                                   "scripts/fetch_model_artifacts.py --add %s %s", legacy, name, name, legacy)
+                    return name, legacy
+                errors.append(str(e))
+        raise ArtifactError('; '.join(errors))
+
+    def register(self, key, loader):
+        """Register how to build a model; nothing is loaded until get() or preload()"""
+        with self._lock:
+            if key not in self._models:
+                self._loaders[key] = loader
+                self._model_locks.setdefault(key, threading.Lock())
+
+    def get(self, key):
+        """The model for key, loading it on first use (a failed load is not retried)"""
+        model = self._models.get(key)
+        if model is not None:
+            return model
+
+        with self._lock:
+            if key not in self._loaders:
+                raise KeyError(f"No loader registered for model '{key}'")
+            model_lock = self._model_locks[key]
+
+        with model_lock:
+            if key in self._models:
+                return self._models[key]
+            if key in self._errors:
+                raise self._errors[key]
+            start = time.perf_counter()
+            try:
+                model = self._loaders[key]()
+            except ArtifactError as e:
+                self._errors[key] = e
+                logger.error("Model %s failed to load: %s", key, e)
+                raise
+            except Exception as e:
+                self._errors[key] = ArtifactError(f"Loading '{key}' failed: {e}")
+                logger.error("Model %s failed to load: %s", key, e)
+                raise self._errors[key] from e
+            elapsed = time.perf_counter() - start
+            self._models[key] = model
+            self._load_times[key] = {'seconds': round(elapsed, 3), 'thread': threading.current_thread().name,
+                                     'loaded_at': time.time()}
+            logger.info("Model %s loaded in %.2fs", key, elapsed)
+            return model
+
+    def is_loaded(self, key):
+        return key in self._models
+
+    def preload(self, keys=None, max_workers=4):
+        """
+        Load models in parallel (eager startup)
+
+        Returns:
+            key -> load seconds, or the error message for models that failed
+        """
+        keys = list(keys if keys is not None else self._loaders)
+        results = {}
+
+        def load(key):
+            try:
+                self.get(key)
+                return self._load_times[key]['seconds']
+            except Exception as e:
+                return str(e)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(keys) or 1)),
+                                thread_name_prefix='model-load') as pool:
+            for key, result in zip(keys, pool.map(load, keys)):
+                results[key] = result
+        print(f"📦 Preloaded {len(keys)} model(s) in {time.perf_counter() - start:.1f}s")
+        return results
+
+    def load_report(self):
+        """Per-model load status and time"""
+        report = {}
+        for key in self._loaders:
+            if key in self._load_times:
+                report[key] = dict(self._load_times[key], status='loaded')
+            elif key in self._errors:
+                report[key] = {'status': 'failed', 'error': str(self._errors[key])}
+            else:
+                report[key] = {'status': 'not_loaded'}
+        return report
+
+
+# Global instance
+model_artifacts = ModelArtifacts()
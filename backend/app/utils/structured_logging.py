@@ -0,0 +1,210 @@
+"""
+Structured logging for AI Eyes Security System
+JSON lines written to rotated files by a background QueueListener, so
+pipeline threads never block on stdout or disk. Repetitive messages are
+rate limited per message template, and levels can be changed per camera
+at runtime.
+"""
+import os
+import json
+import time
+import queue
+import logging
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+# Standard LogRecord attributes (everything else is emitted as a JSON field)
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_listener = None
+_config_lock = threading.Lock()
+_camera_levels = {}  # camera -> level override
+_rate_filter = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line"""
+
+    def format(self, record):
+        entry = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'msg': record.getMessage()
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class TokenBucketFilter(logging.Filter):
+    """
+    Rate limit repetitive messages
+
+    Each (logger, camera, message template) gets its own bucket, so a line
+    logged every frame is throttled while distinct messages still get through.
+    The count of suppressed records is attached to the next one let through.
+    """
+
+    def __init__(self, rate=1.0, burst=5, max_level=logging.WARNING, max_keys=10000):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.max_level = max_level  # ERROR and above are never dropped
+        self.max_keys = max_keys
+        self._buckets = {}  # key -> [tokens, last refill, suppressed]
+        self._lock = threading.Lock()
+        self.suppressed_total = 0
+
+    def filter(self, record):
+        if self.rate <= 0 or record.levelno > self.max_level:
+            return True
+
+        key = (record.name, getattr(record, 'camera', None), record.msg)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) >= self.max_keys:
+                    self._buckets.clear()
+                bucket = self._buckets[key] = [float(self.burst), now, 0]
+            else:
+                bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+
+            if bucket[0] < 1.0:
+                bucket[2] += 1
+                self.suppressed_total += 1
+                return False
+
+            bucket[0] -= 1.0
+            if bucket[2]:
+                record.suppressed = bucket[2]
+                bucket[2] = 0
+        return True
+
+
+class CameraLogger(logging.LoggerAdapter):
+    """Logger adapter that tags records with a camera and honours per-camera levels"""
+
+    def __init__(self, logger, camera):
+        super().__init__(logger, {'camera': camera})
+        self.camera = camera
+
+    def process(self, msg, kwargs):
+        extra = kwargs.get('extra')
+        kwargs['extra'] = {**self.extra, **extra} if extra else self.extra
+        return msg, kwargs
+
+    def isEnabledFor(self, level):
+        override = _camera_levels.get(self.camera)
+        if override is not None:
+            return level >= override
+        return self.logger.isEnabledFor(level)
+
+    def log(self, level, msg, *args, **kwargs):
+        if self.isEnabledFor(level):
+            msg, kwargs = self.process(msg, kwargs)
+            # Bypass the logger's own level check so a per-camera DEBUG override works
+            self.logger._log(level, msg, args, **kwargs)
+
+
+def get_camera_logger(name, camera):
+    """Get a logger for one camera's pipeline"""
+    return CameraLogger(logging.getLogger(name), camera)
+
+
+def _parse_level(level):
+    if isinstance(level, int):
+        return level
+    value = logging.getLevelName(str(level).upper())
+    if not isinstance(value, int):
+        raise ValueError(f"Unknown log level: {level}")
+    return value
+
+
+def configure_logging(log_dir=None, level=None, max_bytes=None, backup_count=None,
+                      rate=None, burst=None, console=True):
+    """
+    Route all logging through a queue to a rotating JSON file (and the console)
+
+    Safe to call more than once; only the first call installs handlers.
+    """
+    global _listener, _rate_filter
+    with _config_lock:
+        if _listener is not None:
+            return _listener
+
+        log_dir = log_dir or os.getenv('LOG_DIR', os.path.join('storage', 'logs'))
+        level = _parse_level(level or os.getenv('LOG_LEVEL', 'INFO'))
+        max_bytes = max_bytes or int(os.getenv('LOG_MAX_BYTES', str(10 * 1024 * 1024)))
+        backup_count = backup_count or int(os.getenv('LOG_BACKUP_COUNT', '5'))
+        rate = float(rate if rate is not None else os.getenv('LOG_RATE_PER_SECOND', '1'))
+        burst = int(burst if burst is not None else os.getenv('LOG_RATE_BURST', '5'))
+
+        os.makedirs(log_dir, exist_ok=True)
+        file_handler = RotatingFileHandler(
+            os.path.join(log_dir, 'surveillance.jsonl'),
+            maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8'
+        )
+        file_handler.setFormatter(JsonFormatter())
+        handlers = [file_handler]
+
+        if console:
+            console_handler = logging.StreamHandler()
+            console_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s [%(name)s] %(message)s'))
+            handlers.append(console_handler)
+
+        # Filtering runs on the calling thread before the record is queued
+        log_queue = queue.SimpleQueue()
+        queue_handler = QueueHandler(log_queue)
+        _rate_filter = TokenBucketFilter(rate=rate, burst=burst)
+        queue_handler.addFilter(_rate_filter)
+
+        root = logging.getLogger()
+        root.addHandler(queue_handler)
+        root.setLevel(level)
+
+        _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        return _listener
+
+
+def shutdown_logging():
+    """Flush queued records and stop the background writer"""
+    global _listener
+    with _config_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+def set_log_level(level, camera=None, logger_name=None):
+    """
+    Change verbosity at runtime
+
+    Args:
+        level: Level name or number ('DEBUG', 'INFO', ...); None clears a camera override
+        camera: Apply only to this camera's pipeline logs
+        logger_name: Apply to a specific logger (default: root)
+    """
+    if camera is not None:
+        if level is None:
+            _camera_levels.pop(camera, None)
+        else:
+            _camera_levels[camera] = _parse_level(level)
+        return
+    logging.getLogger(logger_name).setLevel(_parse_level(level))
+
+
+def get_log_levels():
+    """Current root level, per-camera overrides and rate limiter stats"""
+    return {
+        'level': logging.getLevelName(logging.getLogger().level),
+        'cameras': {camera: logging.getLevelName(level) for camera, level in _camera_levels.items()},
+        'suppressed': _rate_filter.suppressed_total if _rate_filter else 0
+    }
@@ -16,11 +16,58 @@ DATABASE_NAME = os.getenv('DATABASE_NAME', 'ai_eyes_security')
 
 # Collection Names
 CAMERAS_COLLECTION = 'cameras'
+DISCOVERED_CAMERAS_COLLECTION = 'discovered_cameras'
 ALERTS_COLLECTION = 'alerts'
 LOGS_COLLECTION = 'logs'
 USERS_COLLECTION = 'users'
 SETTINGS_COLLECTION = 'settings'
 
+def discovered_camera_id(ip, port) -> str:
+    """Id of a discovered camera (one document per ip:port)"""
+    return f'camera_{str(ip).replace(".", "_")}_{port}'
+
+
+def migrate_discovered_cameras(collection) -> int:
+    """
+    Give every discovered camera document its ip:port id and drop duplicates
+
+    Older versions rewrote the whole collection on every save, and
+    documents read back took their ObjectId as 'id', so one camera can
+    have several documents with different ids (or none). Run before the
+    unique 'id' index is created; once clean it only reads the collection.
+
+    Returns:
+        Number of duplicate documents removed
+    """
+    groups = {}
+    for doc in collection.find():
+        if doc.get('ip') and doc.get('port'):
+            camera_id = discovered_camera_id(doc['ip'], doc['port'])
+        else:
+            camera_id = doc.get('id') or str(doc['_id'])
+        groups.setdefault(camera_id, []).append(doc)
+    
+    removed = 0
+    for camera_id, docs in groups.items():
+        # Keep the most recently seen document, with the earliest discovery time
+        docs.sort(key=lambda d: d.get('last_seen') or '', reverse=True)
+        keep, duplicates = docs[0], docs[1:]
+        if duplicates:
+            collection.delete_many({'_id': {'$in': [d['_id'] for d in duplicates]}})
+            removed += len(duplicates)
+        
+        update = {'id': camera_id}
+        discovered = [d['discovered_at'] for d in docs if d.get('discovered_at')]
+        if discovered:
+            update['discovered_at'] = min(discovered)
+        if any(keep.get(k) != v for k, v in update.items()):
+            collection.update_one({'_id': keep['_id']}, {'$set': update})
+    
+    if removed:
+        print(f"🧹 Removed {removed} duplicate discovered camera documents")
+    return removed
+
+
 class DatabaseConnection:
     _instance = None
     _client = None
@@ -83,6 +130,10 @@ class DatabaseConnection:
             self._database[LOGS_COLLECTION].create_index("timestamp")
             self._database[LOGS_COLLECTION].create_index("camera_id")
             
+            # Discovered cameras are upserted by camera id (legacy duplicates would fail the index)
+            migrate_discovered_cameras(self._database[DISCOVERED_CAMERAS_COLLECTION])
+            self._database[DISCOVERED_CAMERAS_COLLECTION].create_index("id", unique=True)
+            
             print("✅ Database indexes created successfully")
             
         except Exception as e:
@@ -195,6 +195,7 @@ class AlertModel(BaseModel):
             'message': message,
             'severity': severity,  # low, medium, high, critical
             'image_path': image_path,
+            'clip_path': None,  # Evidence video clip, linked once written
             'timestamp': datetime.utcnow(),
             'resolved': False,
             'acknowledged': False
@@ -214,6 +215,17 @@ class AlertModel(BaseModel):
             print(f"❌ MongoDB save failed: {e}")
             return ""
     
+    def attach_clip(self, alert_id: str, clip_path: str,
+                    clip_start: Optional[float] = None, clip_end: Optional[float] = None) -> bool:
+        """Link an evidence video clip to an existing alert"""
+        update_data = {'clip_path': clip_path}
+        if clip_start is not None:
+            update_data['clip_start'] = datetime.utcfromtimestamp(clip_start)
+        if clip_end is not None:
+            update_data['clip_end'] = datetime.utcfromtimestamp(clip_end)
+        
+        return self.update_by_id(alert_id, update_data)
+    
     def get_recent_alerts(self, limit: int = 50) -> List[Dict[str, Any]]:
         """Get recent alerts"""
         if self.collection is None:
@@ -10,10 +10,12 @@ import os
 import cv2
 import time
 import threading
-import requests
+import logging
 from datetime import datetime
-from flask import Flask, jsonify, Response, render_template_string
+from flask import Flask, jsonify, Response, render_template_string, request
 import json
+import base64
+import numpy as np
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -25,6 +27,22 @@ from surveillance.efficientnet_face_recognition import EfficientNetFaceRecognize
 from surveillance.activity_analyzer import SuspiciousActivityAnalyzer, DetectionZone, ActivityType
 from surveillance.tracker import PersonTracker
 from app.services.alert_manager import AlertManager
+from app.services.evidence_recorder import EvidenceRecorder
+from app.services.recording_engine import RecordingEngine
+from app.services.camera_prober import camera_prober
+from surveillance.mjpeg_client import MJPEGCapture, is_mjpeg_url
+from surveillance.frame_source import FrameSource
+from surveillance.capture_supervisor import CaptureSupervisor
+from surveillance.frame_pool import FrameBufferPool, FrameSlot
+from surveillance.shared_frame_store import SharedFrameStore, store_stats
+from surveillance.metrics import metrics
+from surveillance.profiler import SamplingProfiler, ProfilerBusyError, MAX_DURATION
+from app.utils.auth import require_admin_password
+from app.utils.structured_logging import configure_logging, get_camera_logger, set_log_level, get_log_levels
+from app.utils.model_artifacts import MODEL_LOADING, model_artifacts
+
+# Capture loop pacing: one grab per camera every CAPTURE_LOOP_INTERVAL seconds (~3 FPS)
+CAPTURE_LOOP_INTERVAL = 0.33
 
 class MultiCameraAISurveillance:
     """
@@ -32,14 +50,31 @@ class MultiCameraAISurveillance:
     Detects all available IP cameras and runs AI surveillance on each
     """
     
-    def __init__(self):
+    def __init__(self, camera_urls=None, dry_run_alerts=False):
+        """
+        Args:
+            camera_urls: Cameras to use instead of auto-detection (name -> url or {'url', 'ai_mode'})
+            dry_run_alerts: Record alerts in memory only (no email, database or evidence clips)
+        """
         self.app = Flask(__name__)
         
+        # JSON logs via a background queue writer; per-frame messages are rate limited
+        configure_logging()
+        self.camera_loggers = {}  # camera_name -> CameraLogger
+        
+        # Pre-event frame buffers - alerts get a pre/post-event evidence clip
+        self.evidence_recorder = EvidenceRecorder()
+        
         # Initialize Alert Manager with SendGrid integration
-        self.alert_manager = AlertManager(socketio=None)  # No WebSocket for multi-camera system
+        self.alert_manager = AlertManager(socketio=None, evidence_recorder=self.evidence_recorder,
+                                          dry_run=dry_run_alerts)  # No WebSocket for multi-camera system
+        self.evidence_recorder.alert_model = self.alert_manager.alert_model
+        
+        # Continuous segmented recording (own writer thread per camera)
+        self.recording_engine = RecordingEngine()
         
-        # Auto-detect your IP cameras
-        self.camera_urls = self.auto_detect_cameras()
+        # Auto-detect your IP cameras (unless given explicitly, e.g. for replay benchmarks)
+        self.camera_urls = camera_urls if camera_urls is not None else self.auto_detect_cameras()
         
         # Surveillance state
         self.active_cameras = {}
@@ -51,6 +86,37 @@ class MultiCameraAISurveillance:
         # Frame processing counters for optimization
         self.frame_counters = {}  # Track frame numbers per camera
         
+        # Direct MJPEG capture: read HTTP streams ourselves and decode on demand
+        self.use_mjpeg_client = os.getenv('MJPEG_DIRECT_CLIENT', 'true').lower() == 'true'
+        self.preview_decode_scale = int(os.getenv('MJPEG_PREVIEW_SCALE', '2'))  # 1, 2, 4 or 8
+        self.current_jpeg = {}  # camera_name -> raw JPEG of the frame being analysed
+        
+        # Capture decides which frames get decoded: every Nth frame for AI,
+        # others only while someone is watching / recording
+        self.ai_frame_interval = int(os.getenv('AI_FRAME_INTERVAL', '10'))
+        self.viewer_counts = {}  # camera_name -> open /video_feed streams
+        self._viewer_lock = threading.Lock()
+        
+        # Reconnect supervision: backoff + circuit breaker per camera
+        self.capture_supervisors = {}  # camera_name -> CaptureSupervisor
+        self.open_timeout_ms = int(os.getenv('CAMERA_OPEN_TIMEOUT_MS', '5000'))
+        self.read_timeout_ms = int(os.getenv('CAMERA_READ_TIMEOUT_MS', '5000'))
+        
+        # Reusable frame buffers: the annotated frame is handed to viewers via a slot
+        self.frame_pools = {}       # camera_name -> FrameBufferPool
+        self.annotated_slots = {}   # camera_name -> FrameSlot (newest annotated frame)
+        self._encoded_frames = {}   # camera_name -> (slot version, multipart JPEG part)
+        
+        # Shared-memory frame rings so other processes can read decoded frames
+        self.use_shared_frames = os.getenv('SHARED_FRAME_STORE', 'false').lower() == 'true'
+        self.shared_frame_slots = int(os.getenv('SHARED_FRAME_SLOTS', '4'))
+        self.shared_frame_stores = {}  # camera_name -> SharedFrameStore
+        
+        # Pipeline metrics (stage histograms are recorded in the capture/AI loop)
+        self.frame_sources = {}  # camera_name -> current FrameSource
+        self.camera_threads = {}  # camera_name -> processing thread (for the profiler)
+        metrics.register_collector(self._collect_metrics)
+        
         # Person tracking for activity analysis
         self.person_trackers = {}  # Track person movements per camera
         
@@ -68,6 +134,12 @@ class MultiCameraAISurveillance:
             device='cpu'          # Ensure CPU usage for stability
         )
         
+        # Weights come from the local artifact cache; eager mode loads YOLO and the
+        # face backbone in parallel now instead of on the first frame
+        if MODEL_LOADING == 'eager':
+            for key, result in model_artifacts.preload().items():
+                print(f"   {key}: {f'{result:.1f}s' if isinstance(result, float) else f'❌ {result}'}")
+        
         # Face Recognition - EfficientNet B7 Model
         # Uses advanced deep learning for superior accuracy
         # Confidence threshold: 0.50 (50% confidence required for identification)
@@ -80,6 +152,11 @@ class MultiCameraAISurveillance:
             authorized = self.face_recognizer.get_authorized_persons()
             print(f"✅ Authorized Persons: {', '.join(authorized)}")
         
+        # MediaPipe detectors are checked out per call; record how long threads wait for a free one
+        self.face_detector_pool = getattr(getattr(self.face_recognizer, 'recognizer_system', None), 'detector_pool', None)
+        if self.face_detector_pool is not None:
+            self.face_detector_pool.wait_observer = self._observe_detector_wait
+        
         # Initialize activity analyzers and trackers for each camera
         self._initialize_activity_detection()
         
@@ -90,6 +167,12 @@ class MultiCameraAISurveillance:
         
         self.setup_flask_routes()
     
+    def _observe_detector_wait(self, seconds):
+        """Detector pool wait, labelled by camera (threads named camera-<name>); other threads share one label"""
+        thread_name = threading.current_thread().name
+        camera = thread_name[len('camera-'):] if thread_name.startswith('camera-') else 'other'
+        metrics.observe('face_detector_wait', camera, seconds)
+    
     def auto_detect_cameras(self):
         """Automatically detect all live IP cameras using discovery service"""
         print("🔎 Auto-detecting live IP cameras...")
@@ -106,20 +189,20 @@ class MultiCameraAISurveillance:
             if discovered_cameras:
                 print(f"📂 Found {len(discovered_cameras)} cameras in discovery database")
                 
-                for cam in discovered_cameras:
-                    # Only use online cameras
-                    if cam['status'] == 'online':
-                        camera_name = cam['id']
-                        camera_url = cam['url']
-                        
-                        # Verify camera is still accessible
-                        try:
-                            response = requests.head(camera_url, timeout=2)
-                            if response.status_code in [200, 302]:
-                                cameras[camera_name] = camera_url
-                                print(f"✅ {camera_name}: {camera_url}")
-                        except:
-                            print(f"❌ {camera_name}: {camera_url} (not accessible)")
+                # Only use online cameras - verify they are still accessible (in parallel)
+                online_cameras = [cam for cam in discovered_cameras if cam['status'] == 'online']
+                results = camera_prober.probe_many(cam['url'] for cam in online_cameras)
+                
+                for cam in online_cameras:
+                    camera_name = cam['id']
+                    camera_url = cam['url']
+                    result = results[camera_url]
+                    
+                    if result['online']:
+                        cameras[camera_name] = camera_url
+                        print(f"✅ {camera_name}: {camera_url} ({result['latency_ms']:.0f} ms)")
+                    else:
+                        print(f"❌ {camera_name}: {camera_url} (not accessible)")
             else:
                 print("ℹ️ No cameras in discovery database, checking main cameras collection...")
         
@@ -138,19 +221,20 @@ class MultiCameraAISurveillance:
                     if db_cameras:
                         print(f"📂 Found {len(db_cameras)} cameras in main database")
                         
+                        # Verify cameras are accessible (in parallel)
+                        db_cameras = [cam for cam in db_cameras if cam.get('url')]
+                        results = camera_prober.probe_many(cam['url'] for cam in db_cameras)
+                        
                         for cam in db_cameras:
                             camera_name = cam.get('name', cam.get('_id'))
-                            camera_url = cam.get('url')
+                            camera_url = cam['url']
+                            result = results[camera_url]
                             
-                            if camera_url:
-                                # Verify camera is accessible
-                                try:
-                                    response = requests.head(camera_url, timeout=2)
-                                    if response.status_code in [200, 302]:
-                                        cameras[camera_name] = camera_url
-                                        print(f"✅ {camera_name}: {camera_url}")
-                                except:
-                                    print(f"❌ {camera_name}: {camera_url} (not accessible)")
+                            if result['online']:
+                                cameras[camera_name] = camera_url
+                                print(f"✅ {camera_name}: {camera_url} ({result['latency_ms']:.0f} ms)")
+                            else:
+                                print(f"❌ {camera_name}: {camera_url} (not accessible)")
                     else:
                         print("ℹ️ No enabled cameras in main database")
             except Exception as e:
@@ -387,7 +471,8 @@ class MultiCameraAISurveillance:
             cameras = []
             for camera_name, camera_url in self.camera_urls.items():
                 # Check if camera is currently active/online
-                is_online = camera_name in self.active_cameras
+                supervisor = self.capture_supervisors.get(camera_name)
+                is_online = camera_name in self.active_cameras and (supervisor is None or supervisor.connected)
                 
                 cameras.append({
                     'id': camera_name,
@@ -395,11 +480,112 @@ class MultiCameraAISurveillance:
                     'location': 'Farm Security Zone',
                     'status': 'online' if is_online else 'offline',
                     'url': camera_url,
-                    'type': 'farm'
+                    'type': 'farm',
+                    'health': supervisor.get_health() if supervisor else None
                 })
             
             return jsonify(cameras)
         
+        @self.app.route('/api/metrics')
+        def api_metrics():
+            """Pipeline metrics in Prometheus text format (?format=json for p50/p95/p99 summary)"""
+            if request.args.get('format') == 'json':
+                return jsonify(metrics.snapshot())
+            return Response(metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
+        
+        @self.app.route('/api/profile/<camera_name>', methods=['POST'])
+        @require_admin_password
+        def api_profile_camera(camera_name):
+            """Sample a live camera thread's stacks (admin only)
+            
+            JSON body: password, seconds (default 5), interval_ms (default 5),
+            format ('json' or 'collapsed' for a flamegraph-ready file)
+            """
+            thread = self.camera_threads.get(camera_name)
+            if thread is None or not thread.is_alive():
+                return jsonify({'success': False, 'message': 'Camera not active'}), 404
+            
+            data = request.get_json(silent=True) or {}
+            try:
+                seconds = min(float(data.get('seconds', 5)), MAX_DURATION)
+                interval = float(data.get('interval_ms', 5)) / 1000.0
+            except (TypeError, ValueError):
+                return jsonify({'success': False, 'message': 'seconds and interval_ms must be numbers'}), 400
+            
+            try:
+                result = SamplingProfiler([thread.ident], interval=interval).run(seconds)
+            except ProfilerBusyError as e:
+                return jsonify({'success': False, 'message': str(e)}), 409
+            
+            if data.get('format') == 'collapsed':
+                return Response(
+                    result.collapsed(),
+                    mimetype='text/plain',
+                    headers={'Content-Disposition': f'attachment; filename={camera_name}.collapsed.txt'}
+                )
+            return jsonify({'success': True, 'camera': camera_name, **result.to_dict()})
+        
+        @self.app.route('/api/logging', methods=['GET'])
+        def api_logging_levels():
+            """Current log levels and rate-limited message count"""
+            return jsonify(get_log_levels())
+        
+        @self.app.route('/api/logging', methods=['POST'])
+        @require_admin_password
+        def api_set_logging_level():
+            """Change log verbosity at runtime (optionally for one camera or logger)"""
+            data = request.get_json(silent=True) or {}
+            try:
+                set_log_level(data.get('level'), camera=data.get('camera'), logger_name=data.get('logger'))
+            except (TypeError, ValueError) as e:
+                return jsonify({'success': False, 'message': str(e)}), 400
+            return jsonify({'success': True, **get_log_levels()})
+        
+        @self.app.route('/api/models', methods=['GET'])
+        def api_models():
+            """Model load status and time per model"""
+            return jsonify({'loading': MODEL_LOADING, 'cache_dir': str(model_artifacts.cache_dir),
+                            'models': model_artifacts.load_report()})
+        
+        @self.app.route('/api/known_faces', methods=['GET'])
+        def api_known_faces():
+            """Enrolled / authorized persons"""
+            return jsonify({'known_persons': self.face_recognizer.get_authorized_persons()})
+        
+        @self.app.route('/api/known_faces', methods=['POST'])
+        @require_admin_password
+        def api_enroll_person():
+            """Enroll a person from base64 images into the face gallery (no retraining)"""
+            data = request.get_json(silent=True) or {}
+            if not data.get('name') or not data.get('images'):
+                return jsonify({'success': False, 'message': 'Missing name or images'}), 400
+            
+            images = []
+            for img_data in data['images']:
+                try:
+                    if ',' in img_data:
+                        img_data = img_data.split(',')[1]
+                    image = cv2.imdecode(np.frombuffer(base64.b64decode(img_data), dtype=np.uint8), cv2.IMREAD_COLOR)
+                    if image is not None:
+                        images.append(image)
+                except Exception:
+                    continue
+            if not images:
+                return jsonify({'success': False, 'message': 'No valid images provided'}), 400
+            
+            count = self.face_recognizer.enroll_person(data['name'], images)
+            if not count:
+                return jsonify({'success': False, 'message': 'No usable faces found (or gallery mode disabled)'}), 400
+            return jsonify({'success': True, 'message': f"Enrolled {data['name']} with {count} face samples"})
+        
+        @self.app.route('/api/known_faces/<person_name>', methods=['DELETE'])
+        @require_admin_password
+        def api_remove_person(person_name):
+            """Remove a person from the face gallery"""
+            if self.face_recognizer.remove_person(person_name):
+                return jsonify({'success': True, 'message': f'Removed {person_name}'})
+            return jsonify({'success': False, 'message': 'Person not enrolled'}), 404
+        
         @self.app.route('/api/status')
         def api_status():
             """Get system status"""
@@ -422,7 +608,8 @@ class MultiCameraAISurveillance:
                 'active_cameras': len(self.active_cameras),
                 'total_detections': total_detections,
                 'total_alerts': self.alert_count,
-                'camera_stats': camera_stats
+                'camera_stats': camera_stats,
+                'shared_frames': store_stats(self.shared_frame_stores)
             })
         
         @self.app.route('/api/activities')
@@ -522,6 +709,35 @@ class MultiCameraAISurveillance:
             except Exception as e:
                 return jsonify({'success': False, 'message': f'Error: {str(e)}'})
         
+        @self.app.route('/api/record/<camera_name>', methods=['POST'])
+        def api_record_camera(camera_name):
+            """Start/stop continuous recording on specific camera"""
+            try:
+                if camera_name not in self.camera_urls:
+                    return jsonify({'success': False, 'message': 'Camera not found'})
+                
+                data = request.get_json(silent=True) or {}
+                if data.get('action', 'start') == 'start':
+                    self.recording_engine.start_recording(camera_name)
+                    return jsonify({'success': True, 'message': f'Recording started on {camera_name}'})
+                else:
+                    self.recording_engine.stop_recording(camera_name)
+                    return jsonify({'success': True, 'message': f'Recording stopped on {camera_name}'})
+            except Exception as e:
+                return jsonify({'success': False, 'message': f'Error: {str(e)}'})
+        
+        @self.app.route('/api/recordings/<camera_name>', methods=['GET'])
+        def api_recordings(camera_name):
+            """List recorded segments for a time range (?start=&end= epoch seconds)"""
+            start = request.args.get('start', type=float)
+            end = request.args.get('end', type=float)
+            return jsonify({
+                'camera': camera_name,
+                'recording': self.recording_engine.is_recording(camera_name),
+                'status': self.recording_engine.get_status().get(camera_name, {}),
+                'segments': self.recording_engine.find_segments(camera_name, start, end)
+            })
+        
         @self.app.route('/video_feed/<camera_name>')
         def video_feed(camera_name):
             """Live video feed with AI annotations"""
@@ -532,24 +748,140 @@ class MultiCameraAISurveillance:
     
     def generate_frames(self, camera_name):
         """Generate annotated video frames for specific camera"""
-        while camera_name in self.active_cameras:
-            try:
-                if camera_name in self.latest_frames:
-                    frame_data = self.latest_frames[camera_name]
-                    annotated_frame = frame_data.get('annotated_frame')
+        # Register as a viewer so the capture loop decodes preview frames
+        with self._viewer_lock:
+            self.viewer_counts[camera_name] = self.viewer_counts.get(camera_name, 0) + 1
+        
+        try:
+            last_sent = None
+            while camera_name in self.active_cameras:
+                try:
+                    slot = self.annotated_slots.get(camera_name)
+                    if slot is not None and slot.version != last_sent:
+                        part = self._encode_annotated(camera_name, slot)
+                        if part is not None:
+                            last_sent = part[0]
+                            yield part[1]
                     
-                    if annotated_frame is not None:
-                        ret, buffer = cv2.imencode('.jpg', annotated_frame, [cv2.IMWRITE_JPEG_QUALITY, 80])
-                        if ret:
-                            frame = buffer.tobytes()
-                            yield (b'--frame\r\n'
-                                   b'Content-Type: image/jpeg\r\n\r\n' + frame + b'\r\n')
-                
-                time.sleep(0.1)  # ~10 FPS for web
-                
+                    time.sleep(0.1)  # ~10 FPS for web
+                    
+                except Exception as e:
+                    print(f"Frame generation error for {camera_name}: {e}")
+                    time.sleep(1)
+        finally:
+            # Runs when the client disconnects (generator closed)
+            with self._viewer_lock:
+                self.viewer_counts[camera_name] = max(0, self.viewer_counts.get(camera_name, 1) - 1)
+    
+    def _encode_annotated(self, camera_name, slot):
+        """JPEG-encode the newest annotated frame once, shared by all viewers"""
+        cached = self._encoded_frames.get(camera_name)
+        if cached is not None and cached[0] == slot.version:
+            return cached
+        
+        version, annotated = slot.checkout()
+        if annotated is None:
+            return None
+        try:
+            with metrics.timer('encode', camera_name):
+                ret, buffer = cv2.imencode('.jpg', annotated, [cv2.IMWRITE_JPEG_QUALITY, 80])
+        finally:
+            slot.pool.release(annotated)
+        if not ret:
+            return None
+        
+        # Single copy into the multipart part (WSGI servers require bytes, not views)
+        part = (version, b''.join((b'--frame\r\nContent-Type: image/jpeg\r\n\r\n', buffer, b'\r\n')))
+        self._encoded_frames[camera_name] = part
+        return part
+    
+    def _collect_metrics(self):
+        """Queue depths and drop counts, sampled when /api/metrics is scraped"""
+        samples = []
+        for camera_name in list(self.active_cameras):
+            labels = {'camera': camera_name}
+            samples.append(('viewers', 'gauge', labels, self.viewer_counts.get(camera_name, 0)))
+            
+            source = self.frame_sources.get(camera_name)
+            if source is not None:
+                for key, value in source.stats.items():
+                    samples.append((f'capture_{key}_total', 'counter', labels, value))
+                if source.is_mjpeg:
+                    samples.append(('mjpeg_frames_dropped_total', 'counter', labels,
+                                    source.cap.stats['frames_dropped']))
+            
+            recorder = self.recording_engine.recorders.get(camera_name)
+            if recorder is not None:
+                status = recorder.get_status()
+                samples.append(('recorder_queue_depth', 'gauge', labels, status['queue_depth']))
+                samples.append(('recorder_frames_dropped_total', 'counter', labels, status['frames_dropped']))
+            
+            buffer = self.evidence_recorder.buffers.get(camera_name)
+            if buffer is not None:
+                samples.append(('evidence_buffer_bytes', 'gauge', labels, buffer.memory_bytes))
+            
+            supervisor = self.capture_supervisors.get(camera_name)
+            if supervisor is not None:
+                samples.append(('camera_connected', 'gauge', labels, 1 if supervisor.connected else 0))
+        
+        if self.face_detector_pool is not None:
+            pool = self.face_detector_pool.get_stats()
+            samples.append(('face_detector_pool_size', 'gauge', {}, pool['size']))
+            samples.append(('face_detector_pool_created', 'gauge', {}, pool['created']))
+            samples.append(('face_detector_pool_in_use', 'gauge', {}, pool['in_use']))
+            samples.append(('face_detector_checkouts_total', 'counter', {}, pool['checkouts']))
+            samples.append(('face_detector_waits_total', 'counter', {}, pool['waits']))
+            samples.append(('face_detector_wait_seconds_total', 'counter', {}, pool['wait_seconds_total']))
+        return samples
+    
+    def _close_shared_store(self, camera_name):
+        """Remove a camera's shared-memory frame ring"""
+        store = self.shared_frame_stores.pop(camera_name, None)
+        if store is not None:
+            try:
+                store.close()
             except Exception as e:
-                print(f"Frame generation error for {camera_name}: {e}")
-                time.sleep(1)
+                print(f"⚠️ Could not close shared frame store for {camera_name}: {e}")
+    
+    def _get_frame_pool(self, camera_name):
+        """Get (or create) the camera's buffer pool and annotated-frame slot"""
+        pool = self.frame_pools.get(camera_name)
+        if pool is None:
+            pool = FrameBufferPool(name=camera_name)
+            self.frame_pools[camera_name] = pool
+            self.annotated_slots[camera_name] = FrameSlot(pool)
+        return pool
+    
+    def _open_capture(self, camera_url):
+        """Open a camera stream - direct MJPEG client for HTTP streams, OpenCV otherwise"""
+        if self.use_mjpeg_client and is_mjpeg_url(camera_url):
+            cap = MJPEGCapture(camera_url, timeout=self.open_timeout_ms / 1000.0)
+            if cap.isOpened():
+                return cap
+            # Not multipart MJPEG (or unreachable) - let OpenCV/FFmpeg try
+        
+        # Bound how long FFmpeg may block on open / read (OpenCV 4.5.2+)
+        if hasattr(cv2, 'CAP_PROP_OPEN_TIMEOUT_MSEC'):
+            return cv2.VideoCapture(camera_url, cv2.CAP_ANY, [
+                cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, self.open_timeout_ms,
+                cv2.CAP_PROP_READ_TIMEOUT_MSEC, self.read_timeout_ms
+            ])
+        return cv2.VideoCapture(camera_url)
+    
+    def _open_frame_source(self, camera_url):
+        """Open a camera stream wrapped in a FrameSource (decides which frames get decoded)"""
+        return FrameSource(self._open_capture(camera_url), ai_interval=self.ai_frame_interval,
+                           preview_scale=self.preview_decode_scale)
+    
+    def _save_snapshot(self, snapshot_path, frame, camera_name):
+        """Save a snapshot, writing the camera's own JPEG bytes when available"""
+        os.makedirs(os.path.dirname(snapshot_path), exist_ok=True)
+        jpeg = self.current_jpeg.get(camera_name)
+        if jpeg is not None:
+            with open(snapshot_path, 'wb') as f:
+                f.write(jpeg)
+        else:
+            cv2.imwrite(snapshot_path, frame)
     
     def process_camera_feed(self, camera_name, camera_info):
         """Process individual camera with AI surveillance"""
@@ -570,8 +902,33 @@ class MultiCameraAISurveillance:
         else:
             print("   🛡️ Full Protection - Face recognition (EfficientNet) + Activity detection")
         
-        cap = cv2.VideoCapture(camera_url)
-        frame_count = 0
+        supervisor = CaptureSupervisor(
+            camera_name,
+            camera_url,
+            opener=self._open_frame_source,
+            probe=lambda url: camera_prober.probe(url, use_cache=False)['online'],
+            base_delay=float(os.getenv('CAMERA_RECONNECT_BASE_SECONDS', '1')),
+            max_delay=float(os.getenv('CAMERA_RECONNECT_MAX_SECONDS', '60')),
+            failure_threshold=int(os.getenv('CAMERA_CIRCUIT_FAILURES', '5')),
+            open_seconds=float(os.getenv('CAMERA_CIRCUIT_OPEN_SECONDS', '120'))
+        )
+        self.capture_supervisors[camera_name] = supervisor
+        is_active = lambda: camera_name in self.active_cameras
+        
+        shared_store = None
+        if self.use_shared_frames:
+            try:
+                shared_store = SharedFrameStore(camera_name, slots=self.shared_frame_slots)
+                self.shared_frame_stores[camera_name] = shared_store
+            except Exception as e:
+                print(f"⚠️ Shared frame store unavailable for {camera_name}: {e}")
+        
+        source = supervisor.connect(is_active)
+        self.frame_sources[camera_name] = source
+        if source is None:
+            self._close_shared_store(camera_name)
+            print(f"🛑 Stopped surveillance for {camera_name}")
+            return
         last_fps_time = time.time()
         fps_counter = 0
         
@@ -585,71 +942,130 @@ class MultiCameraAISurveillance:
         
         while camera_name in self.active_cameras:
             try:
-                ret, frame = cap.read()
+                # Decode non-AI frames only when someone consumes them. The evidence buffer
+                # never forces a decode: it takes the raw JPEG (MJPEG) or frames that are
+                # decoded anyway for AI or preview. The recorder gets full-resolution frames.
+                now = time.time()
+                record = self.recording_engine.wants_frame(camera_name, now)
+                want_frame = self.viewer_counts.get(camera_name, 0) > 0 or record
+                
+                with metrics.timer('capture', camera_name):
+                    ret, captured = source.next_frame(want_frame=want_frame, full_resolution=record)
                 if not ret:
                     print(f"Failed to read from {camera_name}, reconnecting...")
-                    cap.release()
-                    time.sleep(2)
-                    # Attempt to reconnect
-                    cap = cv2.VideoCapture(camera_url)
-                    if not cap.isOpened():
-                        print(f"Reconnection failed for {camera_name}, will retry...")
-                        time.sleep(3)
+                    source.release()
+                    # Supervisor handles backoff, circuit breaker and the pre-open probe
+                    supervisor.record_failure('read failed')
+                    source = supervisor.connect(is_active)
+                    self.frame_sources[camera_name] = source
+                    if source is None:
+                        break
+                    print(f"✅ Reconnected to {camera_name}")
                     continue
                 
-                frame_count += 1
+                supervisor.mark_frame()
                 fps_counter += 1
                 
                 # Calculate FPS
                 current_time = time.time()
                 if current_time - last_fps_time >= 1.0:
                     self.detection_stats[camera_name]['fps'] = fps_counter
+                    self.detection_stats[camera_name]['decode'] = source.get_stats()
+                    self.detection_stats[camera_name]['buffers'] = self._get_frame_pool(camera_name).get_stats()
                     fps_counter = 0
                     last_fps_time = current_time
                 
-                # AI Processing (optimized timing)
-                processed_data = self.process_frame_ai(frame, camera_name, frame_count)
-                
-                # Update stats
-                if 'detections' in processed_data:
-                    self.detection_stats[camera_name]['total_detections'] += len(processed_data['detections'])
-                
-                # Store latest frame data
-                self.latest_frames[camera_name] = processed_data
-                
-                # Log activities
-                self.log_activities(processed_data, camera_name)
+                # Grabbed but not decoded frames just keep the same pacing as decoded ones
+                self.process_captured_frame(camera_name, captured, shared_store)
                 
                 # ULTRA increased sleep for maximum performance balance (3 FPS AI processing)
-                time.sleep(0.33)  # ~3 FPS for AI processing to eliminate lag spikes
+                time.sleep(CAPTURE_LOOP_INTERVAL)  # ~3 FPS for AI processing to eliminate lag spikes
                 
             except Exception as e:
                 print(f"Camera error {camera_name}: {e}")
                 time.sleep(2)
         
-        cap.release()
+        if source is not None:
+            source.release()
+        self._close_shared_store(camera_name)
         print(f"🛑 Stopped surveillance for {camera_name}")
     
-    def process_frame_ai(self, frame, camera_name, frame_count):
-        """AI processing pipeline for each camera - Performance Optimized"""
+    def process_captured_frame(self, camera_name, captured, shared_store=None):
+        """Run one captured frame through buffering, recording and AI (used by the capture loop and replay benchmarks)"""
+        frame = captured.image
+        
+        # Keep the last few seconds for evidence clips (raw JPEG - no re-encode)
+        if captured.jpeg is not None:
+            self.evidence_recorder.add_jpeg(camera_name, captured.jpeg, captured.timestamp)
+        elif frame is not None:
+            self.evidence_recorder.add_frame(camera_name, frame, captured.timestamp)
+        
+        if frame is None:
+            # Grabbed but not decoded - nobody needs this frame
+            return None
+        
+        # Hand frame to the recorder (no copy, never blocks); reduced-scale preview
+        # frames would mix resolutions within a segment
+        if captured.scale == 1:
+            self.recording_engine.submit_frame(camera_name, frame, captured.timestamp)
+        
+        # Publish pixels for out-of-process readers
+        if shared_store is not None:
+            shared_store.write(frame, captured.index, captured.timestamp)
+        
+        # AI Processing (optimized timing)
+        self.current_jpeg[camera_name] = captured.jpeg
+        with metrics.timer('ai_total' if captured.is_ai_frame else 'preview_total', camera_name):
+            processed_data = self.process_frame_ai(frame, camera_name, captured.index,
+                                                   run_ai=captured.is_ai_frame, timestamp=captured.timestamp)
+        
+        # Update stats
+        if 'detections' in processed_data:
+            self.detection_stats[camera_name]['total_detections'] += len(processed_data['detections'])
+        
+        # Store latest frame data
+        self.latest_frames[camera_name] = processed_data
+        
+        # Log activities
+        self.log_activities(processed_data, camera_name)
+        return processed_data
+    
+    def process_frame_ai(self, frame, camera_name, frame_count, run_ai=None, timestamp=None):
+        """
+        AI processing pipeline for each camera - Performance Optimized
+        
+        timestamp is the frame's capture time (defaults to now). Tracking and
+        activity analysis use it, so replayed video gets the dwell times and
+        speeds of the recording rather than those of the machine replaying it.
+        """
         
         # Get AI mode for this camera
         ai_mode = self.detection_stats.get(camera_name, {}).get('ai_mode', 'both')
         
+        # The capture layer decides which frames get AI; fall back to every 10th frame
+        if run_ai is None:
+            run_ai = frame_count % 10 == 0
+        
         # ULTRA Performance optimization: Skip even more frames to eliminate lag (process every 10th frame)
-        if frame_count % 10 != 0:
+        if not run_ai:
             # Return cached detection data for skipped frames
             if camera_name in self.latest_frames:
-                cached_data = self.latest_frames[camera_name].copy()
-                cached_data['annotated_frame'] = self.create_annotated_frame(
-                    frame, cached_data.get('detections', []), 
-                    cached_data.get('activities', []), camera_name
-                )
+                # Reuse the cached result dict - only the annotated frame changes
+                cached_data = self.latest_frames[camera_name]
+                # Preview frames may be decoded at reduced scale - map boxes onto them
+                analysed = cached_data.get('original_frame')
+                bbox_scale = frame.shape[1] / analysed.shape[1] if analysed is not None else 1.0
+                with metrics.timer('annotate', camera_name):
+                    cached_data['annotated_frame'] = self.create_annotated_frame(
+                        frame, cached_data.get('detections', []), 
+                        cached_data.get('activities', []), camera_name,
+                        bbox_scale=bbox_scale
+                    )
                 return cached_data
         
-        # Resize frame for ULTRA fast processing (reduce resolution even more)
         height, width = frame.shape[:2]
-        small_frame = cv2.resize(frame, (int(width * 0.3), int(height * 0.3)))
+        frame_pool = self._get_frame_pool(camera_name)
+        log = self._camera_log(camera_name)
         
         # === YOLOv9 Object Detection (only if ai_mode is 'yolov9' or 'both') ===
         detections = []
@@ -658,8 +1074,15 @@ class MultiCameraAISurveillance:
         bags = []
         
         if ai_mode in ['yolov9', 'both']:
-            # Object Detection on much smaller frame
-            detections = self.detector.detect(small_frame)
+            # Resize frame for ULTRA fast processing into a reusable buffer
+            with metrics.timer('resize', camera_name):
+                small_frame = frame_pool.resize(frame, (int(width * 0.3), int(height * 0.3)))
+            try:
+                # Object Detection on much smaller frame
+                with metrics.timer('yolo', camera_name):
+                    detections = self.detector.detect(small_frame)
+            finally:
+                frame_pool.release(small_frame)
             
             # Scale detection coordinates back to original frame size (adjusted for 0.3 scale)
             for detection in detections:
@@ -675,7 +1098,9 @@ class MultiCameraAISurveillance:
         activities = []
         
         # === Activity Analysis (only if ai_mode is 'yolov9' or 'both') ===
-        current_time = time.time()
+        current_time = timestamp if timestamp is not None else time.time()
+        tracker = None
+        track_states = {}
         
         if ai_mode in ['yolov9', 'both']:
             # Update person tracker with detected persons
@@ -684,14 +1109,16 @@ class MultiCameraAISurveillance:
             
             if tracker and activity_analyzer and len(persons) > 0:
                 # Update tracker with person detections
-                track_states = tracker.update(frame, persons)
+                with metrics.timer('tracking', camera_name):
+                    track_states = tracker.update(frame, persons, current_time)
                 
                 # Analyze tracks for suspicious activities
-                suspicious_activities = activity_analyzer.analyze_frame(
-                    detections=detections,
-                    tracks=track_states,
-                    current_time=current_time
-                )
+                with metrics.timer('activity', camera_name):
+                    suspicious_activities = activity_analyzer.analyze_frame(
+                        detections=detections,
+                        tracks=track_states,
+                        current_time=current_time
+                    )
                 
                 # Process detected suspicious activities
                 for sus_activity in suspicious_activities:
@@ -702,7 +1129,7 @@ class MultiCameraAISurveillance:
                     snapshot_filename = f"{activity_type}_{camera_name}_{timestamp}.jpg"
                     snapshot_path = os.path.join("storage", "snapshots", snapshot_filename)
                     os.makedirs(os.path.dirname(snapshot_path), exist_ok=True)
-                    cv2.imwrite(snapshot_path, frame)
+                    self._save_snapshot(snapshot_path, frame, camera_name)
                     
                     # Map activity type to severity
                     severity_map = {
@@ -725,41 +1152,41 @@ class MultiCameraAISurveillance:
                     
                     # Send alerts for specific activity types
                     if activity_type == 'loitering':
-                        self.alert_manager.send_suspicious_activity_alert(
-                            activity_type='loitering',
-                            camera_id=camera_name,
-                            confidence=sus_activity.confidence,
-                            image_path=snapshot_path
-                        )
+                        with metrics.timer('alert', camera_name):
+                            self.alert_manager.send_suspicious_activity_alert(
+                                activity_type='loitering',
+                                camera_id=camera_name,
+                                confidence=sus_activity.confidence,
+                                image_path=snapshot_path
+                            )
                         self.alert_count += 1
-                        print(f"⚠️ LOITERING [Camera_{camera_name}]: {sus_activity.description}")
-                        print(f"📸 Snapshot saved: {snapshot_path}")
+                        log.warning("⚠️ LOITERING: %s", sus_activity.description, extra={'snapshot': snapshot_path})
                         
                     elif activity_type == 'zone_intrusion':
-                        self.alert_manager.send_suspicious_activity_alert(
-                            activity_type='zone_intrusion',
-                            camera_id=camera_name,
-                            confidence=sus_activity.confidence,
-                            image_path=snapshot_path
-                        )
+                        with metrics.timer('alert', camera_name):
+                            self.alert_manager.send_suspicious_activity_alert(
+                                activity_type='zone_intrusion',
+                                camera_id=camera_name,
+                                confidence=sus_activity.confidence,
+                                image_path=snapshot_path
+                            )
                         self.alert_count += 1
-                        print(f"🚨 ZONE INTRUSION [Camera_{camera_name}]: {sus_activity.description}")
-                        print(f"📸 Snapshot saved: {snapshot_path}")
+                        log.warning("🚨 ZONE INTRUSION: %s", sus_activity.description, extra={'snapshot': snapshot_path})
                         
                     elif activity_type == 'running':
                         # Don't send email for running, just log it
-                        print(f"🏃 RUNNING [Camera_{camera_name}]: {sus_activity.description}")
+                        log.info("🏃 RUNNING: %s", sus_activity.description, extra={'snapshot': snapshot_path})
                         
                     elif activity_type == 'fighting':
-                        self.alert_manager.send_suspicious_activity_alert(
-                            activity_type='fighting',
-                            camera_id=camera_name,
-                            confidence=sus_activity.confidence,
-                            image_path=snapshot_path
-                        )
+                        with metrics.timer('alert', camera_name):
+                            self.alert_manager.send_suspicious_activity_alert(
+                                activity_type='fighting',
+                                camera_id=camera_name,
+                                confidence=sus_activity.confidence,
+                                image_path=snapshot_path
+                            )
                         self.alert_count += 1
-                        print(f"🚨 FIGHTING [Camera_{camera_name}]: {sus_activity.description}")
-                        print(f"📸 Snapshot saved: {snapshot_path}")
+                        log.warning("🚨 FIGHTING: %s", sus_activity.description, extra={'snapshot': snapshot_path})
         
         # === END: Activity Analysis ===
         
@@ -776,7 +1203,7 @@ class MultiCameraAISurveillance:
             os.makedirs(os.path.dirname(snapshot_path), exist_ok=True)
             
             # Save the full frame as snapshot
-            cv2.imwrite(snapshot_path, frame)
+            self._save_snapshot(snapshot_path, frame, camera_name)
             
             activity = {
                 'type': 'weapon',
@@ -787,59 +1214,56 @@ class MultiCameraAISurveillance:
             activities.append(activity)
             
             # Send immediate weapon detection alert with snapshot
-            self.alert_manager.send_weapon_detection_alert(
-                weapon_type=weapons[0]["class_name"],
-                camera_id=camera_name,
-                confidence=weapons[0]['confidence'],
-                image_path=snapshot_path
-            )
+            with metrics.timer('alert', camera_name):
+                self.alert_manager.send_weapon_detection_alert(
+                    weapon_type=weapons[0]["class_name"],
+                    camera_id=camera_name,
+                    confidence=weapons[0]['confidence'],
+                    image_path=snapshot_path
+                )
             self.alert_count += 1
-            print(f"🚨 CRITICAL ALERT [Camera_{camera_name}]: WEAPON DETECTED: {weapons[0]['class_name']}")
-            print(f"📸 Weapon snapshot saved: {snapshot_path}")
+            # Above WARNING, so the rate-limit filter never drops it
+            log.critical("🚨 CRITICAL ALERT: WEAPON DETECTED: %s", weapons[0]['class_name'],
+                         extra={'snapshot': snapshot_path})
         
         # === Face Recognition (EfficientNet B7 - supports legacy 'lbph' mode config) ===
         authorized_persons_present = False  # Track if authorized persons are detected
-        print(f"🔧 DEBUG: Face recognizer trained: {self.face_recognizer.is_trained}")
+        log.debug("Face recognizer trained: %s", self.face_recognizer.is_trained)
         if ai_mode in ['lbph', 'face_recognition', 'both'] and self.face_recognizer.is_trained:
             # Initialize frame counter for this camera if not exists
             if camera_name not in self.frame_counters:
                 self.frame_counters[camera_name] = 0
             
             self.frame_counters[camera_name] += 1
-            print(f"🔧 DEBUG: Frame counter for {camera_name}: {self.frame_counters[camera_name]}")
+            log.debug("Frame counter: %d", self.frame_counters[camera_name])
             
-            # Run face recognition when person is detected OR every 5th frame
+            # Tracked persons are recognized once from their best face shots; without
+            # person tracking, faces are recognized when a person is detected OR every 5th frame
+            use_tracks = tracker is not None
             run_face_recognition = False
             if person_count > 0:
                 run_face_recognition = True
-                print(f"🔧 DEBUG: Running face detection - person detected on frame {self.frame_counters[camera_name]}")
-            elif self.frame_counters[camera_name] % 5 == 0:
+                log.debug("Running face detection - person detected on frame %d", self.frame_counters[camera_name])
+            elif not use_tracks and self.frame_counters[camera_name] % 5 == 0:
                 run_face_recognition = True
-                print(f"🔧 DEBUG: Running face detection - scheduled frame {self.frame_counters[camera_name]}")
+                log.debug("Running face detection - scheduled frame %d", self.frame_counters[camera_name])
             
             if run_face_recognition:
-                print(f"🔧 DEBUG: Running face detection on frame {self.frame_counters[camera_name]}")
-                print(f"🔍 Frame dimensions for face detection: {frame.shape}")
-                
-                # Use EfficientNet face recognition
-                raw_face_results = self.face_recognizer.recognize_faces(frame)
+                log.debug("Frame dimensions for face detection: %s", frame.shape)
                 
-                # Convert to expected format
-                face_results = []
-                for result in raw_face_results:
-                    face_results.append({
-                        'person_name': result['name'],
-                        'confidence': result['confidence'],
-                        'authorization_status': 'authorized' if result['is_authorized'] else 'intruder',
-                        'bbox': result['bbox']
-                    })
+                with metrics.timer('face_recognition', camera_name):
+                    if use_tracks:
+                        face_results = self._recognize_tracked_faces(
+                            frame, camera_name, tracker, track_states, current_time)
+                    else:
+                        face_results = self._recognize_frame_faces(frame, camera_name)
                 
                 # Debug: Show face recognition results
-                print(f"👤 Face Detection for {camera_name}: {len(face_results)} faces detected")
-                if len(face_results) > 0:
-                    print(f"👤 Face Recognition Results for {camera_name}:")
+                if log.isEnabledFor(logging.DEBUG):
+                    log.debug("Face detection: %d faces detected", len(face_results))
                     for i, face_result in enumerate(face_results):
-                        print(f"   Face {i+1}: {face_result['person_name']} (confidence: {face_result['confidence']:.2f}, status: {face_result['authorization_status']})")
+                        log.debug("Face %d: %s (confidence: %.2f, status: %s)", i + 1, face_result['person_name'],
+                                  face_result['confidence'], face_result['authorization_status'])
                 
                 # Check for intruders (unknown faces) - ALWAYS ALERT for unauthorized faces
                 authorized_faces = []
@@ -863,7 +1287,7 @@ class MultiCameraAISurveillance:
                     os.makedirs(os.path.dirname(snapshot_path), exist_ok=True)
                     
                     # Save the full frame as snapshot
-                    cv2.imwrite(snapshot_path, frame)
+                    self._save_snapshot(snapshot_path, frame, camera_name)
                     
                     # Send intruder alert with snapshot (HIGH priority)
                     # Alert message includes whether authorized persons are also present
@@ -871,12 +1295,13 @@ class MultiCameraAISurveillance:
                     if len(authorized_faces) > 0:
                         alert_message += f" (Authorized personnel also present: {', '.join(set(authorized_faces))})"
                     
-                    self.alert_manager.send_intruder_alert(
-                        person_name="unknown",
-                        camera_id=camera_name,
-                        confidence=0.0,
-                        image_path=snapshot_path
-                    )
+                    with metrics.timer('alert', camera_name):
+                        self.alert_manager.send_intruder_alert(
+                            person_name="unknown",
+                            camera_id=camera_name,
+                            confidence=0.0,
+                            image_path=snapshot_path
+                        )
                     
                     activity = {
                         'type': 'intruder',
@@ -887,8 +1312,7 @@ class MultiCameraAISurveillance:
                     activities.append(activity)
                     self.alert_count += 1
                     
-                    print(f"🚨 ALERT [Camera_{camera_name}]: {alert_message}")
-                    print(f"📸 Snapshot saved: {snapshot_path}")
+                    log.warning("🚨 ALERT: %s", alert_message, extra={'snapshot': snapshot_path})
                 
                 # Show authorized faces confirmation
                 if len(authorized_faces) > 0:
@@ -901,11 +1325,11 @@ class MultiCameraAISurveillance:
                         'frames_since_seen': 0
                     }
                     
-                    print(f"✅ AUTHORIZED [Camera_{camera_name}]: {', '.join(authorized_faces)} - Access granted")
+                    log.info("✅ AUTHORIZED: %s - Access granted", ', '.join(authorized_faces))
                     if len(intruder_faces) > 0:
-                        print(f"⚠️  SECURITY WARNING: {len(intruder_faces)} INTRUDER(S) detected alongside authorized personnel - ALERT SENT")
+                        log.warning("⚠️ SECURITY WARNING: %d INTRUDER(S) detected alongside authorized personnel - ALERT SENT", len(intruder_faces))
                     else:
-                        print(f"ℹ️  INFO: Only authorized personnel detected - no alerts")
+                        log.debug("Only authorized personnel detected - no alerts")
                 elif len(intruder_faces) > 0:
                     # Check if intruder might be authorized person with poor frame quality
                     likely_same_person = False
@@ -921,11 +1345,12 @@ class MultiCameraAISurveillance:
                                     likely_same_person = True
                                     last_auth['frames_since_seen'] += 1
                                     persons_str = ', '.join(last_auth['names'])
-                                    print(f"⚠️  WARNING: Poor quality frame detected (confidence: {intruder['confidence']:.2f}), likely {persons_str} - grace period (frame {last_auth['frames_since_seen']}/3)")
+                                    log.info("Poor quality frame detected (confidence: %.2f), likely %s - grace period (frame %d/3)",
+                                             intruder['confidence'], persons_str, last_auth['frames_since_seen'])
                                     break
                     
                     if not likely_same_person:
-                        print(f"🚨 INTRUDERS ONLY: No authorized personnel detected - intruder alert sent")
+                        log.warning("🚨 INTRUDERS ONLY: No authorized personnel detected - intruder alert sent")
                         # Clear last authorized person memory (real intruder detected)
                         if camera_name in self.last_authorized_person:
                             del self.last_authorized_person[camera_name]
@@ -943,10 +1368,12 @@ class MultiCameraAISurveillance:
                             recently_authorized = True
                             # Show ALL authorized persons who were recently seen
                             persons_str = ', '.join(last_auth['names'])
-                            print(f"ℹ️  INFO: {persons_str} face(s) temporarily not visible (frame {last_auth['frames_since_seen']}/{self.max_frames_without_face}) - no alert")
+                            log.info("%s face(s) temporarily not visible (frame %d/%d) - no alert",
+                                     persons_str, last_auth['frames_since_seen'], self.max_frames_without_face)
                         else:
                             # Too many frames without seeing face, forget this person
-                            print(f"🚨 INTRUDER: Person detected but face not visible for {self.max_frames_without_face}+ frames - potential intruder")
+                            log.warning("🚨 INTRUDER: Person detected but face not visible for %d+ frames - potential intruder",
+                                        self.max_frames_without_face)
                             del self.last_authorized_person[camera_name]
                             
                             # Send intruder alert (person was authorized but face hidden too long)
@@ -958,19 +1385,20 @@ class MultiCameraAISurveillance:
                             os.makedirs(os.path.dirname(snapshot_path), exist_ok=True)
                             
                             # Save the full frame as snapshot
-                            cv2.imwrite(snapshot_path, frame)
+                            self._save_snapshot(snapshot_path, frame, camera_name)
                             
                             # Send intruder alert (face not visible = suspicious)
-                            self.alert_manager.send_intruder_alert(
-                                person_name="hidden_face",
-                                camera_id=camera_name,
-                                confidence=0.0,
-                                image_path=snapshot_path
-                            )
+                            with metrics.timer('alert', camera_name):
+                                self.alert_manager.send_intruder_alert(
+                                    person_name="hidden_face",
+                                    camera_id=camera_name,
+                                    confidence=0.0,
+                                    image_path=snapshot_path
+                                )
                     else:
                         # No previous memory - face detection will handle this on next frame
                         # Don't alert immediately, give face detection a chance to work
-                        print(f"ℹ️  INFO: Person detected, waiting for face detection (no previous authorization data)")
+                        log.debug("Person detected, waiting for face detection (no previous authorization data)")
         
         # Crowd detection (always alert for large groups regardless of authorization)
         if person_count > 3:
@@ -993,7 +1421,7 @@ class MultiCameraAISurveillance:
             os.makedirs(os.path.dirname(snapshot_path), exist_ok=True)
             
             # Save the full frame as snapshot
-            cv2.imwrite(snapshot_path, frame)
+            self._save_snapshot(snapshot_path, frame, camera_name)
             
             activity = {
                 'type': 'abandoned_object',
@@ -1004,15 +1432,15 @@ class MultiCameraAISurveillance:
             activities.append(activity)
             
             # Send suspicious activity alert with snapshot
-            self.alert_manager.send_suspicious_activity_alert(
-                activity_type='abandoned_object',
-                camera_id=camera_name,
-                confidence=bags[0]['confidence'],
-                image_path=snapshot_path
-            )
+            with metrics.timer('alert', camera_name):
+                self.alert_manager.send_suspicious_activity_alert(
+                    activity_type='abandoned_object',
+                    camera_id=camera_name,
+                    confidence=bags[0]['confidence'],
+                    image_path=snapshot_path
+                )
             self.alert_count += 1
-            print(f"⚠️ WARNING [Camera_{camera_name}]: ABANDONED OBJECT: Unattended bag/item detected")
-            print(f"📸 Object snapshot saved: {snapshot_path}")
+            log.warning("⚠️ WARNING: ABANDONED OBJECT: Unattended bag/item detected", extra={'snapshot': snapshot_path})
         
         # Multi-camera correlation
         if len(detections) > 10:
@@ -1024,7 +1452,8 @@ class MultiCameraAISurveillance:
             })
         
         # Create annotated frame
-        annotated_frame = self.create_annotated_frame(frame, detections, activities, camera_name)
+        with metrics.timer('annotate', camera_name):
+            annotated_frame = self.create_annotated_frame(frame, detections, activities, camera_name)
         
         return {
             'original_frame': frame,
@@ -1034,16 +1463,103 @@ class MultiCameraAISurveillance:
             'weapons': weapons,
             'bags': bags,
             'activities': activities,
-            'timestamp': time.time()
+            'timestamp': current_time
         }
     
-    def create_annotated_frame(self, frame, detections, activities, camera_name):
-        """Create frame with AI annotations"""
-        annotated = frame.copy()
+    def _count_skipped_face(self, camera_name, reasons):
+        """Faces that failed the quality gate are neither authorized nor intruders"""
+        for reason in reasons:
+            metrics.inc('faces_skipped_total', camera=camera_name, reason=reason)
+    
+    def _recognize_frame_faces(self, frame, camera_name):
+        """Recognize every face of the frame (no person tracks to attach them to)"""
+        face_results = []
+        for result in self.face_recognizer.recognize_faces(frame):
+            if result.get('skipped'):
+                # Blurred, tiny, dark or profile - a later frame decides
+                self._count_skipped_face(camera_name, result['quality']['reasons'])
+                status = 'low_quality'
+            else:
+                status = 'authorized' if result['is_authorized'] else 'intruder'
+            face_results.append({
+                'person_name': result['name'],
+                'confidence': result['confidence'],
+                'authorization_status': status,
+                'bbox': result['bbox']
+            })
+        return face_results
+    
+    def _recognize_tracked_faces(self, frame, camera_name, tracker, track_states, current_time):
+        """
+        Best-shot face recognition for tracked persons
+        
+        Gated faces are offered to the best-shot buffer of the track they fall in;
+        a track is recognized once (one batched call + vote) when its buffer is full
+        or its collection window ends, and again only if its appearance changes.
+        
+        Returns:
+            Results decided on this frame, plus one per track already authorized
+            (intruders are reported once, when their track is decided)
+        """
+        height, width = frame.shape[:2]
+        pending = {}
+        for track_id, state in track_states.items():
+            x1, y1, x2, y2 = state['bbox']
+            x1, y1, x2, y2 = max(0, x1), max(0, y1), min(width, x2), min(height, y2)
+            person_crop = frame[y1:y2, x1:x2]
+            if person_crop.size and tracker.needs_face_recognition(track_id, person_crop, current_time):
+                pending[track_id] = ((x1, y1, x2, y2), person_crop)
+        
+        if pending:
+            for face in self.face_recognizer.detect_face_crops(frame):
+                if face['skipped']:
+                    self._count_skipped_face(camera_name, face['reasons'])
+                    continue
+                # Attach the face to the smallest pending track box containing its centre
+                cx = (face['bbox'][0] + face['bbox'][2]) / 2
+                cy = (face['bbox'][1] + face['bbox'][3]) / 2
+                owners = [((box[2] - box[0]) * (box[3] - box[1]), track_id)
+                          for track_id, (box, _) in pending.items()
+                          if box[0] <= cx <= box[2] and box[1] <= cy <= box[3]]
+                if owners:
+                    tracker.add_face_crop(min(owners)[1], face['face_crop'], face['quality'], face['bbox'], current_time)
+        
+        face_results = []
+        for track_id, (_, person_crop) in pending.items():
+            if not tracker.face_recognition_due(track_id, current_time):
+                continue
+            shots = self.face_recognizer.recognize_faces_batch(tracker.best_face_crops(track_id))
+            best = tracker.resolve_identity(track_id, shots, person_crop, current_time)
+            if best:
+                face_results.append(dict(best, track_id=track_id))
+        
+        decided = {result['track_id'] for result in face_results}
+        for track_id, state in tracker.track_states.items():
+            if track_id in track_states and track_id not in decided and state['authorization_status'] == 'authorized':
+                face_results.append({
+                    'person_name': state['identity'],
+                    'confidence': state.get('face_confidence', 0.0),
+                    'authorization_status': 'authorized',
+                    'bbox': state['bbox'],
+                    'track_id': track_id
+                })
+        return face_results
+    
+    def create_annotated_frame(self, frame, detections, activities, camera_name, bbox_scale=1.0):
+        """
+        Create frame with AI annotations (bbox_scale maps boxes onto a resized frame)
+        
+        The annotated frame is a pooled buffer published to the camera's slot;
+        the returned array stays valid until the next annotated frame replaces it.
+        """
+        frame_pool = self._get_frame_pool(camera_name)
+        annotated = frame_pool.copy(frame)
         
         # Draw detections
         for detection in detections:
             bbox = detection['bbox']
+            if bbox_scale != 1.0:
+                bbox = [int(v * bbox_scale) for v in bbox]
             class_name = detection['class_name']
             confidence = detection['confidence']
             
@@ -1088,6 +1604,9 @@ class MultiCameraAISurveillance:
         cv2.putText(annotated, info_text, (10, annotated.shape[0]-15), 
                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
         
+        # Hand ownership to the slot - viewers pin it while encoding
+        self.annotated_slots[camera_name].publish(annotated)
+        
         return annotated
     
     def log_activities(self, processed_data, camera_name):
@@ -1124,14 +1643,21 @@ class MultiCameraAISurveillance:
             
             if log_entry['is_alert']:
                 self.alert_count += 1
-                print(f"🚨 ALERT [{camera_name}]: {activity['description']}")
+                self._camera_log(camera_name).warning("🚨 ALERT: %s", activity['description'])
             elif log_entry['is_warning']:
-                print(f"⚠️ WARNING [{camera_name}]: {activity['description']}")
+                self._camera_log(camera_name).warning("⚠️ WARNING: %s", activity['description'])
         
         # Keep recent logs
         if len(self.activity_logs) > 500:
             self.activity_logs = self.activity_logs[-500:]
     
+    def _camera_log(self, camera_name):
+        """Per-camera logger (tags records, honours per-camera levels)"""
+        log = self.camera_loggers.get(camera_name)
+        if log is None:
+            log = self.camera_loggers[camera_name] = get_camera_logger('surveillance.pipeline', camera_name)
+        return log
+    
     def start_camera_surveillance(self, camera_name):
         """Start surveillance on specific camera"""
         if camera_name in self.active_cameras:
@@ -1144,9 +1670,11 @@ class MultiCameraAISurveillance:
         thread = threading.Thread(
             target=self.process_camera_feed,
             args=(camera_name, camera_info),
-            daemon=True
+            daemon=True,
+            name=f"camera-{camera_name}"
         )
         thread.start()
+        self.camera_threads[camera_name] = thread
         print(f"✅ Started surveillance on {camera_name}")
     
     def stop_camera_surveillance(self, camera_name):
@@ -1155,6 +1683,17 @@ class MultiCameraAISurveillance:
             del self.active_cameras[camera_name]
             if camera_name in self.latest_frames:
                 del self.latest_frames[camera_name]
+            slot = self.annotated_slots.get(camera_name)
+            if slot is not None:
+                slot.clear()
+            self._encoded_frames.pop(camera_name, None)
+            self.evidence_recorder.remove_camera(camera_name)
+            self.recording_engine.stop_recording(camera_name)
+            supervisor = self.capture_supervisors.pop(camera_name, None)
+            if supervisor:
+                supervisor.stop()
+            self.frame_sources.pop(camera_name, None)
+            self.camera_threads.pop(camera_name, None)
             print(f"🛑 Stopped surveillance on {camera_name}")
     
     def start_all_surveillance(self):
@@ -0,0 +1,139 @@
+"""
+Face Inference Latency Benchmark
+Per-face latency of the old Keras predict() path (backbone predict + classifier
+predict per face) against the compiled fused path, for single faces and for
+all faces of a frame at once. With --tflite the exported TFLite model is
+timed as well (see scripts/export_face_tflite.py).
+
+Usage (from backend/):
+    python scripts/benchmark_face_inference.py
+    python scripts/benchmark_face_inference.py --faces data/known_faces/alice --batch 4 --output faces.json
+    python scripts/benchmark_face_inference.py --tflite --threads 4
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "ai_models" / "face_recognition"))
+
+from mobilenet_face_recognition import MobileNetFaceRecognitionSystem, prepare_backbone_input
+
+
+def load_faces(directory, count):
+    """Face crops from a directory of images, or random crops"""
+    faces = []
+    if directory:
+        for image_file in sorted(Path(directory).glob("*.jpg"))[:count]:
+            img = cv2.imread(str(image_file))
+            if img is not None:
+                faces.append(img)
+    rng = np.random.default_rng(0)
+    while len(faces) < count:
+        faces.append(rng.integers(0, 255, (160, 140, 3), dtype=np.uint8))
+    return faces
+
+
+def legacy_predict(system, face):
+    """What recognition did per face before: two predict() calls"""
+    batch = np.expand_dims(prepare_backbone_input(face), axis=0)
+    features = system.base_model.predict(batch, verbose=0)
+    if system.classifier_model is not None:
+        system.classifier_model.predict(features.reshape(1, -1), verbose=0)
+
+
+def compiled_predict(system, faces):
+    if system.classifier_model is not None:
+        system.classify_faces(faces)
+    else:
+        system.embed_faces(faces)
+
+
+def time_runs(fn, runs, faces_per_run):
+    fn()  # warm-up
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000 / faces_per_run)
+    samples.sort()
+    return {
+        'runs': runs,
+        'mean_ms': round(float(np.mean(samples)), 2),
+        'p50_ms': round(samples[len(samples) // 2], 2),
+        'p95_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 2)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Per-face recognition latency before/after compiled inference')
+    parser.add_argument('--model', default=str(Path(__file__).parent.parent / "ai_models" / "face_recognition" / "mobilenet_face_model_v2"),
+                        help='Trained model path (without extension); backbone only if missing')
+    parser.add_argument('--faces', help='Directory of face crops (default: random crops)')
+    parser.add_argument('--runs', type=int, default=100)
+    parser.add_argument('--batch', type=int, default=4, help='Faces per frame for the batched case')
+    parser.add_argument('--tflite', action='store_true', help='Also time <model>.tflite')
+    parser.add_argument('--threads', type=int, help='TFLite interpreter threads (default: FACE_TFLITE_THREADS)')
+    parser.add_argument('--output', help='Write results JSON here')
+    args = parser.parse_args()
+
+    load_times = {}
+    start = time.perf_counter()
+    system = MobileNetFaceRecognitionSystem()
+    if Path(f"{args.model}_classifier.h5").exists():
+        system.load_model(args.model)
+    else:
+        print("⚠️ No trained classifier - timing the backbone only")
+    load_times['keras_s'] = round(time.perf_counter() - start, 2)
+    if not system.compiled_inference:
+        print("⚠️ FACE_COMPILED_INFERENCE is off - the compiled path falls back to predict()")
+
+    faces = load_faces(args.faces, max(1, args.batch))
+    face = faces[0]
+
+    print(f"\n⏱️  {args.runs} runs per case...")
+    results = {
+        'legacy_single': time_runs(lambda: legacy_predict(system, face), args.runs, 1),
+        'compiled_single': time_runs(lambda: compiled_predict(system, [face]), args.runs, 1),
+        'legacy_frame': time_runs(lambda: [legacy_predict(system, f) for f in faces], args.runs, len(faces)),
+        'compiled_frame': time_runs(lambda: compiled_predict(system, faces), args.runs, len(faces)),
+    }
+
+    if args.tflite:
+        from tflite_face_recognition import TFLiteFaceRecognitionSystem
+
+        start = time.perf_counter()
+        tflite_system = TFLiteFaceRecognitionSystem()
+        if args.threads:
+            tflite_system.num_threads = args.threads
+        if tflite_system.load_model(args.model):
+            load_times['tflite_s'] = round(time.perf_counter() - start, 2)
+            results['tflite_single'] = time_runs(lambda: tflite_system.classify_faces([face]), args.runs, 1)
+            results['tflite_frame'] = time_runs(lambda: tflite_system.classify_faces(faces), args.runs, len(faces))
+        else:
+            print(f"⚠️ No {args.model}.tflite - run scripts/export_face_tflite.py first")
+
+    print(f"\n{'case':<18}{'mean':>10}{'p50':>10}{'p95':>10}   (ms per face)")
+    for case, stats in results.items():
+        print(f"{case:<18}{stats['mean_ms']:>10}{stats['p50_ms']:>10}{stats['p95_ms']:>10}")
+    speedup = results['legacy_single']['p50_ms'] / max(results['compiled_single']['p50_ms'], 1e-6)
+    print(f"\n🚀 Single face: {speedup:.1f}x faster; frame of {len(faces)}: "
+          f"{results['legacy_frame']['p50_ms'] / max(results['compiled_frame']['p50_ms'], 1e-6):.1f}x faster")
+    print(f"⏳ Load time: {', '.join(f'{k[:-2]} {v}s' for k, v in load_times.items())}")
+
+    if args.output:
+        summary = {'faces_per_frame': len(faces), 'classifier': system.classifier_model is not None,
+                   'load_times': load_times, 'results': results}
+        with open(args.output, 'w') as f:
+            json.dump(summary, f, indent=2)
+        print(f"💾 Results saved to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,322 @@
+"""
+Offline Pipeline Benchmark
+Replays local video files / image directories through the
+MultiCameraAISurveillance processing path and reports per-stage latency,
+frames/sec per camera, CPU, RSS and alert counts as JSON.
+
+Usage (from backend/):
+    python scripts/benchmark_pipeline.py videos/gate.mp4 images/barn/ --max-frames 300
+    python scripts/benchmark_pipeline.py gate.mp4 --fps 10 --output bench.json --compare baseline.json
+
+Every input becomes one camera. Frames are fed in file order, AI runs on
+every Nth frame by index and alerts are dry-run, so two runs over the same
+inputs do the same work - compare the JSON files across commits. Frame
+timestamps come from the frame index and the source frame rate, so
+tracking and activity analysis (loitering, running) see the recording's
+timing whatever the replay speed.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import subprocess
+import threading
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from surveillance.frame_source import CapturedFrame
+from surveillance.metrics import metrics
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+try:
+    import resource  # Unix only
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.bmp'}
+
+
+def iter_frames(path, max_frames=0, loop=False):
+    """Yield (jpeg or None, BGR frame) from a video file or an image directory"""
+    path = Path(path)
+    produced = 0
+    while True:
+        if path.is_dir():
+            files = sorted(p for p in path.iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS)
+            for file in files:
+                data = file.read_bytes()
+                frame = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+                if frame is None:
+                    continue
+                yield (data if file.suffix.lower() in ('.jpg', '.jpeg') else None), frame
+                produced += 1
+                if max_frames and produced >= max_frames:
+                    return
+        else:
+            cap = cv2.VideoCapture(str(path))
+            if not cap.isOpened():
+                raise RuntimeError(f"Cannot open {path}")
+            try:
+                while True:
+                    ret, frame = cap.read()
+                    if not ret:
+                        break
+                    yield None, frame
+                    produced += 1
+                    if max_frames and produced >= max_frames:
+                        return
+            finally:
+                cap.release()
+        if not loop or produced == 0:
+            return
+
+
+def source_fps(path, fallback):
+    """Frame rate of a video file (image directories and files without one use fallback)"""
+    path = Path(path)
+    if path.is_dir():
+        return fallback
+    cap = cv2.VideoCapture(str(path))
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS) if cap.isOpened() else 0.0
+    finally:
+        cap.release()
+    return fps if fps and 0 < fps < 1000 else fallback
+
+
+def replay_camera(surveillance, camera_name, path, args, results):
+    """Feed one input through the pipeline, optionally paced to a fixed FPS"""
+    surveillance.detection_stats[camera_name] = {
+        'total_detections': 0,
+        'fps': 0,
+        'start_time': time.time(),
+        'ai_mode': args.ai_mode
+    }
+    interval = 1.0 / args.fps if args.fps > 0 else 0.0
+    frames = ai_frames = 0
+    lag = 0.0
+
+    # Synthetic capture times: frame index / source fps from the replay start
+    fps = args.source_fps or source_fps(path, args.fps or 10.0)
+    time_base = time.time()
+
+    start = time.perf_counter()
+    next_due = start
+    for index, (jpeg, frame) in enumerate(iter_frames(path, args.max_frames, args.loop)):
+        if interval:
+            now = time.perf_counter()
+            if now < next_due:
+                time.sleep(next_due - now)
+            else:
+                lag = max(lag, now - next_due)
+            next_due += interval
+
+        is_ai_frame = index % args.ai_interval == 0
+        captured = CapturedFrame(index, frame, jpeg, is_ai_frame, 1, time_base + index / fps)
+        surveillance.process_captured_frame(camera_name, captured)
+        frames += 1
+        ai_frames += is_ai_frame
+    elapsed = time.perf_counter() - start
+
+    results[camera_name] = {
+        'input': str(path),
+        'frames': frames,
+        'ai_frames': ai_frames,
+        'source_fps': round(fps, 2),
+        'seconds': round(elapsed, 3),
+        'fps': round(frames / elapsed, 2) if elapsed else 0.0,
+        'max_lag_ms': round(lag * 1000, 1),
+        'total_detections': surveillance.detection_stats[camera_name]['total_detections']
+    }
+
+
+def resource_usage():
+    """
+    Process CPU seconds and memory (current RSS needs psutil; peak RSS needs the
+    Unix resource module, elsewhere CPU time comes from psutil or time.process_time)
+    """
+    if RESOURCE_AVAILABLE:
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        peak_kb = usage.ru_maxrss if sys.platform != 'darwin' else usage.ru_maxrss / 1024
+        result = {
+            'cpu_user_seconds': round(usage.ru_utime, 2),
+            'cpu_system_seconds': round(usage.ru_stime, 2),
+            'peak_rss_mb': round(peak_kb / 1024, 1)
+        }
+    elif PSUTIL_AVAILABLE:
+        cpu_times = psutil.Process().cpu_times()
+        result = {
+            'cpu_user_seconds': round(cpu_times.user, 2),
+            'cpu_system_seconds': round(cpu_times.system, 2)
+        }
+    else:
+        # User + system time together
+        result = {'cpu_user_seconds': round(time.process_time(), 2), 'cpu_system_seconds': 0.0}
+    if PSUTIL_AVAILABLE:
+        result['rss_mb'] = round(psutil.Process().memory_info().rss / 1e6, 1)
+    return result
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+
+def compare(current, baseline_path):
+    """Print throughput and p95 changes against a previous run"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    print(f"\n📊 Compared with {baseline_path} ({baseline.get('revision')})")
+    for camera, stats in current['cameras'].items():
+        old = baseline.get('cameras', {}).get(camera)
+        if not old or not old.get('fps'):
+            continue
+        change = (stats['fps'] - old['fps']) / old['fps'] * 100
+        print(f"   {camera}: {old['fps']} -> {stats['fps']} fps ({change:+.1f}%)")
+        if stats['total_detections'] != old['total_detections']:
+            print(f"   ⚠️ {camera}: detections changed {old['total_detections']} -> {stats['total_detections']}")
+
+        for stage, summary in current['stages'].get(camera, {}).items():
+            old_stage = baseline.get('stages', {}).get(camera, {}).get(stage)
+            if old_stage and old_stage.get('p95_ms'):
+                delta = (summary['p95_ms'] - old_stage['p95_ms']) / old_stage['p95_ms'] * 100
+                if abs(delta) >= 10:
+                    print(f"      {stage}: p95 {old_stage['p95_ms']} -> {summary['p95_ms']} ms ({delta:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay recorded video through the surveillance pipeline')
+    parser.add_argument('inputs', nargs='+', help='Video files or image directories (one camera each)')
+    parser.add_argument('--fps', type=float, default=0, help='Feed rate per camera (0 = as fast as possible)')
+    parser.add_argument('--source-fps', type=float, default=0,
+                        help='Frame rate of the recordings for frame timestamps (0 = from the video, '
+                             'else --fps, else 10)')
+    parser.add_argument('--max-frames', type=int, default=0, help='Frames per camera (0 = whole input)')
+    parser.add_argument('--loop', action='store_true', help='Loop inputs until --max-frames')
+    parser.add_argument('--ai-interval', type=int, default=int(os.getenv('AI_FRAME_INTERVAL', '10')),
+                        help='Run AI on every Nth frame')
+    parser.add_argument('--ai-mode', default='both', choices=['both', 'face_recognition', 'yolov9'])
+    parser.add_argument('--warmup', type=int, default=3, help='Frames run before measuring (model warm-up)')
+    parser.add_argument('--sequential', action='store_true', help='Replay cameras one after another')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Write results JSON here')
+    parser.add_argument('--compare', help='Previous results JSON to compare against')
+    args = parser.parse_args()
+
+    # Same inputs + same seed -> same work
+    random.seed(args.seed)
+    np.random.seed(args.seed)
+    cv2.setRNGSeed(args.seed)
+
+    from multi_camera_surveillance import MultiCameraAISurveillance
+
+    cameras = {}
+    for i, path in enumerate(args.inputs):
+        name = f"replay_{i}_{Path(path).stem}"
+        cameras[name] = {'url': str(path), 'ai_mode': args.ai_mode}
+
+    surveillance = MultiCameraAISurveillance(camera_urls=cameras, dry_run_alerts=True)
+
+    # Warm up models outside the measurement
+    if args.warmup:
+        warm_name = '_warmup'
+        surveillance.detection_stats[warm_name] = {'total_detections': 0, 'ai_mode': args.ai_mode}
+        for index, (_, frame) in enumerate(iter_frames(args.inputs[0], args.warmup)):
+            surveillance.process_frame_ai(frame, warm_name, index, run_ai=True)
+        surveillance.detection_stats.pop(warm_name, None)
+        surveillance.latest_frames.pop(warm_name, None)
+    metrics.reset()
+    surveillance.alert_manager.alert_history.clear()
+    surveillance.alert_count = 0
+
+    print(f"🚀 Replaying {len(cameras)} input(s) "
+          f"({'max speed' if not args.fps else f'{args.fps} fps'}, AI every {args.ai_interval} frames)")
+
+    camera_results = {}
+    usage_before = resource_usage()
+    wall_start = time.perf_counter()
+    if args.sequential:
+        for name, info in cameras.items():
+            replay_camera(surveillance, name, info['url'], args, camera_results)
+    else:
+        threads = [
+            threading.Thread(target=replay_camera, args=(surveillance, name, info['url'], args, camera_results),
+                             name=f"replay-{name}")
+            for name, info in cameras.items()
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    wall = time.perf_counter() - wall_start
+    usage_after = resource_usage()
+
+    cpu = (usage_after['cpu_user_seconds'] + usage_after['cpu_system_seconds']
+           - usage_before['cpu_user_seconds'] - usage_before['cpu_system_seconds'])
+    alert_stats = surveillance.alert_manager.get_alert_stats()
+    results = {
+        'revision': git_revision(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'platform': {
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'cpus': os.cpu_count(),
+            'opencv': cv2.__version__,
+            'opencv_threads': cv2.getNumThreads()
+        },
+        'config': {key: value for key, value in vars(args).items() if key not in ('output', 'compare')},
+        'wall_seconds': round(wall, 3),
+        'total_fps': round(sum(c['frames'] for c in camera_results.values()) / wall, 2) if wall else 0.0,
+        'cpu_seconds': round(cpu, 2),
+        'cpu_utilisation': round(cpu / wall, 2) if wall else 0.0,
+        'memory': usage_after,
+        'cameras': camera_results,
+        'stages': metrics.snapshot(),
+        'alerts': {
+            'total': alert_stats['total_alerts'],
+            'by_type': alert_stats['alerts_by_type'],
+            'activities_logged': surveillance.alert_count
+        }
+    }
+
+    print("\n" + "=" * 70)
+    for name, stats in camera_results.items():
+        print(f"🎥 {name}: {stats['frames']} frames in {stats['seconds']}s -> {stats['fps']} fps "
+              f"({stats['total_detections']} detections)")
+        for stage, summary in sorted(results['stages'].get(name, {}).items()):
+            print(f"   {stage:<18} p50 {summary['p50_ms']:>8} ms   p95 {summary['p95_ms']:>8} ms   n={summary['count']}")
+    print(f"⏱️  Wall {results['wall_seconds']}s, CPU {results['cpu_seconds']}s, "
+          f"peak RSS {usage_after.get('peak_rss_mb', 'n/a')} MB, alerts {results['alerts']['total']}")
+    print("=" * 70)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, default=str)
+        print(f"💾 Results saved to {args.output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+    surveillance.recording_engine.stop_all()
+
+
+if __name__ == '__main__':
+    main()
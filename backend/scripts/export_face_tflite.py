@@ -0,0 +1,138 @@
+"""
+Export Face Model to TFLite
+Fuses MobileNetV2 preprocessing, the backbone and the trained classifier head
+(<model>_classifier.h5) into one TFLite model with two outputs (features,
+probabilities), plus a <model>_tflite.json with the labels, for the TFLite
+runtime (FACE_RUNTIME=tflite).
+
+Usage (from backend/):
+    python scripts/export_face_tflite.py
+    python scripts/export_face_tflite.py --quantize int8 --representative-dir data/known_faces
+    python scripts/export_face_tflite.py --backbone-only   # gallery mode only needs features
+
+Quantization: none (float32), float16, dynamic (int8 weights) or int8 (int8
+weights and activations calibrated on real face crops; input/output stay float).
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "ai_models" / "face_recognition"))
+
+import tensorflow as tf
+from mobilenet_face_recognition import MobileNetFaceRecognitionSystem
+from tflite_face_recognition import prepare_tflite_input
+
+DEFAULT_MODEL = Path(__file__).parent.parent / "ai_models" / "face_recognition" / "mobilenet_face_model_v2"
+
+
+def build_fused_model(system, backbone_only=False):
+    """RGB 0-255 face -> (features, probabilities), preprocessing included"""
+    inputs = tf.keras.Input(shape=(224, 224, 3), name='face_rgb')
+    x = tf.keras.layers.Rescaling(1 / 127.5, offset=-1.0)(inputs)  # mobilenet_v2.preprocess_input
+    features = system.base_model(x, training=False)
+    if backbone_only or system.classifier_model is None:
+        return tf.keras.Model(inputs, features)
+    probabilities = system.classifier_model(features, training=False)
+    return tf.keras.Model(inputs, [features, probabilities])
+
+
+def representative_faces(system, directory, limit):
+    """Face crops for int8 calibration, detected the same way as at runtime"""
+    crops = []
+    for image_file in sorted(Path(directory).rglob("*.jpg")):
+        img = cv2.imread(str(image_file))
+        if img is None:
+            continue
+        face_locations = system.detect_faces(img)
+        if not face_locations:
+            continue
+        top, right, bottom, left = face_locations[0]
+        face = img[top:bottom, left:right]
+        if face.shape[0] >= 50 and face.shape[1] >= 50:
+            crops.append(prepare_tflite_input(face))
+        if len(crops) >= limit:
+            break
+    return crops
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export the face recognition model to TFLite')
+    parser.add_argument('--model', default=str(DEFAULT_MODEL), help='Trained model path (without extension)')
+    parser.add_argument('--output', help='Output path without extension (default: same as --model)')
+    parser.add_argument('--quantize', choices=['none', 'float16', 'dynamic', 'int8'], default='none')
+    parser.add_argument('--representative-dir', default='data/known_faces',
+                        help='Known faces directory used to calibrate int8')
+    parser.add_argument('--representative-count', type=int, default=200)
+    parser.add_argument('--backbone-only', action='store_true', help='Export features only (gallery mode)')
+    args = parser.parse_args()
+
+    output = args.output or args.model
+    system = MobileNetFaceRecognitionSystem()
+    if not args.backbone_only and not system.load_model(args.model):
+        print("❌ No trained classifier found - train first or use --backbone-only")
+        sys.exit(1)
+
+    model = build_fused_model(system, args.backbone_only)
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+
+    if args.quantize == 'float16':
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.target_spec.supported_types = [tf.float16]
+    elif args.quantize == 'dynamic':
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    elif args.quantize == 'int8':
+        crops = representative_faces(system, args.representative_dir, args.representative_count)
+        if not crops:
+            print(f"❌ No faces found in {args.representative_dir} for int8 calibration")
+            sys.exit(1)
+        print(f"📐 Calibrating int8 on {len(crops)} face crops")
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = lambda: ([crop[None, ...]] for crop in crops)
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+
+    start = time.time()
+    tflite_model = converter.convert()
+    Path(f"{output}.tflite").write_bytes(tflite_model)
+
+    metadata = {
+        'labels': [] if args.backbone_only else list(system.authorized_persons),
+        'feature_dim': int(system.base_model.output_shape[-1]),
+        'input_size': 224,
+        'quantization': args.quantize,
+        'backbone_version': f"{system.backbone_version}-tflite-{args.quantize}",
+        'source': None if args.backbone_only else f"{args.model}_classifier.h5",
+        'exported_at': time.strftime('%Y-%m-%dT%H:%M:%S')
+    }
+    with open(f"{output}_tflite.json", 'w') as f:
+        json.dump(metadata, f, indent=2)
+
+    # Sanity check against Keras on one face
+    sample = np.random.default_rng(0).uniform(0, 255, (1, 224, 224, 3)).astype(np.float32)
+    expected = model(sample, training=False)
+    expected = expected[0] if isinstance(expected, (list, tuple)) else expected
+    interpreter = tf.lite.Interpreter(model_content=tflite_model)
+    interpreter.allocate_tensors()
+    interpreter.set_tensor(interpreter.get_input_details()[0]['index'], sample)
+    interpreter.invoke()
+    features = next(interpreter.get_tensor(o['index']) for o in interpreter.get_output_details()
+                    if o['shape'][-1] == metadata['feature_dim'])
+    expected = np.asarray(expected)
+    cosine = float(np.dot(features.ravel(), expected.ravel())
+                   / (np.linalg.norm(features) * np.linalg.norm(expected) + 1e-12))
+
+    print(f"✅ Exported {output}.tflite ({len(tflite_model) / 1e6:.1f} MB, {args.quantize}) "
+          f"in {time.time() - start:.1f}s")
+    print(f"   Feature cosine similarity vs Keras: {cosine:.4f}")
+    print("💡 Use it with FACE_RUNTIME=tflite (threads: FACE_TFLITE_THREADS)")
+
+
+if __name__ == '__main__':
+    main()
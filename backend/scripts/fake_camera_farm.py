@@ -0,0 +1,297 @@
+"""
+Fake IP Camera Farm
+Serves N simulated IP Webcam cameras on localhost - MJPEG at /video and a
+single JPEG at /shot.jpg, the same endpoints CameraDiscovery.check_ip_webcam
+probes - from a video file or synthetic frames, with optional failure
+injection (dropped frames, stalls, disconnects).
+
+Usage (from backend/):
+    python scripts/fake_camera_farm.py --cameras 8 --fps 15 --video data/sample.mp4
+    python scripts/fake_camera_farm.py --cameras 4 --drop-rate 0.1 --stall-rate 0.01 --register
+
+With --register the cameras are added to the discovery database, so
+auto_detect_cameras picks them up; they are removed again on exit.
+"""
+
+import sys
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+BOUNDARY = 'fakecamframe'
+
+
+def load_frames(video: Optional[str], width: int, height: int, max_frames: int = 300,
+                quality: int = 80) -> List[bytes]:
+    """Pre-encode the JPEGs a camera will loop over (no encoding while serving)"""
+    params = [cv2.IMWRITE_JPEG_QUALITY, quality]
+    frames = []
+    if video:
+        cap = cv2.VideoCapture(video)
+        if not cap.isOpened():
+            raise RuntimeError(f"Cannot open {video}")
+        while len(frames) < max_frames:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frame = cv2.resize(frame, (width, height))
+            frames.append(cv2.imencode('.jpg', frame, params)[1].tobytes())
+        cap.release()
+    else:
+        # Synthetic scene: a block moving across a gradient, with the frame number
+        background = np.tile(np.linspace(40, 200, width, dtype=np.uint8), (height, 1))
+        background = cv2.cvtColor(background, cv2.COLOR_GRAY2BGR)
+        for i in range(min(max_frames, 120)):
+            frame = background.copy()
+            x = int((width - 80) * (i / 119))
+            cv2.rectangle(frame, (x, height // 3), (x + 80, height // 3 + 160), (0, 0, 255), -1)
+            cv2.putText(frame, f"frame {i}", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+            frames.append(cv2.imencode('.jpg', frame, params)[1].tobytes())
+    if not frames:
+        raise RuntimeError("No frames to serve")
+    return frames
+
+
+class FakeCamera:
+    """
+    One simulated camera: an HTTP server on its own port
+    """
+
+    def __init__(self, name: str, port: int, frames: List[bytes], fps: float = 15.0,
+                 host: str = '127.0.0.1', drop_rate: float = 0.0, stall_rate: float = 0.0,
+                 stall_seconds: float = 3.0, disconnect_rate: float = 0.0, seed: int = 0):
+        """
+        Args:
+            name: Camera name
+            port: Listening port
+            frames: Pre-encoded JPEG frames (looped)
+            fps: Frame rate of /video
+            drop_rate: Probability a frame is skipped
+            stall_rate: Probability per frame that the stream freezes for stall_seconds
+            disconnect_rate: Probability per frame that the connection is closed
+        """
+        self.name = name
+        self.host = host
+        self.port = port
+        self.frames = frames
+        self.fps = fps
+        self.drop_rate = drop_rate
+        self.stall_rate = stall_rate
+        self.stall_seconds = stall_seconds
+        self.disconnect_rate = disconnect_rate
+        self.seed = seed
+        self.started_at = time.monotonic()
+        self.server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+        self.stats = {
+            'clients': 0,
+            'frames_sent': 0,
+            'frames_dropped': 0,
+            'stalls': 0,
+            'disconnects': 0,
+            'snapshots': 0,
+            'bytes_sent': 0
+        }
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}/video"
+
+    def current_frame(self) -> bytes:
+        """All clients see the same frame for a point in time (like a real camera)"""
+        index = int((time.monotonic() - self.started_at) * self.fps) % len(self.frames)
+        return self.frames[index]
+
+    def _count(self, key: str, amount: int = 1):
+        with self._lock:
+            self.stats[key] += amount
+
+    def start(self):
+        camera = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_HEAD(self):
+                if self.path.split('?')[0] not in ('/video', '/shot.jpg'):
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'multipart/x-mixed-replace; boundary=' + BOUNDARY
+                                 if self.path.startswith('/video') else 'image/jpeg')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def do_GET(self):
+                path = self.path.split('?')[0]
+                if path == '/shot.jpg':
+                    jpeg = camera.current_frame()
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'image/jpeg')
+                    self.send_header('Content-Length', str(len(jpeg)))
+                    self.end_headers()
+                    self.wfile.write(jpeg)
+                    camera._count('snapshots')
+                    return
+                if path != '/video':
+                    self.send_error(404)
+                    return
+
+                self.send_response(200)
+                self.send_header('Content-Type', f'multipart/x-mixed-replace; boundary={BOUNDARY}')
+                self.send_header('Cache-Control', 'no-cache')
+                self.send_header('Connection', 'close')
+                self.end_headers()
+                self.close_connection = True
+                camera.stream(self.wfile)
+
+        self.server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True,
+                                        name=f"fake-camera-{self.name}")
+        self._thread.start()
+
+    def stream(self, wfile):
+        """Write MJPEG parts at the configured FPS until the client goes away"""
+        rng = random.Random(f"{self.seed}-{self.name}-{self.stats['clients']}")
+        self._count('clients')
+        interval = 1.0 / self.fps
+        next_due = time.monotonic()
+        try:
+            while self.server is not None:
+                now = time.monotonic()
+                if now < next_due:
+                    time.sleep(next_due - now)
+                next_due = max(next_due + interval, time.monotonic() - interval)
+
+                if self.disconnect_rate and rng.random() < self.disconnect_rate:
+                    self._count('disconnects')
+                    return
+                if self.stall_rate and rng.random() < self.stall_rate:
+                    self._count('stalls')
+                    time.sleep(self.stall_seconds)
+                    next_due = time.monotonic()
+                if self.drop_rate and rng.random() < self.drop_rate:
+                    self._count('frames_dropped')
+                    continue
+
+                jpeg = self.current_frame()
+                part = (f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                        f"Content-Length: {len(jpeg)}\r\n\r\n").encode() + jpeg + b"\r\n"
+                wfile.write(part)
+                wfile.flush()
+                self._count('frames_sent')
+                self._count('bytes_sent', len(part))
+        except (BrokenPipeError, ConnectionResetError, OSError):
+            pass  # client disconnected
+
+    def stop(self):
+        server, self.server = self.server, None
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+
+class FakeCameraFarm:
+    """
+    N fake cameras on consecutive ports
+    """
+
+    def __init__(self, count: int, base_port: int = 18080, video: Optional[str] = None,
+                 width: int = 640, height: int = 480, fps: float = 15.0, **failure_options):
+        self.frames = load_frames(video, width, height)
+        self.cameras: List[FakeCamera] = [
+            FakeCamera(f"fake_cam_{i:02d}", base_port + i, self.frames, fps=fps, seed=i, **failure_options)
+            for i in range(count)
+        ]
+        self.registered: List[str] = []
+
+    def start(self):
+        for camera in self.cameras:
+            camera.start()
+        print(f"🎥 Fake camera farm: {len(self.cameras)} cameras on ports "
+              f"{self.cameras[0].port}-{self.cameras[-1].port}")
+
+    def stop(self):
+        for camera in self.cameras:
+            camera.stop()
+        self.unregister()
+
+    def camera_urls(self, count: Optional[int] = None) -> Dict[str, Dict]:
+        """camera_urls mapping for MultiCameraAISurveillance"""
+        return {cam.name: {'url': cam.url, 'ai_mode': 'both'} for cam in self.cameras[:count]}
+
+    def register(self):
+        """Add the cameras to the discovery database so auto_detect_cameras finds them"""
+        from app.services.camera_discovery import camera_discovery
+
+        for camera in self.cameras:
+            record = camera_discovery.add_manual_camera(camera.name, camera.url, camera_type='ip_webcam')
+            if record:
+                self.registered.append(record['id'])
+
+    def unregister(self):
+        if not self.registered:
+            return
+        from app.services.camera_discovery import camera_discovery
+
+        for camera_id in self.registered:
+            camera_discovery.remove_camera(camera_id)
+        self.registered = []
+
+    def get_stats(self) -> Dict[str, Dict]:
+        return {camera.name: dict(camera.stats) for camera in self.cameras}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve simulated IP Webcam cameras')
+    parser.add_argument('--cameras', type=int, default=4)
+    parser.add_argument('--base-port', type=int, default=18080)
+    parser.add_argument('--video', help='Video file to loop (default: synthetic frames)')
+    parser.add_argument('--width', type=int, default=640)
+    parser.add_argument('--height', type=int, default=480)
+    parser.add_argument('--fps', type=float, default=15.0)
+    parser.add_argument('--drop-rate', type=float, default=0.0)
+    parser.add_argument('--stall-rate', type=float, default=0.0)
+    parser.add_argument('--stall-seconds', type=float, default=3.0)
+    parser.add_argument('--disconnect-rate', type=float, default=0.0)
+    parser.add_argument('--register', action='store_true', help='Register cameras with discovery')
+    args = parser.parse_args()
+
+    farm = FakeCameraFarm(
+        args.cameras, base_port=args.base_port, video=args.video,
+        width=args.width, height=args.height, fps=args.fps,
+        drop_rate=args.drop_rate, stall_rate=args.stall_rate,
+        stall_seconds=args.stall_seconds, disconnect_rate=args.disconnect_rate
+    )
+    farm.start()
+    if args.register:
+        farm.register()
+
+    try:
+        while True:
+            time.sleep(10)
+            sent = sum(s['frames_sent'] for s in farm.get_stats().values())
+            print(f"📤 {sent} frames sent")
+    except KeyboardInterrupt:
+        print("\n🛑 Stopping camera farm...")
+    finally:
+        farm.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Populate / verify the local model artifact cache
+Run on a machine with internet access, then copy the cache directory
+(MODEL_CACHE_DIR, default storage/models) to air-gapped sites. The runtime
+only reads weights from this directory and checks them against manifest.json.
+
+Usage (from backend/):
+    python scripts/fetch_model_artifacts.py                  # download all known models
+    python scripts/fetch_model_artifacts.py --only yolov8n mobilenet_v2_imagenet_notop
+    python scripts/fetch_model_artifacts.py --add yolov9c /path/to/yolov9c.pt
+    python scripts/fetch_model_artifacts.py --verify
+"""
+
+import sys
+import shutil
+import argparse
+import urllib.request
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.utils.model_artifacts import KNOWN_ARTIFACTS, ArtifactError, ModelArtifacts, MODEL_CACHE_DIR
+
+
+def fetch(artifacts, name):
+    spec = KNOWN_ARTIFACTS[name]
+    target = artifacts.cache_dir / spec['file']
+    artifacts.cache_dir.mkdir(parents=True, exist_ok=True)
+    if target.exists():
+        print(f"📁 {name}: already downloaded")
+    elif spec['source'] == 'ultralytics':
+        from ultralytics.utils.downloads import attempt_download_asset
+        attempt_download_asset(str(target))
+    else:
+        print(f"⬇️  {name}: {spec['url']}")
+        tmp = target.with_suffix(target.suffix + '.part')
+        with urllib.request.urlopen(spec['url'], timeout=60) as response, open(tmp, 'wb') as f:
+            shutil.copyfileobj(response, f)
+        tmp.replace(target)
+    entry = artifacts.add(name, target)
+    print(f"✅ {name}: {entry['bytes'] / 1e6:.1f} MB, sha256 {entry['sha256'][:16]}...")
+
+
+def verify(artifacts):
+    entries = artifacts.read_manifest()['artifacts']
+    if not entries:
+        print(f"❌ No artifacts in {artifacts.manifest_path}")
+        return False
+    ok = True
+    for name in sorted(entries):
+        try:
+            print(f"✅ {name}: {artifacts.path(name)}")
+        except ArtifactError as e:
+            print(f"❌ {e}")
+            ok = False
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Download, register or verify model weights')
+    parser.add_argument('--cache-dir', default=MODEL_CACHE_DIR)
+    parser.add_argument('--only', nargs='+', choices=sorted(KNOWN_ARTIFACTS), help='Artifacts to download')
+    parser.add_argument('--add', nargs=2, metavar=('NAME', 'FILE'), help='Copy a local file into the cache')
+    parser.add_argument('--verify', action='store_true', help='Check every cached file against the manifest')
+    args = parser.parse_args()
+
+    artifacts = ModelArtifacts(args.cache_dir)
+    if args.verify:
+        sys.exit(0 if verify(artifacts) else 1)
+
+    if args.add:
+        name, source = args.add
+        target = artifacts.cache_dir / KNOWN_ARTIFACTS.get(name, {}).get('file', Path(source).name)
+        artifacts.cache_dir.mkdir(parents=True, exist_ok=True)
+        if Path(source).resolve() != target.resolve():
+            shutil.copy2(source, target)
+        entry = artifacts.add(name, target)
+        print(f"✅ {name}: {entry['file']}, sha256 {entry['sha256'][:16]}...")
+        return
+
+    failed = []
+    for name in args.only or sorted(KNOWN_ARTIFACTS):
+        try:
+            fetch(artifacts, name)
+        except Exception as e:
+            print(f"❌ {name}: {e}")
+            failed.append(name)
+    print(f"\n📦 Cache: {artifacts.cache_dir} ({artifacts.manifest_path.name})")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,250 @@
+"""
+Camera Load Ramp
+Starts a fake camera farm and runs the real capture + AI loop on 1, 2, 4, ...
+cameras, measuring latency, throughput and frame drops at each step, to find
+how many cameras this machine can handle.
+
+Usage (from backend/):
+    python scripts/load_ramp.py --max-cameras 32 --step-seconds 60 --output ramp.json
+    python scripts/load_ramp.py --steps 1,4,8,12,16 --video data/sample.mp4 --drop-rate 0.05
+
+A step "breaks" when the p95 AI latency exceeds --max-p95-ms, when the mean
+loop rate falls below --min-fps, or when the drop rate exceeds --max-drop-rate.
+The drop rate is transport loss (frames the cameras sent that the client never
+received) plus the loop's shortfall: frames the capture loop should have
+grabbed at its intended rate (one every CAPTURE_LOOP_INTERVAL) but did not.
+The loop is paced well below the camera frame rate, so frames it was never
+meant to grab are not drops; they are reported separately as unread_rate.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from fake_camera_farm import FakeCameraFarm
+from surveillance.metrics import metrics
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+try:
+    import resource  # Unix only
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
+
+def cpu_seconds():
+    """User + system CPU time of this process"""
+    if RESOURCE_AVAILABLE:
+        return sum(resource.getrusage(resource.RUSAGE_SELF)[:2])
+    if PSUTIL_AVAILABLE:
+        cpu_times = psutil.Process().cpu_times()
+        return cpu_times.user + cpu_times.system
+    return time.process_time()
+
+
+def peak_rss_mb():
+    """Peak resident memory (None where the resource module is missing)"""
+    if not RESOURCE_AVAILABLE:
+        return None
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        peak_kb /= 1024
+    return round(peak_kb / 1024, 1)
+
+
+def default_steps(max_cameras):
+    steps, n = [], 1
+    while n < max_cameras:
+        steps.append(n)
+        n *= 2
+    steps.append(max_cameras)
+    return steps
+
+
+def client_counters(surveillance, names):
+    """MJPEG client counters per camera, with the client they came from (a reconnect starts new counters)"""
+    counters = {}
+    for name in names:
+        source = surveillance.frame_sources.get(name)
+        if source is not None and source.is_mjpeg:
+            counters[name] = (source.cap, dict(source.cap.stats))
+    return counters
+
+
+def counter_delta(before, after, name, key):
+    cap, stats = after.get(name, (None, {}))
+    before_cap, before_stats = before.get(name, (None, {}))
+    return stats.get(key, 0) - (before_stats.get(key, 0) if before_cap is cap else 0)
+
+
+def run_step(surveillance, farm, count, seconds, loop_fps):
+    """Run the first count cameras for seconds and summarise (loop_fps: intended capture loop rate)"""
+    names = list(farm.camera_urls(count))
+    metrics.reset()
+    cpu_before = cpu_seconds()
+    start = time.time()
+    for name in names:
+        surveillance.start_camera_surveillance(name)
+
+    # Sample loop rate once per second (detection_stats fps is a 1 s window)
+    fps_samples = {name: [] for name in names}
+    time.sleep(min(5.0, seconds / 4))  # connect + warm up
+    # Frame counters cover the measurement window only, not connecting and warming up
+    sent_before = {name: stats['frames_sent'] for name, stats in farm.get_stats().items()}
+    clients_before = client_counters(surveillance, names)
+    window_start = time.time()
+    end = window_start + seconds
+    while time.time() < end:
+        time.sleep(1.0)
+        for name in names:
+            fps_samples[name].append(surveillance.detection_stats.get(name, {}).get('fps', 0))
+
+    farm_stats = farm.get_stats()
+    clients_after = client_counters(surveillance, names)
+    window = time.time() - window_start
+    sent = received = grabbed = backlog_dropped = decoded = expected = 0
+    for name in names:
+        camera_received = counter_delta(clients_before, clients_after, name, 'frames_received')
+        camera_grabbed = counter_delta(clients_before, clients_after, name, 'frames_grabbed')
+        sent += farm_stats[name]['frames_sent'] - sent_before[name]
+        received += camera_received
+        grabbed += camera_grabbed
+        backlog_dropped += counter_delta(clients_before, clients_after, name, 'frames_dropped')
+        decoded += counter_delta(clients_before, clients_after, name, 'frames_decoded')
+        # The loop takes one frame per iteration; it cannot grab frames that never arrived
+        expected += min(camera_received, window * loop_fps)
+    transport_loss_rate = max(0, sent - received) / sent if sent else 0.0
+    loop_shortfall_rate = max(0.0, expected - grabbed) / expected if expected else 0.0
+
+    for name in names:
+        surveillance.stop_camera_surveillance(name)
+    elapsed = time.time() - start
+    cpu = cpu_seconds() - cpu_before
+
+    snapshot = metrics.snapshot()
+    ai_p95 = [snapshot.get(name, {}).get('ai_total', {}).get('p95_ms', 0.0) for name in names]
+    capture_p95 = [snapshot.get(name, {}).get('capture', {}).get('p95_ms', 0.0) for name in names]
+    mean_fps = [sum(v) / len(v) if v else 0.0 for v in fps_samples.values()]
+
+    return {
+        'cameras': count,
+        'seconds': round(elapsed, 1),
+        'mean_fps_per_camera': round(sum(mean_fps) / len(mean_fps), 2),
+        'min_fps_per_camera': round(min(mean_fps), 2),
+        'ai_p95_ms': round(max(ai_p95), 1),
+        'capture_p95_ms': round(max(capture_p95), 1),
+        'frames_sent': sent,
+        'frames_received': received,
+        'frames_grabbed': grabbed,
+        'frames_decoded': decoded,
+        'frames_expected': round(expected),
+        # Sent by the farm but never received (lost in transit or across reconnects)
+        'transport_loss_rate': round(transport_loss_rate, 3),
+        # Frames the loop should have grabbed at its intended rate but did not
+        'loop_shortfall_rate': round(loop_shortfall_rate, 3),
+        'drop_rate': round(transport_loss_rate + loop_shortfall_rate, 3),
+        # Informational: the paced loop skips most frames by design
+        'backlog_drop_rate': round(backlog_dropped / received, 3) if received else 0.0,
+        'unread_rate': round(max(0, sent - grabbed) / sent, 3) if sent else 0.0,
+        'decode_ratio': round(decoded / grabbed, 3) if grabbed else 0.0,
+        'cpu_utilisation': round(cpu / elapsed, 2) if elapsed else 0.0,
+        'peak_rss_mb': peak_rss_mb(),
+        'stages': snapshot
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Ramp fake cameras until the pipeline saturates')
+    parser.add_argument('--max-cameras', type=int, default=16)
+    parser.add_argument('--steps', help='Comma-separated camera counts (default: 1, 2, 4, ... max)')
+    parser.add_argument('--step-seconds', type=float, default=30)
+    parser.add_argument('--video', help='Video file for the fake cameras (default: synthetic frames)')
+    parser.add_argument('--width', type=int, default=640)
+    parser.add_argument('--height', type=int, default=480)
+    parser.add_argument('--fps', type=float, default=15.0, help='Frame rate served by each camera')
+    parser.add_argument('--drop-rate', type=float, default=0.0)
+    parser.add_argument('--stall-rate', type=float, default=0.0)
+    parser.add_argument('--disconnect-rate', type=float, default=0.0)
+    parser.add_argument('--base-port', type=int, default=18080)
+    parser.add_argument('--max-p95-ms', type=float, default=1000.0)
+    parser.add_argument('--min-fps', type=float, default=2.0)
+    parser.add_argument('--max-drop-rate', type=float, default=0.10,
+                        help='Transport loss plus capture loop shortfall against its intended rate')
+    parser.add_argument('--continue-after-break', action='store_true')
+    parser.add_argument('--output', help='Write results JSON here')
+    args = parser.parse_args()
+
+    steps = [int(s) for s in args.steps.split(',')] if args.steps else default_steps(args.max_cameras)
+    farm = FakeCameraFarm(
+        max(steps), base_port=args.base_port, video=args.video,
+        width=args.width, height=args.height, fps=args.fps,
+        drop_rate=args.drop_rate, stall_rate=args.stall_rate, disconnect_rate=args.disconnect_rate
+    )
+    farm.start()
+
+    from multi_camera_surveillance import CAPTURE_LOOP_INTERVAL, MultiCameraAISurveillance
+    surveillance = MultiCameraAISurveillance(camera_urls=farm.camera_urls(), dry_run_alerts=True)
+
+    results = []
+    breaking_point = None
+    try:
+        for count in steps:
+            print(f"\n📈 Step: {count} camera(s) for {args.step_seconds:.0f}s")
+            step = run_step(surveillance, farm, count, args.step_seconds, 1.0 / CAPTURE_LOOP_INTERVAL)
+            reasons = []
+            if step['ai_p95_ms'] > args.max_p95_ms:
+                reasons.append(f"AI p95 {step['ai_p95_ms']} ms > {args.max_p95_ms}")
+            if step['min_fps_per_camera'] < args.min_fps:
+                reasons.append(f"fps {step['min_fps_per_camera']} < {args.min_fps}")
+            if step['drop_rate'] > args.max_drop_rate:
+                reasons.append(f"drop rate {step['drop_rate']} > {args.max_drop_rate}")
+            step['broken'] = reasons
+            results.append(step)
+
+            print(f"   fps/camera {step['mean_fps_per_camera']} (min {step['min_fps_per_camera']}), "
+                  f"AI p95 {step['ai_p95_ms']} ms, drops {step['drop_rate']:.1%} "
+                  f"(transport {step['transport_loss_rate']:.1%}, loop shortfall {step['loop_shortfall_rate']:.1%}), "
+                  f"CPU {step['cpu_utilisation']}")
+            if reasons:
+                print(f"   ❌ Saturated: {'; '.join(reasons)}")
+                if breaking_point is None:
+                    breaking_point = count
+                if not args.continue_after_break:
+                    break
+            else:
+                print("   ✅ OK")
+            time.sleep(2)  # let camera threads exit
+    finally:
+        farm.stop()
+        surveillance.recording_engine.stop_all()
+
+    summary = {
+        'max_cameras_ok': max((s['cameras'] for s in results if not s['broken']), default=0),
+        'breaking_point': breaking_point,
+        'config': vars(args),
+        'cpus': os.cpu_count(),
+        'farm': farm.get_stats(),
+        'steps': results
+    }
+    print(f"\n🎯 Handled {summary['max_cameras_ok']} camera(s) within limits"
+          + (f", saturated at {breaking_point}" if breaking_point else ""))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(summary, f, indent=2, default=str)
+        print(f"💾 Results saved to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,216 @@
+"""
+Capture Supervisor Module
+Reconnect policy for camera streams: exponential backoff with jitter and a
+per-camera circuit breaker.
+
+A camera that keeps failing is "parked" (circuit open) and is not touched
+until the open period ends. After that a cheap HTTP HEAD / TCP probe must
+succeed before we pay for opening a decoder again (circuit half-open).
+"""
+
+import random
+import threading
+import time
+import logging
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+CIRCUIT_CLOSED = 'closed'
+CIRCUIT_OPEN = 'open'
+CIRCUIT_HALF_OPEN = 'half_open'
+
+
+class CaptureSupervisor:
+    """
+    Connects (and reconnects) one camera stream
+    """
+
+    def __init__(self,
+                 camera_name: str,
+                 camera_url: str,
+                 opener: Callable[[str], object],
+                 probe: Optional[Callable[[str], bool]] = None,
+                 base_delay: float = 1.0,
+                 max_delay: float = 60.0,
+                 jitter: float = 0.3,
+                 failure_threshold: int = 5,
+                 open_seconds: float = 120.0,
+                 clock: Callable[[], float] = time.time):
+        """
+        Initialize capture supervisor
+
+        Args:
+            camera_name: Camera identifier (for logs / health)
+            camera_url: Stream URL
+            opener: Callable returning an opened source (must have isOpened()/release())
+            probe: Cheap reachability check run before opening a decoder
+            base_delay: First reconnect delay in seconds
+            max_delay: Upper bound for the reconnect delay
+            jitter: Random +/- fraction applied to each delay
+            failure_threshold: Consecutive failures before the circuit opens
+            open_seconds: How long a parked camera is left alone
+            clock: Time source (overridable for tests)
+        """
+        self.camera_name = camera_name
+        self.camera_url = camera_url
+        self.opener = opener
+        self.probe = probe
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.clock = clock
+
+        self.state = CIRCUIT_CLOSED
+        self.connected = False
+        self.streaming = False
+        self.consecutive_failures = 0
+        self.total_failures = 0
+        self.reconnects = 0
+        self.last_error: Optional[str] = None
+        self.last_failure_at: Optional[float] = None
+        self.last_frame_at: Optional[float] = None
+        self.connected_since: Optional[float] = None
+        self.open_until: Optional[float] = None
+        self.next_attempt_at: Optional[float] = None
+        self._stop = threading.Event()
+
+    def next_delay(self) -> float:
+        """Backoff delay for the current failure count (with jitter)"""
+        exponent = max(0, self.consecutive_failures - 1)
+        delay = min(self.max_delay, self.base_delay * (2 ** exponent))
+        return max(0.0, delay * (1 + random.uniform(-self.jitter, self.jitter)))
+
+    def record_success(self):
+        """
+        A source opened successfully
+
+        Opening is not proof the stream works (some cameras accept the
+        connection and never send a frame), so the failure count and the
+        circuit are only reset by the first frame - see mark_frame().
+        """
+        self.connected = True
+        self.streaming = False
+        self.connected_since = self.clock()
+        self.next_attempt_at = None
+
+    def record_failure(self, reason: str):
+        """An open / probe / read failed"""
+        now = self.clock()
+        self.connected = False
+        self.streaming = False
+        self.connected_since = None
+        self.consecutive_failures += 1
+        self.total_failures += 1
+        self.last_error = reason
+        self.last_failure_at = now
+
+        if self.state == CIRCUIT_HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != CIRCUIT_OPEN:
+                logger.warning("Camera %s parked for %.0fs after %d failures (%s)",
+                               self.camera_name, self.open_seconds, self.consecutive_failures, reason)
+            self.state = CIRCUIT_OPEN
+            self.open_until = now + self.open_seconds
+            self.next_attempt_at = self.open_until
+        else:
+            if self.consecutive_failures == 1:
+                logger.warning("Camera %s unavailable: %s - reconnecting with backoff", self.camera_name, reason)
+            self.next_attempt_at = now + self.next_delay()
+
+    def mark_frame(self):
+        """Note that a frame was received; the first one after an open closes the circuit"""
+        self.last_frame_at = self.clock()
+        if self.streaming:
+            return
+        self.streaming = True
+        if self.state != CIRCUIT_CLOSED or self.consecutive_failures:
+            logger.info("Camera %s streaming (after %d failures)", self.camera_name, self.consecutive_failures)
+        if self.total_failures:
+            self.reconnects += 1
+        self.state = CIRCUIT_CLOSED
+        self.consecutive_failures = 0
+        self.open_until = None
+
+    def stop(self):
+        """Interrupt a pending connect()"""
+        self._stop.set()
+
+    def _wait_until(self, when: float, should_continue: Callable[[], bool]) -> bool:
+        """Sleep until a point in time; False if we were told to stop"""
+        while True:
+            if self._stop.is_set() or not should_continue():
+                return False
+            remaining = when - self.clock()
+            if remaining <= 0:
+                return True
+            self._stop.wait(min(remaining, 0.5))
+
+    def connect(self, should_continue: Callable[[], bool] = lambda: True):
+        """
+        Block until a source is open
+
+        Args:
+            should_continue: Polled while waiting; returning False aborts
+
+        Returns:
+            Opened source, or None if aborted
+        """
+        while True:
+            if self.next_attempt_at is not None:
+                if not self._wait_until(self.next_attempt_at, should_continue):
+                    return None
+            elif self._stop.is_set() or not should_continue():
+                return None
+
+            if self.state == CIRCUIT_OPEN:
+                self.state = CIRCUIT_HALF_OPEN
+                logger.info("Camera %s circuit half-open, probing", self.camera_name)
+
+            # Cheap check first - opening a decoder can block for the full FFmpeg timeout
+            if self.probe is not None:
+                try:
+                    reachable = self.probe(self.camera_url)
+                except Exception as e:
+                    reachable = False
+                    logger.debug("Probe error for %s: %s", self.camera_name, e)
+                if not reachable:
+                    self.record_failure('probe failed')
+                    continue
+
+            try:
+                source = self.opener(self.camera_url)
+            except Exception as e:
+                self.record_failure(f'open error: {e}')
+                continue
+
+            if source is not None and source.isOpened():
+                self.record_success()
+                return source
+
+            if source is not None:
+                source.release()
+            self.record_failure('open failed')
+
+    def get_health(self) -> Dict:
+        """Health snapshot for APIs"""
+        now = self.clock()
+
+        def iso(ts):
+            return datetime.fromtimestamp(ts).isoformat() if ts else None
+
+        return {
+            'state': self.state,
+            'connected': self.connected,
+            'streaming': self.streaming,
+            'consecutive_failures': self.consecutive_failures,
+            'total_failures': self.total_failures,
+            'reconnects': self.reconnects,
+            'last_error': self.last_error,
+            'last_failure_at': iso(self.last_failure_at),
+            'last_frame_age': round(now - self.last_frame_at, 1) if self.last_frame_at else None,
+            'connected_since': iso(self.connected_since),
+            'next_attempt_in': round(max(0.0, self.next_attempt_at - now), 1) if self.next_attempt_at else None
+        }
@@ -10,6 +10,8 @@ import os
 from typing import List, Tuple, Dict, Optional
 import logging
 
+from app.utils.model_artifacts import ArtifactError, enforce_offline, model_artifacts
+
 logger = logging.getLogger(__name__)
 
 class YOLOv9Detector:
@@ -27,7 +29,8 @@ class YOLOv9Detector:
         Initialize YOLOv9 detector
         
         Args:
-            model_path: Path to YOLOv9 model weights
+            model_path: Path to YOLOv9 model weights (default: yolov9c, then yolov8n,
+                from the local model artifact cache)
             conf_threshold: Confidence threshold for detections
             nms_threshold: Non-maximum suppression threshold
             device: Device to run inference on ('cpu' or 'cuda')
@@ -63,61 +66,77 @@ class YOLOv9Detector:
             76: 'scissors'    # Potential weapon
         }
         
-        self.model = None
-        self.load_model(model_path)
-        
-    def load_model(self, model_path: str = None):
+        # Loaded on first detect(), or by model_artifacts.preload() (MODEL_LOADING=eager)
+        self._model = None
+        self._model_key = None
+        self._load_error = None
+        self.load_model(model_path, lazy=True)
+    
+    @property
+    def model(self):
+        """The YOLO model, loaded on first use"""
+        if self._model is None:
+            self._model = model_artifacts.get(self._model_key)
+        return self._model
+    
+    @property
+    def available(self) -> bool:
+        """False once the weights are known to be missing or invalid"""
+        return self._load_error is None
+    
+    def load_model(self, model_path: str = None, lazy: bool = False):
         """
         Load YOLOv9 model
         
+        Weights come from model_path or the verified local artifact cache; nothing
+        is downloaded. The model is shared by detectors using the same weights and device.
+        
         Args:
             model_path: Path to model weights file
+            lazy: Only register the model; it is loaded on first detect()
         """
-        try:
-            # Try to import ultralytics YOLO first
+        device = 'cuda' if self.device == 'cuda' and torch.cuda.is_available() else 'cpu'
+        self._model = None
+        self._load_error = None
+        self._model_key = f"yolo:{model_path or 'default'}:{device}"
+        
+        def load():
+            enforce_offline()
             from ultralytics import YOLO
             
             if model_path and os.path.exists(model_path):
                 # Load custom model
-                self.model = YOLO(model_path)
-                logger.info(f"Loaded custom YOLOv9 model from {model_path}")
+                weights = model_path
+                logger.info(f"Loading custom YOLO model from {model_path}")
             else:
-                # Try YOLOv9 models first, fallback to YOLOv8
-                try:
-                    # Look for YOLOv9 in models directory
-                    model_dir = os.path.join(os.path.dirname(__file__), '..', 'app', 'models')
-                    yolo9_path = os.path.join(model_dir, 'yolov9c.pt')
-                    
-                    if os.path.exists(yolo9_path):
-                        self.model = YOLO(yolo9_path)
-                        logger.info(f"Loaded YOLOv9 model from {yolo9_path}")
-                    else:
-                        # Use YOLOv8 as fallback (more stable)
-                        self.model = YOLO('yolov8n.pt')
-                        logger.info("Loaded YOLOv8n model as fallback")
-                except Exception:
-                    # Final fallback to torch hub
-                    self.model = torch.hub.load('ultralytics/yolov5', 'yolov5s', pretrained=True)
-                    logger.info("Loaded pretrained YOLOv5 model as final fallback")
-            
-            # Configure model
-            if hasattr(self.model, 'conf'):
-                self.model.conf = self.conf_threshold
-            if hasattr(self.model, 'iou'):
-                self.model.iou = self.nms_threshold
+                # YOLOv9 first, YOLOv8n as the lighter fallback
+                name, weights = model_artifacts.find('yolov9c', 'yolov8n')
+                logger.info(f"Loading {name} from {weights}")
             
-            # Set device for torch hub models
-            if hasattr(self.model, 'to'):
-                if self.device == 'cuda' and torch.cuda.is_available():
-                    self.model = self.model.to('cuda')
-                    logger.info("Using GPU for inference")
-                else:
-                    self.model = self.model.to('cpu')
-                    logger.info("Using CPU for inference")
-                
-        except Exception as e:
-            logger.error(f"Failed to load YOLO model: {e}")
-            raise
+            model = YOLO(weights)
+            logger.info(f"Using {'GPU' if device == 'cuda' else 'CPU'} for inference")
+            return model.to(device)
+        
+        model_artifacts.register(self._model_key, load)
+        if not lazy:
+            try:
+                self._model = model_artifacts.get(self._model_key)
+            except ArtifactError as e:
+                logger.error(f"Failed to load YOLO model: {e}")
+                raise
+        elif not (model_path and os.path.exists(model_path)):
+            # Resolve the weights now (cheap, no model is built) so a missing file
+            # is reported once at startup instead of on the first frame
+            try:
+                model_artifacts.find('yolov9c', 'yolov8n')
+            except ArtifactError as e:
+                self._disable(e)
+    
+    def _disable(self, error: Exception):
+        """Stop trying to load the model; detect() returns no detections"""
+        self._load_error = error
+        logger.error(f"YOLO detection disabled: {error}. Copy yolov9c.pt or yolov8n.pt into the model cache "
+                     f"with scripts/fetch_model_artifacts.py --add <name> <file>, then restart")
     
     def detect(self, frame: np.ndarray) -> List[Dict]:
         """
@@ -129,13 +148,22 @@ class YOLOv9Detector:
         Returns:
             List of detection dictionaries with bbox, confidence, class_id, class_name
         """
-        if self.model is None:
-            logger.warning("Model not loaded")
+        if self._load_error is not None:
+            return []
+        try:
+            model = self.model
+        except ArtifactError as e:
+            # model_artifacts does not retry a failed load - don't log it every frame
+            self._disable(e)
             return []
         
         try:
-            # Run inference with verbose output enabled to see detections
-            results = self.model(frame, verbose=True, conf=self.conf_threshold, max_det=20)
+            if model is None:
+                logger.warning("Model not loaded")
+                return []
+            
+            # verbose=False: ultralytics otherwise prints a line per frame
+            results = model(frame, verbose=False, conf=self.conf_threshold, max_det=20)
             
             # Parse results
             detections = []
@@ -13,8 +13,13 @@ from typing import Dict, List, Tuple, Optional
 import logging
 from pathlib import Path
 
+from app.utils.model_artifacts import ArtifactError
+
 logger = logging.getLogger(__name__)
 
+# 'keras' (MobileNetV2 via TensorFlow) or 'tflite' (model from scripts/export_face_tflite.py)
+FACE_RUNTIME = os.getenv('FACE_RUNTIME', 'keras').lower()
+
 # Try to import the MobileNetV2 model
 try:
     # Add ai_models directory to path
@@ -22,9 +27,13 @@ try:
     ai_models_path = current_dir / "ai_models" / "face_recognition"
     sys.path.insert(0, str(ai_models_path))
     
-    from mobilenet_face_recognition import MobileNetFaceRecognitionSystem
+    if FACE_RUNTIME == 'tflite':
+        from tflite_face_recognition import TFLiteFaceRecognitionSystem as FaceRecognitionSystem
+        logger.info("✅ Using MobileNetV2 TFLite runtime with MediaPipe face detection")
+    else:
+        from mobilenet_face_recognition import MobileNetFaceRecognitionSystem as FaceRecognitionSystem
+        logger.info("✅ Using MobileNetV2 with MediaPipe face detection")
     MOBILENET_AVAILABLE = True
-    logger.info("✅ Using MobileNetV2 with MediaPipe face detection")
         
 except ImportError as e:
     logger.warning(f"⚠️ MobileNetV2 model import failed: {e}")
@@ -49,6 +58,7 @@ class EfficientNetFaceRecognizer:
         """
         self.confidence_threshold = confidence_threshold
         self.is_trained = False
+        self.model_error = None
         
         if not MOBILENET_AVAILABLE:
             logger.error("❌ MobileNetV2 system not available!")
@@ -57,7 +67,7 @@ class EfficientNetFaceRecognizer:
         
         # Initialize the MobileNetV2 system
         logger.info("Initializing MobileNetV2 Face Recognition System...")
-        self.recognizer_system = MobileNetFaceRecognitionSystem()
+        self.recognizer_system = FaceRecognitionSystem()
         
         # Set default model path if not provided
         if model_path is None:
@@ -67,13 +77,72 @@ class EfficientNetFaceRecognizer:
         self.model_path = model_path
         self.is_trained = False
         
-        # Try to load existing model
-        if self.load_model(model_path):
+        # Try to load existing model (the TFLite model is needed in both modes)
+        if FACE_RUNTIME == 'tflite' and not self.recognizer_system.load_model(model_path):
+            logger.warning("⚠️ No exported TFLite face model found (run scripts/export_face_tflite.py)")
+        elif self.recognizer_system.recognition_mode == 'gallery':
+            self.is_trained = self.load_gallery(f"{model_path}_gallery.npz")
+        elif FACE_RUNTIME == 'tflite' or self.load_model(model_path):
             self.is_trained = True
             logger.info("✅ MobileNetV2 model loaded successfully")
-        else:
+        elif self.model_error is None:
             logger.warning("⚠️ No trained MobileNetV2 model found")
     
+    def _disable(self, error: Exception):
+        """Model weights are missing or invalid: stop recognizing (reported once)"""
+        if self.model_error is None:
+            logger.error(f"❌ Face recognition disabled - model weights unavailable: {error}")
+            logger.error("💡 Solution: add the weights to the model cache with scripts/fetch_model_artifacts.py")
+        self.model_error = error
+        self.is_trained = False
+    
+    def load_gallery(self, gallery_path: str) -> bool:
+        """
+        Load the enrollment gallery, building it from the known faces directory if it is
+        missing or was built with another backbone
+        
+        Returns:
+            True if at least one person is enrolled
+        """
+        try:
+            if not self.recognizer_system.load_gallery(gallery_path):
+                known_faces_dir = os.getenv('KNOWN_FACES_DIR', 'data/known_faces')
+                logger.info(f"Building face gallery from {known_faces_dir}")
+                if os.path.isdir(known_faces_dir) and self.recognizer_system.build_gallery(known_faces_dir):
+                    self.recognizer_system.save_gallery(gallery_path)
+            persons = self.recognizer_system.gallery.get_persons()
+            logger.info(f"Face gallery: {len(persons)} enrolled ({', '.join(persons)})")
+            return len(persons) > 0
+        except ArtifactError as e:
+            self._disable(e)
+            return False
+        except Exception as e:
+            logger.error(f"Error loading face gallery: {e}")
+            return False
+    
+    def enroll_person(self, person_name: str, face_images: List[np.ndarray]) -> int:
+        """
+        Enroll a person into the gallery (no retraining; applies to all cameras immediately)
+        
+        Returns:
+            Number of face samples enrolled
+        """
+        if not MOBILENET_AVAILABLE or self.recognizer_system.recognition_mode != 'gallery':
+            logger.warning("Enrollment requires FACE_RECOGNITION_MODE=gallery")
+            return 0
+        count = self.recognizer_system.enroll_person(person_name, face_images)
+        if count:
+            self.is_trained = True
+        return count
+    
+    def remove_person(self, person_name: str) -> bool:
+        """Remove a person from the gallery"""
+        if not MOBILENET_AVAILABLE or self.recognizer_system.recognition_mode != 'gallery':
+            return False
+        removed = self.recognizer_system.remove_person(person_name)
+        self.is_trained = len(self.recognizer_system.gallery.snapshot) > 0
+        return removed
+    
     def load_model(self, model_path: str = None) -> bool:
         """
         Load the trained EfficientNet model
@@ -95,6 +164,9 @@ class EfficientNetFaceRecognizer:
                 logger.info(f"Authorized persons: {', '.join(self.recognizer_system.authorized_persons)}")
             return success
             
+        except ArtifactError as e:
+            self._disable(e)
+            return False
         except Exception as e:
             logger.error(f"Error loading MobileNetV2 model: {e}")
             return False
@@ -142,20 +214,26 @@ class EfficientNetFaceRecognizer:
                 'name': str,
                 'confidence': float,
                 'bbox': (x, y, w, h),
-                'is_authorized': bool
+                'is_authorized': bool,
+                'quality': dict,   # face quality scores (see face_quality)
+                'skipped': bool    # failed the quality gate: neither authorized nor an intruder
             }
         """
+        if self.model_error is not None:
+            return []
         if not self.is_trained:
             logger.warning("Model not trained, cannot recognize faces")
             return []
         
         try:
             # Use MobileNetV2's recognition
-            face_names, face_locations, verification_results = self.recognizer_system.recognize_faces_in_frame(frame)
+            face_names, face_locations, verification_results, qualities = \
+                self.recognizer_system.recognize_faces_with_quality(frame)
             
             # Format results
             results = []
-            for i, (name, (top, right, bottom, left), is_authorized) in enumerate(zip(face_names, face_locations, verification_results)):
+            for name, (top, right, bottom, left), is_authorized, quality in zip(
+                    face_names, face_locations, verification_results, qualities):
                 # Convert bbox to (x, y, w, h)
                 x = left
                 y = top
@@ -166,15 +244,82 @@ class EfficientNetFaceRecognizer:
                     'name': name,
                     'confidence': 0.75 if is_authorized else 0.25,  # Approximate confidence
                     'bbox': (x, y, w, h),
-                    'is_authorized': bool(is_authorized)
+                    'is_authorized': bool(is_authorized),
+                    'quality': quality,
+                    'skipped': not quality['passed']
                 }
                 results.append(result)
             
             return results
             
+        except ArtifactError as e:
+            # The backbone loads on first inference; a failed load is not retried
+            self._disable(e)
+            return []
+        except Exception as e:
+            logger.error(f"Face recognition failed: {e}")
+            return []
+    
+    def detect_face_crops(self, frame: np.ndarray) -> List[Dict]:
+        """
+        Detect faces and score them with the quality gate, without recognizing them
+        
+        Args:
+            frame: Input BGR frame
+            
+        Returns:
+            List of dicts with bbox (x1, y1, x2, y2), face_bbox (x, y, w, h), face_crop
+            (None if the face failed the gate), quality (best-shot rank, higher is better),
+            skipped and reasons (quality gate rejection reasons)
+        """
+        if self.model_error is not None or not MOBILENET_AVAILABLE:
+            return []
+        try:
+            face_locations, crops, qualities = self.recognizer_system.quality_crops(frame)
+        except Exception as e:
+            logger.error(f"Face detection failed: {e}")
+            return []
+        
+        results = []
+        for (top, right, bottom, left), crop, quality in zip(face_locations, crops, qualities):
+            w = right - left
+            results.append({
+                'bbox': [left, top, right, bottom],
+                'face_bbox': (left, top, w, bottom - top),
+                'face_crop': crop,
+                # Same ranking as the LBPH recognizer: sharp and large first
+                'quality': float(quality['sharpness'] * min(1.0, w / 120.0)),
+                'skipped': crop is None,
+                'reasons': quality['reasons']
+            })
+        return results
+    
+    def recognize_faces_batch(self, face_crops: List[np.ndarray]) -> List[Dict]:
+        """
+        Recognize several face crops (e.g. a track's best shots) in one batched call
+        
+        Args:
+            face_crops: Face crops from detect_face_crops()
+            
+        Returns:
+            One dict per crop with person_name, confidence and authorization_status
+        """
+        if self.model_error is not None or not self.is_trained or not face_crops:
+            return []
+        try:
+            face_names, verification_results = self.recognizer_system.recognize_face_crops(face_crops)
+        except ArtifactError as e:
+            self._disable(e)
+            return []
         except Exception as e:
             logger.error(f"Face recognition failed: {e}")
             return []
+        
+        return [{
+            'person_name': name,
+            'confidence': 0.75 if is_authorized else 0.25,  # Approximate confidence
+            'authorization_status': 'authorized' if is_authorized else 'intruder'
+        } for name, is_authorized in zip(face_names, verification_results)]
     
     def recognize_single_face(self, frame: np.ndarray, face_bbox: Tuple[int, int, int, int]) -> Optional[Dict]:
         """
@@ -196,12 +341,10 @@ class EfficientNetFaceRecognizer:
             if face_image.size == 0:
                 return None
             
-            # Create a temporary frame with just this face
-            temp_frame = frame.copy()
-            
-            # Get features
-            features = self.recognizer_system.extract_face_features(face_image)
-            if features is None:
+            # Backbone + classifier in one compiled call
+            features, probabilities = self.recognizer_system.classify_faces([face_image])
+            # No usable crop, or no classifier head (gallery mode)
+            if features[0] is None or probabilities[0] is None:
                 return {
                     'name': 'Unknown',
                     'confidence': 0.0,
@@ -209,15 +352,12 @@ class EfficientNetFaceRecognizer:
                     'is_authorized': False
                 }
             
-            # Predict
-            features_reshaped = features.reshape(1, -1)
-            predictions = self.recognizer_system.classifier_model.predict(features_reshaped, verbose=0)
-            
-            max_prob_index = np.argmax(predictions[0])
-            max_probability = predictions[0][max_prob_index]
+            predictions = probabilities[0]
+            max_prob_index = int(np.argmax(predictions))
+            max_probability = predictions[max_prob_index]
             
             if max_probability >= self.confidence_threshold:
-                predicted_label = self.recognizer_system.label_encoder.inverse_transform([max_prob_index])[0]
+                predicted_label = self.recognizer_system._class_label(max_prob_index)
                 return {
                     'name': predicted_label,
                     'confidence': float(max_probability),
@@ -263,14 +403,20 @@ class EfficientNetFaceRecognizer:
             
             x, y, w, h = bbox
             
-            # Choose color
-            color = (0, 255, 0) if is_authorized else (0, 0, 255)  # Green/Red
+            # Choose color (faces skipped by the quality gate are not judged)
+            if result.get('skipped'):
+                color = (0, 200, 255)  # Amber
+            else:
+                color = (0, 255, 0) if is_authorized else (0, 0, 255)  # Green/Red
             
             # Draw rectangle
             cv2.rectangle(annotated_frame, (x, y), (x + w, y + h), color, 2)
             
             # Draw label with confidence
-            label = f"{name} ({confidence:.0%})" if is_authorized else "Unauthorized"
+            if result.get('skipped'):
+                label = f"Low quality ({', '.join(result['quality']['reasons'])})"
+            else:
+                label = f"{name} ({confidence:.0%})" if is_authorized else "Unauthorized"
             
             # Draw background for text
             cv2.rectangle(annotated_frame, (x, y - 25), (x + w, y), color, cv2.FILLED)
@@ -7,12 +7,18 @@ import cv2
 import numpy as np
 import os
 import pickle
+import threading
 from typing import Dict, List, Tuple, Optional
 import logging
 from pathlib import Path
 
+from .lbp_gallery import LBPGallery, lbp_histograms
+
 logger = logging.getLogger(__name__)
 
+# 'opencv' (cv2.face LBPH, needs opencv-contrib) or 'numpy' (vectorized LBPGallery)
+LBPH_BACKEND = os.getenv('LBPH_BACKEND', 'opencv').lower()
+
 class LBPHFaceRecognizer:
     """
     Local Binary Pattern Histograms (LBPH) face recognizer
@@ -22,7 +28,8 @@ class LBPHFaceRecognizer:
     def __init__(self, 
                  known_faces_dir: str = "data/known_faces",
                  confidence_threshold: float = 100.0,
-                 face_cascade_path: str = None):
+                 face_cascade_path: str = None,
+                 backend: str = None):
         """
         Initialize LBPH face recognizer
         
@@ -30,6 +37,8 @@ class LBPHFaceRecognizer:
             known_faces_dir: Directory containing known face images
             confidence_threshold: Confidence threshold for recognition (lower = more strict)
             face_cascade_path: Path to Haar cascade file
+            backend: 'opencv' or 'numpy' (default: LBPH_BACKEND); both give the same
+                chi-square confidences, numpy matches all faces of a call at once
         """
         self.known_faces_dir = Path(known_faces_dir)
         self.confidence_threshold = confidence_threshold
@@ -43,8 +52,16 @@ class LBPHFaceRecognizer:
                 cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
             )
         
-        # Initialize LBPH recognizer
-        self.recognizer = cv2.face.LBPHFaceRecognizer_create()
+        # Initialize LBPH recognizer (lock: add_person updates it while cameras predict;
+        # the numpy gallery publishes snapshots and needs no lock for matching)
+        self.backend = (backend or LBPH_BACKEND).lower()
+        if self.backend == 'numpy':
+            self.recognizer = None
+            self.gallery = LBPGallery()
+        else:
+            self.recognizer = cv2.face.LBPHFaceRecognizer_create()
+            self.gallery = None
+        self._recognizer_lock = threading.Lock()
         
         # Face database
         self.face_labels = {}  # label_id -> person_name
@@ -52,7 +69,7 @@ class LBPHFaceRecognizer:
         self.is_trained = False
         
         # Model persistence
-        self.model_path = self.known_faces_dir.parent / "lbph_model.yml"
+        self.model_path = self.known_faces_dir.parent / ("lbp_gallery.npz" if self.backend == 'numpy' else "lbph_model.yml")
         self.labels_path = self.known_faces_dir.parent / "face_labels.pkl"
         
         # Load existing model if available
@@ -143,6 +160,9 @@ class LBPHFaceRecognizer:
         if not self.is_trained:
             return "unknown", 0.0
         
+        if self.gallery is not None:
+            return self._match_gallery([face_crop])[0]
+        
         try:
             # Convert to grayscale if needed
             if len(face_crop.shape) == 3:
@@ -151,7 +171,8 @@ class LBPHFaceRecognizer:
                 gray_face = face_crop
             
             # Predict
-            label_id, confidence = self.recognizer.predict(gray_face)
+            with self._recognizer_lock:
+                label_id, confidence = self.recognizer.predict(gray_face)
             
             # Check if confidence is within threshold
             if confidence <= self.confidence_threshold:
@@ -164,15 +185,31 @@ class LBPHFaceRecognizer:
             logger.error(f"Face recognition failed: {e}")
             return "unknown", 0.0
     
-    def process_frame_faces(self, frame: np.ndarray) -> List[Dict]:
+    def face_quality(self, face_crop: np.ndarray, face_bbox: Tuple[int, int, int, int]) -> float:
         """
-        Detect and recognize all faces in frame
+        Best-shot score of a face crop: sharpness (Laplacian variance of the resized crop)
+        weighted by how close the detected face is to a well-resolved 120 px
+        
+        Args:
+            face_crop: Face crop from extract_face_crop()
+            face_bbox: Detected face bounding box (x, y, w, h)
+            
+        Returns:
+            Quality score (higher is better)
+        """
+        gray = cv2.cvtColor(face_crop, cv2.COLOR_BGR2GRAY) if len(face_crop.shape) == 3 else face_crop
+        sharpness = cv2.Laplacian(gray, cv2.CV_64F).var()
+        return float(sharpness * min(1.0, face_bbox[2] / 120.0))
+    
+    def detect_face_crops(self, frame: np.ndarray) -> List[Dict]:
+        """
+        Detect faces and extract plausible face crops, without recognizing them
         
         Args:
             frame: Input frame
             
         Returns:
-            List of face detection results
+            List of dicts with bbox (x1, y1, x2, y2), face_bbox (x, y, w, h), face_crop and quality
         """
         faces = self.detect_faces(frame)
         results = []
@@ -193,9 +230,32 @@ class LBPHFaceRecognizer:
             if face_crop is None:
                 continue
             
-            # Recognize face
-            person_name, confidence = self.recognize_face(face_crop)
+            results.append({
+                'bbox': [x, y, x + w, y + h],  # Convert to (x1, y1, x2, y2)
+                'face_bbox': face_bbox,  # Original (x, y, w, h)
+                'face_crop': face_crop,
+                'quality': self.face_quality(face_crop, face_bbox)
+            })
+        
+        return results
+    
+    def recognize_faces_batch(self, face_crops: List[np.ndarray]) -> List[Dict]:
+        """
+        Recognize several face crops (e.g. a track's best shots) in one call
+        
+        Args:
+            face_crops: Face crop images
             
+        Returns:
+            One dict per crop with person_name, confidence, authorization_status and threat_level
+        """
+        if self.gallery is not None:
+            recognized = self._match_gallery(face_crops)
+        else:
+            recognized = [self.recognize_face(face_crop) for face_crop in face_crops]
+        
+        results = []
+        for person_name, confidence in recognized:
             # Determine authorization status
             if person_name == "unknown":
                 auth_status = "intruder"
@@ -204,20 +264,60 @@ class LBPHFaceRecognizer:
                 auth_status = "authorized"
                 threat_level = "low"
             
-            result = {
-                'bbox': [x, y, x + w, y + h],  # Convert to (x1, y1, x2, y2)
-                'face_bbox': face_bbox,  # Original (x, y, w, h)
+            results.append({
                 'person_name': person_name,
                 'confidence': confidence,
                 'authorization_status': auth_status,
-                'threat_level': threat_level,
-                'face_crop': face_crop
-            }
-            
-            results.append(result)
+                'threat_level': threat_level
+            })
         
         return results
     
+    def _match_gallery(self, face_crops: List[np.ndarray]) -> List[Tuple[str, float]]:
+        """
+        Recognize face crops against the numpy gallery in one vectorized pass
+        
+        Args:
+            face_crops: Face crops (extract_face_crop size)
+            
+        Returns:
+            (person_name, confidence) per crop
+        """
+        if not face_crops:
+            return []
+        if not self.is_trained:
+            return [("unknown", 0.0)] * len(face_crops)
+        
+        try:
+            grays = [cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY) if len(crop.shape) == 3 else crop
+                     for crop in face_crops]
+            labels, distances = self.gallery.match(lbp_histograms(np.stack(grays)))
+        except Exception as e:
+            logger.error(f"Face recognition failed: {e}")
+            return [("unknown", 0.0)] * len(face_crops)
+        
+        recognized = []
+        for label_id, confidence in zip(labels.tolist(), distances.tolist()):
+            if confidence <= self.confidence_threshold:
+                recognized.append((self.face_labels.get(label_id, "unknown"), confidence))
+            else:
+                recognized.append(("unknown", confidence))
+        return recognized
+    
+    def process_frame_faces(self, frame: np.ndarray) -> List[Dict]:
+        """
+        Detect and recognize all faces in frame
+        
+        Args:
+            frame: Input frame
+            
+        Returns:
+            List of face detection results
+        """
+        faces = self.detect_face_crops(frame)
+        recognized = self.recognize_faces_batch([face['face_crop'] for face in faces])
+        return [{**face, **recognition} for face, recognition in zip(faces, recognized)]
+    
     def train_from_directory(self) -> bool:
         """
         Train LBPH model from known faces directory
@@ -299,7 +399,16 @@ class LBPHFaceRecognizer:
             
             # Train LBPH recognizer
             logger.info(f"Training LBPH model with {len(faces)} face samples")
-            self.recognizer.train(faces, np.array(labels))
+            if self.gallery is not None:
+                # One vectorized histogram pass over all samples
+                histograms = lbp_histograms(np.stack(faces))
+                labels = np.array(labels)
+                gallery = LBPGallery(initial_capacity=max(256, len(faces)))
+                for label in np.unique(labels):
+                    gallery.add(histograms[labels == label], int(label))
+                self.gallery = gallery
+            else:
+                self.recognizer.train(faces, np.array(labels))
             self.is_trained = True
             
             # Save model
@@ -328,24 +437,85 @@ class LBPHFaceRecognizer:
             person_dir = self.known_faces_dir / person_name
             person_dir.mkdir(parents=True, exist_ok=True)
             
-            # Save face images
+            # Save face images (continue numbering so existing samples are kept)
+            start = len(list(person_dir.glob(f"{person_name}_*.jpg")))
             for i, face_image in enumerate(face_images):
-                image_path = person_dir / f"{person_name}_{i:03d}.jpg"
+                image_path = person_dir / f"{person_name}_{start + i:03d}.jpg"
                 cv2.imwrite(str(image_path), face_image)
             
-            # Retrain model
-            return self.train_from_directory()
+            if not self.is_trained:
+                return self.train_from_directory()
+            
+            # LBPH histograms are per sample, so new samples can be added with update()
+            # instead of retraining on the whole directory
+            if person_name in self.face_labels.values():
+                label = next(k for k, v in self.face_labels.items() if v == person_name)
+            else:
+                label = self.label_counter
+            
+            faces = []
+            for image in face_images:
+                for face_bbox in self.detect_faces(image):
+                    face_crop = self.extract_face_crop(image, face_bbox)
+                    if face_crop is not None:
+                        faces.append(cv2.cvtColor(face_crop, cv2.COLOR_BGR2GRAY))
+            
+            if not faces:
+                logger.warning(f"No faces detected for {person_name}")
+                return False
+            
+            if self.gallery is not None:
+                self.gallery.add(lbp_histograms(np.stack(faces)), label)
+            else:
+                with self._recognizer_lock:
+                    self.recognizer.update(faces, np.array([label] * len(faces)))
+            if label == self.label_counter:
+                self.face_labels[label] = person_name
+                self.label_counter += 1
+            self.save_model()
+            
+            logger.info(f"Added {len(faces)} face samples for {person_name} (incremental update)")
+            return True
             
         except Exception as e:
             logger.error(f"Failed to add person {person_name}: {e}")
             return False
     
+    def remove_person(self, person_name: str) -> bool:
+        """
+        Remove a person from the recognition database (images in known_faces_dir are kept)
+        
+        Args:
+            person_name: Name of the person
+            
+        Returns:
+            True if successful
+        """
+        label = next((k for k, v in self.face_labels.items() if v == person_name), None)
+        if label is None:
+            return False
+        
+        if self.gallery is None:
+            # OpenCV LBPH cannot forget samples without retraining
+            logger.warning(f"Cannot remove {person_name} incrementally with the opencv LBPH backend")
+            return False
+        
+        self.gallery.remove(label)
+        del self.face_labels[label]
+        self.save_model()
+        logger.info(f"Removed {person_name} from face database")
+        return True
+    
     def save_model(self):
         """Save trained model and labels to disk"""
         try:
             if self.is_trained:
                 # Save LBPH model
-                self.recognizer.save(str(self.model_path))
+                if self.gallery is not None:
+                    self.gallery.save(str(self.model_path))
+                else:
+                    with self._recognizer_lock:
+                        self.recognizer.save(str(self.model_path))
                 
                 # Save labels
                 with open(self.labels_path, 'wb') as f:
@@ -365,7 +535,10 @@ class LBPHFaceRecognizer:
         try:
             if self.model_path.exists() and self.labels_path.exists():
                 # Load LBPH model
-                self.recognizer.read(str(self.model_path))
+                if self.gallery is not None:
+                    self.gallery = LBPGallery.load(str(self.model_path))
+                else:
+                    self.recognizer.read(str(self.model_path))
                 
                 # Load labels
                 with open(self.labels_path, 'rb') as f:
@@ -0,0 +1,158 @@
+"""
+Frame Buffer Pool Module
+Reusable NumPy image buffers for the per-frame hot path (resize, annotation).
+
+Buffers are handed out with a reference count. The stage that acquires a
+buffer owns it until it calls release() or publishes it to a FrameSlot;
+readers on other threads checkout() the published buffer, which pins it
+until they release it, so a buffer is never overwritten while in use.
+"""
+
+import threading
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class FrameBufferPool:
+    """
+    Pool of preallocated image buffers for one camera
+    """
+
+    def __init__(self, name: str = '', max_free_per_shape: int = 4):
+        """
+        Initialize buffer pool
+
+        Args:
+            name: Pool name (camera) for stats
+            max_free_per_shape: Idle buffers kept per shape; extras are freed
+        """
+        self.name = name
+        self.max_free_per_shape = max_free_per_shape
+        self._free: Dict[Tuple, List[np.ndarray]] = {}
+        self._refs: Dict[int, List] = {}  # id(buffer) -> [buffer, refcount]
+        self._lock = threading.Lock()
+
+        self.stats = {
+            'allocations': 0,
+            'reuses': 0,
+            'allocated_bytes': 0
+        }
+
+    def acquire(self, shape: Tuple[int, ...], dtype=np.uint8) -> np.ndarray:
+        """
+        Get a buffer of the given shape (contents undefined)
+
+        Returns:
+            Buffer owned by the caller (refcount 1)
+        """
+        key = (tuple(shape), np.dtype(dtype).str)
+        with self._lock:
+            free = self._free.get(key)
+            if free:
+                buf = free.pop()
+                self.stats['reuses'] += 1
+            else:
+                buf = np.empty(shape, dtype=dtype)
+                self.stats['allocations'] += 1
+                self.stats['allocated_bytes'] += buf.nbytes
+            self._refs[id(buf)] = [buf, 1]
+        return buf
+
+    def retain(self, buf: np.ndarray) -> np.ndarray:
+        """Add a reference to a pooled buffer"""
+        with self._lock:
+            entry = self._refs.get(id(buf))
+            if entry is None:
+                raise ValueError("Buffer does not belong to this pool or was already released")
+            entry[1] += 1
+        return buf
+
+    def release(self, buf: Optional[np.ndarray]):
+        """Drop a reference; the buffer returns to the pool when none are left"""
+        if buf is None:
+            return
+        with self._lock:
+            entry = self._refs.get(id(buf))
+            if entry is None:
+                logger.debug("Release of unknown buffer in pool %s", self.name)
+                return
+            entry[1] -= 1
+            if entry[1] > 0:
+                return
+            del self._refs[id(buf)]
+            free = self._free.setdefault((buf.shape, buf.dtype.str), [])
+            if len(free) < self.max_free_per_shape:
+                free.append(buf)
+
+    def resize(self, src: np.ndarray, size: Tuple[int, int],
+               interpolation: int = cv2.INTER_LINEAR) -> np.ndarray:
+        """
+        cv2.resize into a pooled buffer
+
+        Args:
+            src: Source image
+            size: (width, height)
+
+        Returns:
+            Pooled buffer owned by the caller
+        """
+        width, height = size
+        dst = self.acquire((height, width) + src.shape[2:], src.dtype)
+        cv2.resize(src, (width, height), dst=dst, interpolation=interpolation)
+        return dst
+
+    def copy(self, src: np.ndarray) -> np.ndarray:
+        """Copy an image into a pooled buffer owned by the caller"""
+        dst = self.acquire(src.shape, src.dtype)
+        np.copyto(dst, src)
+        return dst
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            in_use = len(self._refs)
+            free = sum(len(v) for v in self._free.values())
+        return {**self.stats, 'in_use': in_use, 'free': free}
+
+
+class FrameSlot:
+    """
+    Hands the newest pooled frame from one producer to many readers
+    """
+
+    def __init__(self, pool: FrameBufferPool):
+        self.pool = pool
+        self.version = 0
+        self._current: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+
+    def publish(self, buf: np.ndarray):
+        """Take ownership of buf (the producer's reference) and replace the current frame"""
+        with self._lock:
+            previous = self._current
+            self._current = buf
+            self.version += 1
+        self.pool.release(previous)
+
+    def checkout(self) -> Tuple[int, Optional[np.ndarray]]:
+        """
+        Pin the current frame for reading
+
+        Returns:
+            (version, buffer). The caller must pool.release(buffer) when done.
+        """
+        with self._lock:
+            if self._current is None:
+                return self.version, None
+            return self.version, self.pool.retain(self._current)
+
+    def clear(self):
+        """Drop the current frame"""
+        with self._lock:
+            previous = self._current
+            self._current = None
+        self.pool.release(previous)
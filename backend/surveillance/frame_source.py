@@ -0,0 +1,124 @@
+"""
+Frame Source Module
+Capture layer that decides, per frame, whether a frame needs decoding.
+
+Every frame is grab()bed to keep the stream moving, but retrieve() (the
+decode) only happens for AI frames and for frames a consumer (viewer,
+recorder, evidence buffer) actually wants.
+"""
+
+import time
+import logging
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from .mjpeg_client import MJPEGCapture
+
+logger = logging.getLogger(__name__)
+
+
+class CapturedFrame:
+    """One grabbed frame; image is None when the frame was not decoded"""
+
+    __slots__ = ('index', 'image', 'jpeg', 'is_ai_frame', 'scale', 'timestamp')
+
+    def __init__(self, index: int, image: Optional[np.ndarray], jpeg: Optional[bytes],
+                 is_ai_frame: bool, scale: int, timestamp: float):
+        self.index = index
+        self.image = image
+        self.jpeg = jpeg
+        self.is_ai_frame = is_ai_frame
+        self.scale = scale
+        self.timestamp = timestamp
+
+    @property
+    def decoded(self) -> bool:
+        return self.image is not None
+
+
+class FrameSource:
+    """
+    grab()/retrieve() wrapper around cv2.VideoCapture or MJPEGCapture
+    """
+
+    def __init__(self, cap, ai_interval: int = 10, preview_scale: int = 1):
+        """
+        Initialize frame source
+
+        Args:
+            cap: Opened cv2.VideoCapture or MJPEGCapture
+            ai_interval: Run AI on every Nth frame
+            preview_scale: Decode scale for non-AI frames (MJPEG only: 1, 2, 4 or 8)
+        """
+        self.cap = cap
+        self.ai_interval = max(1, ai_interval)
+        self.preview_scale = preview_scale
+        self.frame_count = 0
+        self._ai_frames = 0
+
+        self.stats = {
+            'frames_grabbed': 0,
+            'frames_decoded': 0,
+            'frames_skipped': 0
+        }
+
+    @property
+    def is_mjpeg(self) -> bool:
+        return isinstance(self.cap, MJPEGCapture)
+
+    def isOpened(self) -> bool:
+        return self.cap is not None and self.cap.isOpened()
+
+    def next_frame(self, want_frame: bool = False,
+                   full_resolution: bool = False) -> Tuple[bool, Optional[CapturedFrame]]:
+        """
+        Advance the stream by one frame
+
+        Args:
+            want_frame: A consumer needs this frame decoded even if it is not an AI frame
+            full_resolution: Decode a wanted frame at full size instead of preview_scale
+                (e.g. for the recorder, whose segments need one resolution)
+
+        Returns:
+            (success, CapturedFrame). success is False when the stream failed.
+        """
+        if not self.cap.grab():
+            return False, None
+
+        self.frame_count += 1
+        self.stats['frames_grabbed'] += 1
+        timestamp = time.time()
+        jpeg = self.cap.get_jpeg() if self.is_mjpeg else None
+
+        # First frame always goes to AI so there is something to annotate with
+        is_ai_frame = self.frame_count % self.ai_interval == 0 or self._ai_frames == 0
+        if not (is_ai_frame or want_frame):
+            self.stats['frames_skipped'] += 1
+            return True, CapturedFrame(self.frame_count, None, jpeg, False, 1, timestamp)
+
+        scale = 1 if is_ai_frame or full_resolution else self.preview_scale
+        if self.is_mjpeg:
+            ret, image = self.cap.retrieve(scale=scale)
+        else:
+            ret, image = self.cap.retrieve()
+            scale = 1
+        if not ret:
+            return False, None
+
+        self.stats['frames_decoded'] += 1
+        if is_ai_frame:
+            self._ai_frames += 1
+        return True, CapturedFrame(self.frame_count, image, jpeg, is_ai_frame, scale, timestamp)
+
+    def get_stats(self) -> Dict:
+        """Decode statistics"""
+        grabbed = self.stats['frames_grabbed']
+        return {
+            **self.stats,
+            'decode_ratio': self.stats['frames_decoded'] / grabbed if grabbed else 0.0
+        }
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
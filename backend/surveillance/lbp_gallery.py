@@ -0,0 +1,233 @@
+"""
+Vectorized LBPH Gallery
+NumPy version of OpenCV's LBPH recognizer: circular LBP codes and grid
+histograms for all face crops of a call in one pass, and a contiguous
+float32 gallery matched with chi-square distances by broadcasting over the
+bins each query actually uses.
+
+Histograms and distances follow cv2.face.LBPHFaceRecognizer (radius 1,
+8 neighbours, 8x8 grid, HISTCMP_CHISQR_ALT), so its confidence thresholds
+keep their meaning. Samples are added and removed incrementally; readers
+match against an immutable snapshot, so cameras never wait for enrollment.
+"""
+
+import threading
+import logging
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Elements per broadcast block (query bins x gallery samples), ~16 MB of float32
+_BLOCK_ELEMENTS = 1 << 22
+
+# Faces per histogram pass (bounds the per-pixel index arrays when enrolling many samples)
+_FACE_CHUNK = 64
+
+
+def lbp_histograms(faces, radius: int = 1, neighbors: int = 8,
+                   grid_x: int = 8, grid_y: int = 8) -> np.ndarray:
+    """
+    Spatial LBP histograms of grayscale faces (same layout as OpenCV LBPH)
+
+    Args:
+        faces: Equally sized grayscale faces, as a list or an (N, H, W) array
+        radius: LBP circle radius
+        neighbors: Sampling points on the circle
+        grid_x / grid_y: Cells per row / column
+
+    Returns:
+        (N, grid_x * grid_y * 2**neighbors) float32, each cell normalized to sum 1
+    """
+    src = np.asarray(faces, dtype=np.float32)
+    if src.ndim == 2:
+        src = src[None]
+    if len(src) > _FACE_CHUNK:
+        return np.concatenate([lbp_histograms(src[i:i + _FACE_CHUNK], radius, neighbors, grid_x, grid_y)
+                               for i in range(0, len(src), _FACE_CHUNK)])
+    n, rows, cols = src.shape
+    h, w = rows - 2 * radius, cols - 2 * radius
+    center = src[:, radius:radius + h, radius:radius + w]
+
+    codes = np.zeros((n, h, w), dtype=np.int32)
+    for k in range(neighbors):
+        # Bilinear sample of neighbour k, as in OpenCV's elbp()
+        x = np.float32(radius * np.cos(2.0 * np.pi * k / neighbors))
+        y = np.float32(-radius * np.sin(2.0 * np.pi * k / neighbors))
+        fx, fy = int(np.floor(x)), int(np.floor(y))
+        cx, cy = int(np.ceil(x)), int(np.ceil(y))
+        tx, ty = x - fx, y - fy
+        w1, w2, w3, w4 = (1 - tx) * (1 - ty), tx * (1 - ty), (1 - tx) * ty, tx * ty
+
+        def shifted(dy, dx):
+            return src[:, radius + dy:radius + dy + h, radius + dx:radius + dx + w]
+
+        t = w1 * shifted(fy, fx) + w2 * shifted(fy, cx) + w3 * shifted(cy, fx) + w4 * shifted(cy, cx)
+        codes |= (((t > center) | (np.abs(t - center) < np.finfo(np.float32).eps)).astype(np.int32) << k)
+
+    # One bincount over (face, cell, code); pixels past the last full cell are ignored
+    patterns = 1 << neighbors
+    cell_h, cell_w = h // grid_y, w // grid_x
+    codes = codes[:, :cell_h * grid_y, :cell_w * grid_x]
+    cell_rows = np.arange(cell_h * grid_y) // cell_h
+    cell_cols = np.arange(cell_w * grid_x) // cell_w
+    cells = cell_rows[:, None] * grid_x + cell_cols[None, :]
+    index = (np.arange(n)[:, None, None] * (grid_x * grid_y) + cells[None]) * patterns + codes
+    hist = np.bincount(index.ravel(), minlength=n * grid_x * grid_y * patterns)
+    return (hist.reshape(n, -1) / np.float32(cell_h * cell_w)).astype(np.float32)
+
+
+def chi_square_distances(queries: np.ndarray, gallery_bins: np.ndarray,
+                         gallery_sums: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Chi-square (OpenCV HISTCMP_CHISQR_ALT) distance of every query to every gallery sample
+
+    For non-negative histograms 2 * sum((a - b)^2 / (a + b)) equals
+    2 * (sum(a) + sum(b)) - 8 * sum(a * b / (a + b)), and the last sum only
+    has terms where the query bin is non-zero - a fraction of the LBP bins.
+    The gallery is stored bins-major so those bins are contiguous rows.
+
+    Args:
+        queries: (M, D) non-negative histograms
+        gallery_bins: (D, N) non-negative histograms, one column per sample
+        gallery_sums: (N,) column sums of gallery_bins, if already known
+
+    Returns:
+        (M, N) float32 distances
+    """
+    queries = np.asarray(queries, dtype=np.float32)
+    samples = gallery_bins.shape[1]
+    if gallery_sums is None:
+        gallery_sums = gallery_bins.sum(axis=0, dtype=np.float64)
+    distances = np.empty((len(queries), samples), dtype=np.float32)
+    for m, query in enumerate(queries):
+        bins = np.flatnonzero(query)
+        a = query[bins][:, None]
+        shared = np.empty(samples, dtype=np.float64)
+        block = max(1, _BLOCK_ELEMENTS // max(1, len(bins)))
+        for start in range(0, samples, block):
+            b = gallery_bins[bins, start:start + block]  # gathered copy, safe to modify
+            products = b * a
+            b += a
+            products /= b
+            shared[start:start + block] = products.sum(axis=0, dtype=np.float64)
+        distances[m] = 2.0 * (query.sum(dtype=np.float64) + gallery_sums) - 8.0 * shared
+    # The subtraction can round a few ulps below zero for identical histograms
+    return np.maximum(distances, 0.0)
+
+
+class LBPGallery:
+    """
+    LBP histograms of enrolled face samples with integer labels
+    """
+
+    def __init__(self, initial_capacity: int = 256):
+        """
+        Args:
+            initial_capacity: Samples preallocated before the first growth
+        """
+        self._capacity = initial_capacity
+        self._bins = None    # (D, capacity) float32, one column per sample
+        self._labels = None
+        self._count = 0
+        self._write_lock = threading.Lock()
+        self._snapshot = (np.zeros((0, 0), np.float32), np.zeros(0, np.int32), np.zeros(0, np.float64))
+
+    def __len__(self) -> int:
+        return len(self._snapshot[1])
+
+    def labels(self) -> List[int]:
+        """Labels with at least one sample"""
+        return sorted(set(self._snapshot[1].tolist()))
+
+    def add(self, histograms: np.ndarray, label: int) -> int:
+        """
+        Append samples for a label
+
+        Args:
+            histograms: (N, D) histograms from lbp_histograms()
+            label: Person label
+
+        Returns:
+            Number of samples added
+        """
+        histograms = np.asarray(histograms, dtype=np.float32)
+        with self._write_lock:
+            if self._bins is None:
+                self._bins = np.empty((histograms.shape[1], max(self._capacity, len(histograms))), np.float32)
+                self._labels = np.empty(self._bins.shape[1], np.int32)
+            if histograms.shape[1] != self._bins.shape[0]:
+                raise ValueError(f"Histogram size {histograms.shape[1]} does not match gallery ({self._bins.shape[0]})")
+
+            needed = self._count + len(histograms)
+            if needed > self._bins.shape[1]:
+                # Grow into new buffers - the published snapshot keeps the old ones
+                capacity = max(needed, self._bins.shape[1] * 2)
+                bins = np.empty((self._bins.shape[0], capacity), np.float32)
+                labels = np.empty(capacity, np.int32)
+                bins[:, :self._count] = self._bins[:, :self._count]
+                labels[:self._count] = self._labels[:self._count]
+                self._bins, self._labels = bins, labels
+
+            # Columns past _count are not part of the published snapshot
+            self._bins[:, self._count:needed] = histograms.T
+            self._labels[self._count:needed] = label
+            self._count = needed
+            self._publish()
+        return len(histograms)
+
+    def remove(self, label: int) -> bool:
+        """
+        Remove every sample of a label (publishes a compacted copy)
+
+        Returns:
+            True if samples were removed
+        """
+        with self._write_lock:
+            if self._bins is None:
+                return False
+            keep = self._labels[:self._count] != label
+            kept = int(keep.sum())
+            if kept == self._count:
+                return False
+            bins = np.empty_like(self._bins)
+            labels = np.empty_like(self._labels)
+            bins[:, :kept] = self._bins[:, :self._count][:, keep]
+            labels[:kept] = self._labels[:self._count][keep]
+            self._bins, self._labels, self._count = bins, labels, kept
+            self._publish()
+        return True
+
+    def _publish(self):
+        bins = self._bins[:, :self._count]
+        self._snapshot = (bins, self._labels[:self._count], bins.sum(axis=0, dtype=np.float64))
+
+    def match(self, histograms: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Nearest enrolled sample for each query histogram
+
+        Args:
+            histograms: (M, D) query histograms
+
+        Returns:
+            (labels, distances): (M,) nearest labels (-1 if the gallery is empty) and chi-square distances
+        """
+        bins, labels, sums = self._snapshot
+        if len(labels) == 0 or len(histograms) == 0:
+            return np.full(len(histograms), -1, np.int32), np.full(len(histograms), np.inf, np.float32)
+        distances = chi_square_distances(histograms, bins, sums)
+        nearest = distances.argmin(axis=1)
+        return labels[nearest], distances[np.arange(len(nearest)), nearest]
+
+    def save(self, path: str):
+        bins, labels, _ = self._snapshot
+        np.savez(path, histograms=bins.T, labels=labels)
+
+    @classmethod
+    def load(cls, path: str) -> 'LBPGallery':
+        data = np.load(path)
+        gallery = cls(initial_capacity=max(256, len(data['labels'])))
+        for label in np.unique(data['labels']):
+            gallery.add(data['histograms'][data['labels'] == label], int(label))
+        return gallery
@@ -0,0 +1,210 @@
+"""
+Pipeline Metrics Module
+Lightweight per-camera stage timing with fixed-bucket histograms, plus
+counters and gauges, rendered in Prometheus text format.
+
+A (stage, camera) histogram can be written from several threads (e.g. the
+encode stage from every viewer's stream, detector waits from request
+threads), so each histogram has its own lock. It is uncontended on the
+usual single-writer path. The registry lock is only held when a new series
+is created or when metrics are scraped.
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Latency bucket upper bounds in seconds (0.5 ms .. 10 s)
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05,
+    0.1, 0.2, 0.5, 1.0, 2.0, 5.0, 10.0
+)
+
+METRIC_PREFIX = 'aieyes'
+
+# Collector callbacks return (name, type, labels, value) samples at scrape time
+Sample = Tuple[str, str, Dict[str, str], float]
+
+
+class Histogram:
+    """Fixed-bucket latency histogram"""
+
+    __slots__ = ('bounds', 'counts', 'total', 'count', 'max', '_lock')
+
+    def __init__(self, bounds: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last bucket is +Inf
+        self.total = 0.0
+        self.count = 0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        bucket = bisect.bisect_left(self.bounds, seconds)
+        with self._lock:
+            self.counts[bucket] += 1
+            self.total += seconds
+            self.count += 1
+            if seconds > self.max:
+                self.max = seconds
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by linear interpolation inside the bucket"""
+        counts = list(self.counts)
+        count = sum(counts)
+        if count == 0:
+            return 0.0
+
+        rank = q * count
+        cumulative = 0
+        for i, bucket_count in enumerate(counts):
+            if cumulative + bucket_count >= rank and bucket_count > 0:
+                lower = self.bounds[i - 1] if i > 0 else 0.0
+                upper = self.bounds[i] if i < len(self.bounds) else max(self.max, lower)
+                fraction = (rank - cumulative) / bucket_count
+                return min(lower + (upper - lower) * fraction, self.max)
+            cumulative += bucket_count
+        return self.max
+
+    def summary(self) -> Dict:
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total / self.count * 1000, 2) if self.count else 0.0,
+            'p50_ms': round(self.quantile(0.50) * 1000, 2),
+            'p95_ms': round(self.quantile(0.95) * 1000, 2),
+            'p99_ms': round(self.quantile(0.99) * 1000, 2),
+            'max_ms': round(self.max * 1000, 2)
+        }
+
+
+class MetricsRegistry:
+    """Stage histograms, counters and gauges for all cameras"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._histograms: Dict[Tuple[str, str], Histogram] = {}
+        self._counters: Dict[Tuple[str, Tuple], float] = {}
+        self._gauges: Dict[Tuple[str, Tuple], float] = {}
+        self._collectors: List[Callable[[], Iterable[Sample]]] = []
+        self._lock = threading.Lock()
+        self.enabled = True
+
+    def histogram(self, stage: str, camera: str) -> Histogram:
+        """Get (or create) the histogram for a stage on a camera"""
+        key = (stage, str(camera))
+        hist = self._histograms.get(key)
+        if hist is None:
+            with self._lock:
+                hist = self._histograms.setdefault(key, Histogram(self.buckets))
+        return hist
+
+    def observe(self, stage: str, camera: str, seconds: float):
+        """Record a stage duration"""
+        if self.enabled:
+            self.histogram(stage, camera).observe(seconds)
+
+    @contextmanager
+    def timer(self, stage: str, camera: str):
+        """Time a block with the monotonic clock"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, camera, time.perf_counter() - start)
+
+    def inc(self, name: str, amount: float = 1.0, **labels):
+        """Increment a counter (e.g. dropped frames)"""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + amount
+
+    def set_gauge(self, name: str, value: float, **labels):
+        """Set a gauge (e.g. queue depth)"""
+        self._gauges[(name, tuple(sorted(labels.items())))] = value
+
+    def register_collector(self, collector: Callable[[], Iterable[Sample]]):
+        """Add a callback that reports samples when metrics are scraped"""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self._gauges.clear()
+
+    def snapshot(self) -> Dict:
+        """JSON-friendly summary: per camera, per stage p50/p95/p99"""
+        with self._lock:
+            histograms = dict(self._histograms)
+        result: Dict[str, Dict] = {}
+        for (stage, camera), hist in sorted(histograms.items()):
+            result.setdefault(camera, {})[stage] = hist.summary()
+        return result
+
+    def render_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        with self._lock:
+            histograms = dict(self._histograms)
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+            collectors = list(self._collectors)
+
+        lines = []
+        name = f'{METRIC_PREFIX}_stage_seconds'
+        lines.append(f'# HELP {name} Pipeline stage latency in seconds')
+        lines.append(f'# TYPE {name} histogram')
+        for (stage, camera), hist in sorted(histograms.items()):
+            labels = {'camera': camera, 'stage': stage}
+            counts = list(hist.counts)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{name}_bucket{_labels({**labels, "le": le})} {cumulative}')
+            lines.append(f'{name}_sum{_labels(labels)} {hist.total:.6f}')
+            lines.append(f'{name}_count{_labels(labels)} {hist.count}')
+
+        quantile_name = f'{METRIC_PREFIX}_stage_latency_seconds'
+        lines.append(f'# HELP {quantile_name} Estimated stage latency quantiles')
+        lines.append(f'# TYPE {quantile_name} gauge')
+        for (stage, camera), hist in sorted(histograms.items()):
+            for q in (0.5, 0.95, 0.99):
+                labels = {'camera': camera, 'stage': stage, 'quantile': str(q)}
+                lines.append(f'{quantile_name}{_labels(labels)} {hist.quantile(q):.6f}')
+
+        samples: List[Sample] = []
+        samples.extend((n, 'counter', dict(l), v) for (n, l), v in counters.items())
+        samples.extend((n, 'gauge', dict(l), v) for (n, l), v in gauges.items())
+        for collector in collectors:
+            try:
+                samples.extend(collector())
+            except Exception:
+                continue
+
+        by_name: Dict[str, List[Sample]] = {}
+        for sample in samples:
+            by_name.setdefault(sample[0], []).append(sample)
+        for metric, metric_samples in sorted(by_name.items()):
+            full_name = f'{METRIC_PREFIX}_{metric}'
+            lines.append(f'# TYPE {full_name} {metric_samples[0][1]}')
+            for _, _, labels, value in metric_samples:
+                lines.append(f'{full_name}{_labels(labels)} {value}')
+
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    parts = []
+    for key, value in sorted(labels.items()):
+        escaped = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{key}="{escaped}"')
+    return '{' + ','.join(parts) + '}'
+
+
+# Process-wide registry
+metrics = MetricsRegistry()
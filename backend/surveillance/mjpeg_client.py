@@ -0,0 +1,318 @@
+"""
+MJPEG Stream Client
+Reads multipart MJPEG streams (IP Webcam /video etc.) directly over HTTP
+instead of going through cv2.VideoCapture / FFmpeg.
+
+A background thread only splits the stream into JPEG byte strings. Frames
+are decoded on demand, optionally at 1/2, 1/4 or 1/8 scale using libjpeg's
+DCT scaling, so frames nobody asks for are never decoded at all.
+"""
+
+import re
+import threading
+import time
+import logging
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+JPEG_SOI = b'\xff\xd8'
+JPEG_EOI = b'\xff\xd9'
+
+# Decode flags per scale factor (libjpeg scales during IDCT - much cheaper than resize)
+DECODE_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+_CONTENT_LENGTH_RE = re.compile(rb'content-length:\s*(\d+)', re.IGNORECASE)
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Shared HTTP session with a connection pool for all camera streams"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=0)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                _session = session
+    return _session
+
+
+def decode_jpeg(jpeg: bytes, scale: int = 1) -> Optional[np.ndarray]:
+    """
+    Decode JPEG bytes, optionally downscaled during decoding
+
+    Args:
+        jpeg: Encoded JPEG data
+        scale: Downscale factor (1, 2, 4 or 8)
+
+    Returns:
+        BGR image or None if the data could not be decoded
+    """
+    flag = DECODE_FLAGS.get(scale)
+    if flag is None:
+        raise ValueError(f"Unsupported decode scale {scale} (use 1, 2, 4 or 8)")
+    return cv2.imdecode(np.frombuffer(jpeg, dtype=np.uint8), flag)
+
+
+class MJPEGStreamParser:
+    """
+    Incremental parser that splits a multipart MJPEG byte stream into JPEGs
+
+    Uses the part's Content-Length header when the camera sends one and
+    falls back to scanning for JPEG start/end markers otherwise.
+    """
+
+    def __init__(self, max_buffer: int = 8 * 1024 * 1024):
+        self.max_buffer = max_buffer
+        self._buf = bytearray()
+
+    def feed(self, data: bytes) -> List[bytes]:
+        """
+        Add stream data
+
+        Args:
+            data: Next chunk read from the HTTP response
+
+        Returns:
+            Complete JPEG frames found so far (oldest first)
+        """
+        self._buf += data
+        frames = []
+        while True:
+            frame = self._next_frame()
+            if frame is None:
+                break
+            frames.append(frame)
+
+        if len(self._buf) > self.max_buffer:
+            # Corrupt stream - resynchronise on the next frame
+            logger.warning("MJPEG buffer overflow, discarding %d bytes", len(self._buf))
+            self._buf.clear()
+        return frames
+
+    def _next_frame(self) -> Optional[bytes]:
+        buf = self._buf
+        soi = buf.find(JPEG_SOI)
+        if soi < 0:
+            # Keep a trailing 0xff in case the marker is split across chunks
+            del buf[:max(0, len(buf) - 1)]
+            return None
+
+        header_end = buf.find(b'\r\n\r\n', 0, soi + 1)
+        if header_end >= 0:
+            match = _CONTENT_LENGTH_RE.search(buf, 0, header_end)
+            start = header_end + 4
+            if match and buf[start:start + 2] == JPEG_SOI:
+                length = int(match.group(1))
+                if len(buf) < start + length:
+                    return None
+                frame = bytes(buf[start:start + length])
+                del buf[:start + length]
+                return frame
+
+        eoi = buf.find(JPEG_EOI, soi + 2)
+        if eoi < 0:
+            return None
+        frame = bytes(buf[soi:eoi + 2])
+        del buf[:eoi + 2]
+        return frame
+
+
+class MJPEGCapture:
+    """
+    cv2.VideoCapture-compatible reader for HTTP MJPEG streams
+
+    Supports read(), grab()/retrieve() and isOpened()/release(). Only the
+    newest frame is kept; frames that arrive before the consumer grabs them
+    are dropped without being decoded.
+    """
+
+    def __init__(self,
+                 url: str,
+                 timeout: float = 5.0,
+                 chunk_size: int = 16384,
+                 session: Optional[requests.Session] = None,
+                 auto_open: bool = True):
+        """
+        Initialize MJPEG capture
+
+        Args:
+            url: Stream URL (e.g. http://192.168.1.5:8080/video)
+            timeout: Connect / read timeout in seconds
+            chunk_size: Bytes read from the socket per iteration
+            session: HTTP session (defaults to the shared pooled session)
+            auto_open: Connect immediately
+        """
+        self.url = url
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+        self.session = session or get_session()
+
+        self._response = None
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._cond = threading.Condition()
+
+        self._latest: Optional[bytes] = None
+        self._latest_seq = 0
+        self._latest_time = 0.0
+        self._grabbed: Optional[bytes] = None
+        self._grabbed_seq = 0
+        self._grabbed_time = 0.0
+
+        self.stats = {
+            'frames_received': 0,
+            'frames_grabbed': 0,
+            'frames_decoded': 0,
+            'frames_dropped': 0,
+            'bytes_received': 0
+        }
+
+        if auto_open:
+            self.open()
+
+    def open(self) -> bool:
+        """Connect to the stream and start the reader thread"""
+        self.release()
+        try:
+            response = self.session.get(self.url, stream=True, timeout=(self.timeout, self.timeout))
+            content_type = response.headers.get('Content-Type', '')
+            if response.status_code != 200 or 'multipart' not in content_type.lower():
+                logger.warning("Not an MJPEG stream: %s (status %s, %s)",
+                               self.url, response.status_code, content_type)
+                response.close()
+                return False
+        except requests.RequestException as e:
+            logger.warning("Could not open MJPEG stream %s: %s", self.url, e)
+            return False
+
+        self._response = response
+        self._running = True
+        self._thread = threading.Thread(target=self._reader_loop, daemon=True, name=f"mjpeg-{self.url}")
+        self._thread.start()
+        return True
+
+    def _reader_loop(self):
+        """Split the HTTP body into JPEG frames; keep only the newest"""
+        parser = MJPEGStreamParser()
+        try:
+            for chunk in self._response.iter_content(chunk_size=self.chunk_size):
+                if not self._running:
+                    break
+                if not chunk:
+                    continue
+                self.stats['bytes_received'] += len(chunk)
+                frames = parser.feed(chunk)
+                if not frames:
+                    continue
+
+                with self._cond:
+                    # Frames never grabbed are dropped here - they were never decoded
+                    unseen = self._latest_seq - self._grabbed_seq
+                    self.stats['frames_dropped'] += len(frames) - 1 + (1 if unseen > 0 else 0)
+                    self.stats['frames_received'] += len(frames)
+                    self._latest = frames[-1]
+                    self._latest_seq += len(frames)
+                    self._latest_time = time.time()
+                    self._cond.notify_all()
+        except Exception as e:
+            if self._running:
+                logger.warning("MJPEG stream %s ended: %s", self.url, e)
+        finally:
+            self._running = False
+            with self._cond:
+                self._cond.notify_all()
+
+    def isOpened(self) -> bool:
+        return self._running
+
+    def grab(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for a frame newer than the last grabbed one (no decoding)
+
+        Args:
+            timeout: Seconds to wait (defaults to the stream timeout)
+
+        Returns:
+            True if a new frame was grabbed
+        """
+        deadline = time.time() + (self.timeout if timeout is None else timeout)
+        with self._cond:
+            while self._latest_seq <= self._grabbed_seq:
+                remaining = deadline - time.time()
+                if remaining <= 0 or not self._running:
+                    return False
+                self._cond.wait(remaining)
+
+            self._grabbed = self._latest
+            self._grabbed_seq = self._latest_seq
+            self._grabbed_time = self._latest_time
+        self.stats['frames_grabbed'] += 1
+        return True
+
+    def retrieve(self, image=None, scale: int = 1) -> Tuple[bool, Optional[np.ndarray]]:
+        """
+        Decode the grabbed frame
+
+        Args:
+            image: Unused (cv2.VideoCapture signature compatibility)
+            scale: Downscale factor applied while decoding (1, 2, 4 or 8)
+
+        Returns:
+            (success, BGR frame)
+        """
+        if self._grabbed is None:
+            return False, None
+        frame = decode_jpeg(self._grabbed, scale)
+        if frame is None:
+            return False, None
+        self.stats['frames_decoded'] += 1
+        return True, frame
+
+    def read(self, scale: int = 1) -> Tuple[bool, Optional[np.ndarray]]:
+        """Grab and decode the newest frame"""
+        if not self.grab():
+            return False, None
+        return self.retrieve(scale=scale)
+
+    def get_jpeg(self) -> Optional[bytes]:
+        """Raw JPEG bytes of the grabbed frame (for snapshots without re-encoding)"""
+        return self._grabbed
+
+    @property
+    def frame_time(self) -> float:
+        """Arrival time of the grabbed frame"""
+        return self._grabbed_time
+
+    def release(self):
+        """Close the stream"""
+        self._running = False
+        if self._response is not None:
+            try:
+                self._response.close()
+            except Exception:
+                pass
+            self._response = None
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2.0)
+        self._thread = None
+
+
+def is_mjpeg_url(url) -> bool:
+    """Whether a camera URL should be read with MJPEGCapture"""
+    return isinstance(url, str) and url.lower().startswith(('http://', 'https://'))
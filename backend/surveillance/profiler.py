@@ -0,0 +1,179 @@
+"""
+Sampling Profiler Module
+Attach to a running camera thread for a few seconds and sample its Python
+stack with sys._current_frames(). No restart, no tracing hooks: the target
+thread is never instrumented, the sampler thread just reads its frames.
+
+Overhead is bounded by the sampling interval (minimum 1 ms), a maximum
+duration and a single profile at a time per process.
+"""
+
+import sys
+import threading
+import time
+import logging
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MIN_INTERVAL = 0.001
+MAX_DURATION = 60.0
+MAX_DEPTH = 128
+
+# Only one profile may run at a time
+_profile_lock = threading.Lock()
+
+FunctionKey = Tuple[str, str, int]  # (function, file, first line)
+
+
+class ProfilerBusyError(RuntimeError):
+    """Raised when another profile is already running"""
+
+
+class ProfileResult:
+    """
+    Stack samples collected from one or more threads
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.stacks: Counter = Counter()  # tuple of frame labels, root first -> samples
+        self.self_counts: Counter = Counter()  # FunctionKey -> samples at top of stack
+        self.total_counts: Counter = Counter()  # FunctionKey -> samples anywhere on stack
+        self.samples = 0
+        self.missed = 0  # ticks where the target thread had exited
+        self.duration = 0.0
+
+    def add_stack(self, frames: List[FunctionKey]):
+        """Record one sample (frames ordered root first)"""
+        self.samples += 1
+        self.stacks[tuple(_frame_label(key) for key in frames)] += 1
+        if frames:
+            self.self_counts[frames[-1]] += 1
+        for key in set(frames):
+            self.total_counts[key] += 1
+
+    def collapsed(self) -> str:
+        """Collapsed stacks ("a;b;c 12" per line) for flamegraph.pl / speedscope"""
+        lines = [f"{';'.join(stack)} {count}" for stack, count in self.stacks.most_common()]
+        return '\n'.join(lines) + '\n' if lines else ''
+
+    def function_table(self, limit: int = 50) -> List[Dict]:
+        """
+        Per-function time, sorted by cumulative time
+
+        Returns:
+            List of dicts with self/cumulative sample counts, seconds and percentages
+        """
+        rows = []
+        for key, total in self.total_counts.most_common(limit):
+            function, filename, line = key
+            own = self.self_counts.get(key, 0)
+            rows.append({
+                'function': function,
+                'file': filename,
+                'line': line,
+                'self_samples': own,
+                'cumulative_samples': total,
+                'self_seconds': round(own * self.interval, 4),
+                'cumulative_seconds': round(total * self.interval, 4),
+                'self_percent': round(100.0 * own / self.samples, 1) if self.samples else 0.0,
+                'cumulative_percent': round(100.0 * total / self.samples, 1) if self.samples else 0.0
+            })
+        return rows
+
+    def to_dict(self, limit: int = 50) -> Dict:
+        return {
+            'samples': self.samples,
+            'missed': self.missed,
+            'interval_ms': round(self.interval * 1000, 3),
+            'duration_seconds': round(self.duration, 3),
+            'functions': self.function_table(limit),
+            'collapsed': self.collapsed()
+        }
+
+
+class SamplingProfiler:
+    """
+    Periodically samples the stacks of the given threads
+    """
+
+    def __init__(self, thread_ids: Iterable[int], interval: float = 0.005,
+                 max_depth: int = MAX_DEPTH):
+        """
+        Initialize profiler
+
+        Args:
+            thread_ids: Thread idents to sample (threading.Thread.ident)
+            interval: Seconds between samples
+            max_depth: Innermost frames kept per stack
+        """
+        self.thread_ids = set(thread_ids)
+        self.interval = max(float(interval), MIN_INTERVAL)
+        self.max_depth = max_depth
+
+    def run(self, duration: float) -> ProfileResult:
+        """
+        Sample for duration seconds on the calling thread
+
+        Raises:
+            ProfilerBusyError: If another profile is in progress
+        """
+        duration = min(max(float(duration), self.interval), MAX_DURATION)
+        if not _profile_lock.acquire(blocking=False):
+            raise ProfilerBusyError("A profile is already running")
+
+        result = ProfileResult(self.interval)
+        try:
+            start = time.perf_counter()
+            deadline = start + duration
+            next_tick = start
+            while True:
+                now = time.perf_counter()
+                if now >= deadline:
+                    break
+                if now < next_tick:
+                    time.sleep(next_tick - now)
+                next_tick += self.interval
+
+                frames = sys._current_frames()
+                for thread_id in self.thread_ids:
+                    frame = frames.get(thread_id)
+                    if frame is None:
+                        result.missed += 1
+                        continue
+                    result.add_stack(self._walk(frame))
+                del frames
+            result.duration = time.perf_counter() - start
+        finally:
+            _profile_lock.release()
+
+        logger.info("Profiled %d thread(s) for %.1fs: %d samples",
+                    len(self.thread_ids), result.duration, result.samples)
+        return result
+
+    def _walk(self, frame) -> List[FunctionKey]:
+        stack = []
+        while frame is not None and len(stack) < self.max_depth:
+            code = frame.f_code
+            stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+            frame = frame.f_back
+        stack.reverse()
+        return stack
+
+
+def _frame_label(key: FunctionKey) -> str:
+    function, filename, line = key
+    # Module-relative path keeps collapsed lines short
+    short = filename.replace('\\', '/').rsplit('/', 2)
+    return f"{function} ({'/'.join(short[-2:])}:{line})"
+
+
+def profile_threads(thread_ids: Iterable[int], duration: float,
+                    interval: float = 0.005) -> Optional[ProfileResult]:
+    """Convenience wrapper: sample thread_ids for duration seconds"""
+    thread_ids = [tid for tid in thread_ids if tid is not None]
+    if not thread_ids:
+        return None
+    return SamplingProfiler(thread_ids, interval=interval).run(duration)
@@ -0,0 +1,250 @@
+"""
+Shared Frame Store Module
+Per-camera ring of frame slots in shared memory (multiprocessing.shared_memory)
+so other processes - inference workers, recorders, the web server - can read
+frames without pickling or copying them.
+
+Layout of one camera's segment:
+
+    [global header 64B][slot 0 header 64B][slot 0 pixels]...[slot N-1 ...]
+
+Each slot header carries a sequence number used as a seqlock: it is odd
+while the single writer is filling the slot and even once the frame is
+complete. Readers check it before and after reading.
+"""
+
+import hashlib
+import re
+import time
+import logging
+from multiprocessing import shared_memory
+from typing import Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MAGIC = 0x41494559455346  # "AIEYESF"
+HEADER_BYTES = 64
+SLOT_HEADER_DTYPE = np.dtype([
+    ('seq', '<u8'),
+    ('frame_index', '<u8'),
+    ('timestamp', '<f8'),
+    ('height', '<u4'),
+    ('width', '<u4'),
+    ('channels', '<u4'),
+    ('nbytes', '<u4'),
+])
+# Global header: magic, slot count, slot capacity (bytes), frames written
+GLOBAL_HEADER_FIELDS = 4
+
+# Segments created by this process (their cleanup stays with the resource tracker)
+_owned_segments = set()
+
+
+def segment_name(camera_id: str) -> str:
+    """Shared memory name for a camera (short and filesystem-safe)"""
+    safe = re.sub(r'[^A-Za-z0-9_]', '_', str(camera_id))[:16]
+    digest = hashlib.sha1(str(camera_id).encode()).hexdigest()[:6]
+    return f"aieyes_{safe}_{digest}"
+
+
+class SharedFrame:
+    """A frame read from the store; image may be a zero-copy view into shared memory"""
+
+    __slots__ = ('image', 'frame_index', 'timestamp', 'seq', '_slot_header')
+
+    def __init__(self, image: np.ndarray, frame_index: int, timestamp: float, seq: int, slot_header):
+        self.image = image
+        self.frame_index = frame_index
+        self.timestamp = timestamp
+        self.seq = seq
+        self._slot_header = slot_header
+
+    def is_valid(self) -> bool:
+        """True while the slot has not been overwritten (check after using a view)"""
+        return self._slot_header is None or int(self._slot_header['seq']) == self.seq
+
+
+class _FrameRing:
+    """Common slot addressing for the writer and readers"""
+
+    def __init__(self, shm: shared_memory.SharedMemory):
+        self.shm = shm
+        self.header = np.ndarray((GLOBAL_HEADER_FIELDS,), dtype='<u8', buffer=shm.buf, offset=0)
+        if int(self.header[0]) not in (0, MAGIC):
+            raise ValueError(f"Shared memory {shm.name} is not a frame store")
+        self.slot_count = int(self.header[1])
+        self.slot_capacity = int(self.header[2])
+        self._slot_headers = []
+        self._slot_data = []
+        for i in range(self.slot_count):
+            offset = HEADER_BYTES + i * (HEADER_BYTES + self.slot_capacity)
+            self._slot_headers.append(
+                np.ndarray((), dtype=SLOT_HEADER_DTYPE, buffer=shm.buf, offset=offset))
+            self._slot_data.append(
+                np.ndarray((self.slot_capacity,), dtype=np.uint8, buffer=shm.buf, offset=offset + HEADER_BYTES))
+
+    @property
+    def frames_written(self) -> int:
+        return int(self.header[3])
+
+    def release(self):
+        # Views must be dropped before the segment can be closed
+        self.header = None
+        self._slot_headers = []
+        self._slot_data = []
+
+
+class SharedFrameStore(_FrameRing):
+    """
+    Writer side: owned by the capture thread of one camera
+    """
+
+    def __init__(self, camera_id: str, slots: int = 4,
+                 max_width: int = 1920, max_height: int = 1080, channels: int = 3):
+        """
+        Create the shared segment for a camera
+
+        Args:
+            camera_id: Camera identifier (readers attach with the same id)
+            slots: Ring size - readers holding a view have slots-1 frames before it is reused
+            max_width: Largest frame width accepted
+            max_height: Largest frame height accepted
+            channels: Channels per pixel
+        """
+        self.camera_id = camera_id
+        slot_capacity = max_width * max_height * channels
+        size = HEADER_BYTES + slots * (HEADER_BYTES + slot_capacity)
+        name = segment_name(camera_id)
+
+        try:
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # Left behind by a crashed process - recreate it
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+
+        header = np.ndarray((GLOBAL_HEADER_FIELDS,), dtype='<u8', buffer=shm.buf, offset=0)
+        header[:] = (MAGIC, slots, slot_capacity, 0)
+        del header
+        super().__init__(shm)
+        _owned_segments.add(shm.name)
+        self.stats = {'frames_written': 0, 'frames_rejected': 0}
+        logger.info("Shared frame store %s: %d slots x %.1f MB", shm.name, slots, slot_capacity / 1e6)
+
+    def write(self, frame: np.ndarray, frame_index: int = 0, timestamp: Optional[float] = None) -> bool:
+        """
+        Copy a frame into the next slot
+
+        Returns:
+            False if the frame does not fit a slot
+        """
+        if frame.dtype != np.uint8 or frame.nbytes > self.slot_capacity:
+            self.stats['frames_rejected'] += 1
+            return False
+
+        count = self.frames_written + 1
+        index = (count - 1) % self.slot_count
+        slot_header = self._slot_headers[index]
+        data = self._slot_data[index]
+
+        height, width = frame.shape[:2]
+        channels = frame.shape[2] if frame.ndim == 3 else 1
+
+        slot_header['seq'] = 2 * count - 1  # odd: write in progress
+        np.copyto(data[:frame.nbytes].reshape(frame.shape), frame)
+        slot_header['frame_index'] = frame_index
+        slot_header['timestamp'] = timestamp or time.time()
+        slot_header['height'] = height
+        slot_header['width'] = width
+        slot_header['channels'] = channels
+        slot_header['nbytes'] = frame.nbytes
+        slot_header['seq'] = 2 * count  # even: complete
+        self.header[3] = count
+
+        self.stats['frames_written'] += 1
+        return True
+
+    def close(self, unlink: bool = True):
+        """Detach, and remove the segment (owner only)"""
+        self.release()
+        self.shm.close()
+        if unlink:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+        _owned_segments.discard(self.shm.name)
+
+
+class SharedFrameReader(_FrameRing):
+    """
+    Reader side: attach to a camera's store from any process
+    """
+
+    def __init__(self, camera_id: str):
+        shm = shared_memory.SharedMemory(name=segment_name(camera_id))
+        if shm.name not in _owned_segments:
+            try:
+                # Attaching must not make this process responsible for unlinking
+                from multiprocessing import resource_tracker
+                resource_tracker.unregister(shm._name, 'shared_memory')
+            except Exception:
+                pass
+        super().__init__(shm)
+        self.camera_id = camera_id
+
+    def read_latest(self, copy: bool = False, retries: int = 3) -> Optional[SharedFrame]:
+        """
+        Read the newest complete frame
+
+        Args:
+            copy: Return a private copy instead of a zero-copy view
+            retries: Attempts when racing the writer
+
+        Returns:
+            SharedFrame or None if nothing has been written yet. With copy=False
+            the image is a view into shared memory; call is_valid() after using it.
+        """
+        for _ in range(retries):
+            count = self.frames_written
+            if count == 0:
+                return None
+            index = (count - 1) % self.slot_count
+            slot_header = self._slot_headers[index]
+
+            seq = int(slot_header['seq'])
+            if seq % 2 == 1:
+                continue  # writer is in this slot right now
+
+            height = int(slot_header['height'])
+            width = int(slot_header['width'])
+            channels = int(slot_header['channels'])
+            nbytes = int(slot_header['nbytes'])
+            frame_index = int(slot_header['frame_index'])
+            timestamp = float(slot_header['timestamp'])
+
+            shape = (height, width, channels) if channels > 1 else (height, width)
+            image = self._slot_data[index][:nbytes].reshape(shape)
+            if copy:
+                image = image.copy()
+
+            if int(slot_header['seq']) != seq:
+                continue  # overwritten while we read the header / copied
+            return SharedFrame(image, frame_index, timestamp, seq, None if copy else slot_header)
+        return None
+
+    def close(self):
+        self.release()
+        self.shm.close()
+
+
+def store_stats(stores: Dict[str, SharedFrameStore]) -> Dict[str, Dict]:
+    """Stats for a set of stores (for status APIs)"""
+    return {
+        camera_id: {**store.stats, 'segment': store.shm.name, 'slots': store.slot_count}
+        for camera_id, store in stores.items()
+    }
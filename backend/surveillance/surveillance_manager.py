@@ -16,6 +16,7 @@ from .detector import YOLOv9Detector
 from .tracker import PersonTracker
 from .face_recognition import LBPHFaceRecognizer
 from .activity_analyzer import SuspiciousActivityAnalyzer, SuspiciousActivity, DetectionZone, ActivityType
+from .metrics import metrics
 
 logger = logging.getLogger(__name__)
 
@@ -30,7 +31,8 @@ class SurveillanceManager:
                  camera_id: int = 0,
                  output_dir: str = "surveillance_output",
                  model_path: Optional[str] = None,
-                 known_faces_dir: str = "data/known_faces"):
+                 known_faces_dir: str = "data/known_faces",
+                 camera_name: Optional[str] = None):
         """
         Initialize surveillance manager
         
@@ -40,9 +42,12 @@ class SurveillanceManager:
             output_dir: Directory for saving outputs
             model_path: Path to YOLO model
             known_faces_dir: Directory with known face images
+            camera_name: Configured camera name used as the metrics label
+                (default: camera_<camera_id>; URLs may carry credentials)
         """
         self.camera_url = camera_url
         self.camera_id = camera_id
+        self.metrics_label = str(camera_name or f"camera_{camera_id}")
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
         
@@ -175,7 +180,8 @@ class SurveillanceManager:
                     self.frame_queue.put((frame, timestamp), block=False)
                 except queue.Full:
                     # Skip frame if queue is full
-                    pass
+                    metrics.inc('frames_dropped_total', camera=self.metrics_label, reason='queue_full')
+                metrics.set_gauge('frame_queue_depth', self.frame_queue.qsize(), camera=self.metrics_label)
                     
             except Exception as e:
                 logger.error(f"Frame capture error: {e}")
@@ -197,7 +203,8 @@ class SurveillanceManager:
                 start_time = time.time()
                 
                 # Process frame
-                result = self._process_single_frame(frame, timestamp)
+                with metrics.timer('total', self.metrics_label):
+                    result = self._process_single_frame(frame, timestamp)
                 
                 # Update statistics
                 self.stats['frames_processed'] += 1
@@ -215,6 +222,7 @@ class SurveillanceManager:
                     self.result_queue.put(result, block=False)
                 except queue.Full:
                     # Remove oldest result to make space
+                    metrics.inc('results_dropped_total', camera=self.metrics_label)
                     try:
                         self.result_queue.get(block=False)
                         self.result_queue.put(result, block=False)
@@ -256,8 +264,11 @@ class SurveillanceManager:
         }
         
         try:
+            camera = self.metrics_label
+            
             # 1. Object Detection
-            detections = self.detector.detect(frame)
+            with metrics.timer('yolo', camera):
+                detections = self.detector.detect(frame)
             result['detections'] = detections
             
             # Filter person detections for tracking
@@ -265,10 +276,13 @@ class SurveillanceManager:
             self.stats['persons_detected'] += len(person_detections)
             
             # 2. Person Tracking
-            tracks = self.tracker.update(frame, person_detections)
+            with metrics.timer('tracking', camera):
+                tracks = self.tracker.update(frame, person_detections, timestamp)
             result['tracks'] = tracks
             
-            # 3. Face Recognition for each track
+            # 3. Face Recognition: each track keeps its best face shots for its first seconds,
+            # is recognized once (one batched call + vote), and only again if its appearance changes
+            face_start = time.perf_counter()
             for track_id, track_state in tracks.items():
                 # Extract face region from track bounding box
                 bbox = track_state['bbox']
@@ -283,35 +297,39 @@ class SurveillanceManager:
                 
                 person_crop = frame[y1:y2, x1:x2]
                 
-                if person_crop.size > 0:
-                    # Detect faces in person crop
-                    face_results = self.face_recognizer.process_frame_faces(person_crop)
+                if person_crop.size == 0 or not self.tracker.needs_face_recognition(track_id, person_crop, timestamp):
+                    continue
+                
+                # Detect faces in person crop and offer them to the track's best-shot buffer
+                for face in self.face_recognizer.detect_face_crops(person_crop):
+                    face_bbox = face['bbox']
+                    global_face_bbox = [
+                        face_bbox[0] + x1,
+                        face_bbox[1] + y1,
+                        face_bbox[2] + x1,
+                        face_bbox[3] + y1
+                    ]
+                    self.tracker.add_face_crop(track_id, face['face_crop'], face['quality'], global_face_bbox, timestamp)
+                
+                if self.tracker.face_recognition_due(track_id, timestamp):
+                    face_results = self.face_recognizer.recognize_faces_batch(self.tracker.best_face_crops(track_id))
+                    best_face = self.tracker.resolve_identity(track_id, face_results, person_crop, timestamp)
                     
-                    if face_results:
-                        # Take the best face result
-                        best_face = max(face_results, key=lambda x: x['confidence'] if x['person_name'] != 'unknown' else 0)
-                        
-                        # Update track with face recognition results
+                    if best_face:
+                        # Update this frame's track copy with the decided identity
                         tracks[track_id]['identity'] = best_face['person_name']
                         tracks[track_id]['authorization_status'] = best_face['authorization_status']
                         tracks[track_id]['face_confidence'] = best_face['confidence']
                         
-                        # Adjust face bbox to global coordinates
-                        face_bbox = best_face['bbox']
-                        global_face_bbox = [
-                            face_bbox[0] + x1,
-                            face_bbox[1] + y1,
-                            face_bbox[2] + x1,
-                            face_bbox[3] + y1
-                        ]
-                        best_face['bbox'] = global_face_bbox
                         best_face['track_id'] = track_id
-                        
                         result['face_results'].append(best_face)
                         self.stats['faces_recognized'] += 1
             
+            metrics.observe('face_recognition', camera, time.perf_counter() - face_start)
+            
             # 4. Activity Analysis
-            activities = self.activity_analyzer.analyze_frame(detections, tracks, timestamp)
+            with metrics.timer('activity', camera):
+                activities = self.activity_analyzer.analyze_frame(detections, tracks, timestamp)
             result['activities'] = activities
             self.stats['activities_detected'] += len(activities)
             
@@ -324,7 +342,8 @@ class SurveillanceManager:
                         logger.error(f"Activity callback error: {e}")
             
             # 5. Create output frame with all visualizations
-            output_frame = self._create_output_frame(frame, detections, tracks, result['face_results'], activities)
+            with metrics.timer('annotate', camera):
+                output_frame = self._create_output_frame(frame, detections, tracks, result['face_results'], activities)
             result['output_frame'] = output_frame
             
         except Exception as e:
@@ -12,6 +12,27 @@ from collections import defaultdict
 
 logger = logging.getLogger(__name__)
 
+
+def appearance_signature(image: np.ndarray) -> np.ndarray:
+    """
+    Colour signature of a person crop (normalized hue/saturation histogram)
+    
+    Args:
+        image: BGR person crop
+        
+    Returns:
+        Histogram comparable with appearance_distance()
+    """
+    hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
+    hist = cv2.calcHist([hsv], [0, 1], None, [16, 16], [0, 180, 0, 256])
+    return cv2.normalize(hist, hist).flatten()
+
+
+def appearance_distance(signature1: np.ndarray, signature2: np.ndarray) -> float:
+    """Bhattacharyya distance between two appearance signatures (0 = same, 1 = disjoint)"""
+    return float(cv2.compareHist(signature1, signature2, cv2.HISTCMP_BHATTACHARYYA))
+
+
 class PersonTracker:
     """
     Track multiple persons across video frames using OpenCV trackers
@@ -22,7 +43,10 @@ class PersonTracker:
                  tracker_type: str = 'CSRT',
                  max_tracks: int = 50,
                  track_timeout: float = 5.0,
-                 min_track_length: int = 5):
+                 min_track_length: int = 5,
+                 face_buffer_size: int = 5,
+                 face_collect_seconds: float = 2.0,
+                 appearance_change_threshold: float = 0.5):
         """
         Initialize person tracker
         
@@ -31,11 +55,19 @@ class PersonTracker:
             max_tracks: Maximum number of simultaneous tracks
             track_timeout: Time in seconds before dropping inactive tracks
             min_track_length: Minimum number of frames to confirm a track
+            face_buffer_size: Best face shots kept per track for recognition (top-K by quality)
+            face_collect_seconds: How long a new track collects faces before it is recognized
+                with fewer than face_buffer_size shots
+            appearance_change_threshold: Appearance distance above which a recognized track
+                is re-evaluated (e.g. the tracker drifted to another person)
         """
         self.tracker_type = tracker_type
         self.max_tracks = max_tracks
         self.track_timeout = track_timeout
         self.min_track_length = min_track_length
+        self.face_buffer_size = face_buffer_size
+        self.face_collect_seconds = face_collect_seconds
+        self.appearance_change_threshold = appearance_change_threshold
         
         # Track management
         self.active_tracks = {}  # track_id -> tracker object
@@ -168,18 +200,21 @@ class PersonTracker:
         
         return matches
     
-    def update(self, frame: np.ndarray, detections: List[Dict]) -> Dict[int, Dict]:
+    def update(self, frame: np.ndarray, detections: List[Dict],
+               timestamp: Optional[float] = None) -> Dict[int, Dict]:
         """
         Update tracker with new frame and detections
         
         Args:
             frame: Current frame
             detections: List of person detections
+            timestamp: Capture time of the frame (defaults to now; replays pass the
+                frame's time so dwell and speed don't depend on processing speed)
             
         Returns:
             Dictionary of active tracks with states
         """
-        current_time = time.time()
+        current_time = timestamp if timestamp is not None else time.time()
         
         # Update existing trackers
         active_track_ids = list(self.active_tracks.keys())
@@ -287,13 +322,158 @@ class PersonTracker:
                 'center': ((x1 + x2) // 2, (y1 + y2) // 2),
                 'bbox': detection['bbox']
             }],
-            'face_crops': [],  # Store face crops for recognition
+            'face_crops': [],  # Best-shot buffer: top-K face crops by quality, recognized together
+            'face_collect_start': timestamp,
+            'appearance': None,  # Person appearance when the identity was decided
             'identity': 'unknown',  # Will be updated by face recognition
             'authorization_status': 'pending'  # pending, authorized, intruder
         }
         
         logger.info(f"Created new track {track_id}")
     
+    def add_face_crop(self, track_id: int, face_crop: np.ndarray, quality: float,
+                      face_bbox: Optional[List[int]] = None, timestamp: Optional[float] = None) -> bool:
+        """
+        Offer a face crop to a track's best-shot buffer
+        
+        Args:
+            track_id: Track ID
+            face_crop: Face crop image
+            quality: Quality score (higher is better)
+            face_bbox: Face bounding box in frame coordinates
+            timestamp: Capture time of the frame (defaults to now)
+            
+        Returns:
+            True if the crop is among the track's best face_buffer_size shots
+        """
+        state = self.track_states.get(track_id)
+        if state is None or state['authorization_status'] != 'pending':
+            return False
+        
+        crops = state['face_crops']
+        if len(crops) >= self.face_buffer_size and quality <= crops[-1]['quality']:
+            return False
+        
+        crops.append({'crop': face_crop, 'quality': float(quality), 'bbox': face_bbox,
+                      'timestamp': timestamp if timestamp is not None else time.time()})
+        crops.sort(key=lambda shot: shot['quality'], reverse=True)
+        del crops[self.face_buffer_size:]
+        return True
+    
+    def needs_face_recognition(self, track_id: int, person_crop: Optional[np.ndarray] = None,
+                               current_time: Optional[float] = None) -> bool:
+        """
+        Check whether a track still wants face crops
+        
+        A track collects faces until its identity is decided, and starts over only
+        when the person's appearance changes.
+        
+        Args:
+            track_id: Track ID
+            person_crop: Current person crop (compared with the appearance at decision time)
+            current_time: Current timestamp (starts a new collection window on a change)
+            
+        Returns:
+            True if faces should be detected and offered with add_face_crop()
+        """
+        state = self.track_states.get(track_id)
+        if state is None:
+            return False
+        if state['authorization_status'] == 'pending':
+            return True
+        if person_crop is None or person_crop.size == 0 or state['appearance'] is None:
+            return False
+        
+        distance = appearance_distance(state['appearance'], appearance_signature(person_crop))
+        if distance <= self.appearance_change_threshold:
+            return False
+        
+        logger.info(f"Track {track_id} appearance changed ({distance:.2f}), re-evaluating identity")
+        self._reset_identity(state, current_time if current_time is not None else time.time())
+        return True
+    
+    def face_recognition_due(self, track_id: int, current_time: Optional[float] = None) -> bool:
+        """
+        Check whether a track's best shots should be recognized now
+        
+        Args:
+            track_id: Track ID
+            current_time: Current timestamp
+            
+        Returns:
+            True when the buffer is full, or the collection window ended with at least one face
+        """
+        state = self.track_states.get(track_id)
+        if state is None or state['authorization_status'] != 'pending' or not state['face_crops']:
+            return False
+        current_time = current_time if current_time is not None else time.time()
+        return (len(state['face_crops']) >= self.face_buffer_size or
+                current_time - state['face_collect_start'] >= self.face_collect_seconds)
+    
+    def best_face_crops(self, track_id: int) -> List[np.ndarray]:
+        """
+        Get a track's buffered face crops, best first
+        
+        Args:
+            track_id: Track ID
+            
+        Returns:
+            Face crop images
+        """
+        state = self.track_states.get(track_id)
+        return [shot['crop'] for shot in state['face_crops']] if state else []
+    
+    def resolve_identity(self, track_id: int, face_results: List[Dict],
+                         person_crop: Optional[np.ndarray] = None,
+                         current_time: Optional[float] = None) -> Optional[Dict]:
+        """
+        Decide a track's identity by majority vote over its best shots
+        
+        Args:
+            track_id: Track ID
+            face_results: Recognition result per crop of best_face_crops(), with
+                person_name, confidence and authorization_status
+            person_crop: Current person crop (kept to detect appearance changes)
+            current_time: Current timestamp (starts a new collection window if nothing was recognized)
+            
+        Returns:
+            Winning result (best-quality shot of the winner) with votes and bbox, or None
+        """
+        state = self.track_states.get(track_id)
+        if state is None:
+            return None
+        shots = state['face_crops']
+        if not face_results:
+            self._reset_identity(state, current_time if current_time is not None else time.time())
+            return None
+        
+        votes = {}
+        for shot, result in zip(shots, face_results):
+            votes.setdefault(result['person_name'], []).append({**result, 'bbox': shot['bbox']})
+        
+        # Most votes wins; a tie never authorizes (split votes count as an intruder)
+        _, winners = max(votes.items(), key=lambda item: (len(item[1]), item[1][0]['authorization_status'] != 'authorized'))
+        best = dict(winners[0], votes={name: len(results) for name, results in votes.items()})
+        
+        state['identity'] = best['person_name']
+        state['authorization_status'] = best['authorization_status']
+        state['face_confidence'] = best['confidence']
+        state['face_votes'] = best['votes']
+        state['appearance'] = (appearance_signature(person_crop)
+                               if person_crop is not None and person_crop.size > 0 else None)
+        state['face_crops'] = []  # decided; free the crops
+        
+        logger.info(f"Track {track_id} identified as {best['person_name']} ({best['authorization_status']}, votes {best['votes']})")
+        return best
+    
+    def _reset_identity(self, state: Dict, timestamp: float):
+        """Send a track back to collecting face shots"""
+        state['face_crops'] = []
+        state['face_collect_start'] = timestamp
+        state['appearance'] = None
+        state['identity'] = 'unknown'
+        state['authorization_status'] = 'pending'
+    
     def _remove_track(self, track_id: int):
         """
         Remove track from active tracking
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Test Async Camera Scanner
+Scan fake local camera servers and check results stream back
+"""
+
+import asyncio
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.async_camera_scanner import AsyncCameraScanner
+
+
+class FakeCameraHandler(BaseHTTPRequestHandler):
+    """Answers HEAD /video like the IP Webcam app (and / with its HTML UI)"""
+    protocol_version = 'HTTP/1.1'
+    video_delay = 0.0
+
+    def do_HEAD(self):
+        if self.path == '/video':
+            time.sleep(self.video_delay)
+        self.send_response(200 if self.path in ('/video', '/') else 404)
+        self.send_header('Content-Type', 'multipart/x-mixed-replace; boundary=frame')
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _start_fake_camera(video_delay=0.0):
+    handler = type('DelayedCameraHandler', (FakeCameraHandler,), {'video_delay': video_delay})
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _closed_port():
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+def test_scan_finds_fake_camera():
+    """A fake IP Webcam is found and reported with the usual camera fields"""
+    server = _start_fake_camera()
+    port = server.server_address[1]
+    try:
+        scanner = AsyncCameraScanner(timeout=1.0, probes=[
+            ('rtsp', _closed_port(), None),
+            ('ip_webcam', port, '/video'),
+        ])
+        found = []
+        cameras = scanner.scan_sync(['127.0.0.1'], on_camera=found.append)
+
+        assert len(cameras) == 1
+        assert found == cameras
+        camera = cameras[0]
+        assert camera['type'] == 'ip_webcam'
+        assert camera['url'] == f'http://127.0.0.1:{port}/video'
+        assert camera['id'] == f'camera_127_0_0_1_{port}'
+    finally:
+        server.shutdown()
+
+
+def test_higher_priority_probe_wins():
+    """When the stream and the HTML UI both answer, the stream is kept even if it answers last"""
+    server = _start_fake_camera(video_delay=0.3)
+    port = server.server_address[1]
+    try:
+        scanner = AsyncCameraScanner(timeout=2.0, probes=[
+            ('ip_webcam', port, '/video'),
+            ('http', port, '/'),
+        ])
+        for _ in range(3):
+            cameras = scanner.scan_sync(['127.0.0.1'])
+            assert [c['url'] for c in cameras] == [f'http://127.0.0.1:{port}/video']
+
+        # A lower-ranked hit is used once the higher-ranked probes fail
+        scanner = AsyncCameraScanner(timeout=2.0, probes=[
+            ('ip_webcam', port, '/missing'),
+            ('http', port, '/'),
+        ])
+        cameras = scanner.scan_sync(['127.0.0.1'])
+        assert [c['type'] for c in cameras] == ['http']
+    finally:
+        server.shutdown()
+
+
+def test_scan_excludes_and_misses():
+    """Excluded hosts and closed ports produce no results"""
+    server = _start_fake_camera()
+    port = server.server_address[1]
+    try:
+        scanner = AsyncCameraScanner(timeout=1.0, probes=[('ip_webcam', port, '/video')],
+                                     exclude={'127.0.0.1'})
+        assert scanner.scan_sync(['127.0.0.1']) == []
+
+        scanner = AsyncCameraScanner(timeout=1.0, probes=[('ip_webcam', port, '/missing')])
+        assert scanner.scan_sync(['127.0.0.1']) == []
+    finally:
+        server.shutdown()
+
+
+def test_scan_streams_many_hosts():
+    """Many hosts are probed concurrently and results arrive as an async stream"""
+    server = _start_fake_camera()
+    port = server.server_address[1]
+    try:
+        scanner = AsyncCameraScanner(max_concurrency=32, timeout=1.0,
+                                     probes=[('ip_webcam', port, '/video')])
+        hosts = [f'127.0.0.{i}' for i in range(1, 65)]
+
+        async def collect():
+            return [camera async for camera in scanner.scan(hosts)]
+
+        started = time.time()
+        cameras = asyncio.run(collect())
+        elapsed = time.time() - started
+
+        # Only 127.0.0.1 answers (the server is bound to it)
+        assert [c['ip'] for c in cameras] == ['127.0.0.1']
+        assert scanner.hosts_scanned == len(hosts)
+        assert elapsed < 5.0
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    test_scan_finds_fake_camera()
+    test_higher_priority_probe_wins()
+    test_scan_excludes_and_misses()
+    test_scan_streams_many_hosts()
+    print("✅ All async camera scanner tests passed")
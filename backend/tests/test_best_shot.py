@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Test Best-Shot Face Selection
+Tracks keep their top-K face crops, are recognized once by vote, and are
+only re-evaluated when their appearance changes
+"""
+
+import importlib.util
+from pathlib import Path
+
+import numpy as np
+
+# Load the module directly (the surveillance package imports torch)
+_spec = importlib.util.spec_from_file_location(
+    "tracker", Path(__file__).parent.parent / "surveillance" / "tracker.py")
+tracker_module = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(tracker_module)
+
+
+class _StillTracker:
+    """OpenCV tracker stand-in that reports the initial box on every frame"""
+
+    def init(self, frame, bbox):
+        self.bbox = bbox
+        return True
+
+    def update(self, frame):
+        return True, self.bbox
+
+
+def _tracker(**kwargs):
+    tracker = tracker_module.PersonTracker(min_track_length=1, **kwargs)
+    tracker._create_tracker = _StillTracker
+    return tracker
+
+
+def _start_track(tracker):
+    frame = np.zeros((240, 320, 3), dtype=np.uint8)
+    tracker.update(frame, [{'bbox': [50, 50, 150, 230], 'confidence': 0.9}])
+    return next(iter(tracker.track_states))
+
+
+def _person(color):
+    crop = np.zeros((180, 100, 3), dtype=np.uint8)
+    crop[:90] = color
+    crop[90:] = (40, 40, 40)
+    return crop
+
+
+def _result(name):
+    status = 'intruder' if name == 'unknown' else 'authorized'
+    return {'person_name': name, 'confidence': 50.0, 'authorization_status': status}
+
+
+def test_buffer_keeps_top_k_by_quality():
+    tracker = _tracker(face_buffer_size=3)
+    track_id = _start_track(tracker)
+    for quality in [5, 50, 1, 30, 40, 10]:
+        tracker.add_face_crop(track_id, np.full((4, 4), quality, dtype=np.uint8), quality)
+    shots = tracker.best_face_crops(track_id)
+    assert [int(shot[0, 0]) for shot in shots] == [50, 40, 30]
+    assert not tracker.add_face_crop(track_id, np.zeros((4, 4), dtype=np.uint8), 20)
+
+
+def test_recognition_due_when_full_or_window_ends():
+    tracker = _tracker(face_buffer_size=3, face_collect_seconds=2.0)
+    track_id = _start_track(tracker)
+    start = tracker.track_states[track_id]['face_collect_start']
+    assert not tracker.face_recognition_due(track_id, start + 10)  # no faces yet
+    tracker.add_face_crop(track_id, np.zeros((4, 4), dtype=np.uint8), 10)
+    assert not tracker.face_recognition_due(track_id, start + 1)
+    assert tracker.face_recognition_due(track_id, start + 2.5)
+    tracker.add_face_crop(track_id, np.zeros((4, 4), dtype=np.uint8), 20)
+    tracker.add_face_crop(track_id, np.zeros((4, 4), dtype=np.uint8), 30)
+    assert tracker.face_recognition_due(track_id, start)
+
+
+def test_vote_decides_identity_once():
+    tracker = _tracker(face_buffer_size=3)
+    track_id = _start_track(tracker)
+    for quality in [30, 20, 10]:
+        tracker.add_face_crop(track_id, np.zeros((4, 4), dtype=np.uint8), quality, [1, 2, 3, 4])
+    person = _person((0, 0, 200))
+    best = tracker.resolve_identity(track_id, [_result('alice'), _result('unknown'), _result('alice')], person)
+
+    assert best['person_name'] == 'alice'
+    assert best['votes'] == {'alice': 2, 'unknown': 1}
+    assert best['bbox'] == [1, 2, 3, 4]
+    state = tracker.track_states[track_id]
+    assert state['authorization_status'] == 'authorized'
+    assert state['face_crops'] == []
+    # Same person in later frames: no more face work
+    assert not tracker.needs_face_recognition(track_id, person)
+    assert not tracker.add_face_crop(track_id, np.zeros((4, 4), dtype=np.uint8), 99)
+
+
+def test_split_vote_never_authorizes():
+    tracker = _tracker(face_buffer_size=2)
+    track_id = _start_track(tracker)
+    tracker.add_face_crop(track_id, np.zeros((4, 4), dtype=np.uint8), 20)
+    tracker.add_face_crop(track_id, np.zeros((4, 4), dtype=np.uint8), 10)
+    best = tracker.resolve_identity(track_id, [_result('alice'), _result('unknown')])
+    assert best['authorization_status'] == 'intruder'
+
+
+def test_appearance_change_reopens_track():
+    tracker = _tracker(face_buffer_size=1)
+    track_id = _start_track(tracker)
+    tracker.add_face_crop(track_id, np.zeros((4, 4), dtype=np.uint8), 10)
+    tracker.resolve_identity(track_id, [_result('alice')], _person((0, 0, 200)))
+
+    assert tracker.needs_face_recognition(track_id, _person((200, 0, 0)))
+    state = tracker.track_states[track_id]
+    assert state['authorization_status'] == 'pending'
+    assert state['identity'] == 'unknown'
+    assert tracker.add_face_crop(track_id, np.zeros((4, 4), dtype=np.uint8), 10)
+
+
+def test_frame_timestamps_drive_tracking():
+    """Replayed frames carry their own capture times; wall-clock time is never mixed in"""
+    tracker = _tracker(face_buffer_size=3, face_collect_seconds=2.0, track_timeout=5.0)
+    frame = np.zeros((240, 320, 3), dtype=np.uint8)
+    person = {'bbox': [50, 50, 150, 230], 'confidence': 0.9}
+    tracker.update(frame, [person], timestamp=1000.0)
+    track_id = next(iter(tracker.track_states))
+    state = tracker.track_states[track_id]
+    assert state['created_time'] == 1000.0 and state['face_collect_start'] == 1000.0
+
+    tracker.update(frame, [person], timestamp=1001.5)
+    assert [h['timestamp'] for h in state['position_history']] == [1000.0, 1001.5]
+    tracker.add_face_crop(track_id, np.zeros((4, 4), dtype=np.uint8), 10, timestamp=1001.5)
+    assert not tracker.face_recognition_due(track_id, 1001.5)
+    assert tracker.face_recognition_due(track_id, 1002.0)
+
+    # A track nothing updates for track_timeout seconds of frame time is dropped
+    tracker._create_tracker = lambda: None
+    tracker.active_tracks.clear()  # the OpenCV tracker lost the person
+    tracker.update(frame, [], timestamp=1010.0)
+    assert track_id not in tracker.track_states
+
+
+if __name__ == "__main__":
+    test_buffer_keeps_top_k_by_quality()
+    test_recognition_due_when_full_or_window_ends()
+    test_vote_decides_identity_once()
+    test_split_vote_never_authorizes()
+    test_appearance_change_reopens_track()
+    test_frame_timestamps_drive_tracking()
+    print("✅ All best-shot tests passed")
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Test Discovered Camera Storage
+Legacy documents (ObjectId ids, duplicates per ip:port) load, save back and
+migrate onto one document per camera
+"""
+
+import importlib
+import sys
+from pathlib import Path
+
+import pytest
+from bson import ObjectId
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import database.config
+from database.config import DISCOVERED_CAMERAS_COLLECTION, migrate_discovered_cameras
+
+
+class RecordedUpdateOne:
+    """Stands in for pymongo.UpdateOne so the fake collection can apply the operation"""
+
+    def __init__(self, filter, update, upsert=False):
+        self.filter = filter
+        self.update = update
+        self.upsert = upsert
+
+
+class FakeCollection:
+    """The slice of a pymongo collection used by discovery and the migration"""
+
+    def __init__(self, docs):
+        self.docs = [dict(doc) for doc in docs]
+        self.bulk_writes = []  # (operations, ordered) per bulk_write call
+
+    def find(self):
+        return [dict(doc) for doc in self.docs]
+
+    def _matches(self, doc, query):
+        for key, value in query.items():
+            if isinstance(value, dict) and '$in' in value:
+                if doc.get(key) not in value['$in']:
+                    return False
+            elif doc.get(key) != value:
+                return False
+        return True
+
+    def update_one(self, query, update, upsert=False):
+        for doc in self.docs:
+            if self._matches(doc, query):
+                doc.update(update['$set'])
+                return
+        if upsert:
+            self.docs.append({'_id': ObjectId(), **query, **update['$set']})
+
+    def delete_many(self, query):
+        self.docs = [doc for doc in self.docs if not self._matches(doc, query)]
+
+    def bulk_write(self, operations, ordered=True):
+        self.bulk_writes.append((list(operations), ordered))
+        before = len(self.docs)
+        for op in operations:
+            self.update_one(op.filter, op.update, upsert=op.upsert)
+        return type('BulkWriteResult', (), {'upserted_count': len(self.docs) - before})()
+
+
+def _legacy_docs():
+    """One camera saved three times by the old delete-all / insert-all save, plus a second camera"""
+    return [
+        {'_id': ObjectId(), 'ip': '192.168.1.20', 'port': 8080, 'name': 'IP Webcam 192.168.1.20',
+         'discovered_at': '2024-01-01T10:00:00', 'last_seen': '2024-01-01T10:00:00'},
+        {'_id': ObjectId(), 'id': str(ObjectId()), 'ip': '192.168.1.20', 'port': 8080, 'name': 'Front door',
+         'discovered_at': '2024-01-02T10:00:00', 'last_seen': '2024-03-01T10:00:00'},
+        {'_id': ObjectId(), 'id': str(ObjectId()), 'ip': '192.168.1.20', 'port': 8080, 'name': 'old',
+         'discovered_at': '2024-01-03T10:00:00', 'last_seen': '2024-02-01T10:00:00'},
+        {'_id': ObjectId(), 'id': 'camera_192_168_1_30_554', 'ip': '192.168.1.30', 'port': 554,
+         'name': 'Garage', 'discovered_at': '2024-01-05T10:00:00', 'last_seen': '2024-01-05T10:00:00'},
+    ]
+
+
+@pytest.fixture
+def discovery_factory(monkeypatch):
+    """CameraDiscovery instances backed by a FakeCollection (patches are undone after each test)"""
+    real_get_database = database.config.get_database
+    # The module-level CameraDiscovery() would otherwise try to reach MongoDB on first import
+    monkeypatch.setattr(database.config, 'get_database', lambda: None)
+    camera_discovery = importlib.import_module('app.services.camera_discovery')
+    if camera_discovery.get_database is not real_get_database:
+        camera_discovery.get_database = real_get_database  # bound to the stub by the first import
+
+    def factory(collection):
+        monkeypatch.setattr(camera_discovery, 'get_database',
+                            lambda: {DISCOVERED_CAMERAS_COLLECTION: collection})
+        monkeypatch.setattr(camera_discovery, 'UpdateOne', RecordedUpdateOne)
+        return camera_discovery.CameraDiscovery()
+
+    return factory
+
+
+def test_load_keys_legacy_documents_by_ip_port(discovery_factory):
+    discovery = discovery_factory(FakeCollection(_legacy_docs()))
+    cameras = {c['id']: c for c in discovery.discovered_cameras}
+    assert sorted(cameras) == ['camera_192_168_1_20_8080', 'camera_192_168_1_30_554']
+    assert cameras['camera_192_168_1_20_8080']['name'] == 'Front door'  # most recently seen
+    assert all('_id' not in c for c in discovery.discovered_cameras)
+
+
+def test_save_round_trip_does_not_duplicate(discovery_factory):
+    collection = FakeCollection(_legacy_docs())
+    migrate_discovered_cameras(collection)
+    discovery = discovery_factory(collection)
+    discovery.save_discovered_cameras()
+    discovery.save_discovered_cameras()
+    assert len(collection.docs) == 2
+
+    # Each save is one unordered bulk write of id-keyed upserts, one per camera
+    assert len(collection.bulk_writes) == 2
+    operations, ordered = collection.bulk_writes[-1]
+    assert not ordered
+    assert sorted(op.filter['id'] for op in operations) == sorted(c['id'] for c in discovery.discovered_cameras)
+    assert all(op.upsert and op.update['$set']['id'] == op.filter['id'] for op in operations)
+
+    reloaded = discovery_factory(collection)
+    assert sorted(c['id'] for c in reloaded.discovered_cameras) == sorted(
+        c['id'] for c in discovery.discovered_cameras)
+
+
+def test_migration_dedupes_and_is_idempotent():
+    collection = FakeCollection(_legacy_docs())
+    assert migrate_discovered_cameras(collection) == 2
+
+    docs = {doc['id']: doc for doc in collection.docs}
+    assert len(collection.docs) == 2 and len(docs) == 2  # unique 'id' index can now be built
+    front = docs['camera_192_168_1_20_8080']
+    assert front['name'] == 'Front door'
+    assert front['discovered_at'] == '2024-01-01T10:00:00'  # earliest discovery kept
+
+    snapshot = [dict(doc) for doc in collection.docs]
+    assert migrate_discovered_cameras(collection) == 0
+    assert collection.docs == snapshot
+
+
+def test_new_scan_updates_migrated_camera(discovery_factory):
+    collection = FakeCollection(_legacy_docs())
+    migrate_discovered_cameras(collection)
+    discovery = discovery_factory(collection)
+    scanned = {'id': 'camera_192_168_1_20_8080', 'ip': '192.168.1.20', 'port': 8080,
+               'name': 'IP Webcam 192.168.1.20', 'last_seen': '2024-04-01T10:00:00',
+               'discovered_at': '2024-04-01T10:00:00'}
+    discovery.save_discovered_cameras([discovery._merge_camera(scanned)])
+    assert len(collection.docs) == 2
+    front = next(doc for doc in collection.docs if doc['id'] == scanned['id'])
+    assert front['last_seen'] == '2024-04-01T10:00:00'
+    assert front['discovered_at'] == '2024-01-01T10:00:00'
+
+
+if __name__ == "__main__":
+    # The discovery tests need pytest's monkeypatch fixture
+    if pytest.main([__file__, "-q"]) == 0:
+        print("✅ All camera discovery tests passed")
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Test Camera Prober
+Parallel liveness checks against local fake cameras
+"""
+
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.camera_prober import CameraProber
+
+
+class FakeCameraHandler(BaseHTTPRequestHandler):
+    """/video answers at once, /delay after 0.4 seconds, /slow hangs for 2 seconds"""
+    protocol_version = 'HTTP/1.1'
+
+    def do_HEAD(self):
+        if self.path == '/slow':
+            time.sleep(2)
+        elif self.path.startswith('/delay'):
+            time.sleep(0.4)
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _closed_port():
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+def test_probe_many_parallel_with_deadline():
+    """Online, offline and slow cameras are checked together within the deadline"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeCameraHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+
+    online = f'http://127.0.0.1:{port}/video'
+    offline = f'http://127.0.0.1:{_closed_port()}/video'
+    slow = f'http://127.0.0.1:{port}/slow'
+
+    try:
+        prober = CameraProber(max_workers=4, timeout=5.0, cache_ttl=30.0)
+        started = time.time()
+        results = prober.probe_many([online, offline, slow], deadline=0.5)
+        elapsed = time.time() - started
+
+        assert elapsed < 1.5
+        assert results[online]['online'] and results[online]['latency_ms'] >= 0
+        assert not results[offline]['online']
+        assert results[slow]['error'] == 'deadline'
+
+        # Fresh results are served from the cache
+        assert prober.get_cached(online) is not None
+        again = prober.probe_many([online])
+        assert again[online]['checked_at'] == results[online]['checked_at']
+        prober.shutdown()
+    finally:
+        server.shutdown()
+
+
+def test_default_deadline_covers_queued_probes():
+    """More cameras than workers: queued probes still finish within the default deadline"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeCameraHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+    urls = [f'http://127.0.0.1:{port}/delay?camera={i}' for i in range(8)]
+
+    try:
+        # Four rounds of 0.4 s take longer than one probe timeout + 1s
+        prober = CameraProber(max_workers=2, timeout=0.5, cache_ttl=0.0)
+        results = prober.probe_many(urls)
+        assert all(results[url]['online'] for url in urls)
+        assert all(results[url]['error'] is None for url in urls)
+        prober.shutdown()
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    test_probe_many_parallel_with_deadline()
+    test_default_deadline_covers_queued_probes()
+    print("✅ All camera prober tests passed")
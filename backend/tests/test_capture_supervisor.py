@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Test Capture Supervisor
+Backoff, circuit breaker and probe-before-open behaviour
+"""
+
+import importlib.util
+import time
+from pathlib import Path
+
+# Load the module directly (surveillance/__init__ pulls in the YOLO detector)
+_spec = importlib.util.spec_from_file_location(
+    "capture_supervisor", Path(__file__).parent.parent / "surveillance" / "capture_supervisor.py")
+capture_supervisor = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(capture_supervisor)
+
+
+class FakeSource:
+    def __init__(self, opened):
+        self.opened = opened
+
+    def isOpened(self):
+        return self.opened
+
+    def release(self):
+        pass
+
+
+def test_backoff_then_connect():
+    """Failed opens back off, then the first good open closes the circuit"""
+    attempts = []
+
+    def opener(url):
+        attempts.append(time.time())
+        return FakeSource(len(attempts) >= 3)
+
+    supervisor = capture_supervisor.CaptureSupervisor(
+        'cam1', 'http://cam1/video', opener, base_delay=0.05, jitter=0.0, failure_threshold=10)
+    source = supervisor.connect()
+
+    assert source is not None and len(attempts) == 3
+    # Second wait is twice the first
+    assert attempts[1] - attempts[0] >= 0.045
+    assert attempts[2] - attempts[1] >= 0.09
+    health = supervisor.get_health()
+    assert health['state'] == capture_supervisor.CIRCUIT_CLOSED and health['connected']
+
+
+def test_circuit_opens_and_probes_first():
+    """A dead camera is parked; while parked no decoder is opened"""
+    opened = []
+    probes = []
+
+    supervisor = capture_supervisor.CaptureSupervisor(
+        'cam2', 'http://cam2/video',
+        opener=lambda url: opened.append(url) or FakeSource(True),
+        probe=lambda url: probes.append(url) or len(probes) > 3,
+        base_delay=0.01, jitter=0.0, failure_threshold=3, open_seconds=0.3)
+
+    started = time.time()
+    source = supervisor.connect()
+
+    assert source is not None
+    # Three failed probes opened the circuit, the half-open probe succeeded
+    assert len(probes) == 4 and len(opened) == 1
+    assert time.time() - started >= 0.3
+    # Half-open until the first frame proves the stream works
+    assert supervisor.state == capture_supervisor.CIRCUIT_HALF_OPEN
+    supervisor.mark_frame()
+    assert supervisor.state == capture_supervisor.CIRCUIT_CLOSED
+    assert supervisor.consecutive_failures == 0
+
+
+def test_connect_aborts_when_stopped():
+    """connect() returns None when the camera is stopped while waiting"""
+    supervisor = capture_supervisor.CaptureSupervisor(
+        'cam3', 'rtsp://cam3/stream', lambda url: FakeSource(False),
+        base_delay=10.0, jitter=0.0)
+    deadline = time.time() + 0.3
+    assert supervisor.connect(lambda: time.time() < deadline) is None
+    assert supervisor.get_health()['consecutive_failures'] == 1
+
+
+def test_opens_but_never_reads():
+    """A camera that accepts the connection but sends no frames keeps backing off and gets parked"""
+    opened = []
+    supervisor = capture_supervisor.CaptureSupervisor(
+        'cam4', 'http://cam4/video', lambda url: opened.append(url) or FakeSource(True),
+        base_delay=0.01, jitter=0.0, failure_threshold=3, open_seconds=60.0)
+
+    for attempt in range(1, 4):
+        assert supervisor.connect() is not None
+        assert supervisor.get_health()['connected'] and not supervisor.get_health()['streaming']
+        supervisor.record_failure('read failed')
+        assert supervisor.consecutive_failures == attempt
+
+    # Opens never reset the count, so the third read failure parks the camera
+    assert len(opened) == 3
+    assert supervisor.state == capture_supervisor.CIRCUIT_OPEN
+    assert supervisor.get_health()['next_attempt_in'] > 50
+
+
+def test_first_frame_resets_backoff():
+    """Only a frame read after the open clears the failure count"""
+    supervisor = capture_supervisor.CaptureSupervisor(
+        'cam5', 'http://cam5/video', lambda url: FakeSource(True),
+        base_delay=0.01, jitter=0.0, failure_threshold=10)
+    supervisor.record_failure('read failed')
+    supervisor.record_failure('read failed')
+    assert supervisor.connect() is not None
+    assert supervisor.consecutive_failures == 2
+
+    supervisor.mark_frame()
+    health = supervisor.get_health()
+    assert health['consecutive_failures'] == 0 and health['streaming']
+    assert health['reconnects'] == 1
+    supervisor.mark_frame()
+    assert supervisor.reconnects == 1
+
+
+if __name__ == "__main__":
+    test_backoff_then_connect()
+    test_circuit_opens_and_probes_first()
+    test_connect_aborts_when_stopped()
+    test_opens_but_never_reads()
+    test_first_frame_resets_backoff()
+    print("✅ All capture supervisor tests passed")
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test Detector Pool
+Detectors are never used by two threads at once; waits are measured
+"""
+
+import importlib.util
+import threading
+import time
+from pathlib import Path
+
+# Load the module directly (the face recognition package needs TensorFlow)
+_spec = importlib.util.spec_from_file_location(
+    "detector_pool", Path(__file__).parent.parent / "ai_models" / "face_recognition" / "detector_pool.py")
+detector_pool = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(detector_pool)
+
+
+class _FakeDetection:
+    """Fails if process() is entered concurrently, like a MediaPipe graph would misbehave"""
+
+    def __init__(self):
+        self.busy = threading.Lock()
+        self.calls = 0
+        self.closed = False
+
+    def process(self, image):
+        assert self.busy.acquire(blocking=False), "detector used concurrently"
+        try:
+            time.sleep(0.01)
+            self.calls += 1
+        finally:
+            self.busy.release()
+
+    def close(self):
+        self.closed = True
+
+
+def test_exclusive_checkout_and_wait_metrics():
+    """8 threads share 3 detectors safely; waits are counted and observed"""
+    created, waits = [], []
+
+    def factory():
+        created.append(_FakeDetection())
+        return created[-1]
+
+    pool = detector_pool.DetectorPool(factory, size=3, wait_observer=waits.append)
+
+    def worker():
+        for _ in range(10):
+            with pool.checkout() as detection:
+                detection.process(None)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    stats = pool.get_stats()
+    assert len(created) == 3 and stats['created'] == 3
+    assert sum(d.calls for d in created) == 80
+    assert stats['checkouts'] == 80 and stats['in_use'] == 0
+    assert stats['waits'] > 0 and stats['wait_seconds_total'] > 0
+    assert len(waits) == 80 and max(waits) == stats['max_wait_seconds']
+
+    pool.close()
+    assert all(d.closed for d in created) and pool.get_stats()['created'] == 0
+
+
+def test_lazy_creation_and_timeout():
+    """Detectors are created only when needed; a full pool times out"""
+    pool = detector_pool.DetectorPool(_FakeDetection, size=1)
+    assert pool.get_stats()['created'] == 0
+    with pool.checkout():
+        try:
+            with pool.checkout(timeout=0.05):
+                assert False, "second checkout should time out"
+        except TimeoutError:
+            pass
+    with pool.checkout(timeout=0.05):
+        pass
+    assert pool.get_stats()['created'] == 1
+
+
+if __name__ == "__main__":
+    test_exclusive_checkout_and_wait_metrics()
+    test_lazy_creation_and_timeout()
+    print("✅ All detector pool tests passed")
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Test Embedding Cache
+Embeddings are reused by image content and invalidated by backbone version
+"""
+
+import importlib.util
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Load the module directly (the face recognition package needs TensorFlow)
+_spec = importlib.util.spec_from_file_location(
+    "embedding_cache", Path(__file__).parent.parent / "ai_models" / "face_recognition" / "embedding_cache.py")
+embedding_cache = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(embedding_cache)
+
+
+def test_roundtrip_and_backbone_versions():
+    """Vectors survive reopening; another backbone version sees nothing"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "cache.sqlite3"
+        digest = embedding_cache.image_hash(b"fake jpeg bytes")
+        vector = np.arange(1280, dtype=np.float32)
+
+        cache = embedding_cache.EmbeddingCache(path, "mobilenet_v2-a")
+        assert cache.get(digest) == {}
+        cache.put_many(digest, {'original': vector, 'flip': vector * 2, 'bright_1.2_10': None})
+        cache.close()
+
+        cache = embedding_cache.EmbeddingCache(path, "mobilenet_v2-a")
+        cached = cache.get(digest)
+        assert set(cached) == {'original', 'flip', 'bright_1.2_10'}
+        assert np.array_equal(cached['flip'], vector * 2)
+        assert cached['bright_1.2_10'] is None
+        cache.close()
+
+        other = embedding_cache.EmbeddingCache(path, "mobilenet_v2-b")
+        assert other.get(digest) == {}
+        other.close()
+
+
+def test_prune_removes_deleted_images_and_old_versions():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "cache.sqlite3"
+        old = embedding_cache.EmbeddingCache(path, "v1")
+        old.put_many("kept", {'original': np.ones(4)})
+        old.close()
+
+        cache = embedding_cache.EmbeddingCache(path, "v2")
+        cache.put_many("kept", {'original': np.ones(4)})
+        cache.put_many("deleted", {embedding_cache.NO_FACE: None})
+        assert cache.prune(["kept"]) == 2  # v1 entry + deleted image
+        assert len(cache) == 1
+        cache.close()
+
+
+if __name__ == "__main__":
+    test_roundtrip_and_backbone_versions()
+    test_prune_removes_deleted_images_and_old_versions()
+    print("✅ All embedding cache tests passed")
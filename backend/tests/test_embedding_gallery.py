@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Test Embedding Gallery
+Vectorized matching, enrollment while matching, re-enrollment and removal
+"""
+
+import importlib.util
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Load the module directly (the face recognition package needs TensorFlow)
+_spec = importlib.util.spec_from_file_location(
+    "embedding_gallery", Path(__file__).parent.parent / "ai_models" / "face_recognition" / "embedding_gallery.py")
+embedding_gallery = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(embedding_gallery)
+
+rng = np.random.default_rng(0)
+DIM = 1280
+
+
+def _identity():
+    return rng.normal(size=DIM).astype(np.float32)
+
+
+def _samples(center, n=30, noise=0.3):
+    return center + noise * rng.normal(size=(n, DIM)).astype(np.float32)
+
+
+def test_match_batch():
+    """All faces of a frame are matched at once; strangers stay unknown"""
+    alice, bob = _identity(), _identity()
+    gallery = embedding_gallery.EmbeddingGallery(max_prototypes=8)
+    gallery.add_person('alice', _samples(alice))
+    gallery.add_person('bob', _samples(bob))
+    assert len(gallery.snapshot) == 16  # prototypes, not every sample
+
+    faces = np.stack([bob + 0.3 * rng.normal(size=DIM), alice + 0.3 * rng.normal(size=DIM), _identity()])
+    results = gallery.match(faces, threshold=0.7)
+    assert [r['name'] for r in results] == ['bob', 'alice', 'Unknown']
+    assert results[0]['matched'] and not results[2]['matched']
+    assert results[0]['margin'] > 0.3
+
+
+def test_enroll_and_remove_swap_snapshots():
+    """A snapshot taken before an update is unaffected by it"""
+    alice, carol = _identity(), _identity()
+    gallery = embedding_gallery.EmbeddingGallery(initial_capacity=4)
+    gallery.add_person('alice', _samples(alice, n=3))
+    before = gallery.snapshot
+
+    gallery.add_person('carol', _samples(carol, n=5))  # forces growth
+    assert len(before) == 3 and before.names == ('alice',)
+    assert gallery.match(carol[None, :], threshold=0.7)[0]['name'] == 'carol'
+
+    assert gallery.remove_person('alice')
+    assert gallery.get_persons() == ['carol']
+    assert gallery.match(alice[None, :], threshold=0.7)[0]['name'] == 'Unknown'
+    assert not gallery.remove_person('alice')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / 'gallery.npz')
+        gallery.save(path)
+        loaded = embedding_gallery.EmbeddingGallery.load(path)
+        assert loaded.get_persons() == ['carol']
+        assert np.allclose(loaded.snapshot.matrix, gallery.snapshot.matrix)
+
+
+def test_backbone_version_round_trip():
+    """The backbone a gallery was built with is saved with it; old files load unversioned"""
+    gallery = embedding_gallery.EmbeddingGallery(backbone_version='mobilenet_v2-224-avg-lanczos-abc')
+    gallery.add_person('alice', _samples(_identity(), n=3))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / 'gallery.npz')
+        gallery.save(path)
+        assert embedding_gallery.EmbeddingGallery.load(path).backbone_version == gallery.backbone_version
+
+        snapshot = gallery.snapshot
+        legacy = str(Path(tmp) / 'legacy.npz')
+        np.savez(legacy, matrix=snapshot.matrix, labels=snapshot.labels,
+                 names=np.array(snapshot.names, dtype=str))
+        loaded = embedding_gallery.EmbeddingGallery.load(legacy)
+        assert loaded.backbone_version is None and loaded.get_persons() == ['alice']
+
+        # Pickled (object array) names are refused rather than unpickled
+        pickled = str(Path(tmp) / 'pickled.npz')
+        np.savez(pickled, matrix=snapshot.matrix, labels=snapshot.labels,
+                 names=np.array(snapshot.names, dtype=object))
+        with pytest.raises(ValueError):
+            embedding_gallery.EmbeddingGallery.load(pickled)
+
+
+def test_repeated_enrollment_is_bounded():
+    """Enrolling the same person again re-selects prototypes instead of adding rows"""
+    alice, bob = _identity(), _identity()
+    gallery = embedding_gallery.EmbeddingGallery(max_prototypes=8, initial_capacity=4)
+    gallery.add_person('bob', _samples(bob, n=5))
+    for _ in range(5):
+        assert gallery.add_person('alice', _samples(alice, n=6)) <= 8
+    assert len(gallery.snapshot) == 5 + 8
+    assert gallery.get_persons() == ['bob', 'alice']
+    assert gallery.match(np.stack([alice, bob]), threshold=0.7)[0]['name'] == 'alice'
+    assert gallery.match(np.stack([alice, bob]), threshold=0.7)[1]['name'] == 'bob'
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / 'gallery.npz')
+        gallery.save(path)
+        with np.load(path, allow_pickle=False) as data:
+            assert data['names'].dtype.kind == 'U'
+        assert embedding_gallery.EmbeddingGallery.load(path).get_persons() == ['bob', 'alice']
+
+
+if __name__ == "__main__":
+    test_match_batch()
+    test_enroll_and_remove_swap_snapshots()
+    test_backbone_version_round_trip()
+    test_repeated_enrollment_is_bounded()
+    print("✅ All embedding gallery tests passed")
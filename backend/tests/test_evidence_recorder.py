@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test Evidence Recorder
+Verify the pre-event ring buffer stays bounded and clips are written
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.evidence_recorder import EvidenceRecorder, FrameRingBuffer
+
+
+def _noise_frame(width=320, height=240):
+    return np.random.randint(0, 255, (height, width, 3), dtype=np.uint8)
+
+
+def test_ring_buffer_memory_cap():
+    """Buffer never holds more than max_bytes"""
+    buffer = FrameRingBuffer(max_seconds=60.0, max_bytes=200 * 1024)
+    now = time.time()
+    for i in range(50):
+        buffer.push(_noise_frame(), timestamp=now + i * 0.1)
+    
+    assert buffer.memory_bytes <= 200 * 1024
+    assert 0 < len(buffer) < 50
+
+
+def test_ring_buffer_time_window():
+    """Frames older than max_seconds are evicted"""
+    buffer = FrameRingBuffer(max_seconds=2.0, max_bytes=64 * 1024 * 1024)
+    now = time.time()
+    for i in range(10):
+        buffer.push_jpeg(b'x' * 100, timestamp=now + i)
+    
+    frames = buffer.frames_between(0, now + 100)
+    assert [ts for ts, _ in frames] == [now + 7, now + 8, now + 9]
+
+
+def test_clip_written_and_linked():
+    """Pre- and post-event frames end up in one clip linked to the alert"""
+    linked = {}
+    
+    class FakeAlertModel:
+        def attach_clip(self, alert_id, clip_path, clip_start=None, clip_end=None):
+            linked[alert_id] = clip_path
+            return True
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        recorder = EvidenceRecorder(pre_event_seconds=1.0, post_event_seconds=0.5,
+                                    max_buffer_mb=8, buffer_fps=0, output_dir=tmp,
+                                    alert_model=FakeAlertModel())
+        for _ in range(5):
+            recorder.add_frame('cam1', _noise_frame())
+            time.sleep(0.05)
+        
+        done = []
+        assert recorder.request_clip('cam1', alert_id='a1', callback=lambda path, ids: done.append(path))
+        # A second alert during the post-event window shares the clip
+        assert recorder.request_clip('cam1', alert_id='a2')
+        
+        for _ in range(5):
+            recorder.add_frame('cam1', _noise_frame())
+            time.sleep(0.05)
+        
+        deadline = time.time() + 5
+        while not done and time.time() < deadline:
+            time.sleep(0.05)
+        
+        assert done and done[0] is not None
+        assert Path(done[0]).exists()
+        assert linked == {'a1': done[0], 'a2': done[0]}
+
+
+if __name__ == "__main__":
+    test_ring_buffer_memory_cap()
+    test_ring_buffer_time_window()
+    test_clip_written_and_linked()
+    print("✅ Evidence recorder tests passed")
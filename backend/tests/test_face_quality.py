@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test Face Quality Gate
+Blurred, tiny, dark and profile faces are rejected; sharp frontal faces pass
+"""
+
+import importlib.util
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# Load the module directly (the face recognition package needs TensorFlow)
+_spec = importlib.util.spec_from_file_location(
+    "face_quality", Path(__file__).parent.parent / "ai_models" / "face_recognition" / "face_quality.py")
+face_quality = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(face_quality)
+
+# Right eye, left eye, nose tip (frame pixels) of a frontal 120 px face
+FRONTAL = [(40, 50), (80, 50), (60, 75)]
+
+
+def _face(seed=0):
+    """Textured mid-grey crop (sharp edges, like skin, eyes and hair)"""
+    rng = np.random.default_rng(seed)
+    face = rng.integers(60, 190, (15, 15), dtype=np.uint8)
+    face = cv2.resize(face, (120, 120), interpolation=cv2.INTER_NEAREST)
+    return cv2.cvtColor(face, cv2.COLOR_GRAY2BGR)
+
+
+def _gate(**overrides):
+    return face_quality.FaceQualityGate(**{'enabled': True, **overrides})
+
+
+def test_sharp_frontal_face_passes():
+    result = _gate().score(_face(), FRONTAL)
+    assert result['passed'], result
+    assert result['reasons'] == []
+    assert result['yaw'] == 0.0
+    assert result['eye_distance'] == 40.0
+
+
+def test_blurred_face_rejected():
+    blurred = cv2.GaussianBlur(_face(), (31, 31), 12)
+    result = _gate().score(blurred, FRONTAL)
+    assert not result['passed']
+    assert 'blur' in result['reasons']
+
+
+def test_small_face_rejected():
+    tiny = [(10, 10), (18, 10), (14, 14)]
+    result = _gate().score(_face(), tiny)
+    assert result['reasons'] == ['small'], result
+
+
+def test_dark_and_bright_faces_rejected():
+    dark = (_face() * 0.15).astype(np.uint8)
+    assert 'dark' in _gate().score(dark, FRONTAL)['reasons']
+    bright = np.full((120, 120, 3), 250, dtype=np.uint8)
+    reasons = _gate().score(bright, FRONTAL)['reasons']
+    assert 'bright' in reasons and 'low_contrast' in reasons
+
+
+def test_profile_face_rejected():
+    profile = [(40, 50), (80, 50), (95, 75)]  # nose beyond the left eye
+    result = _gate().score(_face(), profile)
+    assert result['reasons'] == ['pose'], result
+    assert result['yaw'] > 0.5
+
+
+def test_no_keypoints_skips_size_and_pose():
+    result = _gate().score(_face())
+    assert result['passed']
+    assert result['eye_distance'] is None and result['yaw'] is None
+
+
+def test_disabled_gate_passes_everything_but_reports():
+    gate = _gate(enabled=False)
+    blurred = cv2.GaussianBlur(_face(), (31, 31), 12)
+    result = gate.score(blurred, FRONTAL)
+    assert result['passed'] and 'blur' in result['reasons']
+
+
+def test_stats():
+    gate = _gate()
+    gate.score(_face(), FRONTAL)
+    gate.score(_face(), [(10, 10), (18, 10), (14, 14)])
+    gate.score(np.zeros((0, 0, 3), dtype=np.uint8))
+    stats = gate.get_stats()
+    assert stats['scored'] == 3
+    assert stats['passed'] == 1
+    assert stats['rejected'] == {'small': 1, 'empty': 1}
+
+
+if __name__ == "__main__":
+    test_sharp_frontal_face_passes()
+    test_blurred_face_rejected()
+    test_small_face_rejected()
+    test_dark_and_bright_faces_rejected()
+    test_profile_face_rejected()
+    test_no_keypoints_skips_size_and_pose()
+    test_disabled_gate_passes_everything_but_reports()
+    test_stats()
+    print("✅ All face quality tests passed")
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Test Frame Buffer Pool
+Buffers are reused, and pinned buffers are never handed out again
+"""
+
+import importlib.util
+from pathlib import Path
+
+import numpy as np
+
+# Load the module directly (surveillance/__init__ pulls in the YOLO detector)
+_spec = importlib.util.spec_from_file_location(
+    "frame_pool", Path(__file__).parent.parent / "surveillance" / "frame_pool.py")
+frame_pool = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(frame_pool)
+
+
+def test_steady_state_allocations():
+    """A resize + annotate loop stops allocating after warm-up"""
+    pool = frame_pool.FrameBufferPool('cam1')
+    slot = frame_pool.FrameSlot(pool)
+    frame = np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8)
+
+    for _ in range(100):
+        small = pool.resize(frame, (192, 144))
+        pool.release(small)
+        slot.publish(pool.copy(frame))
+
+    stats = pool.get_stats()
+    assert stats['allocations'] <= 3
+    assert stats['reuses'] >= 197
+    assert stats['in_use'] == 1  # the published frame
+
+
+def test_checkout_pins_buffer():
+    """A frame checked out by a reader is not recycled by the producer"""
+    pool = frame_pool.FrameBufferPool('cam2')
+    slot = frame_pool.FrameSlot(pool)
+
+    first = pool.acquire((4, 4, 3))
+    first[:] = 1
+    slot.publish(first)
+
+    version, pinned = slot.checkout()
+    assert pinned is first and version == 1
+
+    # Producer moves on; the pinned buffer must not come back from acquire()
+    slot.publish(pool.acquire((4, 4, 3)))
+    other = pool.acquire((4, 4, 3))
+    assert other is not first
+    assert (pinned == 1).all()
+
+    pool.release(pinned)
+    pool.release(other)
+    reused = pool.acquire((4, 4, 3))
+    assert reused is first or reused is other
+
+
+if __name__ == "__main__":
+    test_steady_state_allocations()
+    test_checkout_pins_buffer()
+    print("✅ All frame pool tests passed")
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Test Frame Source
+Every frame is grabbed, but only AI frames and wanted frames are decoded
+"""
+
+import importlib.util
+import sys
+import types
+from pathlib import Path
+
+import numpy as np
+
+# Load the module without surveillance/__init__ (it pulls in the YOLO detector);
+# a bare package lets frame_source's relative mjpeg_client import resolve
+_surveillance_dir = Path(__file__).parent.parent / "surveillance"
+_package = types.ModuleType("surveillance_frames")
+_package.__path__ = [str(_surveillance_dir)]
+sys.modules.setdefault("surveillance_frames", _package)
+_spec = importlib.util.spec_from_file_location(
+    "surveillance_frames.frame_source", _surveillance_dir / "frame_source.py")
+frame_source = importlib.util.module_from_spec(_spec)
+sys.modules[_spec.name] = frame_source
+_spec.loader.exec_module(frame_source)
+
+
+class FakeCapture:
+    """cv2.VideoCapture stand-in that counts decodes"""
+
+    def __init__(self, frames=100, fail_retrieve=False):
+        self.frames = frames
+        self.fail_retrieve = fail_retrieve
+        self.grabs = 0
+        self.retrieves = 0
+        self.released = False
+
+    def isOpened(self):
+        return True
+
+    def grab(self):
+        if self.grabs >= self.frames:
+            return False
+        self.grabs += 1
+        return True
+
+    def retrieve(self):
+        self.retrieves += 1
+        if self.fail_retrieve:
+            return False, None
+        return True, np.full((4, 4, 3), self.grabs, dtype=np.uint8)
+
+    def release(self):
+        self.released = True
+
+
+class FakeMJPEGCapture(frame_source.MJPEGCapture):
+    """MJPEGCapture stand-in that records the decode scale of each retrieve()"""
+
+    def __init__(self):
+        self.scales = []
+
+    def isOpened(self):
+        return True
+
+    def grab(self, timeout=None):
+        return True
+
+    def get_jpeg(self):
+        return b"jpeg"
+
+    def retrieve(self, image=None, scale=1):
+        self.scales.append(scale)
+        return True, np.zeros((8 // scale, 8 // scale, 3), dtype=np.uint8)
+
+    def release(self):
+        pass
+
+
+def test_only_ai_frames_decoded_without_consumers():
+    cap = FakeCapture()
+    source = frame_source.FrameSource(cap, ai_interval=5)
+    assert not source.is_mjpeg
+
+    decoded = []
+    for _ in range(20):
+        ok, captured = source.next_frame()
+        assert ok
+        if captured.decoded:
+            assert captured.is_ai_frame
+            decoded.append(captured.index)
+
+    # The first frame always goes to AI, then every 5th
+    assert decoded == [1, 5, 10, 15, 20]
+    assert cap.grabs == 20 and cap.retrieves == 5
+    stats = source.get_stats()
+    assert stats['frames_grabbed'] == 20
+    assert stats['frames_decoded'] == 5
+    assert stats['frames_skipped'] == 15
+    assert stats['decode_ratio'] == 0.25
+
+
+def test_wanted_frames_decoded_as_preview():
+    cap = FakeCapture()
+    source = frame_source.FrameSource(cap, ai_interval=5)
+    source.next_frame()
+    ok, captured = source.next_frame(want_frame=True)
+    assert ok and captured.decoded
+    assert not captured.is_ai_frame
+    assert captured.scale == 1  # cv2 sources always decode at full size
+    assert cap.retrieves == 2
+
+
+def test_mjpeg_preview_scale_and_full_resolution():
+    cap = FakeMJPEGCapture()
+    source = frame_source.FrameSource(cap, ai_interval=10, preview_scale=2)
+    assert source.is_mjpeg
+    ok, ai = source.next_frame()
+    assert ok and ai.is_ai_frame and ai.scale == 1 and ai.jpeg == b"jpeg"
+    _, preview = source.next_frame(want_frame=True)
+    assert preview.scale == 2 and preview.image.shape[:2] == (4, 4)
+    # The recorder asks for full-size frames so a segment never mixes resolutions
+    _, recorded = source.next_frame(want_frame=True, full_resolution=True)
+    assert recorded.scale == 1 and recorded.image.shape[:2] == (8, 8)
+    assert cap.scales == [1, 2, 1]
+
+
+def test_skipped_frames_keep_index_and_timestamp():
+    source = frame_source.FrameSource(FakeCapture(), ai_interval=10)
+    source.next_frame()
+    ok, captured = source.next_frame()
+    assert ok
+    assert captured.image is None and captured.jpeg is None
+    assert captured.index == 2
+    assert captured.timestamp > 0
+
+
+def test_stream_end_and_decode_failure():
+    source = frame_source.FrameSource(FakeCapture(frames=1))
+    assert source.next_frame()[0]
+    assert source.next_frame() == (False, None)
+
+    source = frame_source.FrameSource(FakeCapture(fail_retrieve=True))
+    assert source.next_frame() == (False, None)  # first frame is an AI frame
+
+
+def test_release():
+    cap = FakeCapture()
+    source = frame_source.FrameSource(cap)
+    assert source.isOpened()
+    source.release()
+    assert cap.released
+
+
+if __name__ == "__main__":
+    test_only_ai_frames_decoded_without_consumers()
+    test_wanted_frames_decoded_as_preview()
+    test_mjpeg_preview_scale_and_full_resolution()
+    test_skipped_frames_keep_index_and_timestamp()
+    test_stream_end_and_decode_failure()
+    test_release()
+    print("✅ All frame source tests passed")
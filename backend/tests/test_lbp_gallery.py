@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Test Vectorized LBPH Gallery
+Histograms and chi-square distances match OpenCV's LBPH definitions;
+samples are added and removed incrementally
+"""
+
+import importlib.util
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Load the module directly (the surveillance package imports torch)
+_spec = importlib.util.spec_from_file_location(
+    "lbp_gallery", Path(__file__).parent.parent / "surveillance" / "lbp_gallery.py")
+lbp_gallery = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(lbp_gallery)
+
+
+def _reference_histogram(face, grid=8):
+    """Per-pixel port of OpenCV's elbp() + spatial_histogram() (radius 1, 8 neighbours)"""
+    src = face.astype(np.float32)
+    rows, cols = src.shape
+    codes = np.zeros((rows - 2, cols - 2), dtype=np.int32)
+    for n in range(8):
+        x = np.float32(np.cos(2.0 * np.pi * n / 8))
+        y = np.float32(-np.sin(2.0 * np.pi * n / 8))
+        fx, fy, cx, cy = int(np.floor(x)), int(np.floor(y)), int(np.ceil(x)), int(np.ceil(y))
+        tx, ty = x - fx, y - fy
+        w1, w2, w3, w4 = (1 - tx) * (1 - ty), tx * (1 - ty), (1 - tx) * ty, tx * ty
+        for i in range(1, rows - 1):
+            for j in range(1, cols - 1):
+                t = (w1 * src[i + fy, j + fx] + w2 * src[i + fy, j + cx] +
+                     w3 * src[i + cy, j + fx] + w4 * src[i + cy, j + cx])
+                if t > src[i, j] or abs(t - src[i, j]) < np.finfo(np.float32).eps:
+                    codes[i - 1, j - 1] |= 1 << n
+    height, width = codes.shape[0] // grid, codes.shape[1] // grid
+    cells = []
+    for i in range(grid):
+        for j in range(grid):
+            cell = codes[i * height:(i + 1) * height, j * width:(j + 1) * width]
+            cells.append(np.bincount(cell.ravel(), minlength=256) / cell.size)
+    return np.concatenate(cells).astype(np.float32)
+
+
+def _faces(count, seed=0, size=40):
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 256, (count, size, size), dtype=np.uint8)
+
+
+def test_histograms_match_reference():
+    faces = _faces(3)
+    histograms = lbp_gallery.lbp_histograms(faces)
+    assert histograms.shape == (3, 64 * 256) and histograms.dtype == np.float32
+    for face, histogram in zip(faces, histograms):
+        assert np.allclose(histogram, _reference_histogram(face), atol=1e-6)
+    # Each cell is a normalized histogram
+    assert np.allclose(histograms.reshape(3, 64, 256).sum(axis=2), 1.0, atol=1e-5)
+
+
+def test_chunked_extraction_matches_single_pass():
+    faces = _faces(lbp_gallery._FACE_CHUNK + 5, seed=1, size=24)
+    chunked = lbp_gallery.lbp_histograms(faces)
+    assert np.array_equal(chunked[-1], lbp_gallery.lbp_histograms(faces[-1])[0])
+
+
+def test_chi_square_matches_opencv_definition():
+    rng = np.random.default_rng(2)
+    queries = rng.random((3, 50)).astype(np.float32)
+    gallery = rng.random((7, 50)).astype(np.float32)
+    gallery[0, :10] = 0
+    queries[0, :10] = 0  # zero bins on both sides are skipped
+    distances = lbp_gallery.chi_square_distances(queries, gallery.T)
+    for m in range(3):
+        for n in range(7):
+            a, b = queries[m].astype(np.float64), gallery[n].astype(np.float64)
+            mask = (a + b) > 0
+            expected = 2 * np.sum((a[mask] - b[mask]) ** 2 / (a[mask] + b[mask]))
+            assert abs(distances[m, n] - expected) < 1e-3
+
+
+def test_blocked_distances_cover_whole_gallery():
+    original = lbp_gallery._BLOCK_ELEMENTS
+    lbp_gallery._BLOCK_ELEMENTS = 100  # force one gallery sample per block
+    try:
+        rng = np.random.default_rng(3)
+        queries = rng.random((2, 50)).astype(np.float32)
+        gallery = rng.random((5, 50)).astype(np.float32)
+        blocked = lbp_gallery.chi_square_distances(queries, gallery.T)
+    finally:
+        lbp_gallery._BLOCK_ELEMENTS = original
+    assert np.allclose(blocked, lbp_gallery.chi_square_distances(queries, np.ascontiguousarray(gallery.T)))
+
+
+def test_gallery_match_add_remove():
+    gallery = lbp_gallery.LBPGallery(initial_capacity=2)
+    alice, bob = _faces(4, seed=4), _faces(4, seed=5)
+    gallery.add(lbp_gallery.lbp_histograms(alice), 0)
+    gallery.add(lbp_gallery.lbp_histograms(bob), 1)  # grows past the initial capacity
+    assert len(gallery) == 8 and gallery.labels() == [0, 1]
+
+    labels, distances = gallery.match(lbp_gallery.lbp_histograms(np.stack([alice[2], bob[1]])))
+    assert labels.tolist() == [0, 1]
+    assert np.allclose(distances, 0.0, atol=1e-4)
+
+    snapshot_before = gallery._snapshot
+    assert gallery.remove(0)
+    assert not gallery.remove(0)
+    assert gallery.labels() == [1]
+    assert len(snapshot_before[1]) == 8  # readers of the old snapshot are unaffected
+    labels, _ = gallery.match(lbp_gallery.lbp_histograms(alice[:1]))
+    assert labels.tolist() == [1]
+
+
+def test_empty_gallery():
+    labels, distances = lbp_gallery.LBPGallery().match(lbp_gallery.lbp_histograms(_faces(2)))
+    assert labels.tolist() == [-1, -1]
+    assert np.isinf(distances).all()
+
+
+def test_save_and_load():
+    gallery = lbp_gallery.LBPGallery()
+    gallery.add(lbp_gallery.lbp_histograms(_faces(2, seed=6)), 3)
+    gallery.add(lbp_gallery.lbp_histograms(_faces(2, seed=7)), 5)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "lbp_gallery.npz")
+        gallery.save(path)
+        loaded = lbp_gallery.LBPGallery.load(path)
+    assert loaded.labels() == [3, 5]
+    query = lbp_gallery.lbp_histograms(_faces(2, seed=7)[1])
+    assert loaded.match(query)[0].tolist() == [5]
+
+
+def test_batch_speed():
+    """All faces of a frame against a 200-sample gallery (150x150 crops, as extract_face_crop)"""
+    gallery = lbp_gallery.LBPGallery()
+    gallery.add(lbp_gallery.lbp_histograms(_faces(200, seed=8, size=150)), 0)
+    queries = _faces(4, seed=9, size=150)
+    gallery.match(lbp_gallery.lbp_histograms(queries))  # warm-up
+    start = time.perf_counter()
+    gallery.match(lbp_gallery.lbp_histograms(queries))
+    per_face_ms = (time.perf_counter() - start) * 1000 / len(queries)
+    print(f"   {per_face_ms:.2f} ms per face")
+    assert per_face_ms < 100
+
+
+if __name__ == "__main__":
+    test_histograms_match_reference()
+    test_chunked_extraction_matches_single_pass()
+    test_chi_square_matches_opencv_definition()
+    test_blocked_distances_cover_whole_gallery()
+    test_gallery_match_add_remove()
+    test_empty_gallery()
+    test_save_and_load()
+    test_batch_speed()
+    print("✅ All LBP gallery tests passed")
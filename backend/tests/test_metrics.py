@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test Pipeline Metrics
+Histogram quantiles and the Prometheus text output
+"""
+
+import importlib.util
+import threading
+from pathlib import Path
+
+# Load the module directly (surveillance/__init__ pulls in the YOLO detector)
+_spec = importlib.util.spec_from_file_location(
+    "metrics", Path(__file__).parent.parent / "surveillance" / "metrics.py")
+metrics_module = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(metrics_module)
+
+
+def test_histogram_quantiles():
+    """Quantiles land in the right bucket and never exceed the max"""
+    hist = metrics_module.Histogram()
+    for _ in range(90):
+        hist.observe(0.004)   # 2-5 ms bucket
+    for _ in range(10):
+        hist.observe(0.15)    # 100-200 ms bucket
+
+    assert 0.002 <= hist.quantile(0.50) <= 0.005
+    assert 0.1 <= hist.quantile(0.95) <= 0.15
+    assert hist.quantile(0.99) <= 0.15
+    summary = hist.summary()
+    assert summary['count'] == 100
+    assert summary['max_ms'] == 150.0
+
+
+def test_concurrent_observers():
+    """Viewer threads sharing one (stage, camera) histogram lose no observations"""
+    registry = metrics_module.MetricsRegistry()
+
+    def viewer():
+        for _ in range(5000):
+            registry.observe('encode', 'cam1', 0.004)
+
+    threads = [threading.Thread(target=viewer) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    hist = registry.histogram('encode', 'cam1')
+    assert hist.count == sum(hist.counts) == 40000
+    assert abs(hist.total - 40000 * 0.004) < 1e-6
+
+
+def test_prometheus_output():
+    """Buckets are cumulative and counters, gauges and collectors are exported"""
+    registry = metrics_module.MetricsRegistry()
+    with registry.timer('yolo', 'cam1'):
+        pass
+    registry.observe('yolo', 'cam1', 0.03)
+    registry.inc('frames_dropped_total', camera='cam1', reason='queue_full')
+    registry.set_gauge('frame_queue_depth', 3, camera='cam1')
+    registry.register_collector(lambda: [('viewers', 'gauge', {'camera': 'cam1'}, 2)])
+    registry.register_collector(lambda: 1 / 0)  # a broken collector must not break scraping
+
+    text = registry.render_prometheus()
+    assert '# TYPE aieyes_stage_seconds histogram' in text
+    assert 'aieyes_stage_seconds_bucket{camera="cam1",le="+Inf",stage="yolo"} 2' in text
+    assert 'aieyes_stage_seconds_bucket{camera="cam1",le="0.05",stage="yolo"} 2' in text
+    assert 'aieyes_stage_seconds_bucket{camera="cam1",le="0.02",stage="yolo"} 1' in text
+    assert 'aieyes_stage_seconds_count{camera="cam1",stage="yolo"} 2' in text
+    assert 'aieyes_frames_dropped_total{camera="cam1",reason="queue_full"} 1.0' in text
+    assert 'aieyes_frame_queue_depth{camera="cam1"} 3' in text
+    assert 'aieyes_viewers{camera="cam1"} 2' in text
+
+    snapshot = registry.snapshot()
+    assert snapshot['cam1']['yolo']['count'] == 2
+
+
+if __name__ == "__main__":
+    test_histogram_quantiles()
+    test_concurrent_observers()
+    test_prometheus_output()
+    print("✅ All metrics tests passed")
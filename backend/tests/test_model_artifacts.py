@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Test Model Artifacts
+Checksum-verified local weights and lazy / parallel model loading
+"""
+
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.utils.model_artifacts import ArtifactError, ModelArtifacts
+
+
+def test_verified_paths():
+    """Files resolve only when present in the manifest with a matching checksum"""
+    with tempfile.TemporaryDirectory() as tmp:
+        artifacts = ModelArtifacts(tmp)
+        weights = Path(tmp) / 'yolov8n.pt'
+        weights.write_bytes(b'weights v1')
+
+        try:
+            artifacts.path('yolov8n')
+            assert False, "unregistered artifact resolved"
+        except ArtifactError:
+            pass
+
+        artifacts.add('yolov8n', weights)
+        assert artifacts.path('yolov8n') == str(weights)
+        assert artifacts.find('yolov9c', 'yolov8n') == ('yolov8n', str(weights))
+        assert len(artifacts.checksum('yolov8n')) == 64
+
+        weights.write_bytes(b'tampered!!')  # same size, different content
+        try:
+            artifacts.path('yolov8n')
+            assert False, "tampered artifact resolved"
+        except ArtifactError as e:
+            assert 'checksum' in str(e)
+
+        weights.unlink()
+        try:
+            artifacts.find('yolov9c', 'yolov8n')
+            assert False, "missing artifact resolved"
+        except ArtifactError as e:
+            assert 'yolov9c' in str(e) and 'missing' in str(e)
+
+
+def test_legacy_model_directory():
+    """Weights left in the old app/models directory still resolve, after the cache"""
+    with tempfile.TemporaryDirectory() as cache, tempfile.TemporaryDirectory() as legacy:
+        artifacts = ModelArtifacts(cache, legacy_dirs=[legacy])
+        (Path(legacy) / 'yolov9c.pt').write_bytes(b'old weights')
+        assert artifacts.find('yolov9c', 'yolov8n') == ('yolov9c', str(Path(legacy) / 'yolov9c.pt'))
+
+        # A verified cache entry wins over the legacy file
+        weights = Path(cache) / 'yolov9c.pt'
+        weights.write_bytes(b'new weights')
+        artifacts.add('yolov9c', weights)
+        assert artifacts.find('yolov9c', 'yolov8n') == ('yolov9c', str(weights))
+
+        (Path(legacy) / 'yolov9c.pt').unlink()
+        weights.unlink()
+        try:
+            artifacts.find('yolov9c', 'yolov8n')
+            assert False, "missing artifact resolved"
+        except ArtifactError:
+            pass
+
+
+def test_lazy_and_parallel_loading():
+    """Each model loads once, on first use or in parallel with preload"""
+    artifacts = ModelArtifacts(tempfile.gettempdir())
+    calls = []
+
+    def slow_loader(name):
+        def load():
+            calls.append(name)
+            time.sleep(0.2)
+            return f"model-{name}"
+        return load
+
+    artifacts.register('a', slow_loader('a'))
+    artifacts.register('b', slow_loader('b'))
+    assert calls == [] and artifacts.load_report()['a'] == {'status': 'not_loaded'}
+
+    threads = [threading.Thread(target=artifacts.get, args=('a',)) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert calls == ['a']
+
+    artifacts.register('c', slow_loader('c'))
+    start = time.perf_counter()
+    results = artifacts.preload(['b', 'c'])
+    assert time.perf_counter() - start < 0.35  # loaded concurrently
+    assert set(results) == {'b', 'c'} and all(isinstance(v, float) for v in results.values())
+    assert artifacts.get('b') == 'model-b'
+
+    def broken():
+        calls.append('broken')
+        raise OSError("no such file")
+
+    artifacts.register('broken', broken)
+    for _ in range(2):
+        try:
+            artifacts.get('broken')
+            assert False, "broken model loaded"
+        except ArtifactError:
+            pass
+    assert calls.count('broken') == 1  # failures are not retried every frame
+
+    report = artifacts.load_report()
+    assert report['a']['status'] == 'loaded' and report['a']['seconds'] >= 0.2
+    assert report['broken']['status'] == 'failed'
+
+
+if __name__ == "__main__":
+    test_verified_paths()
+    test_legacy_model_directory()
+    test_lazy_and_parallel_loading()
+    print("✅ All model artifact tests passed")
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test Sampling Profiler
+Samples a busy thread and attributes time to the hot function
+"""
+
+import importlib.util
+import threading
+import time
+from pathlib import Path
+
+# Load the module directly (surveillance/__init__ pulls in the YOLO detector)
+_spec = importlib.util.spec_from_file_location(
+    "profiler", Path(__file__).parent.parent / "surveillance" / "profiler.py")
+profiler = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(profiler)
+
+
+def hot_function(stop):
+    while not stop.is_set():
+        sum(i * i for i in range(1000))
+
+
+def camera_loop(stop):
+    hot_function(stop)
+
+
+def test_profile_busy_thread():
+    """Samples land in the target thread's hot function"""
+    stop = threading.Event()
+    worker = threading.Thread(target=camera_loop, args=(stop,), daemon=True)
+    worker.start()
+    try:
+        result = profiler.SamplingProfiler([worker.ident], interval=0.002).run(0.3)
+    finally:
+        stop.set()
+        worker.join()
+
+    assert result.samples > 20
+    table = {row['function']: row for row in result.function_table()}
+    assert table['camera_loop']['cumulative_percent'] > 90
+    assert table['hot_function']['cumulative_percent'] > 90
+
+    lines = result.collapsed().strip().splitlines()
+    stack, count = lines[0].rsplit(' ', 1)
+    assert 'camera_loop' in stack and int(count) > 0
+    assert sum(int(line.rsplit(' ', 1)[1]) for line in lines) == result.samples
+
+
+def test_single_profile_at_a_time():
+    """A second profile is refused while one is running"""
+    sampler = profiler.SamplingProfiler([threading.get_ident()], interval=0.01)
+    background = threading.Thread(target=sampler.run, args=(0.3,))
+    background.start()
+    time.sleep(0.05)
+    try:
+        profiler.SamplingProfiler([threading.get_ident()]).run(0.1)
+        assert False, "expected ProfilerBusyError"
+    except profiler.ProfilerBusyError:
+        pass
+    finally:
+        background.join()
+
+
+if __name__ == "__main__":
+    test_profile_busy_thread()
+    test_single_profile_at_a_time()
+    print("✅ All profiler tests passed")
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test Shared Frame Store
+Frames written by one process are readable from another without copying
+"""
+
+import importlib.util
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+
+MODULE_PATH = Path(__file__).parent.parent / "surveillance" / "shared_frame_store.py"
+
+# Load the module directly (surveillance/__init__ pulls in the YOLO detector)
+_spec = importlib.util.spec_from_file_location("shared_frame_store", MODULE_PATH)
+shared_frame_store = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(shared_frame_store)
+
+
+def test_zero_copy_view_and_ring_reuse():
+    """Reader gets a view of the newest frame; it goes stale once its slot is reused"""
+    store = shared_frame_store.SharedFrameStore('test_cam_view', slots=2, max_width=64, max_height=48)
+    try:
+        reader = shared_frame_store.SharedFrameReader('test_cam_view')
+        assert reader.read_latest() is None
+
+        store.write(np.full((48, 64, 3), 7, dtype=np.uint8), frame_index=1)
+        frame = reader.read_latest()
+        assert frame.frame_index == 1 and frame.image.shape == (48, 64, 3)
+        assert (frame.image == 7).all()
+        assert not frame.image.flags.owndata  # view into shared memory
+
+        store.write(np.full((24, 32, 3), 8, dtype=np.uint8), frame_index=2)
+        assert frame.is_valid()  # other slot
+        store.write(np.full((48, 64, 3), 9, dtype=np.uint8), frame_index=3)
+        assert not frame.is_valid()  # slot reused
+
+        latest = reader.read_latest(copy=True)
+        assert latest.frame_index == 3 and (latest.image == 9).all()
+
+        # Oversized frames are rejected, not truncated
+        assert not store.write(np.zeros((96, 128, 3), dtype=np.uint8))
+
+        del frame
+        reader.close()
+    finally:
+        store.close()
+
+
+def test_read_from_other_process():
+    """A separate process attaches by camera id and sees the pixels"""
+    store = shared_frame_store.SharedFrameStore('test_cam_proc', slots=3, max_width=32, max_height=32)
+    try:
+        store.write(np.full((32, 32, 3), 42, dtype=np.uint8), frame_index=5)
+        script = (
+            "import importlib.util, sys\n"
+            f"spec = importlib.util.spec_from_file_location('sfs', r'{MODULE_PATH}')\n"
+            "m = importlib.util.module_from_spec(spec); spec.loader.exec_module(m)\n"
+            "r = m.SharedFrameReader('test_cam_proc')\n"
+            "f = r.read_latest(copy=True)\n"
+            "print(f.frame_index, int(f.image.mean()))\n"
+            "r.close()\n"
+        )
+        result = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, timeout=30)
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.split() == ['5', '42']
+
+        # Reader exiting must not remove the segment
+        reader = shared_frame_store.SharedFrameReader('test_cam_proc')
+        assert reader.read_latest(copy=True) is not None
+        reader.close()
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    test_zero_copy_view_and_ring_reuse()
+    test_read_from_other_process()
+    print("✅ All shared frame store tests passed")
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test Structured Logging
+JSON formatting, rate limiting and per-camera levels
+"""
+
+import json
+import logging
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.utils import structured_logging
+
+
+class _ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def _make_logger(name):
+    logger = logging.getLogger(name)
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    handler = _ListHandler()
+    logger.addHandler(handler)
+    return logger, handler
+
+
+def test_rate_limit_per_template():
+    """A message logged every frame is throttled; the next one reports what was dropped"""
+    logger, handler = _make_logger('test.rate')
+    rate_filter = structured_logging.TokenBucketFilter(rate=0.0001, burst=3)
+    handler.addFilter(rate_filter)
+
+    for frame in range(100):
+        logger.info("Frame %d processed", frame)
+    logger.info("Different message")
+    logger.error("Errors are never dropped %d", 1)
+    logger.error("Errors are never dropped %d", 2)
+
+    messages = [r.getMessage() for r in handler.records]
+    assert messages[:3] == ["Frame 0 processed", "Frame 1 processed", "Frame 2 processed"]
+    assert "Different message" in messages
+    assert messages.count("Errors are never dropped 1") == 1 and len(messages) == 6
+    assert rate_filter.suppressed_total == 97
+
+    rate_filter._buckets[('test.rate', None, "Frame %d processed")][0] = 1.0
+    logger.info("Frame %d processed", 100)
+    assert handler.records[-1].suppressed == 97
+
+
+def test_json_formatter_and_camera_levels():
+    """Camera loggers tag records and can be made more verbose for one camera"""
+    logger, handler = _make_logger('test.camera')
+    cam1 = structured_logging.CameraLogger(logger, 'cam1')
+    cam2 = structured_logging.CameraLogger(logger, 'cam2')
+
+    cam1.debug("hidden")
+    structured_logging.set_log_level('DEBUG', camera='cam1')
+    try:
+        cam1.debug("shown %s", 'now', extra={'frame': 7})
+        cam2.debug("still hidden")
+    finally:
+        structured_logging.set_log_level(None, camera='cam1')
+    cam1.debug("hidden again")
+
+    assert [r.getMessage() for r in handler.records] == ["shown now"]
+    entry = json.loads(structured_logging.JsonFormatter().format(handler.records[0]))
+    assert entry['camera'] == 'cam1' and entry['frame'] == 7
+    assert entry['level'] == 'DEBUG' and entry['msg'] == 'shown now'
+
+
+if __name__ == "__main__":
+    test_rate_limit_per_template()
+    test_json_formatter_and_camera_levels()
+    print("✅ All structured logging tests passed")
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Test TFLite Preprocessing
+The TFLite input plus the Rescaling layer fused into the exported model
+(scripts/export_face_tflite.py) matches the Keras runtime's preprocessing
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Both runtimes need TensorFlow, MediaPipe (face detection) and scikit-learn (Keras runtime)
+tf = pytest.importorskip("tensorflow")
+pytest.importorskip("mediapipe")
+pytest.importorskip("sklearn")
+
+# The face recognition modules import each other as top-level modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "ai_models" / "face_recognition"))
+
+from mobilenet_face_recognition import prepare_backbone_input
+from tflite_face_recognition import prepare_tflite_input
+
+
+def test_fused_rescaling_matches_backbone_input():
+    rng = np.random.default_rng(0)
+    for shape in [(224, 224, 3), (97, 143, 3), (300, 260, 3)]:
+        face = rng.integers(0, 256, size=shape, dtype=np.uint8)
+        face[0, 0] = 0
+        face[-1, -1] = 255
+
+        # Same layer as build_fused_model
+        rescaling = tf.keras.layers.Rescaling(1 / 127.5, offset=-1.0)
+        fused = rescaling(prepare_tflite_input(face)[None, ...]).numpy()[0]
+        expected = prepare_backbone_input(face)
+
+        assert fused.shape == expected.shape == (224, 224, 3)
+        assert fused.dtype == expected.dtype == np.float32
+        np.testing.assert_allclose(fused, expected, atol=1e-6)
+
+
+if __name__ == "__main__":
+    test_fused_rescaling_matches_backbone_input()
+    print("✅ All TFLite preprocessing tests passed")
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test Training Pipeline
+Threaded, batched feature extraction matches one-at-a-time extraction
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# The face recognition modules import each other as top-level modules
+sys.path.insert(0, str(Path(__file__).parent.parent / "ai_models" / "face_recognition"))
+
+from embedding_cache import NO_FACE
+from training_pipeline import TrainingPipeline
+
+AUGMENTATIONS = {
+    'original': lambda face: face,
+    'flip': lambda face: cv2.flip(face, 1),
+}
+
+
+def _detector_factory(created):
+    def factory():
+        created.append(threading.get_ident())
+        # Bright pixels are the "face"
+        def detect(img):
+            ys, xs = np.nonzero(img[:, :, 2] > 128)
+            if len(ys) == 0:
+                return []
+            return [(ys.min(), xs.max() + 1, ys.max() + 1, xs.min())]
+        return detect
+    return factory
+
+
+def _prepare(face):
+    return cv2.resize(face, (32, 32)).astype(np.float32) / 255.0
+
+
+def _embed(batches):
+    def embed_batch(batch):
+        batches.append(batch.shape)
+        return batch.reshape(len(batch), -1)[:, ::97] * 2.0
+    return embed_batch
+
+
+def _image(seed, face=True, size=80):
+    rng = np.random.default_rng(seed)
+    img = rng.integers(0, 100, (240, 320, 3), dtype=np.uint8)
+    if face:
+        img[50:50 + size, 60:60 + size, 2] = rng.integers(150, 255, (size, size), dtype=np.uint8)
+    return cv2.imencode('.png', img)[1].tobytes()
+
+
+def test_matches_sequential_embedding():
+    """Same vectors as embedding each image alone; fixed-size batches"""
+    images = [_image(i) for i in range(25)] + [_image(99, face=False), _image(98, size=20), b'not an image']
+    created, batches = [], []
+    pipeline = TrainingPipeline(_detector_factory(created), _embed(batches), _prepare, AUGMENTATIONS,
+                                batch_size=8, workers=4, progress_interval=0)
+    results = pipeline.run(images)
+
+    assert len(results) == len(images)
+    assert all(shape[0] == 8 for shape in batches)  # last batch padded
+    assert len(batches) == 7  # 50 crops
+    assert len(created) <= 4  # one detector per worker thread
+
+    detect = _detector_factory([])()
+    for data, (vectors, cacheable) in zip(images[:25], results[:25]):
+        img = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+        top, right, bottom, left = detect(img)[0]
+        for name, augment in AUGMENTATIONS.items():
+            expected = _prepare(augment(img[top:bottom, left:right])).ravel()[::97] * 2.0
+            assert np.allclose(vectors[name], expected)
+        assert cacheable
+
+    assert results[25] == ({NO_FACE: None}, True)
+    assert results[26] == ({NO_FACE: None}, True)  # face too small
+    assert results[27] == (None, False)
+
+    report = pipeline.report()
+    assert report['batches'] == 7 and report['images_per_sec'] > 0
+    assert pipeline.stats['decode']['items'] == 28 and pipeline.stats['embed']['items'] == 50
+
+
+if __name__ == "__main__":
+    test_matches_sequential_embedding()
+    print("✅ All training pipeline tests passed")